@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark de lectura de tramas
+
+Compara la lectura original del servidor de procesamiento (recv_exact con
+`data += chunk`, O(n²) en copias) contra FrameReader (buffer preasignado +
+recv_into) para tramas de 1 KB a 64 MB sobre un socketpair local.
+
+Uso:
+    python3 benchmarks/bench_framing.py
+    python3 benchmarks/bench_framing.py --max-mb 16 --repeat 5
+"""
+
+import sys
+import time
+import struct
+import socket
+import argparse
+import threading
+from pathlib import Path
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from common.framing import FrameReader
+
+
+def recv_exact_legacy(sock: socket.socket, num_bytes: int) -> bytes:
+    """Implementación original de ProcessingServer.recv_exact"""
+    data = b''
+    while len(data) < num_bytes:
+        chunk = sock.recv(num_bytes - len(data))
+        if not chunk:
+            return b''
+        data += chunk
+    return data
+
+
+def read_legacy(sock: socket.socket):
+    header = recv_exact_legacy(sock, 5)
+    length, msg_type = struct.unpack('!IB', header)
+    return msg_type, recv_exact_legacy(sock, length - 1)
+
+
+def make_frame(size: int) -> bytes:
+    return struct.pack('!IB', size + 1, 100) + b'x' * size
+
+
+def run(size: int, repeat: int, use_reader: bool) -> float:
+    """Envía `repeat` tramas de `size` bytes y devuelve el tiempo de lectura"""
+    left, right = socket.socketpair()
+    frame = make_frame(size)
+
+    def sender():
+        for _ in range(repeat):
+            left.sendall(frame)
+
+    thread = threading.Thread(target=sender)
+    reader = FrameReader(max_frame_size=size + 1)
+
+    start = time.perf_counter()
+    thread.start()
+    for _ in range(repeat):
+        if use_reader:
+            msg_type, payload = reader.recv_frame(right)
+        else:
+            msg_type, payload = read_legacy(right)
+        assert len(payload) == size
+    elapsed = time.perf_counter() - start
+
+    thread.join()
+    left.close()
+    right.close()
+    return elapsed
+
+
+def human(size: int) -> str:
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f'{size}{unit}'
+        size //= 1024
+    return f'{size}GB'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark recv_exact vs FrameReader')
+    parser.add_argument('--max-mb', type=int, default=64, help='Tamaño máximo de trama en MB (default: 64)')
+    parser.add_argument('--repeat', type=int, default=3, help='Tramas por tamaño (default: 3)')
+    args = parser.parse_args()
+
+    sizes = []
+    size = 1024
+    while size <= args.max_mb * 1024 * 1024:
+        sizes.append(size)
+        size *= 4
+
+    print(f"{'trama':>8} {'recv_exact MB/s':>16} {'FrameReader MB/s':>17} {'mejora':>8}")
+    for size in sizes:
+        # Tramas chicas: repetir más para que el tiempo sea medible
+        repeat = max(args.repeat, (4 * 1024 * 1024) // size)
+        legacy = run(size, repeat, use_reader=False)
+        reader = run(size, repeat, use_reader=True)
+        megabytes = size * repeat / (1024 * 1024)
+        print(f"{human(size):>8} {megabytes / legacy:>16.1f} {megabytes / reader:>17.1f} {legacy / reader:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
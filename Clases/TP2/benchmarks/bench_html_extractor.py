@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark de extracción HTML: BeautifulSoup (parse_page) vs streaming (lxml)
+
+Genera páginas con la forma de sitios reales (head con meta tags y JSON-LD,
+navegación, artículos con párrafos, imágenes, scripts y estilos en línea)
+de distintos tamaños y mide, para cada extractor, el tiempo y el pico de
+memoria. Cada medición corre en un proceso nuevo (spawn) para que el pico
+de RSS de una no contamine a la siguiente; además el pico se reinicia antes
+de medir (/proc/self/clear_refs), porque se hereda incluso a través de exec.
+
+Uso:
+    python3 benchmarks/bench_html_extractor.py
+    python3 benchmarks/bench_html_extractor.py --sizes 1 5 20 --repeat 3
+"""
+
+import sys
+import time
+import argparse
+import multiprocessing
+from pathlib import Path
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from scraper.html_parser import parse_page
+from scraper.stream_extractor import extract_stream
+from rss import start_rss_measurement, peak_rss_mb
+
+
+BASE_URL = 'https://news.example.com/section/'
+CHUNK_SIZE = 64 * 1024
+
+HEAD = """<!DOCTYPE html>
+<html lang="es"><head>
+<meta charset="utf-8">
+<title>Diario de ejemplo - Portada</title>
+<meta name="description" content="Las noticias del día">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<meta property="og:title" content="Diario de ejemplo">
+<meta property="og:image" content="https://cdn.example.com/og.jpg">
+<meta name="twitter:card" content="summary_large_image">
+<link rel="stylesheet" href="/static/main.css">
+<link rel="stylesheet" href="https://cdn.example.com/fonts.css">
+<script src="/static/vendor.js"></script>
+<script type="application/ld+json">{"@context": "https://schema.org", "@type": "NewsMediaOrganization", "name": "Diario"}</script>
+<style>.hero { background: url('/img/hero.jpg') } .promo { background-image: url("/img/promo.png") }</style>
+</head><body>
+<header><nav><ul>
+""" + ''.join(f'<li><a href="/seccion/{i}">Sección {i}</a></li>' for i in range(40)) + """
+</ul></nav></header><main>
+"""
+
+ARTICLE = """<article class="card"><h2><a href="/nota/{i}">Titular de la nota {i}</a></h2>
+<img src="/img/notas/{i}.jpg" alt="Foto {i}" width="640" height="360">
+<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit. Integer nec odio. Praesent libero.
+Sed cursus ante dapibus diam. Sed nisi. Nulla quis sem at nibh elementum imperdiet.
+<a href="https://otro.example.org/ref/{i}">Fuente</a> Duis sagittis ipsum. Praesent mauris.</p>
+<p>Fusce nec tellus sed augue semper porta. Mauris massa. Vestibulum lacinia arcu eget nulla.
+Class aptent taciti sociosqu ad litora torquent per conubia nostra, per inceptos himenaeos.</p>
+<div class="share"><a href="/share?nota={i}&amp;via=tw">Compartir</a><span>123</span></div>
+<script>window.dataLayer = window.dataLayer || []; dataLayer.push({{"nota": {i}}});</script>
+</article>
+"""
+
+TAIL = '</main><footer><p>© Diario</p><iframe src="https://ads.example.com/frame"></iframe></footer></body></html>'
+
+
+def make_page(size_mb: float) -> bytes:
+    """Genera una página de aproximadamente size_mb megabytes"""
+    target = int(size_mb * 1024 * 1024)
+    parts = [HEAD]
+    total = len(HEAD)
+    i = 0
+    while total < target:
+        article = ARTICLE.format(i=i)
+        parts.append(article)
+        total += len(article)
+        i += 1
+    parts.append(TAIL)
+    return ''.join(parts).encode('utf-8')
+
+
+def run_soup(data: bytes):
+    return parse_page(data.decode('utf-8'), BASE_URL, 5)
+
+
+def run_stream(data: bytes):
+    chunks = (data[i:i + CHUNK_SIZE] for i in range(0, len(data), CHUNK_SIZE))
+    return extract_stream(chunks, BASE_URL, 5)
+
+
+def measure(name: str, data: bytes, queue):
+    """Corre un extractor en el proceso hijo y reporta tiempo y pico de RSS"""
+    extractor = run_soup if name == 'soup' else run_stream
+    state = start_rss_measurement()
+    start = time.perf_counter()
+    result = extractor(data)
+    elapsed = time.perf_counter() - start
+    queue.put((elapsed, peak_rss_mb(state), len(result['links'])))
+
+
+def run_isolated(name: str, data: bytes):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=measure, args=(name, data, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='BeautifulSoup vs extractor en streaming')
+    parser.add_argument('--sizes', type=float, nargs='+', default=[0.1, 1, 5, 20],
+                        help='Tamaños de página en MB (default: 0.1 1 5 20)')
+    parser.add_argument('--repeat', type=int, default=3, help='Repeticiones por caso (default: 3)')
+    args = parser.parse_args()
+
+    print(f"{'página':>8} {'extractor':>10} {'tiempo (ms)':>12} {'pico RSS (MB)':>14}")
+    for size in args.sizes:
+        data = make_page(size)
+        for name in ('soup', 'stream'):
+            runs = [run_isolated(name, data) for _ in range(args.repeat)]
+            best = min(r[0] for r in runs) * 1000
+            peak = max(r[1] for r in runs)
+            print(f"{len(data) / 1024 / 1024:>6.1f}MB {name:>10} {best:>12.1f} {peak:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
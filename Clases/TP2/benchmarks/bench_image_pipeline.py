@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline de imágenes: secuencial vs paralelo
+
+Sirve imágenes JPEG grandes desde un servidor HTTP local con latencia
+simulada y compara el bucle original (descargar y hacer el thumbnail de
+una imagen por vez) contra process_images_parallel. Se informa la latencia
+del lote junto con la suma y el máximo de las latencias individuales: el
+pipeline paralelo debería acercarse al máximo.
+
+Uso:
+    python3 benchmarks/bench_image_pipeline.py
+    python3 benchmarks/bench_image_pipeline.py --images 10 --latency 0.3 --size 3000
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from PIL import Image
+from processor.image_processor import download_image, create_thumbnail_bytes, process_images_parallel
+
+
+def make_jpeg(size: int) -> bytes:
+    """Foto sintética (ruido suavizado) de size x size píxeles"""
+    noise = Image.frombytes('RGB', (size // 8, size // 8), os.urandom((size // 8) ** 2 * 3))
+    image = noise.resize((size, size), Image.Resampling.BILINEAR)
+    buf = io.BytesIO()
+    image.save(buf, format='JPEG', quality=90)
+    return buf.getvalue()
+
+
+def start_site(image: bytes, latency: float):
+    class ImageHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/jpeg')
+            self.send_header('Content-Length', str(len(image)))
+            self.end_headers()
+            self.wfile.write(image)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), ImageHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def run_sequential(urls: list) -> list:
+    """Bucle original: descarga y thumbnail de a una imagen"""
+    thumbnails = []
+    for url in urls:
+        image_bytes = download_image(url)
+        if image_bytes:
+            thumbnail = create_thumbnail_bytes(image_bytes)
+            if thumbnail:
+                thumbnails.append(thumbnail)
+    return thumbnails
+
+
+def single_latencies(urls: list) -> list:
+    latencies = []
+    for url in urls:
+        start = time.perf_counter()
+        create_thumbnail_bytes(download_image(url))
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pipeline de imágenes secuencial vs paralelo')
+    parser.add_argument('--images', type=int, default=5, help='Imágenes por lote (default: 5)')
+    parser.add_argument('--latency', type=float, default=0.2, help='Latencia del servidor en s (default: 0.2)')
+    parser.add_argument('--size', type=int, default=2000, help='Lado de las imágenes en px (default: 2000)')
+    parser.add_argument('--per-host', type=int, default=4, help='Descargas simultáneas por host (default: 4)')
+    args = parser.parse_args()
+
+    httpd = start_site(make_jpeg(args.size), args.latency)
+    base = f'http://127.0.0.1:{httpd.server_address[1]}'
+    urls = [f'{base}/img_{i}.jpg' for i in range(args.images)]
+
+    try:
+        latencies = single_latencies(urls)
+
+        start = time.perf_counter()
+        sequential = run_sequential(urls)
+        sequential_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel = process_images_parallel(urls, max_images=args.images, encode_base64=False,
+                                           per_host=args.per_host)
+        parallel_time = time.perf_counter() - start
+    finally:
+        httpd.shutdown()
+
+    print(f"{args.images} imágenes de {args.size}x{args.size}, latencia {args.latency * 1000:.0f} ms, {os.cpu_count()} CPU")
+    print(f"  suma de latencias individuales: {sum(latencies) * 1000:8.1f} ms")
+    print(f"  máximo individual:              {max(latencies) * 1000:8.1f} ms")
+    print(f"  secuencial (original):          {sequential_time * 1000:8.1f} ms ({len(sequential)} thumbnails)")
+    print(f"  paralelo:                       {parallel_time * 1000:8.1f} ms ({parallel['processed_count']} thumbnails)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark del ejecutor de parseo del Servidor de Scraping (Parte A)
+
+Sirve una página local de tamaño real y ejecuta scrapes con 1, 4 y 16
+peticiones concurrentes para cada backend (thread / process / inline).
+El servidor B queda fuera de la medición (request_processing se reemplaza
+por una respuesta vacía): se mide descarga + parseo.
+
+Además del throughput se informa el retraso máximo del event loop (cuánto
+tarda en despertar una tarea que duerme 10 ms), que muestra cuánto bloquea
+el parseo al resto de las peticiones.
+
+Uso:
+    python3 benchmarks/bench_parse_executor.py
+    python3 benchmarks/bench_parse_executor.py --workers 4 --page-kb 500 --scrapes 48
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from bench_html_extractor import make_page
+from server_scraping import ScrapingServer
+
+
+def start_site(page: bytes):
+    class PageHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), PageHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+async def no_processing(url, image_urls, page=None):
+    return {}
+
+
+async def measure_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Retraso máximo del event loop en ms mientras corre el benchmark"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst * 1000
+
+
+async def run_backend(kind: str, workers: int, url: str, concurrency: int, scrapes: int):
+    server = ScrapingServer(executor=kind, workers=workers)
+    server.request_processing = no_processing
+    await server.initialize()
+
+    try:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(i):
+            async with semaphore:
+                # URLs distintas: single-flight no agrupa las peticiones
+                await server.scrape_url(f'{url}?n={i}')
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_lag(stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(scrapes)))
+        elapsed = time.perf_counter() - start
+        stop.set()
+        lag = await lag_task
+    finally:
+        await server.cleanup()
+
+    return scrapes / elapsed, lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Throughput del parseo según el backend')
+    parser.add_argument('--workers', type=int, default=4, help='Hilos/procesos del ejecutor (default: 4)')
+    parser.add_argument('--page-kb', type=int, default=300, help='Tamaño de la página en KB (default: 300)')
+    parser.add_argument('--scrapes', type=int, default=32, help='Scrapes por medición (default: 32)')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16],
+                        help='Niveles de concurrencia (default: 1 4 16)')
+    parser.add_argument('--backends', nargs='+', default=['inline', 'thread', 'process'],
+                        help='Backends a medir (default: inline thread process)')
+    args = parser.parse_args()
+
+    httpd = start_site(make_page(args.page_kb / 1024))
+    url = f'http://127.0.0.1:{httpd.server_address[1]}/index.html'
+
+    print(f"{'backend':>8} {'concurrencia':>12} {'scrapes/s':>10} {'lag máx (ms)':>13}")
+    try:
+        for kind in args.backends:
+            for concurrency in args.concurrency:
+                rate, lag = asyncio.run(run_backend(kind, args.workers, url, concurrency, args.scrapes))
+                print(f"{kind:>8} {concurrency:>12} {rate:>10.1f} {lag:>13.1f}")
+    finally:
+        httpd.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark de concurrencia del Servidor de Procesamiento (Parte B)
+
+Levanta un servidor HTTP local con imágenes grandes, arranca
+server_processing.py con distintos valores de --processes y dispara
+peticiones de procesamiento de imágenes concurrentes. El throughput
+(peticiones/segundo) debería escalar con el número de procesos.
+
+El servidor corre con --no-cache y cada petición lleva sus propias URLs
+(un query string distinto sobre las mismas imágenes): así ni la caché de
+resultados ni la unión de tareas idénticas en curso evitan el trabajo, y el
+pool procesa de verdad una tarea por petición.
+
+Uso:
+    python3 benchmarks/bench_processing_concurrency.py --processes 1 2 4 --requests 16
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import threading
+import functools
+import subprocess
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from pathlib import Path
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from PIL import Image
+from common.protocol import ProtocolMessage, create_image_processing_request, MSG_TYPE_RESPONSE
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def make_fixtures(directory: str, count: int, size: int) -> list:
+    """Genera imágenes PNG con ruido (costosas de decodificar)"""
+    names = []
+    for i in range(count):
+        img = Image.frombytes('RGB', (size, size), os.urandom(size * size * 3))
+        name = f'bench_{i}.png'
+        img.save(os.path.join(directory, name), format='PNG', compress_level=1)
+        names.append(name)
+    return names
+
+
+def start_http_server(directory: str):
+    """Sirve los fixtures por HTTP en un hilo"""
+    handler = functools.partial(QuietHandler, directory=directory)
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 15.0) -> bool:
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+
+async def send_request(port: int, image_urls: list) -> bool:
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        await create_image_processing_request('bench', image_urls).send_message(writer)
+        response = await ProtocolMessage.receive_message(reader)
+        return response.msg_type == MSG_TYPE_RESPONSE
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+def unique_urls(image_urls: list, request_id: str) -> list:
+    """Las mismas imágenes con un query string propio de la petición"""
+    return [f'{url}?req={request_id}' for url in image_urls]
+
+
+async def run_load(port: int, image_urls: list, total: int, concurrency: int, run: int = 0) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(i):
+        async with semaphore:
+            return await send_request(port, unique_urls(image_urls, f'{run}-{i}'))
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(bounded(i) for i in range(total)))
+    elapsed = time.perf_counter() - start
+    if not all(results):
+        print("  Aviso: algunas peticiones fallaron")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de escalado del servidor de procesamiento')
+    parser.add_argument('--processes', type=int, nargs='+', default=[1, 2, 4],
+                        help='Valores de --processes a probar (default: 1 2 4)')
+    parser.add_argument('--requests', type=int, default=16,
+                        help='Peticiones por corrida (default: 16)')
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help='Peticiones simultáneas (default: 16)')
+    parser.add_argument('--image-size', type=int, default=1500,
+                        help='Lado de las imágenes de prueba en px (default: 1500)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        names = make_fixtures(tmp, 5, args.image_size)
+        httpd = start_http_server(tmp)
+        base = f'http://127.0.0.1:{httpd.server_address[1]}'
+        image_urls = [f'{base}/{name}' for name in names]
+
+        print(f"{'procesos':>9} {'tiempo (s)':>11} {'req/s':>8} {'speedup':>8}")
+        baseline = None
+        for run, processes in enumerate(args.processes):
+            port = free_port()
+            proc = subprocess.Popen(
+                [sys.executable, os.path.join(PROJECT_ROOT, 'server_processing.py'),
+                 '-i', '127.0.0.1', '-p', str(port), '-n', str(processes), '--no-cache'],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            try:
+                if not wait_for_port(port):
+                    print(f"  No se pudo iniciar el servidor con {processes} procesos")
+                    continue
+                elapsed = asyncio.run(run_load(port, image_urls, args.requests, args.concurrency, run))
+                throughput = args.requests / elapsed
+                baseline = baseline or throughput
+                print(f"{processes:>9} {elapsed:>11.2f} {throughput:>8.2f} {throughput / baseline:>7.2f}x")
+            finally:
+                proc.terminate()
+                proc.wait(timeout=10)
+
+        httpd.shutdown()
+
+
+if __name__ == '__main__':
+    main()
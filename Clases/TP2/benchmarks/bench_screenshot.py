@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latencia de screenshots: navegador en frío vs pool precalentado
+
+En frío cada captura arranca y cierra un navegador (comportamiento original).
+En caliente se usa BrowserPool, que reutiliza el mismo navegador. Requiere
+Chrome/Chromium o Firefox instalado.
+
+Uso:
+    python3 benchmarks/bench_screenshot.py -u https://example.com -n 10
+"""
+
+import sys
+import math
+import time
+import argparse
+from pathlib import Path
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from processor.screenshot import capture_screenshot_png, create_browser, is_screenshot_available
+from processor.browser_pool import BrowserPool
+
+
+def percentile(values: list, pct: float) -> float:
+    """Percentil por rango más cercano"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def measure(url: str, runs: int, pool=None) -> list:
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        png = capture_screenshot_png(url, timeout=30, pool=pool)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if png is None:
+            print("  Aviso: captura fallida")
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latencia de screenshots en frío vs en caliente')
+    parser.add_argument('-u', '--url', default='https://example.com', help='URL a capturar')
+    parser.add_argument('-n', '--runs', type=int, default=10, help='Capturas por modo (default: 10)')
+    args = parser.parse_args()
+
+    if not is_screenshot_available():
+        print("Selenium no disponible")
+        sys.exit(1)
+
+    cold = measure(args.url, args.runs)
+
+    pool = BrowserPool(create_browser, size=1, max_pages=args.runs + 1)
+    pool.warm()
+    try:
+        warm = measure(args.url, args.runs, pool=pool)
+    finally:
+        pool.close()
+
+    print(f"{'modo':>8} {'p50 (ms)':>10} {'p99 (ms)':>10}")
+    for name, values in (('frío', cold), ('caliente', warm)):
+        print(f"{name:>8} {percentile(values, 50):>10.1f} {percentile(values, 99):>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark del motor de thumbnails
+
+Genera un corpus de imágenes grandes (JPEG, PNG RGB/RGBA/paleta, WebP
+RGB/RGBA) y mide, por formato, los ms por imagen y el pico de memoria de:
+
+- legacy: implementación original (composición alfa a resolución completa
+  y LANCZOS sobre la imagen entera)
+- fast / balanced / quality: presets de create_thumbnail_bytes
+
+Cada medición corre en un proceso nuevo (spawn, sin reutilizar el heap del
+proceso que generó el corpus) y el pico de RSS se reinicia antes de medir
+(/proc/self/clear_refs): el pico se hereda incluso a través de exec.
+
+Uso:
+    python3 benchmarks/bench_thumbnails.py
+    python3 benchmarks/bench_thumbnails.py --megapixels 24 --repeat 5
+"""
+
+import io
+import os
+import sys
+import time
+import math
+import argparse
+import multiprocessing
+from pathlib import Path
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from PIL import Image, features
+from rss import start_rss_measurement, peak_rss_mb
+from processor.image_processor import create_thumbnail_bytes, THUMBNAIL_PRESETS
+
+
+def create_thumbnail_legacy(image_bytes: bytes, size=(150, 150)) -> bytes:
+    """Implementación original de create_thumbnail_bytes"""
+    image = Image.open(io.BytesIO(image_bytes))
+    if image.mode in ('RGBA', 'LA', 'P'):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
+        image = background
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=85, optimize=True)
+    return buffer.getvalue()
+
+
+def make_photo(width: int, height: int, mode: str = 'RGB') -> Image.Image:
+    """Imagen sintética con el aspecto de una foto (ruido suavizado)"""
+    small = Image.frombytes('RGB', (width // 16, height // 16), os.urandom((width // 16) * (height // 16) * 3))
+    image = small.resize((width, height), Image.Resampling.BICUBIC)
+    if mode == 'RGBA':
+        alpha = Image.linear_gradient('L').resize((width, height))
+        image.putalpha(alpha)
+    elif mode == 'P':
+        image = image.quantize(colors=256)
+    return image
+
+
+def make_corpus(megapixels: float) -> dict:
+    width = int(math.sqrt(megapixels * 1_000_000 * 4 / 3))
+    height = width * 3 // 4
+    corpus = {}
+
+    def encode(name, image, fmt, **kwargs):
+        buf = io.BytesIO()
+        image.save(buf, format=fmt, **kwargs)
+        corpus[name] = buf.getvalue()
+
+    rgb = make_photo(width, height)
+    rgba = make_photo(width, height, 'RGBA')
+    encode('jpeg', rgb, 'JPEG', quality=90)
+    encode('png-rgb', rgb, 'PNG', compress_level=1)
+    encode('png-rgba', rgba, 'PNG', compress_level=1)
+    encode('png-palette', make_photo(width, height, 'P'), 'PNG', compress_level=1)
+    if features.check('webp'):
+        encode('webp-rgb', rgb, 'WEBP', quality=85)
+        encode('webp-rgba', rgba, 'WEBP', quality=85)
+    return corpus
+
+
+def measure(engine: str, data: bytes, repeat: int, queue):
+    if engine == 'legacy':
+        def run():
+            return create_thumbnail_legacy(data)
+    else:
+        def run():
+            return create_thumbnail_bytes(data, preset=engine)
+
+    state = start_rss_measurement()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        assert run()
+    elapsed = (time.perf_counter() - start) / repeat
+    queue.put((elapsed * 1000, peak_rss_mb(state)))
+
+
+def run_isolated(engine: str, data: bytes, repeat: int):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=measure, args=(engine, data, repeat, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark de thumbnails: legacy vs presets')
+    parser.add_argument('--megapixels', type=float, default=12, help='Tamaño de las imágenes (default: 12 MP)')
+    parser.add_argument('--repeat', type=int, default=3, help='Thumbnails por medición (default: 3)')
+    args = parser.parse_args()
+
+    corpus = make_corpus(args.megapixels)
+    engines = ['legacy'] + list(THUMBNAIL_PRESETS)
+
+    print(f"Corpus de {args.megapixels:g} MP")
+    print(f"{'formato':>12} {'motor':>9} {'ms/imagen':>10} {'pico RSS (MB)':>14}")
+    for name, data in corpus.items():
+        for engine in engines:
+            ms, peak = run_isolated(engine, data, args.repeat)
+            print(f"{name:>12} {engine:>9} {ms:>10.1f} {peak:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Benchmark de "thundering herd" sobre el Servidor de Scraping (Parte A)
+
+Levanta un sitio local (que cuenta las descargas de cada recurso), el
+servidor B sin caché y el servidor A en el mismo proceso, y dispara N
+peticiones GET /scrape simultáneas por la misma URL (con variantes
+equivalentes: mayúsculas, fragmento, puerto por defecto).
+
+Con single-flight la página se descarga una sola vez desde A (más una desde
+B para el análisis de rendimiento) y cada imagen una sola vez, sin importar
+N. Con --no-coalesce se llama directamente a fetch_and_scrape para comparar.
+
+Uso:
+    python3 benchmarks/bench_thundering_herd.py --clients 50
+    python3 benchmarks/bench_thundering_herd.py --clients 50 --no-coalesce
+"""
+
+import io
+import sys
+import time
+import asyncio
+import argparse
+import threading
+from collections import Counter
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import aiohttp
+from aiohttp import web
+from PIL import Image
+
+from server_processing import ProcessingServer
+from server_scraping import ScrapingServer, create_app
+
+
+PAGE = (
+    '<html><head><title>Herd</title></head><body>'
+    '<img src="/a.png"><img src="/b.png"></body></html>'
+).encode()
+
+
+def make_png() -> bytes:
+    buf = io.BytesIO()
+    Image.new('RGB', (400, 300), (0, 128, 255)).save(buf, format='PNG')
+    return buf.getvalue()
+
+
+def start_site(delay: float):
+    """Sitio local que cuenta cuántas veces se descarga cada recurso"""
+    hits = Counter()
+    lock = threading.Lock()
+    png = make_png()
+
+    class CountingHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                hits[self.path] += 1
+            if self.path.startswith('/index.html'):
+                # Simula un origen lento: todas las peticiones se solapan
+                time.sleep(delay)
+                body, content_type = PAGE, 'text/html'
+            elif self.path.endswith('.png'):
+                body, content_type = png, 'image/png'
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), CountingHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd, hits
+
+
+async def run_herd(site_port: int, processing_port: int, clients: int, coalesce: bool) -> float:
+    server = ScrapingServer('127.0.0.1', processing_port)
+    if not coalesce:
+        server.scrape_url = server.fetch_and_scrape
+
+    runner = web.AppRunner(await create_app(server))
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    variants = [
+        f'http://127.0.0.1:{site_port}/index.html',
+        f'HTTP://127.0.0.1:{site_port}/index.html#top',
+    ]
+    try:
+        async with aiohttp.ClientSession() as session:
+            async def one(i):
+                params = {'url': variants[i % len(variants)]}
+                async with session.get(f'http://127.0.0.1:{port}/scrape', params=params) as resp:
+                    await resp.read()
+                    return resp.status
+
+            start = time.perf_counter()
+            statuses = await asyncio.gather(*(one(i) for i in range(clients)))
+            elapsed = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+
+    failed = sum(1 for s in statuses if s != 200)
+    if failed:
+        print(f"Aviso: {failed} respuestas con error")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='N scrapes simultáneos de la misma URL')
+    parser.add_argument('--clients', type=int, default=50, help='Peticiones simultáneas (default: 50)')
+    parser.add_argument('--delay', type=float, default=0.3, help='Latencia del origen en segundos (default: 0.3)')
+    parser.add_argument('--no-coalesce', action='store_true', help='Desactivar single-flight en el servidor A')
+    args = parser.parse_args()
+
+    httpd, hits = start_site(args.delay)
+
+    processing = ProcessingServer('127.0.0.1', 0, num_processes=2)
+    thread = threading.Thread(target=processing.start, daemon=True)
+    thread.start()
+    if not processing.ready.wait(30):
+        print("El servidor de procesamiento no arrancó")
+        sys.exit(1)
+
+    try:
+        elapsed = asyncio.run(run_herd(
+            httpd.server_address[1], processing.port, args.clients, not args.no_coalesce
+        ))
+    finally:
+        processing.stop()
+        thread.join(10)
+        processing.cleanup()
+        httpd.shutdown()
+
+    mode = 'sin single-flight' if args.no_coalesce else 'con single-flight'
+    print(f"{args.clients} clientes ({mode}): {elapsed:.2f}s")
+    print(f"{'recurso':>12} {'descargas':>10}")
+    for path in sorted(hits):
+        print(f"{path:>12} {hits[path]:>10}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark de conjuntos de URLs vistas para crawls grandes
+
+Compara un set de Python con las estructuras de scraper/url_set.py:
+ScalableBloomFilter, FingerprintSet (huellas de 64 bits sobre mmap) y
+DiskFrontier (cola en disco + huellas). Para cada cantidad de URLs mide
+inserciones por segundo, consultas por segundo (mitad presentes, mitad
+ausentes), pico de RSS, bytes por URL y, en las que pueden equivocarse,
+falsos positivos entre las consultas ausentes.
+
+Cada medición corre en un proceso nuevo (spawn), como en
+bench_html_extractor.py. Las URLs se generan en lotes que no cuentan en el
+tiempo; el lote en curso (~1 MB) sí queda dentro del pico de RSS. Las
+páginas del archivo mapeado de FingerprintSet cuentan en el RSS mientras
+están residentes, aunque el sistema puede desalojarlas.
+
+Uso:
+    python3 benchmarks/bench_url_set.py
+    python3 benchmarks/bench_url_set.py --sizes 1000000 --structures bloom fingerprints
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from pathlib import Path
+
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from rss import start_rss_measurement, peak_rss_mb
+from scraper.url_set import ScalableBloomFilter, FingerprintSet, DiskFrontier
+
+
+STRUCTURES = ('set', 'bloom', 'fingerprints', 'frontier')
+BATCH = 10_000
+
+
+def make_urls(start: int, count: int) -> list:
+    """URLs con la forma de un crawl real: muchos hosts, paths y query strings"""
+    return [f'https://www.sitio{i % 5000}.example.com/articulos/{i // 5000}/nota-{i}?ref=portada'
+            for i in range(start, start + count)]
+
+
+def create(name: str, directory: str):
+    if name == 'set':
+        return set()
+    if name == 'bloom':
+        return ScalableBloomFilter(initial_capacity=100_000, error_rate=0.001)
+    if name == 'fingerprints':
+        return FingerprintSet(os.path.join(directory, 'seen.fp'))
+    return DiskFrontier(directory)
+
+
+def measure(name: str, count: int, queue):
+    """Inserta y consulta `count` URLs en el proceso hijo"""
+    directory = tempfile.mkdtemp(prefix='bench_url_set_')
+    try:
+        structure = create(name, directory)
+        insert = structure.push if name == 'frontier' else structure.add
+        contains = (lambda url: url in structure.seen) if name == 'frontier' else structure.__contains__
+
+        batch = make_urls(0, min(BATCH, count))
+        state = start_rss_measurement()
+        insert_time = 0.0
+        for start in range(0, count, BATCH):
+            if start:
+                batch = make_urls(start, min(BATCH, count - start))
+            began = time.perf_counter()
+            for url in batch:
+                insert(url)
+            insert_time += time.perf_counter() - began
+        peak = peak_rss_mb(state)
+
+        # Consultas: la mitad insertadas, la mitad nunca vistas
+        lookups = min(count, 1_000_000)
+        present = make_urls(0, lookups // 2)
+        absent = make_urls(count, lookups // 2)
+        began = time.perf_counter()
+        for url in present:
+            contains(url)
+        false_positives = sum(1 for url in absent if contains(url))
+        lookup_time = time.perf_counter() - began
+
+        disk = sum(f.stat().st_size for f in Path(directory).iterdir())
+        if hasattr(structure, 'close'):
+            structure.close()
+        queue.put((count / insert_time, lookups / lookup_time, peak, false_positives / (lookups // 2), disk))
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def run_isolated(name: str, count: int):
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=measure, args=(name, count, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Memoria y velocidad de conjuntos de URLs vistas')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000_000, 10_000_000],
+                        help='Cantidades de URLs (default: 1000000 10000000)')
+    parser.add_argument('--structures', choices=STRUCTURES, nargs='+', default=list(STRUCTURES),
+                        help=f'Estructuras a medir (default: {" ".join(STRUCTURES)})')
+    args = parser.parse_args()
+
+    print(f"{'URLs':>10} {'estructura':>13} {'inserciones/s':>14} {'consultas/s':>12} "
+          f"{'pico RSS (MB)':>14} {'bytes/URL':>10} {'falsos +':>9} {'disco (MB)':>11}")
+    for count in args.sizes:
+        for name in args.structures:
+            inserts, lookups, peak, fp_rate, disk = run_isolated(name, count)
+            print(f"{count:>10} {name:>13} {inserts:>14,.0f} {lookups:>12,.0f} {peak:>14.1f} "
+                  f"{peak * 1024 * 1024 / count:>10.1f} {fp_rate:>8.3%} {disk / 1024 / 1024:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Medición del pico de RSS para los benchmarks
+
+El pico (VmHWM) se reinicia antes de medir escribiendo en
+/proc/self/clear_refs, porque se hereda incluso a través de exec. Fuera de
+Linux se usa ru_maxrss, que no puede reiniciarse: conviene medir cada caso
+en un proceso nuevo (spawn).
+
+Uso desde un benchmark:
+    from rss import start_rss_measurement, peak_rss_mb
+"""
+
+import re
+import resource
+
+
+def reset_peak_rss() -> bool:
+    """Reinicia el pico de RSS del proceso (Linux); False si no es posible"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _status_kb(field: str) -> int:
+    with open('/proc/self/status') as f:
+        return int(re.search(rf'{field}:\s+(\d+)', f.read()).group(1))
+
+
+def start_rss_measurement() -> tuple:
+    """
+    Toma la línea base para medir el pico de RSS de lo que sigue
+
+    Returns:
+        tuple: Estado a pasar a peak_rss_mb
+    """
+    if reset_peak_rss():
+        return True, _status_kb('VmRSS')
+    return False, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def peak_rss_mb(state: tuple) -> float:
+    """Pico de RSS (MB) por encima de la línea base de start_rss_measurement"""
+    reset, before = state
+    peak = _status_kb('VmHWM') if reset else resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return (peak - before) / 1024
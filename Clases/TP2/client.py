@@ -10,6 +10,7 @@ import argparse
 import base64
 import os
 import copy
+import time
 from datetime import datetime
 from urllib.parse import urlparse
 
@@ -44,6 +45,94 @@ def save_screenshot(screenshot_base64: str, url: str, output_dir: str = "screens
     return filepath
 
 
+def show_result(data: dict, target_url: str, save_screenshots: bool = False):
+    """
+    Muestra un resultado de scraping y guarda el JSON completo en outputs/
+    
+    Args:
+        data: Resultado de /scrape (o de un trabajo terminado)
+        target_url: URL scrapeada
+        save_screenshots: Guardar el screenshot en disco
+    """
+    # Prepare a copy for printing: replace huge base64 screenshot with a placeholder
+    printable = copy.deepcopy(data)
+    try:
+        proc = printable.get('processing_data', {})
+        if proc and 'screenshot' in proc and proc['screenshot']:
+            b64 = proc['screenshot']
+            proc['screenshot'] = f"<base64 {len(b64)} chars>"
+    except Exception:
+        # best-effort: if anything goes wrong, continue without replacing
+        pass
+
+    print("=" * 70)
+    print("RESPUESTA RECIBIDA")
+    print("=" * 70)
+    # Print an ordered/pretty JSON for readability
+    print(json.dumps(printable, indent=2, ensure_ascii=False, sort_keys=True))
+    print("=" * 70)
+
+    # Also save the full JSON (ordered) to disk for later inspection
+    try:
+        out_dir = 'outputs'
+        os.makedirs(out_dir, exist_ok=True)
+        domain = urlparse(target_url).netloc.replace('www.', '').replace('.', '_')
+        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+        out_path = os.path.join(out_dir, f"{domain}_{ts}.json")
+        with open(out_path, 'w', encoding='utf-8') as jf:
+            json.dump(data, jf, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"   JSON completo guardado en: {out_path}")
+    except Exception as e:
+        print(f"   Error guardando JSON: {e}")
+
+    # Mostrar resumen
+    print("\n RESUMEN:")
+    print(f"  URL: {data.get('url')}")
+    print(f"  Status: {data.get('status')}")
+    print(f"  Timestamp: {data.get('timestamp')}")
+
+    if 'scraping_data' in data:
+        scraping = data['scraping_data']
+        print(f"\n  Título: {scraping.get('title')}")
+        print(f"  Enlaces encontrados: {len(scraping.get('links', []))}")
+        print(f"  Imágenes: {scraping.get('images_count')}")
+
+        if 'structure' in scraping:
+            structure = scraping['structure']
+            print(f"  Headers: H1={structure.get('h1', 0)}, H2={structure.get('h2', 0)}, H3={structure.get('h3', 0)}")
+
+    if 'processing_data' in data:
+        processing = data['processing_data']
+
+        if 'performance' in processing:
+            perf = processing['performance']
+            print(f"\n   Rendimiento:")
+            print(f"     Tiempo de carga: {perf.get('load_time_ms', 0)} ms")
+            print(f"     Tamaño total: {perf.get('total_size_kb', 0)} KB")
+            print(f"     Número de requests: {perf.get('num_requests', 0)}")
+
+        if 'screenshot' in processing:
+            screenshot = processing['screenshot']
+            if screenshot:
+                print(f"   Screenshot: Capturado ({len(screenshot)} caracteres base64)")
+
+                # Guardar screenshot si está habilitado
+                if save_screenshots:
+                    try:
+                        filepath = save_screenshot(screenshot, target_url)
+                        print(f"   Screenshot guardado en: {filepath}")
+                    except Exception as e:
+                        print(f"   Error guardando screenshot: {e}")
+            else:
+                print(f"   Screenshot: No disponible")
+
+        if 'thumbnails' in processing:
+            thumbnails = processing['thumbnails']
+            print(f"    Thumbnails: {len(thumbnails)} generados")
+
+    print("\n Scraping completado exitosamente!")
+
+
 def scrape_url(server_url: str, target_url: str, save_screenshots: bool = False):
     """
     Realiza una petición de scraping al servidor
@@ -66,84 +155,7 @@ def scrape_url(server_url: str, target_url: str, save_screenshots: bool = False)
         # Verificar respuesta
         if response.status_code == 200:
             data = response.json()
-
-            # Prepare a copy for printing: replace huge base64 screenshot with a placeholder
-            printable = copy.deepcopy(data)
-            try:
-                proc = printable.get('processing_data', {})
-                if proc and 'screenshot' in proc and proc['screenshot']:
-                    b64 = proc['screenshot']
-                    proc['screenshot'] = f"<base64 {len(b64)} chars>"
-            except Exception:
-                # best-effort: if anything goes wrong, continue without replacing
-                pass
-
-            print("=" * 70)
-            print("RESPUESTA RECIBIDA")
-            print("=" * 70)
-            # Print an ordered/pretty JSON for readability
-            print(json.dumps(printable, indent=2, ensure_ascii=False, sort_keys=True))
-            print("=" * 70)
-
-            # Also save the full JSON (ordered) to disk for later inspection
-            try:
-                out_dir = 'outputs'
-                os.makedirs(out_dir, exist_ok=True)
-                domain = urlparse(target_url).netloc.replace('www.', '').replace('.', '_')
-                ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-                out_path = os.path.join(out_dir, f"{domain}_{ts}.json")
-                with open(out_path, 'w', encoding='utf-8') as jf:
-                    json.dump(data, jf, ensure_ascii=False, indent=2, sort_keys=True)
-                print(f"   JSON completo guardado en: {out_path}")
-            except Exception as e:
-                print(f"   Error guardando JSON: {e}")
-            
-            # Mostrar resumen
-            print("\n RESUMEN:")
-            print(f"  URL: {data.get('url')}")
-            print(f"  Status: {data.get('status')}")
-            print(f"  Timestamp: {data.get('timestamp')}")
-            
-            if 'scraping_data' in data:
-                scraping = data['scraping_data']
-                print(f"\n  Título: {scraping.get('title')}")
-                print(f"  Enlaces encontrados: {len(scraping.get('links', []))}")
-                print(f"  Imágenes: {scraping.get('images_count')}")
-                
-                if 'structure' in scraping:
-                    structure = scraping['structure']
-                    print(f"  Headers: H1={structure.get('h1', 0)}, H2={structure.get('h2', 0)}, H3={structure.get('h3', 0)}")
-            
-            if 'processing_data' in data:
-                processing = data['processing_data']
-                
-                if 'performance' in processing:
-                    perf = processing['performance']
-                    print(f"\n   Rendimiento:")
-                    print(f"     Tiempo de carga: {perf.get('load_time_ms', 0)} ms")
-                    print(f"     Tamaño total: {perf.get('total_size_kb', 0)} KB")
-                    print(f"     Número de requests: {perf.get('num_requests', 0)}")
-                
-                if 'screenshot' in processing:
-                    screenshot = processing['screenshot']
-                    if screenshot:
-                        print(f"   Screenshot: Capturado ({len(screenshot)} caracteres base64)")
-                        
-                        # Guardar screenshot si está habilitado
-                        if save_screenshots:
-                            try:
-                                filepath = save_screenshot(screenshot, target_url)
-                                print(f"   Screenshot guardado en: {filepath}")
-                            except Exception as e:
-                                print(f"   Error guardando screenshot: {e}")
-                    else:
-                        print(f"   Screenshot: No disponible")
-                
-                if 'thumbnails' in processing:
-                    thumbnails = processing['thumbnails']
-                    print(f"    Thumbnails: {len(thumbnails)} generados")
-            
-            print("\n Scraping completado exitosamente!")
+            show_result(data, target_url, save_screenshots)
             
         else:
             print(f" Error: Status code {response.status_code}")
@@ -163,6 +175,238 @@ def scrape_url(server_url: str, target_url: str, save_screenshots: bool = False)
         sys.exit(1)
 
 
+def scrape_stream(server_url: str, target_url: str, save_screenshots: bool = False):
+    """
+    Scrapea una URL con respuesta progresiva (/scrape?stream=ndjson)
+    
+    Muestra los datos del scraping apenas llegan y cada resultado del
+    servidor de procesamiento a medida que termina.
+    
+    Args:
+        server_url: URL del servidor de scraping
+        target_url: URL a scrapear
+        save_screenshots: Guardar el screenshot en disco
+    """
+    try:
+        print(f"Solicitando scraping progresivo de: {target_url}")
+        print(f"Servidor: {server_url}\n")
+        
+        response = requests.get(
+            f"{server_url}/scrape",
+            params={'url': target_url, 'stream': 'ndjson'},
+            stream=True,
+            timeout=(10, 120)
+        )
+        if response.status_code != 200:
+            print(f" Error: Status code {response.status_code}")
+            print(response.text)
+            sys.exit(1)
+        
+        data = {'url': target_url, 'processing_data': {}, 'status': 'success'}
+        for raw in response.iter_lines():
+            if not raw:
+                continue
+            event = json.loads(raw)
+            elapsed = event.get('elapsed_ms', 0) / 1000
+            
+            if event['event'] == 'scraping':
+                data.update(url=event['url'], timestamp=event['timestamp'], scraping_data=event['scraping_data'])
+                print(f"  [{elapsed:5.1f} s] Scraping listo: {event['scraping_data'].get('title')}")
+            elif event['event'] == 'component':
+                data['processing_data'][event['name']] = event['data']
+                if event.get('error'):
+                    data['processing_data'].setdefault('errors', {})[event['name']] = event['error']
+                    print(f"  [{elapsed:5.1f} s] {event['name']}: {event['error']}")
+                else:
+                    print(f"  [{elapsed:5.1f} s] {event['name']} listo")
+        
+        print()
+        show_result(data, target_url, save_screenshots)
+    
+    except requests.Timeout:
+        print(" Error: Timeout al conectar con el servidor")
+        sys.exit(1)
+    
+    except requests.ConnectionError:
+        print(f" Error: No se pudo conectar con el servidor en {server_url}")
+        sys.exit(1)
+
+
+def scrape_job(server_url: str, target_url: str, save_screenshots: bool = False,
+               poll_interval: float = 1.0, max_wait: float = 600):
+    """
+    Scrapea una URL como trabajo en segundo plano (POST /jobs) y consulta su estado
+    
+    Muestra los datos del scraping apenas están listos y cada resultado del
+    servidor de procesamiento a medida que llega, sin mantener abierta una
+    petición larga.
+    
+    Args:
+        server_url: URL del servidor de scraping
+        target_url: URL a scrapear
+        save_screenshots: Guardar el screenshot en disco
+        poll_interval: Segundos entre consultas
+        max_wait: Segundos máximos de espera del trabajo
+    """
+    try:
+        print(f"Creando trabajo para: {target_url}")
+        print(f"Servidor: {server_url}\n")
+        
+        response = requests.post(f"{server_url}/jobs", params={'url': target_url}, timeout=10)
+        if response.status_code != 202:
+            print(f" Error: Status code {response.status_code}")
+            print(response.text)
+            sys.exit(1)
+        job_id = response.json()['id']
+        print(f"  Trabajo: {job_id}")
+        
+        start = time.monotonic()
+        shown = set()
+        while True:
+            response = requests.get(f"{server_url}/jobs/{job_id}", timeout=10)
+            if response.status_code != 200:
+                print(f" Error: Status code {response.status_code}")
+                print(response.text)
+                sys.exit(1)
+            job = response.json()
+            elapsed = time.monotonic() - start
+            
+            if job.get('scraping_data') and 'scraping_data' not in shown:
+                shown.add('scraping_data')
+                print(f"  [{elapsed:5.1f} s] Scraping listo: {job['scraping_data'].get('title')}")
+            for name in job.get('processing_data', {}):
+                if name not in shown:
+                    shown.add(name)
+                    print(f"  [{elapsed:5.1f} s] {name} listo")
+            
+            if job['status'] == 'failed':
+                print(f" Error: {job.get('error')}")
+                sys.exit(1)
+            if job['status'] == 'done':
+                break
+            if elapsed > max_wait:
+                print(f" Error: El trabajo no terminó en {max_wait:g} s (sigue en {server_url}/jobs/{job_id})")
+                sys.exit(1)
+            time.sleep(poll_interval)
+        
+        print()
+        show_result({
+            'url': job['url'],
+            'timestamp': job['finished_at'],
+            'scraping_data': job['scraping_data'],
+            'processing_data': job['processing_data'],
+            'status': 'success'
+        }, target_url, save_screenshots)
+    
+    except requests.Timeout:
+        print(" Error: Timeout al conectar con el servidor")
+        sys.exit(1)
+    
+    except requests.ConnectionError:
+        print(f" Error: No se pudo conectar con el servidor en {server_url}")
+        sys.exit(1)
+
+
+def read_batch_file(path: str):
+    """
+    Lee las URLs de un archivo de lote (una por línea) a medida que se envían
+    
+    Args:
+        path: Archivo con URLs ('-' para stdin); se ignoran líneas vacías y comentarios (#)
+        
+    Yields:
+        bytes: Una línea NDJSON por URL
+    """
+    source = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        for line in source:
+            url = line.strip()
+            if url and not url.startswith('#'):
+                yield (json.dumps({'url': url}) + '\n').encode('utf-8')
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def scrape_batch(server_url: str, batch_path: str, concurrency: int = None, save_screenshots: bool = False):
+    """
+    Scrapea un lote de URLs con POST /scrape/batch
+    
+    Las URLs se envían en streaming (NDJSON) y cada resultado se muestra y se
+    guarda apenas llega, en outputs/batch_<timestamp>.ndjson.
+    
+    Args:
+        server_url: URL del servidor de scraping
+        batch_path: Archivo con una URL por línea ('-' para stdin)
+        concurrency: Scrapes simultáneos a pedir al servidor (default: el del servidor)
+        save_screenshots: Guardar los screenshots en disco
+    """
+    params = {'concurrency': concurrency} if concurrency else {}
+    os.makedirs('outputs', exist_ok=True)
+    out_path = os.path.join('outputs', f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.ndjson")
+    
+    try:
+        print(f"Enviando lote desde: {batch_path}")
+        print(f"Servidor: {server_url}\n")
+        
+        # Sin timeout de lectura global: el lote puede tardar; se corta si no llega nada en 5 min
+        response = requests.post(
+            f"{server_url}/scrape/batch",
+            params=params,
+            data=read_batch_file(batch_path),
+            headers={'Content-Type': 'application/x-ndjson'},
+            stream=True,
+            timeout=(10, 300)
+        )
+        
+        if response.status_code != 200:
+            print(f" Error: Status code {response.status_code}")
+            print(response.text)
+            sys.exit(1)
+        
+        with open(out_path, 'w', encoding='utf-8') as out:
+            for raw in response.iter_lines():
+                if not raw:
+                    continue
+                out.write(raw.decode('utf-8') + '\n')
+                data = json.loads(raw)
+                
+                if 'summary' in data:
+                    summary = data['summary']
+                    print(f"\n RESUMEN: {summary.get('total')} URLs, {summary.get('succeeded')} exitosas, "
+                          f"{summary.get('failed')} fallidas en {summary.get('elapsed_ms')} ms")
+                    if summary.get('error'):
+                        print(f"   Error leyendo el lote: {summary['error']}")
+                    continue
+                
+                if data.get('status') == 'success':
+                    title = data.get('scraping_data', {}).get('title')
+                    print(f"  [{data.get('index')}] OK    {data.get('url')} - {title}")
+                    screenshot = data.get('processing_data', {}).get('screenshot')
+                    if save_screenshots and screenshot:
+                        try:
+                            filepath = save_screenshot(screenshot, data['url'])
+                            print(f"        Screenshot guardado en: {filepath}")
+                        except Exception as e:
+                            print(f"        Error guardando screenshot: {e}")
+                else:
+                    print(f"  [{data.get('index')}] ERROR {data.get('url')} - {data.get('error')}")
+        
+        print(f"   Resultados guardados en: {out_path}")
+    
+    except requests.Timeout:
+        print(" Error: El servidor no envió resultados en 5 minutos")
+        sys.exit(1)
+    
+    except requests.ConnectionError:
+        print(f" Error: No se pudo conectar con el servidor en {server_url}")
+        sys.exit(1)
+    
+    except OSError as e:
+        print(f" Error: {e}")
+        sys.exit(1)
+
+
 def health_check(server_url: str):
     """
     Verifica el estado del servidor
@@ -195,6 +439,9 @@ Ejemplos de uso:
   %(prog)s -s http://localhost:8000 -u https://example.com
   %(prog)s --health
   %(prog)s -s http://localhost:8000 -u https://python.org --save-screenshots
+  %(prog)s --batch urls.txt --concurrency 16
+  %(prog)s -u https://python.org --job
+  %(prog)s -u https://python.org --stream
         """
     )
     
@@ -211,6 +458,31 @@ Ejemplos de uso:
         help='URL a scrapear'
     )
     
+    parser.add_argument(
+        '--job',
+        action='store_true',
+        help='Scrapear la URL como trabajo en segundo plano (/jobs) y consultar su avance'
+    )
+    
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='Recibir la respuesta de forma progresiva (scraping primero, después cada resultado)'
+    )
+    
+    parser.add_argument(
+        '--batch',
+        type=str,
+        metavar='ARCHIVO',
+        help='Scrapear un lote de URLs (una por línea, - para stdin) con /scrape/batch'
+    )
+    
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        help='Scrapes simultáneos del lote (default: el configurado en el servidor)'
+    )
+    
     parser.add_argument(
         '--health',
         action='store_true',
@@ -232,11 +504,17 @@ Ejemplos de uso:
     
     if args.health:
         health_check(args.server)
+    elif args.batch:
+        scrape_batch(args.server, args.batch, args.concurrency, save_screenshots=args.save_screenshots)
+    elif args.url and args.stream:
+        scrape_stream(args.server, args.url, save_screenshots=args.save_screenshots)
+    elif args.url and args.job:
+        scrape_job(args.server, args.url, save_screenshots=args.save_screenshots)
     elif args.url:
         scrape_url(args.server, args.url, save_screenshots=args.save_screenshots)
     else:
         parser.print_help()
-        print("\n  Debes especificar una URL con -u o usar --health")
+        print("\n  Debes especificar una URL con -u, un lote con --batch o usar --health")
         sys.exit(1)
 
 
@@ -5,14 +5,23 @@ Contiene funcionalidades compartidas entre servidores
 
 from .protocol import (
     ProtocolMessage,
+    MultiplexedConnection,
+    ProcessingConnectionPool,
     create_screenshot_request,
     create_performance_request,
     create_image_processing_request,
+    create_stats_request,
     create_response,
     create_error_response,
+    create_hello,
+    negotiate_features,
+    FEATURE_BINARY,
+    SUPPORTED_FEATURES,
     MSG_TYPE_SCREENSHOT,
     MSG_TYPE_PERFORMANCE,
     MSG_TYPE_IMAGE_PROCESSING,
+    MSG_TYPE_STATS,
+    MSG_TYPE_HELLO,
     MSG_TYPE_RESPONSE,
     MSG_TYPE_ERROR
 )
@@ -23,19 +32,31 @@ from .serialization import (
     serialize_pickle,
     deserialize_pickle,
     encode_image_base64,
-    decode_image_base64
+    decode_image_base64,
+    encode_binary_base64,
+    extract_attachments,
+    restore_attachments
 )
 
 __all__ = [
     'ProtocolMessage',
+    'MultiplexedConnection',
+    'ProcessingConnectionPool',
     'create_screenshot_request',
     'create_performance_request',
     'create_image_processing_request',
+    'create_stats_request',
     'create_response',
     'create_error_response',
+    'create_hello',
+    'negotiate_features',
+    'FEATURE_BINARY',
+    'SUPPORTED_FEATURES',
     'MSG_TYPE_SCREENSHOT',
     'MSG_TYPE_PERFORMANCE',
     'MSG_TYPE_IMAGE_PROCESSING',
+    'MSG_TYPE_STATS',
+    'MSG_TYPE_HELLO',
     'MSG_TYPE_RESPONSE',
     'MSG_TYPE_ERROR',
     'serialize_json',
@@ -43,5 +64,8 @@ __all__ = [
     'serialize_pickle',
     'deserialize_pickle',
     'encode_image_base64',
-    'decode_image_base64'
+    'decode_image_base64',
+    'encode_binary_base64',
+    'extract_attachments',
+    'restore_attachments'
 ]
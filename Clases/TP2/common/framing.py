@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Módulo de Lectura de Tramas
+Lee tramas del protocolo ([4 bytes longitud][1 byte tipo][datos]) desde sockets
+sin copias cuadráticas, usando buffers preasignados y recv_into
+"""
+
+import socket
+import struct
+from collections import deque
+from typing import List, Optional, Tuple, Union
+
+
+# Tamaño máximo por defecto de una trama (datos + adjuntos)
+DEFAULT_MAX_FRAME_SIZE = 64 * 1024 * 1024
+
+# Tamaño del buffer de lectura para tramas chicas
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_FRAME_HEADER = struct.Struct('!IB')
+
+
+class FrameTooLargeError(ValueError):
+    """La trama anunciada supera el tamaño máximo permitido"""
+
+
+class FrameReader:
+    """
+    Lector de tramas reutilizable para sockets bloqueantes y no bloqueantes
+
+    Las tramas chicas se acumulan en un único buffer de lectura (varias
+    tramas pueden llegar en un mismo recv). Cuando el header anuncia una
+    trama que no entra en ese buffer, se preasigna un bytearray de su tamaño
+    exacto y el resto se recibe directamente ahí con recv_into, sin
+    concatenar bytes: el costo es O(n) para cualquier tamaño.
+    """
+
+    def __init__(self, max_frame_size: int = DEFAULT_MAX_FRAME_SIZE,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Args:
+            max_frame_size: Tamaño máximo aceptado para el contenido de una trama
+            chunk_size: Tamaño del buffer de lectura para tramas chicas
+        """
+        self.max_frame_size = max_frame_size
+        self._buffer = bytearray(chunk_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+
+        # Trama grande en curso: (tipo, buffer, bytes ya recibidos)
+        self._large_type = None
+        self._large_buffer = None
+        self._large_filled = 0
+
+        self._ready = deque()
+
+    def read_frames(self, sock: socket.socket) -> List[Tuple[int, Union[bytes, bytearray]]]:
+        """
+        Hace una lectura del socket y devuelve las tramas que quedaron completas
+
+        Pensado para bucles con selectors: una llamada por evento de lectura.
+        En sockets no bloqueantes sin datos devuelve una lista vacía.
+
+        Args:
+            sock: Socket a leer
+
+        Returns:
+            List[Tuple[int, bytes]]: (tipo, contenido) de cada trama completa
+
+        Raises:
+            EOFError: Si el otro extremo cerró la conexión
+            FrameTooLargeError: Si una trama supera max_frame_size
+        """
+        try:
+            if self._large_buffer is not None:
+                self._fill_large(sock)
+            else:
+                self._fill_buffer(sock)
+        except (BlockingIOError, InterruptedError):
+            pass
+
+        frames = list(self._ready)
+        self._ready.clear()
+        return frames
+
+    def recv_frame(self, sock: socket.socket) -> Optional[Tuple[int, Union[bytes, bytearray]]]:
+        """
+        Recibe una trama completa desde un socket bloqueante
+
+        Args:
+            sock: Socket bloqueante
+
+        Returns:
+            Tuple[int, bytes]: (tipo, contenido) o None si el socket se cerró
+
+        Raises:
+            FrameTooLargeError: Si la trama supera max_frame_size
+        """
+        while not self._ready:
+            try:
+                if self._large_buffer is not None:
+                    self._fill_large(sock)
+                else:
+                    self._fill_buffer(sock)
+            except EOFError:
+                return None
+        return self._ready.popleft()
+
+    def _fill_buffer(self, sock: socket.socket):
+        """Lee al buffer de tramas chicas y separa las tramas completas"""
+        if self._start:
+            # Mover los bytes sin consumir al inicio (mismo tamaño: no realoca)
+            pending = self._end - self._start
+            self._buffer[:pending] = self._view[self._start:self._end]
+            self._start, self._end = 0, pending
+
+        received = sock.recv_into(self._view[self._end:])
+        if not received:
+            raise EOFError("Conexión cerrada por el otro extremo")
+        self._end += received
+        self._split_frames()
+
+    def _split_frames(self):
+        """Extrae las tramas completas del buffer de lectura"""
+        header_size = _FRAME_HEADER.size
+
+        while self._end - self._start >= header_size:
+            length, msg_type = _FRAME_HEADER.unpack_from(self._buffer, self._start)
+            size = length - 1
+            if size < 0 or size > self.max_frame_size:
+                raise FrameTooLargeError(
+                    f"Trama de {size} bytes supera el máximo de {self.max_frame_size}"
+                )
+
+            body_start = self._start + header_size
+            available = self._end - body_start
+
+            if available >= size:
+                self._ready.append((msg_type, bytes(self._view[body_start:body_start + size])))
+                self._start = body_start + size
+            elif header_size + size > len(self._buffer):
+                # No entra en el buffer: preasignar la trama completa y seguir ahí
+                self._large_type = msg_type
+                self._large_buffer = bytearray(size)
+                self._large_buffer[:available] = self._view[body_start:self._end]
+                self._large_filled = available
+                self._start = self._end = 0
+                return
+            else:
+                break
+
+        if self._start == self._end:
+            self._start = self._end = 0
+
+    def _fill_large(self, sock: socket.socket):
+        """Recibe directamente en el buffer preasignado de una trama grande"""
+        view = memoryview(self._large_buffer)
+        received = sock.recv_into(view[self._large_filled:])
+        if not received:
+            raise EOFError("Conexión cerrada en medio de una trama")
+        self._large_filled += received
+
+        if self._large_filled == len(self._large_buffer):
+            self._ready.append((self._large_type, self._large_buffer))
+            self._large_type = None
+            self._large_buffer = None
+            self._large_filled = 0
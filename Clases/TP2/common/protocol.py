@@ -5,98 +5,409 @@ Define el protocolo de comunicación entre servidor A (asyncio) y servidor B (mu
 """
 
 import struct
-from typing import Dict, Any
-from .serialization import serialize_json, deserialize_json
+import uuid
+import asyncio
+from typing import Dict, Any, List, Optional
+from .serialization import (
+    serialize_json,
+    deserialize_json,
+    extract_attachments,
+    restore_attachments,
+    encode_binary_base64
+)
 
 
 # Tipos de mensajes
 MSG_TYPE_SCREENSHOT = 1
 MSG_TYPE_PERFORMANCE = 2
 MSG_TYPE_IMAGE_PROCESSING = 3
+MSG_TYPE_STATS = 4
+MSG_TYPE_HELLO = 10
 MSG_TYPE_RESPONSE = 100
 MSG_TYPE_ERROR = 255
 
+# Capacidades negociables con MSG_TYPE_HELLO
+FEATURE_BINARY = 'binary'
+SUPPORTED_FEATURES = (FEATURE_BINARY,)
+
+# Espera máxima por defecto de una respuesta del servidor de procesamiento (segundos)
+DEFAULT_REQUEST_TIMEOUT = 120
+
+_FRAME_HEADER = struct.Struct('!IB')
+_JSON_LENGTH = struct.Struct('!I')
+
 
 class ProtocolMessage:
-    """Clase para manejar mensajes del protocolo"""
+    """
+    Clase para manejar mensajes del protocolo
+    
+    Hay dos formatos de trama, elegidos por conexión:
+    
+    - JSON (por defecto): [4 bytes longitud][1 byte tipo][N bytes datos JSON].
+      Los valores binarios se envían como base64.
+    - Binario (negociado con MSG_TYPE_HELLO):
+      [4 bytes longitud][1 byte tipo][4 bytes longitud JSON][JSON][adjuntos].
+      Los valores binarios viajan crudos como adjuntos al final de la trama y
+      el JSON solo guarda referencias {"$att": i} y sus tamaños.
+    """
     
     def __init__(self, msg_type: int, data: Dict[str, Any]):
         self.msg_type = msg_type
         self.data = data
     
-    def encode(self) -> bytes:
+    def encode_parts(self, binary: bool = False) -> List[Any]:
+        """
+        Codifica el mensaje como lista de buffers para envío scatter-gather
+        
+        Los adjuntos binarios se devuelven tal cual (sin copiarlos), listos
+        para `writer.writelines` o `socket.sendmsg`.
+        
+        Args:
+            binary: Usar el formato binario negociado
+            
+        Returns:
+            List: Buffers que concatenados forman la trama
+        """
+        if not binary:
+            # Serializar datos (los binarios, si los hay, viajan como base64)
+            data_bytes = serialize_json(encode_binary_base64(self.data))
+            
+            # Header: longitud (4 bytes, incluye el tipo) + tipo (1 byte)
+            header = _FRAME_HEADER.pack(1 + len(data_bytes), self.msg_type)
+            return [header, data_bytes]
+        
+        data, attachments = extract_attachments(self.data)
+        sizes = [memoryview(a).nbytes for a in attachments]
+        json_bytes = serialize_json({'data': data, 'attachments': sizes})
+        
+        total_length = 1 + _JSON_LENGTH.size + len(json_bytes) + sum(sizes)
+        header = _FRAME_HEADER.pack(total_length, self.msg_type) + _JSON_LENGTH.pack(len(json_bytes))
+        return [header, json_bytes] + attachments
+    
+    def encode(self, binary: bool = False) -> bytes:
         """
         Codifica el mensaje en bytes para enviar por socket
         Formato: [4 bytes longitud][1 byte tipo][N bytes datos JSON]
         
+        Args:
+            binary: Usar el formato binario negociado
+        
         Returns:
             bytes: Mensaje codificado
         """
-        # Serializar datos
-        data_bytes = serialize_json(self.data)
+        return b''.join(self.encode_parts(binary))
+    
+    @staticmethod
+    def from_payload(msg_type: int, payload, binary: bool = False) -> 'ProtocolMessage':
+        """
+        Construye un mensaje a partir del contenido de una trama (sin el header)
         
-        # Calcular longitud total (tipo + datos)
-        total_length = 1 + len(data_bytes)
+        En modo binario los adjuntos se devuelven como memoryview sobre
+        `payload`, sin copias.
         
-        # Crear header: longitud (4 bytes) + tipo (1 byte)
-        header = struct.pack('!IB', total_length, self.msg_type)
+        Args:
+            msg_type: Tipo del mensaje
+            payload: Bytes de la trama después del byte de tipo
+            binary: La trama usa el formato binario
+            
+        Returns:
+            ProtocolMessage: Mensaje decodificado
+        """
+        if not binary:
+            return ProtocolMessage(msg_type, deserialize_json(bytes(payload)))
         
-        # Retornar header + datos
-        return header + data_bytes
+        view = memoryview(payload)
+        json_length, = _JSON_LENGTH.unpack_from(view)
+        offset = _JSON_LENGTH.size + json_length
+        header = deserialize_json(bytes(view[_JSON_LENGTH.size:offset]))
+        
+        attachments = []
+        for size in header.get('attachments', []):
+            attachments.append(view[offset:offset + size])
+            offset += size
+        
+        return ProtocolMessage(msg_type, restore_attachments(header['data'], attachments))
     
     @staticmethod
-    def decode(data: bytes) -> 'ProtocolMessage':
+    def decode(data: bytes, binary: bool = False) -> 'ProtocolMessage':
         """
         Decodifica bytes a un mensaje del protocolo
         
         Args:
             data: Bytes con el mensaje completo
+            binary: La trama usa el formato binario
             
         Returns:
             ProtocolMessage: Mensaje decodificado
         """
         # Extraer header (5 bytes: 4 de longitud + 1 de tipo)
-        length, msg_type = struct.unpack('!IB', data[:5])
-        
-        # Extraer datos JSON
-        json_data = data[5:]
-        message_data = deserialize_json(json_data)
+        length, msg_type = _FRAME_HEADER.unpack_from(data)
         
-        return ProtocolMessage(msg_type, message_data)
+        # El resto de la trama (length incluye el byte del tipo)
+        payload = memoryview(data)[_FRAME_HEADER.size:4 + length]
+        return ProtocolMessage.from_payload(msg_type, payload, binary)
     
     @staticmethod
-    async def receive_message(reader) -> 'ProtocolMessage':
+    async def receive_message(reader, binary: bool = False) -> 'ProtocolMessage':
         """
         Recibe un mensaje completo desde un StreamReader asíncrono
         
         Args:
             reader: asyncio.StreamReader
+            binary: La conexión negoció el formato binario
             
         Returns:
             ProtocolMessage: Mensaje recibido
         """
         # Leer header (4 bytes de longitud + 1 byte de tipo)
-        header = await reader.readexactly(5)
-        length, msg_type = struct.unpack('!IB', header)
+        header = await reader.readexactly(_FRAME_HEADER.size)
+        length, msg_type = _FRAME_HEADER.unpack(header)
+        
+        if not binary:
+            # Leer datos (length ya incluye el byte del tipo, por eso restamos 1)
+            data_bytes = await reader.readexactly(length - 1)
+            message_data = deserialize_json(data_bytes)
+            return ProtocolMessage(msg_type, message_data)
+        
+        json_length, = _JSON_LENGTH.unpack(await reader.readexactly(_JSON_LENGTH.size))
+        json_header = deserialize_json(await reader.readexactly(json_length))
         
-        # Leer datos (length ya incluye el byte del tipo, por eso restamos 1)
-        data_bytes = await reader.readexactly(length - 1)
-        message_data = deserialize_json(data_bytes)
+        # Cada adjunto se lee directamente en un buffer preasignado de su tamaño
+        attachments = []
+        for size in json_header.get('attachments', []):
+            buffer = bytearray(size)
+            await _read_into(reader, memoryview(buffer))
+            attachments.append(buffer)
         
-        return ProtocolMessage(msg_type, message_data)
+        return ProtocolMessage(msg_type, restore_attachments(json_header['data'], attachments))
     
-    async def send_message(self, writer):
+    async def send_message(self, writer, binary: bool = False):
         """
         Envía el mensaje a través de un StreamWriter asíncrono
         
         Args:
             writer: asyncio.StreamWriter
+            binary: Usar el formato binario negociado
         """
-        encoded = self.encode()
-        writer.write(encoded)
+        writer.writelines(self.encode_parts(binary))
         await writer.drain()
 
 
+async def _read_into(reader: asyncio.StreamReader, view: memoryview):
+    """Llena `view` con datos del reader sin concatenar bytes intermedios"""
+    filled = 0
+    while filled < len(view):
+        chunk = await reader.read(len(view) - filled)
+        if not chunk:
+            raise asyncio.IncompleteReadError(bytes(view[:filled]), len(view))
+        view[filled:filled + len(chunk)] = chunk
+        filled += len(chunk)
+
+
+def create_hello(features=SUPPORTED_FEATURES) -> ProtocolMessage:
+    """Crea el mensaje de negociación de capacidades"""
+    return ProtocolMessage(MSG_TYPE_HELLO, {'features': list(features)})
+
+
+async def negotiate_features(reader, writer, features=SUPPORTED_FEATURES,
+                             timeout: float = 5) -> set:
+    """
+    Negocia capacidades con el servidor de procesamiento
+    
+    Un servidor que no conoce MSG_TYPE_HELLO responde con un error y la
+    conexión sigue usando el formato JSON.
+    
+    Args:
+        reader: asyncio.StreamReader
+        writer: asyncio.StreamWriter
+        features: Capacidades que el cliente soporta
+        timeout: Tiempo máximo de espera de la respuesta
+        
+    Returns:
+        set: Capacidades aceptadas por ambos extremos
+    """
+    await create_hello(features).send_message(writer)
+    response = await asyncio.wait_for(ProtocolMessage.receive_message(reader), timeout)
+    if response.msg_type != MSG_TYPE_HELLO:
+        return set()
+    return set(response.data.get('features', [])) & set(features)
+
+
+class MultiplexedConnection:
+    """
+    Conexión persistente con el servidor de procesamiento
+    
+    Permite tener varias peticiones en vuelo sobre el mismo socket
+    (pipelining). Las respuestas pueden llegar en cualquier orden y se
+    asocian a su petición mediante el campo task_id.
+    """
+    
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 binary: bool = False):
+        self.reader = reader
+        self.writer = writer
+        self.binary = binary
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.closed = False
+        self._send_lock = asyncio.Lock()
+        self._reader_task = asyncio.create_task(self._read_loop())
+    
+    async def _read_loop(self):
+        """Lee respuestas y las entrega al futuro de su task_id"""
+        error = ConnectionError("Conexión con el servidor de procesamiento cerrada")
+        try:
+            while True:
+                message = await ProtocolMessage.receive_message(self.reader, self.binary)
+                task_id = message.data.get('task_id')
+                if task_id is None and message.msg_type == MSG_TYPE_ERROR:
+                    # Error sin task_id (frame inválido o demasiado grande): no se
+                    # sabe a qué petición corresponde, así que falla todas las pendientes
+                    for future in self.pending.values():
+                        if not future.done():
+                            future.set_result(message)
+                    self.pending.clear()
+                    continue
+                future = self.pending.pop(task_id, None)
+                if future and not future.done():
+                    future.set_result(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = ConnectionError(f"Conexión con el servidor de procesamiento perdida: {e}")
+        finally:
+            self.closed = True
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self.pending.clear()
+    
+    async def request(self, message: ProtocolMessage,
+                      timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT) -> ProtocolMessage:
+        """
+        Envía una petición y espera su respuesta
+        
+        Args:
+            message: Petición a enviar (se le asigna un task_id único si no tiene)
+            timeout: Tiempo máximo de espera en segundos (None = sin límite)
+            
+        Returns:
+            ProtocolMessage: Respuesta con el mismo task_id
+        """
+        if self.closed:
+            raise ConnectionError("Conexión con el servidor de procesamiento cerrada")
+        
+        task_id = message.data.get('task_id')
+        if not task_id or task_id in self.pending:
+            task_id = uuid.uuid4().hex
+            message.data['task_id'] = task_id
+        
+        future = asyncio.get_running_loop().create_future()
+        self.pending[task_id] = future
+        try:
+            async with self._send_lock:
+                await message.send_message(self.writer, self.binary)
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(task_id, None)
+    
+    async def close(self):
+        """Cierra la conexión y cancela la lectura"""
+        self.closed = True
+        self._reader_task.cancel()
+        try:
+            await self._reader_task
+        except asyncio.CancelledError:
+            pass
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except Exception:
+            pass
+
+
+class ProcessingConnectionPool:
+    """
+    Pool de conexiones persistentes hacia el servidor de procesamiento
+    
+    Reutiliza hasta `size` conexiones multiplexadas en lugar de abrir una
+    conexión TCP por petición. Las conexiones se abren bajo demanda y se
+    reemplazan automáticamente si se pierden.
+    """
+    
+    def __init__(self, host: str, port: int, size: int = 2, connect_timeout: float = 10,
+                 binary: bool = True):
+        """
+        Args:
+            host: Host del servidor de procesamiento
+            port: Puerto del servidor de procesamiento
+            size: Máximo de conexiones simultáneas
+            connect_timeout: Timeout para abrir cada conexión en segundos
+            binary: Negociar el formato binario (adjuntos sin base64)
+        """
+        self.host = host
+        self.port = port
+        self.size = max(1, size)
+        self.connect_timeout = connect_timeout
+        self.binary = binary
+        self.connections: list = []
+        self._connect_lock = asyncio.Lock()
+    
+    async def request(self, message: ProtocolMessage,
+                      timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT) -> ProtocolMessage:
+        """
+        Envía una petición por alguna de las conexiones del pool
+        
+        Args:
+            message: Petición a enviar
+            timeout: Tiempo máximo de espera de la respuesta en segundos (None = sin límite)
+            
+        Returns:
+            ProtocolMessage: Respuesta del servidor
+        """
+        connection = await self._get_connection()
+        return await connection.request(message, timeout)
+    
+    async def _get_connection(self) -> MultiplexedConnection:
+        """Elige la conexión menos cargada, abriendo una nueva si conviene"""
+        self.connections = [c for c in self.connections if not c.closed]
+        
+        idle = [c for c in self.connections if not c.pending]
+        if idle:
+            return idle[0]
+        
+        if len(self.connections) < self.size:
+            async with self._connect_lock:
+                self.connections = [c for c in self.connections if not c.closed]
+                if len(self.connections) < self.size:
+                    connection = await self._open_connection()
+                    self.connections.append(connection)
+                    return connection
+        
+        return min(self.connections, key=lambda c: len(c.pending))
+    
+    async def _open_connection(self) -> MultiplexedConnection:
+        """Abre una conexión y negocia el formato de trama"""
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port),
+            self.connect_timeout
+        )
+        binary = False
+        if self.binary:
+            try:
+                features = await negotiate_features(reader, writer, timeout=self.connect_timeout)
+            except Exception:
+                writer.close()
+                raise
+            binary = FEATURE_BINARY in features
+        return MultiplexedConnection(reader, writer, binary)
+    
+    async def close(self):
+        """Cierra todas las conexiones del pool"""
+        connections, self.connections = self.connections, []
+        for connection in connections:
+            await connection.close()
+
+
 def create_screenshot_request(url: str, task_id: str = None) -> ProtocolMessage:
     """Crea una solicitud de screenshot"""
     return ProtocolMessage(MSG_TYPE_SCREENSHOT, {
@@ -105,20 +416,56 @@ def create_screenshot_request(url: str, task_id: str = None) -> ProtocolMessage:
     })
 
 
-def create_performance_request(url: str, task_id: str = None) -> ProtocolMessage:
-    """Crea una solicitud de análisis de rendimiento"""
-    return ProtocolMessage(MSG_TYPE_PERFORMANCE, {
+def create_performance_request(url: str, task_id: str = None, page: dict = None,
+                               options: dict = None) -> ProtocolMessage:
+    """
+    Crea una solicitud de análisis de rendimiento
+    
+    Args:
+        url: URL de la página
+        task_id: Identificador de la tarea
+        page: Datos de la página ya descargada (load_time_ms, size_bytes,
+              status_code, resources); si se envían, el servidor B no la
+              vuelve a descargar
+        options: Opciones del análisis (ej: {'page_weight': True} para medir
+                 el peso real descargando los subrecursos)
+    """
+    data = {
         'url': url,
         'task_id': task_id
-    })
+    }
+    if page is not None:
+        data['page'] = page
+    if options:
+        data['options'] = options
+    return ProtocolMessage(MSG_TYPE_PERFORMANCE, data)
 
 
-def create_image_processing_request(url: str, images: list, task_id: str = None) -> ProtocolMessage:
-    """Crea una solicitud de procesamiento de imágenes"""
-    return ProtocolMessage(MSG_TYPE_IMAGE_PROCESSING, {
+def create_image_processing_request(url: str, images: list, task_id: str = None,
+                                    options: dict = None) -> ProtocolMessage:
+    """
+    Crea una solicitud de procesamiento de imágenes
+    
+    Args:
+        url: URL de la página
+        images: URLs de las imágenes
+        task_id: Identificador de la tarea
+        options: Opciones de los thumbnails (ej: {'preset': 'fast'})
+    """
+    data = {
         'url': url,
         'images': images,
         'task_id': task_id
+    }
+    if options:
+        data['options'] = options
+    return ProtocolMessage(MSG_TYPE_IMAGE_PROCESSING, data)
+
+
+def create_stats_request(task_id: str = None) -> ProtocolMessage:
+    """Crea una solicitud de estadísticas del servidor de procesamiento"""
+    return ProtocolMessage(MSG_TYPE_STATS, {
+        'task_id': task_id
     })
 
 
@@ -7,7 +7,7 @@ Maneja la serialización y deserialización de datos para comunicación entre se
 import json
 import pickle
 import base64
-from typing import Any, Dict
+from typing import Any, Dict, List, Tuple
 
 
 def serialize_json(data: Dict[str, Any]) -> bytes:
@@ -64,12 +64,12 @@ def deserialize_pickle(data: bytes) -> Any:
     return pickle.loads(data)
 
 
-def encode_image_base64(image_bytes: bytes) -> str:
+def encode_image_base64(image_bytes) -> str:
     """
     Codifica una imagen en base64 para enviarla en JSON
     
     Args:
-        image_bytes: Bytes de la imagen
+        image_bytes: Bytes de la imagen (bytes, bytearray o memoryview)
         
     Returns:
         str: Imagen codificada en base64
@@ -88,3 +88,86 @@ def decode_image_base64(base64_str: str) -> bytes:
         bytes: Bytes de la imagen
     """
     return base64.b64decode(base64_str.encode('utf-8'))
+
+
+# Tipos que viajan como adjuntos binarios (sin base64) en el modo binario del protocolo
+BINARY_TYPES = (bytes, bytearray, memoryview)
+
+# Clave usada en el JSON para referenciar un adjunto: {"$att": índice}
+ATTACHMENT_REF = '$att'
+
+
+def extract_attachments(data: Any) -> Tuple[Any, List[Any]]:
+    """
+    Separa los valores binarios de una estructura JSON
+    
+    Cada valor bytes/bytearray/memoryview se reemplaza por una referencia
+    {"$att": índice} y se devuelve aparte, sin copiarlo.
+    
+    Args:
+        data: Estructura (dict/list) que puede contener valores binarios
+        
+    Returns:
+        Tuple: (estructura con referencias, lista de buffers binarios)
+    """
+    attachments = []
+    
+    def walk(value):
+        if isinstance(value, BINARY_TYPES):
+            attachments.append(value)
+            return {ATTACHMENT_REF: len(attachments) - 1}
+        if isinstance(value, dict):
+            return {k: walk(v) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [walk(v) for v in value]
+        return value
+    
+    return walk(data), attachments
+
+
+def restore_attachments(data: Any, attachments: List[Any]) -> Any:
+    """
+    Reemplaza las referencias {"$att": índice} por sus buffers binarios
+    
+    Args:
+        data: Estructura deserializada del JSON
+        attachments: Buffers recibidos, en orden
+        
+    Returns:
+        Any: Estructura con los valores binarios restaurados
+    """
+    if not attachments:
+        return data
+    
+    def walk(value):
+        if isinstance(value, dict):
+            if len(value) == 1 and ATTACHMENT_REF in value:
+                return attachments[value[ATTACHMENT_REF]]
+            return {k: walk(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [walk(v) for v in value]
+        return value
+    
+    return walk(data)
+
+
+def encode_binary_base64(data: Any) -> Any:
+    """
+    Convierte los valores binarios de una estructura a strings base64
+    
+    Se usa al salir del sistema (respuesta JSON al cliente HTTP) o con
+    clientes del protocolo que no negociaron el modo binario.
+    
+    Args:
+        data: Estructura que puede contener valores binarios
+        
+    Returns:
+        Any: Estructura apta para serializar como JSON
+    """
+    if isinstance(data, BINARY_TYPES):
+        return encode_image_base64(data)
+    if isinstance(data, dict):
+        return {k: encode_binary_base64(v) for k, v in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [encode_binary_base64(v) for v in data]
+    return data
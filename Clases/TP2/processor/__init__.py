@@ -3,15 +3,32 @@ Módulo de Procesamiento
 Contiene funcionalidades para procesamiento CPU-bound
 """
 
-from .screenshot import capture_screenshot, is_screenshot_available
+from .screenshot import capture_screenshot, capture_screenshot_png, is_screenshot_available
+from .browser_pool import BrowserPool, get_browser_pool, init_browser_pool
 from .performance import analyze_performance, analyze_performance_detailed
+from .page_weight import measure_page_weight
+from .timing import waterfall_samples
 from .image_processor import process_images, process_images_parallel
+from .result_cache import ResultCache
+from .http_session import get_session, install_dns_cache, HostLimiter
+from .image_sniff import sniff_image
 
 __all__ = [
     'capture_screenshot',
+    'capture_screenshot_png',
     'is_screenshot_available',
+    'BrowserPool',
+    'get_browser_pool',
+    'init_browser_pool',
     'analyze_performance',
     'analyze_performance_detailed',
+    'measure_page_weight',
+    'waterfall_samples',
     'process_images',
-    'process_images_parallel'
+    'process_images_parallel',
+    'ResultCache',
+    'get_session',
+    'install_dns_cache',
+    'HostLimiter',
+    'sniff_image'
 ]
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Módulo de Pool de Navegadores
+Mantiene navegadores headless ya iniciados para reutilizarlos entre capturas.
+
+Arrancar Chrome/Firefox tarda segundos y domina la latencia de un screenshot.
+Cada proceso worker del servidor de procesamiento tiene su propio pool
+(los drivers de Selenium no se pueden compartir entre procesos): los
+navegadores se reutilizan entre peticiones y se reciclan después de N
+páginas o cuando dejan de responder.
+"""
+
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+
+class PooledBrowser:
+    """Navegador del pool junto con la cantidad de páginas que ya cargó"""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.pages = 0
+
+
+class BrowserPool:
+    """Pool de navegadores headless reutilizables"""
+
+    def __init__(self, driver_factory: Callable, size: int = 1, max_pages: int = 50):
+        """
+        Args:
+            driver_factory: Función sin argumentos que crea un WebDriver nuevo
+            size: Navegadores que se mantienen abiertos
+            max_pages: Páginas que carga un navegador antes de reciclarlo
+        """
+        self.driver_factory = driver_factory
+        self.size = max(1, size)
+        self.max_pages = max(1, max_pages)
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.recycled = 0
+
+    def warm(self):
+        """Inicia navegadores hasta completar el tamaño del pool"""
+        while True:
+            with self._lock:
+                if len(self._idle) >= self.size:
+                    return
+            browser = self._create()
+            with self._lock:
+                self._idle.append(browser)
+
+    @contextmanager
+    def browser(self):
+        """
+        Presta un navegador del pool
+
+        Si el código que lo usa lanza una excepción, el navegador se descarta
+        (puede haber quedado colgado o con la sesión rota).
+
+        Yields:
+            WebDriver listo para usar
+        """
+        browser = self._acquire()
+        broken = True
+        try:
+            yield browser.driver
+            broken = False
+        finally:
+            browser.pages += 1
+            self._release(browser, broken)
+
+    def health_check(self) -> dict:
+        """
+        Verifica los navegadores ociosos y descarta los que no responden
+
+        Returns:
+            dict: Estado del pool
+        """
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+
+        healthy = []
+        for browser in idle:
+            if is_driver_healthy(browser.driver):
+                healthy.append(browser)
+            else:
+                self._discard(browser)
+
+        with self._lock:
+            self._idle.extend(healthy)
+            return {
+                'idle': len(self._idle),
+                'size': self.size,
+                'created': self.created,
+                'recycled': self.recycled
+            }
+
+    def close(self):
+        """Cierra todos los navegadores ociosos"""
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for browser in idle:
+            _quit(browser.driver)
+
+    def _create(self) -> PooledBrowser:
+        driver = self.driver_factory()
+        with self._lock:
+            self.created += 1
+        return PooledBrowser(driver)
+
+    def _acquire(self) -> PooledBrowser:
+        """Toma un navegador sano del pool o crea uno nuevo"""
+        while True:
+            with self._lock:
+                browser = self._idle.popleft() if self._idle else None
+            if browser is None:
+                return self._create()
+            if is_driver_healthy(browser.driver):
+                return browser
+            # Se cayó mientras estaba ocioso: reciclar y probar con otro
+            self._discard(browser)
+
+    def _release(self, browser: PooledBrowser, broken: bool):
+        """Devuelve un navegador al pool o lo recicla"""
+        if broken or browser.pages >= self.max_pages:
+            self._discard(browser)
+            return
+
+        # Limpiar estado entre páginas (cookies, página cargada)
+        try:
+            browser.driver.delete_all_cookies()
+            browser.driver.get('about:blank')
+        except Exception:
+            self._discard(browser)
+            return
+
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(browser)
+                return
+        self._discard(browser)
+
+    def _discard(self, browser: PooledBrowser):
+        with self._lock:
+            self.recycled += 1
+        _quit(browser.driver)
+
+
+def is_driver_healthy(driver) -> bool:
+    """Indica si el navegador sigue respondiendo comandos"""
+    try:
+        return driver.execute_script('return 1') == 1
+    except Exception:
+        return False
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+# Pool del proceso actual (cada worker del Pool de multiprocessing tiene el suyo)
+_worker_pool: Optional[BrowserPool] = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """
+    Devuelve el pool de navegadores del proceso actual, creándolo si hace falta
+
+    La configuración se toma de las variables de entorno
+    BROWSER_POOL_SIZE (default: 1) y BROWSER_MAX_PAGES (default: 50).
+    """
+    global _worker_pool
+    if _worker_pool is None:
+        from multiprocessing import util
+        from .screenshot import create_browser
+
+        try:
+            size = int(os.environ.get('BROWSER_POOL_SIZE', '1'))
+            max_pages = int(os.environ.get('BROWSER_MAX_PAGES', '50'))
+        except ValueError:
+            size, max_pages = 1, 50
+
+        _worker_pool = BrowserPool(create_browser, size=size, max_pages=max_pages)
+        # Cerrar los navegadores cuando termine el proceso worker
+        util.Finalize(None, _worker_pool.close, exitpriority=10)
+    return _worker_pool
+
+
+def init_browser_pool(warm: bool = False):
+    """
+    Prepara el pool del proceso (pensado como initializer de multiprocessing.Pool)
+
+    Args:
+        warm: Iniciar los navegadores ya, en lugar de en la primera captura
+    """
+    pool = get_browser_pool()
+    if warm:
+        try:
+            pool.warm()
+        except Exception as e:
+            print(f"[screenshot] no se pudo precalentar el navegador: {e}")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Módulo de Sesión HTTP
+Sesión de requests compartida por proceso (pool de conexiones keep-alive),
+caché de resolución DNS de esa sesión y limitador de descargas concurrentes
+por host.
+"""
+
+import os
+import time
+import socket
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NameResolutionError, NewConnectionError
+from urllib3.util import connection
+
+
+USER_AGENT = 'Mozilla/5.0 (Web Scraper Bot)'
+
+# Conexiones keep-alive que se conservan por host
+POOL_MAXSIZE = 16
+
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+# Segundos que se recuerda una resolución DNS
+DNS_CACHE_TTL = 60
+
+# Hosts distintos que se recuerdan (se desaloja el usado hace más tiempo)
+DNS_CACHE_MAX_ENTRIES = 1024
+
+# Resolución del sistema, sin la caché de install_dns_cache (para medir DNS)
+system_getaddrinfo = socket.getaddrinfo
+
+_dns_cache: Optional['DNSCache'] = None
+
+
+def get_session() -> requests.Session:
+    """
+    Devuelve la sesión HTTP del proceso actual, creándola si hace falta
+
+    La sesión reutiliza conexiones entre descargas y puede usarse desde
+    varios hilos. Cada proceso (worker del Pool) tiene la suya: una sesión
+    heredada por fork compartiría sockets con el proceso padre.
+
+    Returns:
+        requests.Session configurada
+    """
+    global _session, _session_pid
+    with _session_lock:
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            adapter = CachedDNSAdapter(pool_connections=POOL_MAXSIZE, pool_maxsize=POOL_MAXSIZE)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+            _session, _session_pid = session, os.getpid()
+        return _session
+
+
+class DNSCache:
+    """Caché LRU de socket.getaddrinfo con TTL (las fallas no se cachean)"""
+
+    def __init__(self, ttl: float = DNS_CACHE_TTL, resolver=system_getaddrinfo,
+                 max_entries: int = DNS_CACHE_MAX_ENTRIES):
+        """
+        Args:
+            ttl: Segundos de validez de cada resolución
+            resolver: Función de resolución original
+            max_entries: Resoluciones que se conservan como máximo
+        """
+        self.ttl = ttl
+        self.resolver = resolver
+        self.max_entries = max(1, max_entries)
+        self._entries: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        """Misma firma que socket.getaddrinfo"""
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+        result = self.resolver(host, port, family, type, proto, flags)
+        with self._lock:
+            self._entries[key] = (now + self.ttl, tuple(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        """Aciertos, fallos y entradas de la caché"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+def install_dns_cache(ttl: float = DNS_CACHE_TTL, max_entries: int = DNS_CACHE_MAX_ENTRIES) -> DNSCache:
+    """
+    Cachea las resoluciones DNS de la sesión del proceso (get_session)
+    
+    Solo las conexiones que abre esa sesión usan la caché (ver
+    CachedDNSAdapter); socket.getaddrinfo no se toca, así el resto del
+    proceso sigue resolviendo con el sistema. Pensado para los workers del
+    Pool: cada tarea nueva a un host ya visto evita la consulta DNS.
+    Llamarla de nuevo no la crea dos veces.
+    
+    Args:
+        ttl: Segundos de validez de cada resolución
+        max_entries: Resoluciones que se conservan como máximo
+        
+    Returns:
+        DNSCache: Caché instalada
+    """
+    global _dns_cache
+    with _session_lock:
+        if _dns_cache is None:
+            _dns_cache = DNSCache(ttl, max_entries=max_entries)
+        return _dns_cache
+
+
+class _CachedDNSConnectionMixin:
+    """Abre la conexión resolviendo el host con la caché DNS del proceso"""
+
+    def _new_conn(self) -> socket.socket:
+        cache = _dns_cache
+        if cache is None:
+            return super()._new_conn()
+        try:
+            addresses = cache.getaddrinfo(self._dns_host, self.port, 0, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+
+        # Igual que urllib3: se prueba cada dirección hasta que una conecte
+        error = None
+        for *_, address in addresses:
+            try:
+                return connection.create_connection(
+                    (address[0], self.port),
+                    self.timeout,
+                    source_address=self.source_address,
+                    socket_options=self.socket_options,
+                )
+            except socket.timeout as e:
+                raise ConnectTimeoutError(
+                    self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})"
+                ) from e
+            except OSError as e:
+                error = e
+        raise NewConnectionError(self, f"Failed to establish a new connection: {error}") from error
+
+
+class _CachedDNSHTTPConnection(_CachedDNSConnectionMixin, HTTPConnection):
+    pass
+
+
+class _CachedDNSHTTPSConnection(_CachedDNSConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _CachedDNSHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _CachedDNSHTTPConnection
+
+
+class _CachedDNSHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedDNSHTTPSConnection
+
+
+class CachedDNSAdapter(HTTPAdapter):
+    """
+    Adapter de requests cuyas conexiones resuelven con la caché DNS
+
+    Mientras no se llame a install_dns_cache se comporta como HTTPAdapter.
+    El nombre del host se conserva para SNI y la verificación del
+    certificado; solo el connect usa la dirección cacheada.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _CachedDNSHTTPConnectionPool,
+            'https': _CachedDNSHTTPSConnectionPool
+        }
+
+
+class HostLimiter:
+    """Limita cuántas descargas simultáneas se hacen a un mismo host"""
+
+    def __init__(self, per_host: int = 4):
+        """
+        Args:
+            per_host: Descargas concurrentes permitidas por host
+        """
+        self.per_host = max(1, per_host)
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url: str):
+        """
+        Espera un lugar libre para el host de la URL
+
+        Args:
+            url: URL a descargar
+        """
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host)
+                self._semaphores[host] = semaphore
+        with semaphore:
+            yield
@@ -5,113 +5,296 @@ Descarga imágenes y genera thumbnails optimizados
 """
 
 import io
+import os
+import time
 import base64
-import requests
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from typing import List, Optional, Tuple
-from PIL import Image, ImageOps
+from PIL import Image, ImageChops, ImageOps, features
 
+# AVIF es opcional: Pillow lo soporta con el plugin pillow-avif-plugin
+try:
+    import pillow_avif  # noqa: F401
+except ImportError:
+    pass
 
-def download_image(url: str, timeout: int = 10) -> Optional[bytes]:
+from .http_session import get_session, HostLimiter
+from .image_sniff import sniff_image
+
+
+# Presets de thumbnails: velocidad vs calidad
+#   reducing_gap: antes del remuestreo final se reduce la imagen por un factor
+#   entero (draft/escalado DCT para JPEG, reduce() para el resto) hasta quedar
+#   a reducing_gap veces el tamaño final; None = remuestrear desde la
+#   resolución completa
+THUMBNAIL_PRESETS = {
+    'fast': {
+        'resample': Image.Resampling.BILINEAR,
+        'reducing_gap': 1.5,
+        'quality': 75,
+        'optimize': False,
+        'webp_method': 0
+    },
+    'balanced': {
+        'resample': Image.Resampling.LANCZOS,
+        'reducing_gap': 2.0,
+        'quality': 85,
+        'optimize': True,
+        'webp_method': 4
+    },
+    'quality': {
+        'resample': Image.Resampling.LANCZOS,
+        'reducing_gap': None,
+        'quality': 90,
+        'optimize': True,
+        'webp_method': 6
+    }
+}
+
+DEFAULT_THUMBNAIL_PRESET = 'balanced'
+
+# Sets de thumbnails (varios tamaños/formatos de una sola decodificación)
+THUMBNAIL_SET_FORMATS = ('JPEG', 'WEBP', 'AVIF')
+MAX_THUMBNAIL_SET_SIZES = 6
+MAX_THUMBNAIL_SIDE = 2048
+
+# Límites de las descargas de imágenes (ver set_download_limits)
+DEFAULT_MAX_IMAGE_BYTES = 20 * 1024 * 1024
+DEFAULT_MAX_IMAGE_PIXELS = 40_000_000
+
+# Bytes leídos por iteración y máximo a leer buscando las dimensiones
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+SNIFF_LIMIT = 256 * 1024
+
+_download_limits = {
+    'max_bytes': DEFAULT_MAX_IMAGE_BYTES,
+    'max_pixels': DEFAULT_MAX_IMAGE_PIXELS
+}
+
+# Hilos de descarga del pool compartido de process_images_parallel
+DOWNLOAD_THREADS = 8
+
+# Tope de process_images_parallel para todo el lote (cada imagen tiene además su deadline)
+BATCH_DEADLINE = 30.0
+
+# Pools de hilos del proceso (ver init_image_pools)
+_image_pools = {'download': None, 'thumbnail': None, 'pid': None}
+_image_pools_lock = threading.Lock()
+
+
+def set_download_limits(max_bytes: int = None, max_pixels: int = None):
+    """
+    Cambia los límites por defecto de download_image en este proceso
+    
+    Args:
+        max_bytes: Tamaño máximo de una imagen descargada
+        max_pixels: Píxeles máximos (ancho x alto) de una imagen
+    """
+    if max_bytes is not None:
+        _download_limits['max_bytes'] = max_bytes
+    if max_pixels is not None:
+        _download_limits['max_pixels'] = max_pixels
+
+
+def init_image_pools(download_threads: int = DOWNLOAD_THREADS) -> Tuple[ThreadPoolExecutor, ThreadPoolExecutor]:
+    """
+    Crea (una sola vez) los pools de hilos de descargas y thumbnails del proceso
+    
+    Los workers del servidor B lo llaman al iniciar; así cada lote reutiliza
+    los mismos hilos en lugar de crear y destruir dos pools por tarea. Un
+    proceso creado con fork no hereda los hilos, así que crea sus propios
+    pools.
+    
+    Args:
+        download_threads: Hilos del pool de descargas
+        
+    Returns:
+        Tuple: (pool de descargas, pool de thumbnails)
+    """
+    with _image_pools_lock:
+        if _image_pools['pid'] != os.getpid():
+            _image_pools['download'] = ThreadPoolExecutor(download_threads, thread_name_prefix='img-download')
+            _image_pools['thumbnail'] = ThreadPoolExecutor(os.cpu_count() or 1, thread_name_prefix='img-thumb')
+            _image_pools['pid'] = os.getpid()
+        return _image_pools['download'], _image_pools['thumbnail']
+
+
+def download_image(url: str, timeout: int = 10, max_bytes: int = None,
+                   max_pixels: int = None) -> Optional[bytes]:
     """
     Descarga una imagen desde una URL
     
+    La respuesta se lee en streaming: se rechaza apenas supera max_bytes
+    (o si Content-Length ya lo anuncia), y el formato y las dimensiones se
+    leen de los primeros bytes para descartar lo que no es una imagen o
+    tiene demasiados píxeles (bomba de descompresión) sin terminar de
+    descargarlo ni decodificarlo.
+    
     Args:
         url: URL de la imagen
         timeout: Timeout en segundos
+        max_bytes: Tamaño máximo en bytes (None = límite del proceso)
+        max_pixels: Píxeles máximos (None = límite del proceso)
         
     Returns:
         bytes: Bytes de la imagen o None si falla
     """
+    max_bytes = max_bytes or _download_limits['max_bytes']
+    max_pixels = max_pixels or _download_limits['max_pixels']
+    
     try:
-        response = requests.get(
-            url,
-            timeout=timeout,
-            headers={'User-Agent': 'Mozilla/5.0 (Web Scraper Bot)'},
-            stream=True
-        )
-        
-        if response.status_code == 200:
-            # Verificar que sea una imagen
-            content_type = response.headers.get('Content-Type', '')
-            if 'image' in content_type:
-                return response.content
-        
-        return None
+        # Sesión compartida: reutiliza conexiones keep-alive entre descargas
+        with get_session().get(url, timeout=timeout, stream=True) as response:
+            if response.status_code != 200:
+                return None
+            
+            content_length = response.headers.get('Content-Length', '')
+            if content_length.isdigit() and int(content_length) > max_bytes:
+                print(f"Imagen descartada {url}: {content_length} bytes (máximo {max_bytes})")
+                return None
+            
+            buffer = io.BytesIO()
+            header = None
+            for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                buffer.write(chunk)
+                received = buffer.tell()
+                if received > max_bytes:
+                    print(f"Imagen descartada {url}: supera {max_bytes} bytes")
+                    return None
+                
+                if header is None:
+                    # El encabezado se lee sobre el propio buffer, sin copiarlo
+                    with buffer.getbuffer() as head:
+                        header = sniff_image(head)
+                    if header is None and received >= SNIFF_LIMIT:
+                        raise ValueError("No se encontraron las dimensiones en el encabezado")
+                    if header is not None and header[1] * header[2] > max_pixels:
+                        print(f"Imagen descartada {url}: {header[1]}x{header[2]} píxeles")
+                        return None
+            
+            if header is None:
+                return None
+            
+            # getvalue no copia: devuelve el bytes interno del buffer
+            return buffer.getvalue()
         
     except Exception as e:
         print(f"Error descargando imagen {url}: {str(e)}")
         return None
 
 
-def create_thumbnail(image_bytes: bytes, size: Tuple[int, int] = (150, 150)) -> Optional[str]:
+def create_thumbnail(image_bytes: bytes, size: Tuple[int, int] = (150, 150),
+                     preset: str = DEFAULT_THUMBNAIL_PRESET) -> Optional[str]:
     """
     Crea un thumbnail de una imagen
     
     Args:
         image_bytes: Bytes de la imagen original
         size: Tamaño del thumbnail (ancho, alto)
+        preset: 'fast', 'balanced' o 'quality'
         
     Returns:
         str: Thumbnail codificado en base64 o None si falla
     """
+    thumbnail = create_thumbnail_bytes(image_bytes, size, preset)
+    if thumbnail is None:
+        return None
+    return base64.b64encode(thumbnail).decode('utf-8')
+
+
+def create_thumbnail_bytes(image_bytes: bytes, size: Tuple[int, int] = (150, 150),
+                           preset: str = DEFAULT_THUMBNAIL_PRESET) -> Optional[bytes]:
+    """
+    Crea un thumbnail de una imagen y devuelve los bytes JPEG crudos
+    
+    La imagen no se decodifica a resolución completa si no hace falta: los
+    JPEG se leen directamente reducidos (draft, escalado DCT 1/2-1/8) y el
+    resto se achica con reduce() antes del remuestreo final. Las imágenes
+    con canal alfa se premultiplican (RGBa) antes de reducirse, así la
+    composición sobre fondo blanco se hace sobre la imagen ya reducida.
+    
+    Args:
+        image_bytes: Bytes de la imagen original
+        size: Tamaño del thumbnail (ancho, alto)
+        preset: 'fast', 'balanced' o 'quality' (ver THUMBNAIL_PRESETS)
+        
+    Returns:
+        bytes: Thumbnail en JPEG o None si falla
+    """
     try:
-        # Abrir imagen desde bytes
+        options = THUMBNAIL_PRESETS[preset]
+        
+        # Abrir imagen desde bytes (solo lee el header)
         image = Image.open(io.BytesIO(image_bytes))
         
-        # Convertir a RGB si es necesario (para PNGs con transparencia)
-        if image.mode in ('RGBA', 'LA', 'P'):
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            if image.mode == 'P':
-                image = image.convert('RGBA')
-            background.paste(image, mask=image.split()[-1] if image.mode == 'RGBA' else None)
-            image = background
+        # Paleta: remuestrear índices de color da mal resultado
+        if image.mode == 'P':
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        
+        # Alfa premultiplicado: Pillow lo reduce sin convertir de ida y vuelta
+        # a resolución completa
+        if image.mode in ('RGBA', 'LA', 'PA'):
+            image = image.convert('RGBA').convert('RGBa')
         
-        # Crear thumbnail manteniendo proporción
-        image.thumbnail(size, Image.Resampling.LANCZOS)
+        # Crear thumbnail manteniendo proporción (draft/reduce + remuestreo final)
+        image.thumbnail(size, options['resample'], reducing_gap=options['reducing_gap'])
+        
+        image = flatten_to_rgb(image)
         
         # Guardar en buffer
         buffer = io.BytesIO()
-        image.save(buffer, format='JPEG', quality=85, optimize=True)
-        buffer.seek(0)
+        image.save(buffer, format='JPEG', quality=options['quality'], optimize=options['optimize'])
         
-        # Codificar en base64
-        thumbnail_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        
-        return thumbnail_base64
+        return buffer.getvalue()
         
     except Exception as e:
         print(f"Error creando thumbnail: {str(e)}")
         return None
 
 
-def process_images(image_urls: List[str], max_images: int = 5) -> List[str]:
+def flatten_to_rgb(image: Image.Image) -> Image.Image:
+    """
+    Prepara una imagen para guardarla como JPEG
+    
+    Las imágenes con transparencia se componen sobre fondo blanco; el resto
+    solo se convierte si su modo no es compatible con JPEG.
+    
+    Args:
+        image: Imagen (idealmente ya reducida)
+        
+    Returns:
+        Image en modo RGB o L
+    """
+    if image.mode in ('RGBA', 'LA', 'PA'):
+        image = image.convert('RGBA').convert('RGBa')
+    
+    if image.mode == 'RGBa':
+        # Sobre blanco: color premultiplicado + (255 - alfa) en cada canal
+        *channels, alpha = image.split()
+        uncovered = ImageChops.invert(alpha)
+        return Image.merge('RGB', [ImageChops.add(channel, uncovered) for channel in channels])
+    
+    if image.mode not in ('RGB', 'L'):
+        return image.convert('RGB')
+    
+    return image
+
+
+def process_images(image_urls: List[str], max_images: int = 5,
+                   preset: str = DEFAULT_THUMBNAIL_PRESET) -> List[str]:
     """
     Descarga imágenes y genera thumbnails
     
     Args:
         image_urls: Lista de URLs de imágenes
         max_images: Número máximo de imágenes a procesar
+        preset: Preset de thumbnails ('fast', 'balanced' o 'quality')
         
     Returns:
         List[str]: Lista de thumbnails en base64
     """
-    thumbnails = []
-    
-    # Limitar número de imágenes
-    urls_to_process = image_urls[:max_images]
-    
-    for url in urls_to_process:
-        # Descargar imagen
-        image_bytes = download_image(url)
-        
-        if image_bytes:
-            # Crear thumbnail
-            thumbnail = create_thumbnail(image_bytes)
-            
-            if thumbnail:
-                thumbnails.append(thumbnail)
-    
-    return thumbnails
+    return process_images_parallel(image_urls, max_images, preset=preset)['thumbnails']
 
 
 def optimize_image(image_bytes: bytes, max_size: int = 800, quality: int = 85) -> Optional[bytes]:
@@ -189,44 +372,278 @@ def create_multiple_thumbnails(image_bytes: bytes, sizes: List[Tuple[int, int]])
     Returns:
         List: Lista de thumbnails en base64
     """
-    thumbnails = []
+    thumbnail_set = create_thumbnail_set(image_bytes, sizes)
+    if thumbnail_set is None:
+        return [None] * len(sizes)
+    
+    return [base64.b64encode(variant['data']).decode('utf-8') for variant in thumbnail_set]
+
+
+def available_thumbnail_formats() -> List[str]:
+    """Formatos de THUMBNAIL_SET_FORMATS que esta instalación de Pillow puede escribir"""
+    Image.init()
+    return [name for name in THUMBNAIL_SET_FORMATS
+            if name in Image.SAVE and (name != 'WEBP' or features.check('webp'))]
+
+
+def validate_thumbnail_set_options(sizes, formats=None) -> Tuple[List[Tuple[int, int]], List[str]]:
+    """
+    Valida y normaliza los tamaños y formatos pedidos para un set de thumbnails
     
+    Args:
+        sizes: Lista de pares [ancho, alto]
+        formats: Lista de formatos ('jpeg', 'webp', 'avif'); None = solo JPEG
+        
+    Returns:
+        Tuple: (tamaños como tuplas, formatos en mayúsculas sin repetir)
+        
+    Raises:
+        ValueError: Si algún tamaño o formato no es válido
+    """
+    if not isinstance(sizes, (list, tuple)) or not 0 < len(sizes) <= MAX_THUMBNAIL_SET_SIZES:
+        raise ValueError(f"Se esperan entre 1 y {MAX_THUMBNAIL_SET_SIZES} tamaños")
+    
+    normalized_sizes = []
     for size in sizes:
-        thumbnail = create_thumbnail(image_bytes, size)
-        thumbnails.append(thumbnail)
+        if (not isinstance(size, (list, tuple)) or len(size) != 2
+                or not all(isinstance(side, int) and 0 < side <= MAX_THUMBNAIL_SIDE for side in size)):
+            raise ValueError(f"Tamaño inválido: {size} (lados entre 1 y {MAX_THUMBNAIL_SIDE})")
+        normalized_sizes.append((size[0], size[1]))
+    
+    available = available_thumbnail_formats()
+    normalized_formats = []
+    for name in formats or ['JPEG']:
+        name = str(name).upper()
+        if name not in available:
+            raise ValueError(f"Formato no disponible: {name} (disponibles: {', '.join(available)})")
+        if name not in normalized_formats:
+            normalized_formats.append(name)
+    
+    return normalized_sizes, normalized_formats
+
+
+def create_thumbnail_set(image_bytes: bytes, sizes: List[Tuple[int, int]], formats: List[str] = ('JPEG',),
+                         preset: str = DEFAULT_THUMBNAIL_PRESET) -> Optional[List[dict]]:
+    """
+    Crea thumbnails de varios tamaños y formatos decodificando la imagen una vez
+    
+    La imagen se decodifica (reducida, como en create_thumbnail_bytes) solo
+    para el tamaño más grande; cada tamaño menor se obtiene achicando el
+    anterior. JPEG se compone sobre fondo blanco; WebP y AVIF conservan la
+    transparencia.
+    
+    Args:
+        image_bytes: Bytes de la imagen original
+        sizes: Lista de tuplas (ancho, alto)
+        formats: Formatos a generar por tamaño ('JPEG', 'WEBP', 'AVIF')
+        preset: 'fast', 'balanced' o 'quality'
+        
+    Returns:
+        List: Por cada tamaño (en el orden pedido) y formato, un dict con
+        size (pedido), width, height, format y data (bytes); None si falla
+    """
+    try:
+        options = THUMBNAIL_PRESETS[preset]
+        image = Image.open(io.BytesIO(image_bytes))
+        
+        if image.mode == 'P':
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        if image.mode in ('RGBA', 'LA', 'PA'):
+            image = image.convert('RGBA').convert('RGBa')
+        
+        # Del más grande al más chico: cada reducción parte de la anterior
+        order = sorted(range(len(sizes)), key=lambda i: sizes[i][0] * sizes[i][1], reverse=True)
+        resized = {}
+        current = image
+        for position, index in enumerate(order):
+            if position:
+                current = current.copy()
+            current.thumbnail(sizes[index], options['resample'], reducing_gap=options['reducing_gap'])
+            resized[index] = current
+        
+        variants = []
+        for index, size in enumerate(sizes):
+            for name in formats:
+                variants.append({
+                    'size': list(size),
+                    'width': resized[index].width,
+                    'height': resized[index].height,
+                    'format': name.lower(),
+                    'data': encode_thumbnail(resized[index], name, options)
+                })
+        return variants
+        
+    except Exception as e:
+        print(f"Error creando set de thumbnails: {str(e)}")
+        return None
+
+
+def encode_thumbnail(image: Image.Image, image_format: str, options: dict) -> bytes:
+    """
+    Codifica un thumbnail ya reducido
+    
+    Args:
+        image: Imagen reducida (RGBa si tiene transparencia)
+        image_format: 'JPEG', 'WEBP' o 'AVIF'
+        options: Preset de THUMBNAIL_PRESETS
+        
+    Returns:
+        bytes: Imagen codificada
+    """
+    buffer = io.BytesIO()
+    if image_format == 'JPEG':
+        flatten_to_rgb(image).save(buffer, format='JPEG', quality=options['quality'], optimize=options['optimize'])
+        return buffer.getvalue()
+    
+    if image.mode == 'RGBa':
+        image = image.convert('RGBA')
+    elif image.mode not in ('RGB', 'RGBA', 'L'):
+        image = image.convert('RGB')
     
-    return thumbnails
+    if image_format == 'WEBP':
+        image.save(buffer, format='WEBP', quality=options['quality'], method=options['webp_method'])
+    else:
+        image.save(buffer, format=image_format, quality=options['quality'])
+    return buffer.getvalue()
 
 
-def process_images_parallel(image_urls: List[str], max_images: int = 5) -> dict:
+def process_images_parallel(image_urls: List[str], max_images: int = 5, encode_base64: bool = True,
+                            max_downloads: int = 8, per_host: int = 4, deadline: float = 15.0,
+                            preset: str = DEFAULT_THUMBNAIL_PRESET, sizes: List[Tuple[int, int]] = None,
+                            formats: List[str] = None, batch_deadline: float = BATCH_DEADLINE) -> dict:
     """
-    Procesa múltiples imágenes y retorna información detallada
+    Descarga imágenes y genera thumbnails en paralelo
+    
+    Las descargas corren concurrentes en un pool de hilos (con la sesión HTTP
+    compartida y un límite por host). Apenas termina cada descarga, su
+    thumbnail se encola en un segundo pool dimensionado a los núcleos (ambos
+    pools son del proceso, ver init_image_pools): la
+    decodificación de una imagen se solapa con la descarga de las demás
+    (Pillow libera el GIL al decodificar y redimensionar). Así la latencia
+    del lote se acerca a la de la imagen más lenta en lugar de la suma.
+    
+    Se usan hilos y no procesos porque esta función corre dentro de un
+    worker del Pool del servidor B (los procesos daemon no pueden tener hijos).
     
     Args:
         image_urls: Lista de URLs de imágenes
         max_images: Número máximo de imágenes
+        encode_base64: Devolver thumbnails en base64 (False = bytes JPEG crudos)
+        max_downloads: Descargas simultáneas (como mucho DOWNLOAD_THREADS)
+        per_host: Descargas simultáneas a un mismo host
+        deadline: Segundos máximos por imagen, desde que empieza su descarga
+                  (el tiempo en cola no cuenta) hasta tener su thumbnail;
+                  las que no terminan a tiempo cuentan como fallidas
+        preset: Preset de thumbnails ('fast', 'balanced' o 'quality')
+        sizes: Si se indica, genera por imagen un set de thumbnails de estos
+               tamaños (create_thumbnail_set) en lugar de uno de 150x150
+        formats: Formatos de cada set (default: solo JPEG)
+        batch_deadline: Segundos máximos para todo el lote, contando la cola
         
     Returns:
-        dict: Diccionario con thumbnails e información
+        dict: Thumbnails (o thumbnail_sets) en el orden de las URLs y contadores
     """
+    if sizes:
+        result_key = 'thumbnail_sets'
+        
+        def render(image_bytes):
+            variants = create_thumbnail_set(image_bytes, sizes, formats or ['JPEG'], preset)
+            if variants and encode_base64:
+                for variant in variants:
+                    variant['data'] = base64.b64encode(variant['data']).decode('utf-8')
+            return variants
+    else:
+        result_key = 'thumbnails'
+        make_thumbnail = create_thumbnail if encode_base64 else create_thumbnail_bytes
+        
+        def render(image_bytes):
+            return make_thumbnail(image_bytes, (150, 150), preset)
+    
     result = {
-        'thumbnails': [],
+        result_key: [],
         'processed_count': 0,
-        'failed_count': 0
+        'failed_count': 0,
+        'timed_out_count': 0
     }
     
     urls_to_process = image_urls[:max_images]
+    if not urls_to_process:
+        return result
     
-    for url in urls_to_process:
-        image_bytes = download_image(url)
-        
-        if image_bytes:
-            thumbnail = create_thumbnail(image_bytes)
-            if thumbnail:
-                result['thumbnails'].append(thumbnail)
-                result['processed_count'] += 1
-            else:
-                result['failed_count'] += 1
+    start = time.monotonic()
+    limiter = HostLimiter(per_host)
+    downloads = threading.BoundedSemaphore(max(1, max_downloads))
+    download_pool, thumbnail_pool = init_image_pools()
+    expired = threading.Event()
+    # Vencimiento de cada imagen: se fija cuando empieza su descarga
+    expires: List[Optional[float]] = [None] * len(urls_to_process)
+    tasks: List[List[Future]] = [[] for _ in urls_to_process]
+    
+    def fetch(index, url):
+        with downloads, limiter.slot(url):
+            if expired.is_set():
+                return None
+            expires[index] = time.monotonic() + deadline
+            return download_image(url, timeout=min(10, deadline))
+    
+    def chain(index: int, download: Future, stage: Future):
+        """Al terminar una descarga, encola su thumbnail"""
+        failed = download.cancelled() or download.exception() is not None
+        image_bytes = None if failed else download.result()
+        if not image_bytes or expired.is_set() or time.monotonic() >= expires[index]:
+            # Sin imagen o ya venció
+            stage.set_result(None)
+            return
+        thumbnail = thumbnail_pool.submit(render, image_bytes)
+        tasks[index].append(thumbnail)
+        thumbnail.add_done_callback(
+            lambda done: stage.set_result(
+                None if done.cancelled() or done.exception() is not None else done.result()
+            )
+        )
+    
+    stages = []
+    for index, url in enumerate(urls_to_process):
+        stage = Future()
+        download = download_pool.submit(fetch, index, url)
+        tasks[index].append(download)
+        download.add_done_callback(lambda done, index=index, stage=stage: chain(index, done, stage))
+        stages.append(stage)
+    
+    batch_end = start + batch_deadline
+    pending = set(range(len(stages)))
+    timed_out = set()
+    while pending:
+        now = time.monotonic()
+        for index in [i for i in pending if stages[i].done()]:
+            pending.discard(index)
+        for index in [i for i in pending if expires[i] is not None and now >= expires[i]]:
+            # Venció esta imagen: se libera su lugar en los pools
+            pending.discard(index)
+            timed_out.add(index)
+            for future in tasks[index]:
+                future.cancel()
+        if not pending or now >= batch_end:
+            break
+        # Una imagen que empiece ahora vence dentro de `deadline` como pronto
+        wake = min([expires[i] for i in pending if expires[i] is not None] + [now + deadline, batch_end])
+        wait([stages[i] for i in pending], timeout=max(0, wake - now), return_when=FIRST_COMPLETED)
+    
+    # No esperar a las tareas que vencieron: las que siguen en cola se
+    # cancelan (los pools son compartidos, no se cierran)
+    expired.set()
+    timed_out |= pending
+    for futures in tasks:
+        for future in list(futures):
+            future.cancel()
+    
+    for index, stage in enumerate(stages):
+        if index in timed_out:
+            result['timed_out_count'] += 1
+            result['failed_count'] += 1
+        elif stage.result():
+            result[result_key].append(stage.result())
+            result['processed_count'] += 1
         else:
             result['failed_count'] += 1
     
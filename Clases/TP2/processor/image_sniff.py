@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Módulo de Identificación de Imágenes
+Reconoce el formato y las dimensiones de una imagen a partir de sus primeros
+bytes, sin decodificarla. Permite rechazar respuestas que no son imágenes o
+que son bombas de descompresión antes de descargarlas completas.
+
+Los formatos más comunes se leen directamente de su encabezado; para el
+resto (TIFF, PSD, TGA, ...) se le pregunta a Pillow, que con Image.open solo
+lee el encabezado.
+"""
+
+import io
+import struct
+from typing import Optional, Tuple
+
+from PIL import Image
+
+
+# Formatos que se reconocen (firma -> nombre)
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+    (b'BM', 'BMP'),
+    (b'\x00\x00\x01\x00', 'ICO')
+)
+
+# Marcadores JPEG Start Of Frame (los que llevan las dimensiones)
+JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Marcadores JPEG sin segmento de longitud
+JPEG_STANDALONE_MARKERS = frozenset(range(0xD0, 0xDA)) | {0x01}
+
+
+def sniff_format(head: bytes) -> Optional[str]:
+    """
+    Identifica el formato por sus bytes mágicos
+
+    Args:
+        head: Primeros bytes del archivo (bytes o memoryview)
+
+    Returns:
+        str: Nombre del formato o None si no es una imagen reconocida
+    """
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'WEBP'
+    for signature, name in IMAGE_SIGNATURES:
+        if head[:len(signature)] == signature:
+            return name
+    return None
+
+
+def sniff_image(head: bytes) -> Optional[Tuple[str, int, int]]:
+    """
+    Lee formato y dimensiones del encabezado de una imagen
+
+    Los formatos sin lector propio se verifican con Pillow: mientras no
+    pueda abrirlos se devuelve None, y el que llama decide cuántos bytes
+    esperar como máximo.
+
+    Args:
+        head: Primeros bytes del archivo (bytes o memoryview; pueden estar incompletos)
+
+    Returns:
+        tuple: (formato, ancho, alto) o None si hacen falta más bytes
+
+    Raises:
+        ValueError: Si los bytes no corresponden a una imagen (ej: HTML)
+    """
+    image_format = sniff_format(head)
+    if image_format is None:
+        if len(head) < 12:
+            return None
+        if bytes(head[:64]).lstrip()[:1] == b'<':
+            # HTML, XML o SVG: Pillow no los abre
+            raise ValueError("El contenido no es una imagen reconocida")
+        return _pillow_sniff(head)
+
+    size = _SIZE_READERS[image_format](head)
+    if size is None:
+        return None
+    return image_format, size[0], size[1]
+
+
+def _pillow_sniff(head: bytes) -> Optional[Tuple[str, int, int]]:
+    """Formato y dimensiones según Pillow, o None si todavía no puede abrirlo"""
+    try:
+        with Image.open(io.BytesIO(head)) as image:
+            return image.format, image.width, image.height
+    except Image.DecompressionBombError as e:
+        raise ValueError(str(e))
+    except Exception:
+        return None
+
+
+def _png_size(head: bytes) -> Optional[Tuple[int, int]]:
+    # El chunk IHDR siempre es el primero
+    if len(head) < 24:
+        return None
+    return struct.unpack('>II', head[16:24])
+
+
+def _gif_size(head: bytes) -> Optional[Tuple[int, int]]:
+    if len(head) < 10:
+        return None
+    return struct.unpack('<HH', head[6:10])
+
+
+def _bmp_size(head: bytes) -> Optional[Tuple[int, int]]:
+    if len(head) < 26:
+        return None
+    width, height = struct.unpack('<ii', head[18:26])
+    # Alto negativo: filas de arriba hacia abajo
+    return abs(width), abs(height)
+
+
+def _ico_size(head: bytes) -> Optional[Tuple[int, int]]:
+    # Primer ícono del directorio; 0 significa 256
+    if len(head) < 8:
+        return None
+    return head[6] or 256, head[7] or 256
+
+
+def _webp_size(head: bytes) -> Optional[Tuple[int, int]]:
+    if len(head) < 30:
+        return None
+    chunk = head[12:16]
+    if chunk == b'VP8 ':
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L':
+        bits = int.from_bytes(head[21:25], 'little')
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+    raise ValueError("WebP con formato desconocido")
+
+
+def _jpeg_size(head: bytes) -> Optional[Tuple[int, int]]:
+    # Recorre los segmentos (APPn, DQT, ...) hasta el Start Of Frame
+    position = 2
+    while position + 4 <= len(head):
+        if head[position] != 0xFF:
+            raise ValueError("JPEG con segmentos inválidos")
+        marker = head[position + 1]
+        if marker == 0xFF:
+            # Relleno entre segmentos
+            position += 1
+            continue
+        if marker in JPEG_STANDALONE_MARKERS:
+            position += 2
+            continue
+        if marker in JPEG_SOF_MARKERS:
+            if position + 9 > len(head):
+                return None
+            height, width = struct.unpack('>HH', head[position + 5:position + 9])
+            return width, height
+        length = struct.unpack('>H', head[position + 2:position + 4])[0]
+        position += 2 + length
+    return None
+
+
+_SIZE_READERS = {
+    'JPEG': _jpeg_size,
+    'PNG': _png_size,
+    'GIF': _gif_size,
+    'BMP': _bmp_size,
+    'ICO': _ico_size,
+    'WEBP': _webp_size
+}
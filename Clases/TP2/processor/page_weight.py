@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Módulo de Peso de Página
+Mide el peso real de una página descargando sus subrecursos (imágenes,
+scripts, hojas de estilo, videos, iframes) en paralelo, con concurrencia
+acotada y un plazo total.
+
+Las mediciones se cachean por URL de recurso en cada proceso: los recursos
+compartidos entre páginas (CDN, librerías comunes) no se vuelven a medir.
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional
+
+from .http_session import get_session, HostLimiter
+from .result_cache import ResultCache
+
+
+# Tipos que bloquean el render (el navegador los espera antes de pintar)
+BLOCKING_TYPES = ('stylesheets', 'scripts')
+
+# Bytes máximos a leer de un recurso sin Content-Length (ej: videos)
+MAX_RESOURCE_BYTES = 20 * 1024 * 1024
+
+# Validez de una medición cacheada
+RESOURCE_CACHE_TTL = 3600
+
+SLOWEST_COUNT = 5
+
+_resource_cache: Optional[ResultCache] = None
+_resource_cache_pid: Optional[int] = None
+_resource_cache_lock = threading.Lock()
+
+
+def get_resource_cache() -> ResultCache:
+    """
+    Devuelve la caché de mediciones del proceso actual (en memoria, LRU)
+
+    Returns:
+        ResultCache: Caché de mediciones por URL
+    """
+    global _resource_cache, _resource_cache_pid
+    with _resource_cache_lock:
+        if _resource_cache is None or _resource_cache_pid != os.getpid():
+            _resource_cache = ResultCache(':memory:', ttl=RESOURCE_CACHE_TTL, max_bytes=8 * 1024 * 1024)
+            _resource_cache_pid = os.getpid()
+        return _resource_cache
+
+
+def measure_resource(url: str, timeout: float = 5.0, stop_at: float = None) -> Dict[str, Any]:
+    """
+    Mide el tamaño transferido y el tiempo de descarga de un recurso
+
+    Primero prueba con HEAD; si el servidor no informa Content-Length (o no
+    acepta HEAD) descarga el recurso contando los bytes tal como llegan
+    (sin descomprimir), hasta MAX_RESOURCE_BYTES o hasta stop_at.
+
+    Args:
+        url: URL del recurso
+        timeout: Timeout de conexión/lectura en segundos
+        stop_at: Instante (time.monotonic) en el que se deja de leer
+
+    Returns:
+        Dict con bytes, ms, status y method (o error)
+    """
+    session = get_session()
+    start = time.perf_counter()
+    try:
+        response = session.head(url, timeout=timeout, allow_redirects=True)
+        length = response.headers.get('Content-Length', '')
+        if response.status_code in (404, 410):
+            return {'error': f'HTTP {response.status_code}', 'ms': round((time.perf_counter() - start) * 1000, 2)}
+        if response.status_code < 400 and length.isdigit():
+            return {
+                'bytes': int(length),
+                'ms': round((time.perf_counter() - start) * 1000, 2),
+                'status': response.status_code,
+                'method': 'HEAD'
+            }
+
+        with session.get(url, timeout=timeout, stream=True) as response:
+            size = 0
+            complete = True
+            for chunk in response.raw.stream(64 * 1024, decode_content=False):
+                size += len(chunk)
+                if size >= MAX_RESOURCE_BYTES or (stop_at and time.monotonic() > stop_at):
+                    complete = False
+                    break
+            if response.status_code >= 400:
+                return {'error': f'HTTP {response.status_code}', 'ms': round((time.perf_counter() - start) * 1000, 2)}
+            return {
+                'bytes': size,
+                'ms': round((time.perf_counter() - start) * 1000, 2),
+                'status': response.status_code,
+                'method': 'GET',
+                'complete': complete
+            }
+
+    except Exception as e:
+        return {'error': str(e), 'ms': round((time.perf_counter() - start) * 1000, 2)}
+
+
+def measure_page_weight(resources: Dict[str, List[str]], html_bytes: int = 0, html_ms: float = 0,
+                        concurrency: int = 8, per_host: int = 6, deadline: float = 10.0,
+                        timeout: float = 5.0) -> Dict[str, Any]:
+    """
+    Mide el peso real de una página a partir de las URLs de sus recursos
+
+    Args:
+        resources: URLs por tipo (images, scripts, stylesheets, other)
+        html_bytes: Tamaño del HTML de la página
+        html_ms: Tiempo de carga del HTML
+        concurrency: Descargas simultáneas
+        per_host: Descargas simultáneas a un mismo host (como un navegador)
+        deadline: Segundos máximos para toda la medición
+        timeout: Timeout por recurso
+
+    Returns:
+        Dict con total_bytes, totales por tipo, recursos más lentos y el
+        camino crítico estimado (HTML + recurso bloqueante más lento)
+    """
+    # Cada URL se mide una vez aunque aparezca repetida
+    pending = {}
+    for kind, urls in (resources or {}).items():
+        for url in urls:
+            if url.startswith(('http://', 'https://')) and url not in pending:
+                pending[url] = kind
+
+    cache = get_resource_cache()
+    measurements = {}
+    for url in pending:
+        cached = cache.get(ResultCache.make_key('resource', url))
+        if cached is not None:
+            measurements[url] = dict(cached, cached=True)
+
+    limiter = HostLimiter(per_host)
+    stop_at = time.monotonic() + deadline
+
+    def measure(url):
+        with limiter.slot(url):
+            if time.monotonic() > stop_at:
+                return None
+            result = measure_resource(url, timeout=min(timeout, max(0.1, stop_at - time.monotonic())),
+                                      stop_at=stop_at)
+        # Un timeout causado por el plazo total cuenta como no medido, no como error
+        if 'error' in result and time.monotonic() >= stop_at:
+            return None
+        return result
+
+    to_measure = [url for url in pending if url not in measurements]
+    timed_out = 0
+    if to_measure:
+        executor = ThreadPoolExecutor(min(concurrency, len(to_measure)), thread_name_prefix='page-weight')
+        futures = {executor.submit(measure, url): url for url in to_measure}
+        wait(futures, timeout=deadline)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        for future, url in futures.items():
+            if not future.done() or future.cancelled() or future.result() is None:
+                timed_out += 1
+                continue
+            result = future.result()
+            measurements[url] = result
+            if 'error' not in result and result.get('complete', True):
+                cache.put(ResultCache.make_key('resource', url), result)
+
+    return summarize_page_weight(pending, measurements, html_bytes, html_ms, timed_out)
+
+
+def summarize_page_weight(kinds: Dict[str, str], measurements: Dict[str, Dict[str, Any]],
+                          html_bytes: int, html_ms: float, timed_out: int) -> Dict[str, Any]:
+    """
+    Arma el resumen de measure_page_weight
+
+    Args:
+        kinds: Tipo de cada URL
+        measurements: Medición de cada URL medida
+        html_bytes: Tamaño del HTML
+        html_ms: Tiempo de carga del HTML
+        timed_out: Recursos que no llegaron a medirse antes del plazo
+
+    Returns:
+        Dict con el resumen
+    """
+    by_type = {kind: {'count': 0, 'bytes': 0} for kind in ('images', 'scripts', 'stylesheets', 'other')}
+    measured = []
+    failed = 0
+    for url, result in measurements.items():
+        if 'error' in result:
+            failed += 1
+            continue
+        kind = kinds[url]
+        totals = by_type.setdefault(kind, {'count': 0, 'bytes': 0})
+        totals['count'] += 1
+        totals['bytes'] += result['bytes']
+        measured.append(dict(result, url=url, type=kind))
+
+    resources_bytes = sum(totals['bytes'] for totals in by_type.values())
+    slowest = sorted(measured, key=lambda r: r['ms'], reverse=True)[:SLOWEST_COUNT]
+
+    # Estimación: los recursos bloqueantes se piden en paralelo apenas llega
+    # el HTML, así que el render espera al más lento de ellos
+    blocking = [r for r in measured if r['type'] in BLOCKING_TYPES]
+    critical = max(blocking, key=lambda r: r['ms']) if blocking else None
+
+    return {
+        'total_bytes': html_bytes + resources_bytes,
+        'total_kb': round((html_bytes + resources_bytes) / 1024, 2),
+        'html_bytes': html_bytes,
+        'by_type': by_type,
+        'measured': len(measured),
+        'cached': sum(1 for r in measured if r.get('cached')),
+        'failed': failed,
+        'timed_out': timed_out,
+        'slowest': [
+            {'url': r['url'], 'type': r['type'], 'ms': r['ms'], 'bytes': r['bytes']} for r in slowest
+        ],
+        'critical_path_ms': round(html_ms + (critical['ms'] if critical else 0), 2),
+        'critical_resource': critical['url'] if critical else None
+    }
@@ -6,22 +6,69 @@ Analiza el rendimiento de carga de páginas web
 
 import time
 import requests
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 
+from .http_session import get_session
+from .page_weight import measure_page_weight
+from .timing import waterfall_samples
 
-def analyze_performance(url: str, timeout: int = 30) -> Dict[str, Any]:
+
+def fetch_timed(url: str, timeout: int = 30) -> Tuple[requests.Response, float, float]:
+    """
+    Descarga una URL midiendo TTFB y tiempo total con una sola petición
+    
+    Usa la sesión del proceso (conexiones keep-alive reutilizadas entre
+    tareas). El TTFB se marca con un hook de respuesta, que requests llama
+    al recibir los headers y antes de leer el cuerpo.
+    
+    Args:
+        url: URL a descargar
+        timeout: Timeout en segundos
+        
+    Returns:
+        Tuple: (respuesta con el contenido ya leído, TTFB en ms, tiempo total en ms)
+    """
+    marks = {}
+    
+    def on_response(response, *args, **kwargs):
+        # Con redirecciones se llama por cada respuesta: queda la última
+        marks['ttfb'] = time.perf_counter()
+    
+    start = time.perf_counter()
+    response = get_session().get(url, timeout=timeout, stream=True, hooks={'response': on_response})
+    response.content  # leer el cuerpo completo
+    end = time.perf_counter()
+    
+    return response, (marks.get('ttfb', end) - start) * 1000, (end - start) * 1000
+
+
+def analyze_performance(url: str, timeout: int = 30, page: Optional[Dict[str, Any]] = None,
+                        measure_weight: bool = False, waterfall: int = 0) -> Dict[str, Any]:
     """
     Analiza el rendimiento de una página web
     
     Args:
         url: URL de la página a analizar
         timeout: Timeout en segundos
+        page: Datos de la página ya descargada por el servidor de scraping
+              (load_time_ms, size_bytes, status_code y resources con las
+              URLs por tipo). Si se pasan, no se vuelve a descargar.
+        measure_weight: Descargar los subrecursos para medir el peso real
+                        de la página (ver measure_page_weight)
+        waterfall: Muestras del desglose DNS/conexión/TLS/TTFB/descarga
+                   (0 = no medir; ver timing.waterfall_samples)
         
     Returns:
         Dict con métricas de rendimiento
     """
+    if page is not None:
+        performance_data = performance_from_page(page, measure_weight)
+        if waterfall > 0:
+            performance_data['waterfall'] = waterfall_samples(url, waterfall, timeout=min(timeout, 10))
+        return performance_data
+    
     performance_data = {
         'load_time_ms': 0,
         'total_size_kb': 0,
@@ -35,17 +82,10 @@ def analyze_performance(url: str, timeout: int = 30) -> Dict[str, Any]:
     }
     
     try:
-        # Medir tiempo de carga de la página principal
-        start_time = time.time()
-        
-        response = requests.get(
-            url,
-            timeout=timeout,
-            headers={'User-Agent': 'Mozilla/5.0 (Web Scraper Bot)'}
-        )
-        
-        load_time = (time.time() - start_time) * 1000  # Convertir a milisegundos
+        # Medir TTFB y tiempo de carga de la página principal con la misma petición
+        response, ttfb, load_time = fetch_timed(url, timeout)
         performance_data['load_time_ms'] = round(load_time, 2)
+        performance_data['ttfb_ms'] = round(ttfb, 2)
         
         # Tamaño de la página principal
         html_size = len(response.content)
@@ -58,6 +98,16 @@ def analyze_performance(url: str, timeout: int = 30) -> Dict[str, Any]:
             resource_counts = count_resources(soup)
             performance_data['resources'] = resource_counts
             performance_data['num_requests'] += sum(resource_counts.values())
+            
+            if measure_weight:
+                performance_data['page_weight'] = measure_page_weight(
+                    collect_resource_urls(soup, response.url),
+                    html_bytes=html_size,
+                    html_ms=load_time
+                )
+        
+        if waterfall > 0:
+            performance_data['waterfall'] = waterfall_samples(url, waterfall, timeout=min(timeout, 10))
         
         return performance_data
         
@@ -74,6 +124,41 @@ def analyze_performance(url: str, timeout: int = 30) -> Dict[str, Any]:
         return performance_data
 
 
+def performance_from_page(page: Dict[str, Any], measure_weight: bool = False) -> Dict[str, Any]:
+    """
+    Arma las métricas de rendimiento con datos de una descarga ya hecha
+    
+    Args:
+        page: Dict con load_time_ms, size_bytes, status_code y resources
+        measure_weight: Medir el peso real descargando los recursos de page
+        
+    Returns:
+        Dict con métricas de rendimiento (mismo formato que analyze_performance)
+    """
+    resources = {'images': 0, 'scripts': 0, 'stylesheets': 0, 'other': 0}
+    ok = page.get('status_code', 200) == 200
+    if ok:
+        for kind, urls in (page.get('resources') or {}).items():
+            if kind in resources:
+                resources[kind] = len(urls)
+    
+    performance_data = {
+        'load_time_ms': round(page.get('load_time_ms', 0), 2),
+        'total_size_kb': round(page.get('size_bytes', 0) / 1024, 2),
+        'num_requests': 1 + sum(resources.values()),
+        'resources': resources
+    }
+    
+    if measure_weight and ok:
+        performance_data['page_weight'] = measure_page_weight(
+            page.get('resources') or {},
+            html_bytes=page.get('size_bytes', 0),
+            html_ms=page.get('load_time_ms', 0)
+        )
+    
+    return performance_data
+
+
 def count_resources(soup: BeautifulSoup) -> Dict[str, int]:
     """
     Cuenta los recursos externos de la página
@@ -111,6 +196,25 @@ def count_resources(soup: BeautifulSoup) -> Dict[str, int]:
     return resources
 
 
+def collect_resource_urls(soup: BeautifulSoup, base_url: str) -> Dict[str, List[str]]:
+    """
+    URLs de los recursos externos por tipo (mismos criterios que count_resources)
+    
+    Args:
+        soup: Objeto BeautifulSoup con el HTML
+        base_url: URL base para resolver URLs relativas
+        
+    Returns:
+        Dict con listas de URLs de images, scripts, stylesheets y other
+    """
+    return {
+        'images': [urljoin(base_url, tag['src']) for tag in soup.find_all('img', src=True)],
+        'scripts': [urljoin(base_url, tag['src']) for tag in soup.find_all('script', src=True)],
+        'stylesheets': [urljoin(base_url, tag['href']) for tag in soup.find_all('link', rel='stylesheet', href=True)],
+        'other': [urljoin(base_url, tag['src']) for tag in soup.find_all(['video', 'iframe'], src=True)]
+    }
+
+
 def measure_ttfb(url: str, timeout: int = 30) -> float:
     """
     Mide el Time To First Byte (TTFB)
@@ -123,19 +227,20 @@ def measure_ttfb(url: str, timeout: int = 30) -> float:
         float: TTFB en milisegundos
     """
     try:
-        start_time = time.time()
+        marks = {}
+        start_time = time.perf_counter()
         
-        response = requests.get(
+        response = get_session().get(
             url,
             timeout=timeout,
             stream=True,
-            headers={'User-Agent': 'Mozilla/5.0 (Web Scraper Bot)'}
+            hooks={'response': lambda r, *args, **kwargs: marks.update(ttfb=time.perf_counter())}
         )
         
-        # El tiempo hasta recibir el primer byte
-        ttfb = (time.time() - start_time) * 1000
+        # El tiempo hasta recibir el primer byte (headers de la respuesta)
+        ttfb = (marks.get('ttfb', time.perf_counter()) - start_time) * 1000
         
-        # Cerrar la conexión sin leer todo el contenido
+        # Cerrar la respuesta sin leer todo el contenido
         response.close()
         
         return round(ttfb, 2)
@@ -148,6 +253,8 @@ def estimate_page_weight(soup: BeautifulSoup, base_url: str) -> int:
     """
     Estima el peso total de la página (aproximado)
     
+    Para medir el peso real ver page_weight.measure_page_weight.
+    
     Args:
         soup: Objeto BeautifulSoup
         base_url: URL base de la página
@@ -190,11 +297,9 @@ def analyze_performance_detailed(url: str, timeout: int = 30) -> Dict[str, Any]:
     Returns:
         Dict con métricas detalladas
     """
+    # El TTFB sale de la misma petición que el tiempo de carga
     performance = analyze_performance(url, timeout)
-    
-    # Agregar TTFB
-    ttfb = measure_ttfb(url, timeout)
-    performance['ttfb_ms'] = ttfb
+    ttfb = performance.setdefault('ttfb_ms', 0.0)
     
     # Calcular métricas adicionales
     if 'error' not in performance:
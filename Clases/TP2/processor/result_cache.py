@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Módulo de Caché de Resultados
+Guarda resultados de tareas de procesamiento (screenshot, performance,
+thumbnails) en un archivo SQLite, con TTL y desalojo LRU por tamaño.
+
+La clave es un hash del tipo de tarea + URL + opciones, así una misma
+petición repetida se responde sin pasar por el pool. Al ser un archivo en
+disco (modo WAL) también puede abrirse desde los procesos workers.
+"""
+
+import json
+import time
+import pickle
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+
+class ResultCache:
+    """Caché persistente de resultados con TTL y límite de tamaño"""
+
+    def __init__(self, path: str, ttl: float = 300, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            path: Archivo SQLite (':memory:' para una caché solo en memoria)
+            ttl: Segundos de validez por defecto de cada entrada
+            max_bytes: Tamaño máximo total de los valores almacenados
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS results ('
+            ' key TEXT PRIMARY KEY,'
+            ' value BLOB NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' expires_at REAL NOT NULL,'
+            ' last_access REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS results_lru ON results (last_access)')
+
+    @staticmethod
+    def make_key(task_type: Any, target: Any, options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Genera la clave de una tarea
+
+        Args:
+            task_type: Tipo de tarea (ej: MSG_TYPE_SCREENSHOT)
+            target: URL (o lista de URLs) sobre la que opera la tarea
+            options: Opciones que cambian el resultado
+
+        Returns:
+            str: Hash SHA-256 en hexadecimal
+        """
+        raw = json.dumps([task_type, target, options or {}], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Busca un resultado vigente
+
+        Args:
+            key: Clave generada con make_key
+
+        Returns:
+            Any: Resultado almacenado o None si no existe o expiró
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value, expires_at FROM results WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None or row[1] <= now:
+                if row is not None:
+                    self._db.execute('DELETE FROM results WHERE key = ?', (key,))
+                self.misses += 1
+                return None
+
+            self._db.execute('UPDATE results SET last_access = ? WHERE key = ?', (now, key))
+            self.hits += 1
+
+        return pickle.loads(row[0])
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None):
+        """
+        Guarda un resultado y desaloja entradas si se supera el tamaño máximo
+
+        Args:
+            key: Clave generada con make_key
+            value: Resultado (debe ser serializable con pickle)
+            ttl: Segundos de validez (default: el de la caché)
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(blob) > self.max_bytes:
+            return
+
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO results (key, value, size, expires_at, last_access)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (key, blob, len(blob), expires_at, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float):
+        """Borra entradas vencidas y, si hace falta, las menos usadas"""
+        removed = self._db.execute('DELETE FROM results WHERE expires_at <= ?', (now,)).rowcount
+        total = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM results').fetchone()[0]
+
+        if total > self.max_bytes:
+            excess = total - self.max_bytes
+            victims = []
+            for key, size in self._db.execute('SELECT key, size FROM results ORDER BY last_access'):
+                victims.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            self._db.executemany('DELETE FROM results WHERE key = ?', victims)
+            removed += len(victims)
+
+        self.evictions += max(removed, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Contadores de la caché
+
+        Returns:
+            Dict: hits, misses, desalojos, entradas y bytes almacenados
+        """
+        with self._lock:
+            entries, size = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results'
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_bytes': size
+        }
+
+    def close(self):
+        """Cierra la conexión con la base"""
+        with self._lock:
+            self._db.close()
@@ -167,9 +167,64 @@ def capture_screenshot(url: str, timeout: int = 30, full_page: bool = False) ->
     Returns:
         Base64 string o None si falla.
     """
+    png = capture_screenshot_png(url, timeout=timeout, full_page=full_page)
+    if png is None:
+        return None
+    return base64.b64encode(png).decode('utf-8')
+
+
+def create_browser(timeout: int = 30, width: int = 1280, height: int = 720):
+    """Start a headless browser honouring BROWSER / BROWSER_START_TIMEOUT.
+
+    Falls back to Firefox when Chrome cannot be started. Used as the driver
+    factory of the warm browser pool (see processor/browser_pool.py).
+    """
+    browser = os.environ.get('BROWSER', '').lower() or 'chrome'
+    try:
+        start_timeout = int(os.environ.get('BROWSER_START_TIMEOUT', '20'))
+    except Exception:
+        start_timeout = 20
+
+    print(f"[screenshot] starting pooled browser driver (browser={browser}, start_timeout={start_timeout}s)")
+    try:
+        return _create_driver_with_timeout(browser=browser, width=width, height=height,
+                                           timeout=timeout, timeout_sec=start_timeout)
+    except Exception:
+        if browser != 'chrome':
+            raise
+        return _create_driver_with_timeout(browser='firefox', width=width, height=height,
+                                           timeout=timeout, timeout_sec=start_timeout)
+
+
+def capture_screenshot_png(url: str, timeout: int = 30, full_page: bool = False,
+                           pool=None) -> Optional[bytes]:
+    """Captura un screenshot de una página web y devuelve los bytes PNG crudos.
+
+    Es la variante usada por el servidor de procesamiento: los bytes viajan
+    como adjunto binario del protocolo, sin pasar por base64.
+
+    Args:
+        url: URL a capturar
+        timeout: Timeout en segundos para carga de página
+        full_page: actualmente ignorado (Chrome headless captura viewport)
+        pool: BrowserPool opcional; si se indica se reutiliza un navegador ya
+              iniciado en lugar de arrancar uno nuevo
+
+    Returns:
+        Bytes PNG o None si falla.
+    """
     if not SELENIUM_AVAILABLE:
         return None
 
+    if pool is not None:
+        try:
+            with pool.browser() as driver:
+                driver.get(url)
+                return driver.get_screenshot_as_png()
+        except Exception as e:
+            print(f"Error al capturar screenshot de {url}: {e}")
+            return None
+
     # Choose browser: env BROWSER overrides (values: 'chrome' or 'firefox')
     browser = os.environ.get('BROWSER', '').lower() or 'chrome'
 
@@ -185,7 +240,7 @@ def capture_screenshot(url: str, timeout: int = 30, full_page: bool = False) ->
         try:
             driver.get(url)
             png = driver.get_screenshot_as_png()
-            return base64.b64encode(png).decode('utf-8')
+            return png
         finally:
             try:
                 driver.quit()
@@ -200,7 +255,7 @@ def capture_screenshot(url: str, timeout: int = 30, full_page: bool = False) ->
                 try:
                     driver.get(url)
                     png = driver.get_screenshot_as_png()
-                    return base64.b64encode(png).decode('utf-8')
+                    return png
                 finally:
                     try:
                         driver.quit()
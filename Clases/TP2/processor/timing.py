@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Módulo de Tiempos de Carga (waterfall)
+Descarga una URL con sockets propios para medir por separado cada fase de
+la petición: resolución DNS, conexión TCP, handshake TLS, tiempo hasta el
+primer byte (TTFB) y descarga del contenido. Permite tomar varias muestras
+y resumirlas con percentiles.
+"""
+
+import ssl
+import time
+import socket
+from typing import Any, Dict, List
+from urllib.parse import urljoin, urlsplit
+
+from .http_session import USER_AGENT, system_getaddrinfo
+
+
+PHASES = ('dns_ms', 'connect_ms', 'tls_ms', 'ttfb_ms', 'download_ms', 'total_ms')
+
+MAX_REDIRECTS = 5
+
+# Bytes máximos a descargar por muestra
+MAX_BODY_BYTES = 20 * 1024 * 1024
+
+# Muestras máximas por análisis
+MAX_SAMPLES = 10
+
+
+def _elapsed_ms(start_ns: int, end_ns: int) -> float:
+    return round((end_ns - start_ns) / 1_000_000, 3)
+
+
+class _ResponseBody:
+    """
+    Sigue el cuerpo de una respuesta según su framing
+
+    Con Content-Length termina al llegar esa cantidad de bytes; con
+    Transfer-Encoding: chunked se decodifica a medida que llega (size cuenta
+    solo los datos, sin los encabezados de cada chunk) y termina con el chunk
+    de tamaño 0; si no, termina al cerrarse la conexión.
+    """
+
+    def __init__(self, status: int, headers: Dict[str, str]):
+        self.size = 0
+        self.done = status in (204, 304) or 100 <= status < 200
+        self.chunked = 'chunked' in headers.get('transfer-encoding', '').lower()
+        length = headers.get('content-length', '')
+        self.length = int(length) if length.isdigit() and not self.chunked else None
+        if self.length == 0:
+            self.done = True
+        self._pending = b''
+        self._remaining = 0
+
+    def feed(self, data: bytes):
+        """Procesa los bytes nuevos del cuerpo"""
+        if self.done or not data:
+            return
+        if self.chunked:
+            self._feed_chunked(data)
+            return
+        self.size += len(data)
+        if self.length is not None and self.size >= self.length:
+            self.size = self.length
+            self.done = True
+
+    def _feed_chunked(self, data: bytes):
+        data = self._pending + data
+        self._pending = b''
+        position = 0
+        while position < len(data):
+            if self._remaining:
+                # Datos del chunk actual (y su CRLF final)
+                taken = min(self._remaining, len(data) - position)
+                self._remaining -= taken
+                position += taken
+                continue
+            end = data.find(b'\r\n', position)
+            if end < 0:
+                self._pending = data[position:]
+                return
+            size_field = data[position:end].split(b';', 1)[0].strip()
+            position = end + 2
+            try:
+                size = int(size_field, 16)
+            except ValueError:
+                raise ValueError(f"Tamaño de chunk inválido: {size_field!r}")
+            if size == 0:
+                # Último chunk: los trailers no se miden
+                self.done = True
+                return
+            self.size += size
+            self._remaining = size + 2
+
+
+def _parse_head(head: bytes, url: str):
+    """Status y headers (nombres en minúscula) del encabezado de una respuesta"""
+    lines = head.decode('iso-8859-1').split('\r\n')
+    status_line = lines[0].split(' ', 2)
+    if len(status_line) < 2 or not status_line[1].isdigit():
+        raise ValueError(f"Respuesta HTTP inválida de {url}")
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return int(status_line[1]), headers
+
+
+def fetch_phases(url: str, timeout: float = 10.0) -> Dict[str, Any]:
+    """
+    Descarga una URL (sin seguir redirecciones) midiendo cada fase
+
+    La descarga termina con el último byte del cuerpo (Content-Length o
+    chunk final), no al cerrarse la conexión, y bytes cuenta el cuerpo ya
+    decodificado.
+
+    Args:
+        url: URL http o https
+        timeout: Timeout de cada operación de red en segundos
+
+    Returns:
+        Dict con los tiempos de PHASES en ms, status, bytes y location
+        (destino de la redirección, si la hay)
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError(f"URL no soportada: {url}")
+    secure = parts.scheme == 'https'
+    port = parts.port or (443 if secure else 80)
+    path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+
+    start = time.perf_counter_ns()
+    addresses = system_getaddrinfo(parts.hostname, port, 0, socket.SOCK_STREAM)
+    resolved = time.perf_counter_ns()
+
+    sock = None
+    error = None
+    for family, socktype, proto, _, address in addresses:
+        candidate = socket.socket(family, socktype, proto)
+        try:
+            candidate.settimeout(timeout)
+            candidate.connect(address)
+            sock = candidate
+            break
+        except OSError as e:
+            error = e
+            candidate.close()
+    if sock is None:
+        raise error or OSError(f"No se pudo conectar a {parts.hostname}")
+    connected = time.perf_counter_ns()
+
+    try:
+        if secure:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=parts.hostname)
+        handshaken = time.perf_counter_ns()
+
+        host = parts.hostname if not parts.port else f'{parts.hostname}:{parts.port}'
+        request = (
+            f'GET {path} HTTP/1.1\r\n'
+            f'Host: {host}\r\n'
+            f'User-Agent: {USER_AGENT}\r\n'
+            'Accept: */*\r\n'
+            'Accept-Encoding: identity\r\n'
+            'Connection: close\r\n\r\n'
+        )
+        sock.sendall(request.encode('ascii'))
+
+        buffer = bytearray()
+        first = sock.recv(64 * 1024)
+        first_byte = time.perf_counter_ns()
+        buffer += first
+
+        body = None
+        fed = 0
+        chunk = first
+        while True:
+            if body is None:
+                end = buffer.find(b'\r\n\r\n')
+                if end >= 0:
+                    status, headers = _parse_head(bytes(buffer[:end]), url)
+                    body = _ResponseBody(status, headers)
+                    fed = end + 4
+            if body is not None:
+                body.feed(bytes(buffer[fed:]))
+                fed = len(buffer)
+                if body.done:
+                    break
+            # Sin Content-Length ni chunked el cuerpo termina al cerrarse la conexión
+            if not chunk or len(buffer) >= MAX_BODY_BYTES:
+                break
+            chunk = sock.recv(64 * 1024)
+            buffer += chunk
+        done = time.perf_counter_ns()
+    finally:
+        sock.close()
+
+    if body is None:
+        raise ValueError(f"Respuesta HTTP inválida de {url}")
+
+    return {
+        'dns_ms': _elapsed_ms(start, resolved),
+        'connect_ms': _elapsed_ms(resolved, connected),
+        'tls_ms': _elapsed_ms(connected, handshaken),
+        'ttfb_ms': _elapsed_ms(handshaken, first_byte),
+        'download_ms': _elapsed_ms(first_byte, done),
+        'total_ms': _elapsed_ms(start, done),
+        'status': status,
+        'bytes': body.size,
+        'location': headers.get('location')
+    }
+
+
+def measure_waterfall(url: str, timeout: float = 10.0) -> Dict[str, Any]:
+    """
+    Toma una muestra de los tiempos de carga de una URL
+
+    Sigue las redirecciones: las fases corresponden a la respuesta final y
+    el tiempo de los saltos previos se informa en redirect_ms.
+
+    Args:
+        url: URL a medir
+        timeout: Timeout de cada operación de red en segundos
+
+    Returns:
+        Dict con los tiempos de PHASES, redirect_ms, redirects, status y bytes
+    """
+    redirect_ms = 0.0
+    for redirects in range(MAX_REDIRECTS + 1):
+        sample = fetch_phases(url, timeout)
+        if sample['status'] in (301, 302, 303, 307, 308) and sample['location'] and redirects < MAX_REDIRECTS:
+            redirect_ms += sample['total_ms']
+            url = urljoin(url, sample.pop('location'))
+            continue
+        sample.pop('location')
+        sample['redirects'] = redirects
+        sample['redirect_ms'] = round(redirect_ms, 3)
+        sample['url'] = url
+        return sample
+
+
+def percentile(values: List[float], p: float) -> float:
+    """
+    Percentil p (0-100) con interpolación lineal
+
+    Args:
+        values: Valores (al menos uno)
+        p: Percentil
+
+    Returns:
+        float: Valor del percentil
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def waterfall_samples(url: str, samples: int = 3, timeout: float = 10.0) -> Dict[str, Any]:
+    """
+    Toma varias muestras del waterfall y las resume por fase
+
+    Las muestras se toman de a una, cada una con conexión y resolución DNS
+    propias (la del sistema, sin la caché del proceso).
+
+    Args:
+        url: URL a medir
+        samples: Cantidad de muestras (máximo MAX_SAMPLES)
+        timeout: Timeout de cada operación de red en segundos
+
+    Returns:
+        Dict con samples, ok, errors y, por fase, min/p50/p90/max en ms
+    """
+    samples = max(1, min(samples, MAX_SAMPLES))
+    taken = []
+    errors = []
+    for _ in range(samples):
+        try:
+            taken.append(measure_waterfall(url, timeout))
+        except Exception as e:
+            errors.append(str(e))
+
+    result: Dict[str, Any] = {'samples': samples, 'ok': len(taken)}
+    if errors:
+        result['errors'] = errors
+    if not taken:
+        return result
+
+    last = taken[-1]
+    result.update(status=last['status'], bytes=last['bytes'], url=last['url'], redirects=last['redirects'])
+    for phase in PHASES + ('redirect_ms',):
+        values = [sample[phase] for sample in taken]
+        result[phase] = {
+            'min': round(min(values), 3),
+            'p50': round(percentile(values, 50), 3),
+            'p90': round(percentile(values, 90), 3),
+            'max': round(max(values), 3)
+        }
+    return result
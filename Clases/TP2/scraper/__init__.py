@@ -3,15 +3,44 @@ Módulo de Scraping
 Contiene funcionalidades para scraping web asíncrono
 """
 
-from .async_http import AsyncHTTPClient, fetch_url_simple
-from .html_parser import parse_html, extract_links, extract_image_urls
-from .metadata_extractor import extract_metadata
+from .async_http import AsyncHTTPClient, ResponseTooLargeError, fetch_url_simple
+from .http_cache import HTTPCache
+from .connector import CONNECTOR_PROFILES, ConnectionStats
+from .html_parser import parse_html, parse_page, extract_links, extract_image_urls, extract_resource_urls
+from .metadata_extractor import extract_metadata, extract_metadata_from_soup
+from .url_utils import normalize_url
+from .single_flight import AsyncSingleFlight
+from .job_store import JobStore
+from .crawler import Crawler, DomainRateLimiter, RobotsCache
+from .url_set import BloomFilter, ScalableBloomFilter, FingerprintSet, DiskFrontier
+from .stream_extractor import StreamingHTMLExtractor, extract_stream
+from .parse_executor import ParseExecutor
 
 __all__ = [
     'AsyncHTTPClient',
+    'ResponseTooLargeError',
     'fetch_url_simple',
+    'HTTPCache',
+    'CONNECTOR_PROFILES',
+    'ConnectionStats',
     'parse_html',
+    'parse_page',
     'extract_links',
     'extract_image_urls',
-    'extract_metadata'
+    'extract_resource_urls',
+    'extract_metadata',
+    'extract_metadata_from_soup',
+    'normalize_url',
+    'AsyncSingleFlight',
+    'JobStore',
+    'Crawler',
+    'DomainRateLimiter',
+    'RobotsCache',
+    'BloomFilter',
+    'ScalableBloomFilter',
+    'FingerprintSet',
+    'DiskFrontier',
+    'StreamingHTMLExtractor',
+    'extract_stream',
+    'ParseExecutor'
 ]
@@ -2,27 +2,144 @@
 """
 Módulo de Cliente HTTP Asíncrono
 Realiza requests HTTP de forma asíncrona usando aiohttp
+
+Los cuerpos se leen por chunks (response.content.iter_chunked) con un
+tamaño máximo: una respuesta enorme o que nunca termina corta la descarga
+en lugar de agotar la memoria. El HTML se decodifica a medida que llega.
 """
 
+import re
+import codecs
 import aiohttp
 import asyncio
-from typing import Dict, Optional, Tuple
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Tuple, Union
 from urllib.parse import urlparse
 
+from .http_cache import HTTPCache
+from .connector import ConnectionStats, create_connector, resolve_profile
+from .url_utils import normalize_url
+
+
+# Tamaño máximo de una página HTML y de un binario (imágenes), ya descomprimidos
+MAX_BODY_BYTES = 10 * 1024 * 1024
+MAX_BINARY_BYTES = 20 * 1024 * 1024
+
+# Bytes iniciales que se examinan para elegir la codificación si el header no la declara
+ENCODING_SNIFF_BYTES = 64 * 1024
+
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
+
+BOMS = ((codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+
+
+class ResponseTooLargeError(aiohttp.ClientError):
+    """El cuerpo de la respuesta supera el tamaño máximo permitido"""
+
+
+def sniff_encoding(prefix: bytes) -> str:
+    """
+    Elige la codificación de un HTML sin charset en el header
+
+    En orden: BOM, <meta charset> en el primer KB, UTF-8 si el prefijo es
+    UTF-8 válido y, si no, windows-1252 (como los navegadores).
+
+    Args:
+        prefix: Primeros bytes del cuerpo
+
+    Returns:
+        str: Nombre de la codificación
+    """
+    for bom, encoding in BOMS:
+        if prefix.startswith(bom):
+            return encoding
+
+    match = META_CHARSET_RE.search(prefix[:1024])
+    if match:
+        try:
+            encoding = codecs.lookup(match.group(1).decode('ascii')).name
+            # Un <meta> no puede declarar UTF-16 (el propio meta estaría en ASCII)
+            return 'utf-8' if encoding.startswith('utf-16') else encoding
+        except LookupError:
+            pass
+
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(prefix, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'windows-1252'
+
+
+class IncrementalHTMLDecoder:
+    """Decodifica un cuerpo HTML chunk a chunk"""
+
+    def __init__(self, charset: Optional[str] = None):
+        """
+        Args:
+            charset: Codificación declarada en Content-Type (None = detectarla
+                     con los primeros ENCODING_SNIFF_BYTES bytes)
+        """
+        self.encoding = None
+        self._decoder = None
+        self._pending = b''
+        if charset:
+            try:
+                self._start(codecs.lookup(charset).name)
+            except LookupError:
+                pass
+
+    def _start(self, encoding: str):
+        self.encoding = encoding
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+    def decode(self, chunk: bytes) -> str:
+        """
+        Decodifica un chunk (los caracteres partidos quedan para el siguiente)
+
+        Returns:
+            str: Texto decodificado hasta ahora ('' mientras se detecta la codificación)
+        """
+        if self._decoder is None:
+            self._pending += chunk
+            if len(self._pending) < ENCODING_SNIFF_BYTES:
+                return ''
+            self._start(sniff_encoding(self._pending))
+            chunk, self._pending = self._pending, b''
+        return self._decoder.decode(chunk)
+
+    def flush(self) -> str:
+        """Decodifica lo que quedó pendiente al terminar el cuerpo"""
+        if self._decoder is None:
+            self._start(sniff_encoding(self._pending))
+            return self._decoder.decode(self._pending, final=True)
+        return self._decoder.decode(b'', final=True)
+
 
 class AsyncHTTPClient:
     """Cliente HTTP asíncrono para scraping"""
     
-    def __init__(self, timeout: int = 30, max_redirects: int = 10):
+    def __init__(self, timeout: int = 30, max_redirects: int = 10, cache: Optional[HTTPCache] = None,
+                 connector_profile: Union[str, Dict[str, Any], None] = None,
+                 max_body_bytes: Optional[int] = MAX_BODY_BYTES,
+                 max_binary_bytes: Optional[int] = MAX_BINARY_BYTES):
         """
         Inicializa el cliente HTTP asíncrono
         
         Args:
             timeout: Tiempo máximo de espera en segundos
             max_redirects: Número máximo de redirects a seguir
+            cache: Caché HTTP para fetch_url (None = sin caché)
+            connector_profile: Perfil de conexiones (nombre de CONNECTOR_PROFILES
+                               o dict con límites, TTL DNS, keep-alive, etc.)
+            max_body_bytes: Tamaño máximo de una página (None = sin límite)
+            max_binary_bytes: Tamaño máximo de download_binary (None = sin límite)
         """
-        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.profile = resolve_profile(connector_profile)
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=self.profile['connect_timeout'])
         self.max_redirects = max_redirects
+        self.cache = cache
+        self.max_body_bytes = max_body_bytes
+        self.max_binary_bytes = max_binary_bytes
+        self.connection_stats = ConnectionStats(self.profile)
         self.session: Optional[aiohttp.ClientSession] = None
     
     async def __aenter__(self):
@@ -39,8 +156,9 @@ class AsyncHTTPClient:
         if self.session is None or self.session.closed:
             self.session = aiohttp.ClientSession(
                 timeout=self.timeout,
-                connector=aiohttp.TCPConnector(limit=10),
-                headers={'User-Agent': 'Mozilla/5.0 (Web Scraper Bot)'}
+                connector=create_connector(self.profile),
+                headers={'User-Agent': 'Mozilla/5.0 (Web Scraper Bot)'},
+                trace_configs=[self.connection_stats.trace_config()]
             )
     
     async def close_session(self):
@@ -49,17 +167,33 @@ class AsyncHTTPClient:
             await self.session.close()
             await asyncio.sleep(0.250)  # Dar tiempo para cerrar conexiones
     
-    async def fetch_url(self, url: str) -> Tuple[str, int, Dict]:
+    async def fetch_url(self, url: str, max_bytes: Optional[int] = None,
+                        on_chunk: Optional[Callable[[bytes], bool]] = None,
+                        chunk_size: int = 64 * 1024) -> Tuple[str, int, Dict]:
         """
         Obtiene el contenido de una URL de forma asíncrona
         
+        El cuerpo se lee por chunks y se decodifica a medida que llega; si
+        supera max_bytes la descarga se corta. on_chunk recibe cada chunk
+        crudo (ej: para alimentar un parser incremental) y puede cortar la
+        lectura devolviendo True; en ese caso se devuelve lo leído hasta ahí.
+        
+        Con caché, una página fresca se devuelve sin tocar la red y una
+        vencida se revalida (If-None-Match / If-Modified-Since): ante un 304
+        se devuelve el cuerpo guardado (on_chunk lo recibe entero). El
+        header X-Cache de la respuesta indica HIT, REVALIDATED o MISS.
+        
         Args:
             url: URL a consultar
+            max_bytes: Tamaño máximo del cuerpo (default: el del cliente)
+            on_chunk: Función que recibe cada chunk; si devuelve True se deja de leer
+            chunk_size: Tamaño máximo de cada chunk
             
         Returns:
             Tuple[str, int, Dict]: (contenido HTML, status code, headers)
             
         Raises:
+            ResponseTooLargeError: Si el cuerpo supera max_bytes
             aiohttp.ClientError: Si hay error en la petición
             asyncio.TimeoutError: Si se excede el timeout
         """
@@ -70,28 +204,181 @@ class AsyncHTTPClient:
         if not self._is_valid_url(url):
             raise ValueError(f"URL inválida: {url}")
         
+        max_bytes = self.max_body_bytes if max_bytes is None else max_bytes
+        key = normalize_url(url) if self.cache else None
+        # La caché es SQLite (bloqueante): se consulta desde un hilo
+        entry = await asyncio.to_thread(self.cache.lookup, key) if self.cache else None
+        if entry and entry['fresh']:
+            await asyncio.to_thread(self.cache.hit, key, entry)
+            if on_chunk:
+                on_chunk(entry['body'])
+            return self._cached_response(entry, 'HIT')
+        
         try:
             async with self.session.get(
                 url,
                 allow_redirects=True,
-                max_redirects=self.max_redirects
+                max_redirects=self.max_redirects,
+                headers=HTTPCache.conditional_headers(entry) if entry else None
             ) as response:
                 
+                if entry and response.status == 304:
+                    await asyncio.to_thread(self.cache.refresh, key, entry, dict(response.headers))
+                    if on_chunk:
+                        on_chunk(entry['body'])
+                    return self._cached_response(entry, 'REVALIDATED')
+                
                 # Verificar tipo de contenido
                 content_type = response.headers.get('Content-Type', '')
                 if 'text/html' not in content_type.lower():
                     raise ValueError(f"Tipo de contenido no HTML: {content_type}")
                 
-                # Leer contenido
-                html_content = await response.text()
+                # Leer y decodificar por chunks
+                decoder = IncrementalHTMLDecoder(response.charset)
+                text = []
+                body = [] if self.cache else None
+                complete = True
+                async for chunk in self._iter_body(response, url, max_bytes, chunk_size):
+                    text.append(decoder.decode(chunk))
+                    if body is not None:
+                        body.append(chunk)
+                    if on_chunk and on_chunk(chunk):
+                        # Ya no hace falta el resto: cerrar sin leerlo
+                        complete = False
+                        response.close()
+                        break
+                text.append(decoder.flush())
+                
+                html_content = ''.join(text)
                 status_code = response.status
                 headers = dict(response.headers)
                 
+                if self.cache:
+                    self.cache.miss()
+                    # Un cuerpo incompleto no se guarda
+                    if complete:
+                        await asyncio.to_thread(self.cache.store, key, status_code, headers,
+                                                b''.join(body), decoder.encoding)
+                    headers['X-Cache'] = 'MISS'
+                
                 return html_content, status_code, headers
                 
         except asyncio.TimeoutError:
             raise asyncio.TimeoutError(f"Timeout al acceder a {url}")
         
+        except ResponseTooLargeError:
+            raise
+        
+        except aiohttp.ClientError as e:
+            raise aiohttp.ClientError(f"Error al acceder a {url}: {str(e)}")
+    
+    @staticmethod
+    async def _iter_body(response: aiohttp.ClientResponse, url: str, max_bytes: Optional[int],
+                         chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """
+        Chunks del cuerpo de una respuesta, cortando al superar max_bytes
+        
+        El límite se aplica al cuerpo ya descomprimido (protege también de
+        respuestas comprimidas que se inflan). Si Content-Length declara más
+        de max_bytes se falla sin leer nada.
+        
+        Args:
+            response: Respuesta de aiohttp
+            url: URL (para el mensaje de error)
+            max_bytes: Tamaño máximo (None = sin límite)
+            chunk_size: Tamaño máximo de cada chunk
+            
+        Yields:
+            bytes: Chunks del cuerpo
+            
+        Raises:
+            ResponseTooLargeError: Si el cuerpo supera max_bytes
+        """
+        declared = response.content_length
+        if max_bytes is not None and declared is not None and declared > max_bytes:
+            response.close()
+            raise ResponseTooLargeError(f"{url} ocupa {declared} bytes (máximo {max_bytes})")
+        
+        size = 0
+        async for chunk in response.content.iter_chunked(chunk_size):
+            size += len(chunk)
+            if max_bytes is not None and size > max_bytes:
+                response.close()
+                raise ResponseTooLargeError(f"{url} supera el máximo de {max_bytes} bytes")
+            yield chunk
+    
+    @staticmethod
+    def _cached_response(entry: Dict, cache_status: str) -> Tuple[str, int, Dict]:
+        """Arma la respuesta de fetch_url a partir de una entrada de la caché"""
+        headers = dict(entry['headers'], **{'X-Cache': cache_status})
+        # Igual que al descargarla: un byte inválido no hace fallar la página
+        text = entry['body'].decode(entry['encoding'] or 'utf-8', errors='replace')
+        return text, entry['status'], headers
+    
+    async def fetch_stream(self, url: str, on_chunk: Callable[[bytes], bool],
+                           on_headers: Optional[Callable[[int, Dict, Optional[str]], None]] = None,
+                           chunk_size: int = 64 * 1024, max_bytes: Optional[int] = None) -> Tuple[int, Dict, int]:
+        """
+        Obtiene una página HTML entregando el cuerpo por chunks, sin acumularlo
+        
+        Args:
+            url: URL a consultar
+            on_chunk: Función (o corrutina) que recibe cada chunk; si devuelve
+                      True se deja de leer
+            on_headers: Función llamada antes del primer chunk con
+                        (status code, headers, charset declarado)
+            chunk_size: Tamaño máximo de cada chunk
+            max_bytes: Tamaño máximo del cuerpo (default: el del cliente)
+            
+        Returns:
+            Tuple[int, Dict, int]: (status code, headers, bytes leídos)
+            
+        Raises:
+            ResponseTooLargeError: Si el cuerpo supera max_bytes
+            aiohttp.ClientError: Si hay error en la petición
+            asyncio.TimeoutError: Si se excede el timeout
+        """
+        if not self.session:
+            await self.create_session()
+        
+        if not self._is_valid_url(url):
+            raise ValueError(f"URL inválida: {url}")
+        
+        try:
+            async with self.session.get(
+                url,
+                allow_redirects=True,
+                max_redirects=self.max_redirects
+            ) as response:
+                
+                content_type = response.headers.get('Content-Type', '')
+                if 'text/html' not in content_type.lower():
+                    raise ValueError(f"Tipo de contenido no HTML: {content_type}")
+                
+                headers = dict(response.headers)
+                if on_headers:
+                    on_headers(response.status, headers, response.charset)
+                
+                size = 0
+                max_bytes = self.max_body_bytes if max_bytes is None else max_bytes
+                async for chunk in self._iter_body(response, url, max_bytes, chunk_size):
+                    size += len(chunk)
+                    done = on_chunk(chunk)
+                    if asyncio.iscoroutine(done):
+                        done = await done
+                    if done:
+                        # Ya no hace falta el resto: cerrar sin leerlo
+                        response.close()
+                        break
+                
+                return response.status, headers, size
+                
+        except asyncio.TimeoutError:
+            raise asyncio.TimeoutError(f"Timeout al acceder a {url}")
+        
+        except ResponseTooLargeError:
+            raise
+        
         except aiohttp.ClientError as e:
             raise aiohttp.ClientError(f"Error al acceder a {url}: {str(e)}")
     
@@ -145,29 +432,38 @@ class AsyncHTTPClient:
         except Exception:
             return False
     
-    async def download_binary(self, url: str) -> bytes:
+    async def download_binary(self, url: str, max_bytes: Optional[int] = None) -> bytes:
         """
         Descarga contenido binario (ej: imágenes)
         
         Args:
             url: URL del recurso a descargar
+            max_bytes: Tamaño máximo (default: max_binary_bytes del cliente)
             
         Returns:
             bytes: Contenido binario
+            
+        Raises:
+            ResponseTooLargeError: Si el contenido supera max_bytes
         """
         if not self.session:
             await self.create_session()
         
+        max_bytes = self.max_binary_bytes if max_bytes is None else max_bytes
         try:
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    return await response.read()
+                    chunks = [chunk async for chunk in self._iter_body(response, url, max_bytes)]
+                    return b''.join(chunks)
                 else:
                     raise aiohttp.ClientError(f"Status {response.status} al descargar {url}")
         
         except asyncio.TimeoutError:
             raise asyncio.TimeoutError(f"Timeout al descargar {url}")
         
+        except ResponseTooLargeError:
+            raise
+        
         except aiohttp.ClientError as e:
             raise aiohttp.ClientError(f"Error al descargar {url}: {str(e)}")
 
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Módulo de Conexiones HTTP
+Perfiles del connector de aiohttp (límites global y por host, caché DNS,
+keep-alive, IPv4/IPv6) y estadísticas de uso del pool de conexiones
+obtenidas con TraceConfig.
+
+Happy eyeballs: las direcciones de un host se ordenan alternando familias
+(IPv6, IPv4, IPv6, ... como indica RFC 8305) y cada intento de conexión
+tiene un timeout acotado, así un IPv6 roto cae enseguida a IPv4. Con
+aiohttp >= 3.10 además los intentos se lanzan en paralelo, escalonados
+por happy_eyeballs_delay.
+"""
+
+import time
+import socket
+import inspect
+from typing import Any, Dict, List, Union
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+from aiohttp.resolver import DefaultResolver
+
+
+# Perfiles del connector
+# - limit: conexiones simultáneas totales
+# - limit_per_host: conexiones simultáneas por host (0 = sin límite)
+# - dns_ttl: segundos que se cachea una resolución DNS
+# - keepalive: segundos que una conexión ociosa queda abierta para reutilizarse
+# - connect_timeout: timeout de cada intento de conexión (por dirección)
+# - happy_eyeballs_delay: espera antes de probar la siguiente dirección (aiohttp >= 3.10)
+CONNECTOR_PROFILES = {
+    'default': {
+        'limit': 10,
+        'limit_per_host': 6,
+        'dns_ttl': 300,
+        'keepalive': 30,
+        'connect_timeout': 5,
+        'happy_eyeballs_delay': 0.25
+    },
+    'crawl': {
+        'limit': 100,
+        'limit_per_host': 4,
+        'dns_ttl': 600,
+        'keepalive': 60,
+        'connect_timeout': 5,
+        'happy_eyeballs_delay': 0.25
+    },
+    'gentle': {
+        'limit': 4,
+        'limit_per_host': 1,
+        'dns_ttl': 600,
+        'keepalive': 30,
+        'connect_timeout': 10,
+        'happy_eyeballs_delay': 0.25
+    }
+}
+
+SUPPORTS_HAPPY_EYEBALLS = 'happy_eyeballs_delay' in inspect.signature(aiohttp.TCPConnector.__init__).parameters
+
+
+def resolve_profile(profile: Union[str, Dict[str, Any], None] = None, **overrides) -> Dict[str, Any]:
+    """
+    Arma un perfil de connector completo
+
+    Args:
+        profile: Nombre de un perfil de CONNECTOR_PROFILES o dict con algunos valores
+        **overrides: Valores que reemplazan a los del perfil (los None se ignoran)
+
+    Returns:
+        Dict con todos los valores del perfil
+
+    Raises:
+        ValueError: Si el perfil o alguno de los valores no existe o es inválido
+    """
+    if profile is None or isinstance(profile, str):
+        name = profile or 'default'
+        if name not in CONNECTOR_PROFILES:
+            raise ValueError(f"Perfil de conexiones desconocido: {name} (opciones: {', '.join(CONNECTOR_PROFILES)})")
+        profile = {}
+    else:
+        name = 'default'
+
+    resolved = dict(CONNECTOR_PROFILES[name], **profile)
+    resolved.update({key: value for key, value in overrides.items() if value is not None})
+    unknown = set(resolved) - set(CONNECTOR_PROFILES['default'])
+    if unknown:
+        raise ValueError(f"Opciones de conexión desconocidas: {', '.join(sorted(unknown))}")
+    if resolved['limit'] < 1 or resolved['limit_per_host'] < 0:
+        raise ValueError("limit debe ser al menos 1 y limit_per_host no puede ser negativo")
+    return resolved
+
+
+def interleave_families(hosts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Ordena direcciones alternando familias (RFC 8305)
+
+    Se respeta la preferencia del sistema para la primera familia.
+
+    Args:
+        hosts: Resultado de un resolver de aiohttp
+
+    Returns:
+        list: Las mismas direcciones, intercaladas por familia
+    """
+    if not hosts:
+        return hosts
+    first = hosts[0]['family']
+    preferred = [host for host in hosts if host['family'] == first]
+    others = [host for host in hosts if host['family'] != first]
+    ordered = []
+    for i in range(max(len(preferred), len(others))):
+        ordered.extend(group[i] for group in (preferred, others) if i < len(group))
+    return ordered
+
+
+class InterleavingResolver(AbstractResolver):
+    """Resolver que devuelve todas las familias (IPv4 e IPv6) intercaladas"""
+
+    def __init__(self, resolver: AbstractResolver = None):
+        self._resolver = resolver or DefaultResolver()
+
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_UNSPEC) -> List[Dict[str, Any]]:
+        return interleave_families(await self._resolver.resolve(host, port, family))
+
+    async def close(self):
+        await self._resolver.close()
+
+
+def create_connector(profile: Dict[str, Any]) -> aiohttp.TCPConnector:
+    """
+    Crea el TCPConnector de un perfil
+
+    Args:
+        profile: Perfil completo (ver resolve_profile)
+
+    Returns:
+        aiohttp.TCPConnector
+    """
+    options = {
+        'limit': profile['limit'],
+        'limit_per_host': profile['limit_per_host'],
+        'use_dns_cache': profile['dns_ttl'] > 0,
+        'ttl_dns_cache': profile['dns_ttl'] or None,
+        'keepalive_timeout': profile['keepalive'],
+        'family': socket.AF_UNSPEC,
+        'resolver': InterleavingResolver()
+    }
+    if SUPPORTS_HAPPY_EYEBALLS:
+        options['happy_eyeballs_delay'] = profile['happy_eyeballs_delay']
+        options['interleave'] = 1
+    return aiohttp.TCPConnector(**options)
+
+
+class ConnectionStats:
+    """Uso del pool de conexiones de una sesión aiohttp, medido con TraceConfig"""
+
+    def __init__(self, profile: Dict[str, Any]):
+        """
+        Args:
+            profile: Perfil del connector (para calcular la utilización)
+        """
+        self.profile = profile
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.connect_ms = 0.0
+        self.queued = 0
+        self.queue_ms = 0.0
+        self.dns_hits = 0
+        self.dns_misses = 0
+        self.dns_ms = 0.0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        TraceConfig que alimenta estos contadores
+
+        Returns:
+            aiohttp.TraceConfig para ClientSession(trace_configs=[...])
+        """
+        config = aiohttp.TraceConfig()
+
+        def timed(attribute, start_hook, end_hook, on_end):
+            # Guarda el inicio en el contexto de la petición y mide al terminar
+            async def start(session, context, params):
+                setattr(context, attribute, time.perf_counter())
+
+            async def end(session, context, params):
+                started = getattr(context, attribute, None)
+                if started is not None:
+                    on_end((time.perf_counter() - started) * 1000)
+
+            start_hook.append(start)
+            end_hook.append(end)
+
+        async def request_start(session, context, params):
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+        async def request_done(session, context, params):
+            self.in_flight -= 1
+
+        async def reused(session, context, params):
+            self.connections_reused += 1
+
+        async def dns_hit(session, context, params):
+            self.dns_hits += 1
+
+        async def dns_miss(session, context, params):
+            self.dns_misses += 1
+
+        def connected(ms):
+            self.connections_created += 1
+            self.connect_ms += ms
+
+        def dequeued(ms):
+            self.queued += 1
+            self.queue_ms += ms
+
+        def resolved(ms):
+            self.dns_ms += ms
+
+        config.on_request_start.append(request_start)
+        config.on_request_end.append(request_done)
+        config.on_request_exception.append(request_done)
+        config.on_connection_reuseconn.append(reused)
+        config.on_dns_cache_hit.append(dns_hit)
+        config.on_dns_cache_miss.append(dns_miss)
+        timed('connect_start', config.on_connection_create_start, config.on_connection_create_end, connected)
+        timed('queue_start', config.on_connection_queued_start, config.on_connection_queued_end, dequeued)
+        timed('dns_start', config.on_dns_resolvehost_start, config.on_dns_resolvehost_end, resolved)
+        config.freeze()
+        return config
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Contadores del pool
+
+        Una petición cuenta como en curso hasta que llegan los headers de
+        la respuesta; utilization es en curso / limit.
+
+        Returns:
+            Dict con el perfil, peticiones en curso y pico, utilización,
+            conexiones nuevas y reutilizadas, esperas por límite y DNS
+        """
+        connections = self.connections_created + self.connections_reused
+        return {
+            'profile': self.profile,
+            'happy_eyeballs': 'race' if SUPPORTS_HAPPY_EYEBALLS else 'interleave',
+            'requests': self.requests,
+            'in_flight': self.in_flight,
+            'peak_in_flight': self.peak_in_flight,
+            'utilization': round(self.in_flight / self.profile['limit'], 3),
+            'connections_created': self.connections_created,
+            'connections_reused': self.connections_reused,
+            'reuse_ratio': round(self.connections_reused / connections, 3) if connections else 0.0,
+            'avg_connect_ms': round(self.connect_ms / self.connections_created, 2) if self.connections_created else 0.0,
+            'queued': self.queued,
+            'avg_queue_ms': round(self.queue_ms / self.queued, 2) if self.queued else 0.0,
+            'dns_cache_hits': self.dns_hits,
+            'dns_cache_misses': self.dns_misses,
+            'avg_dns_ms': round(self.dns_ms / self.dns_misses, 2) if self.dns_misses else 0.0
+        }
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Módulo de Crawling
+Recorre un sitio siguiendo enlaces, con cortesía hacia cada origen:
+
+- Frontera: las URLs se normalizan, se descartan las ya vistas (huellas
+  de 64 bits) y se escriben en un archivo mapeado en memoria (DiskFrontier,
+  ver url_set.py); cada dominio tiene una cola con los offsets de sus URLs.
+- Límite por dominio: token bucket (ritmo sostenido + ráfaga), compartido
+  entre crawls simultáneos y ajustado al Crawl-delay de robots.txt.
+- robots.txt: se descarga una vez por origen y se cachea (RFC 9309).
+- Profundidad y cantidad de páginas máximas.
+
+Los workers siempre toman la URL del dominio que primero tiene un token
+disponible: mientras un dominio espera, se avanza con los demás.
+"""
+
+import time
+import heapq
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional
+from urllib.parse import urlsplit
+from urllib.robotparser import RobotFileParser
+
+import aiohttp
+
+from .async_http import AsyncHTTPClient
+from .url_utils import normalize_url
+from .url_set import DiskFrontier
+from .single_flight import AsyncSingleFlight
+
+
+# Nombre con el que el crawler se identifica ante robots.txt
+ROBOTS_USER_AGENT = 'WebScraperBot'
+
+# Validez de un robots.txt cacheado (y de un fallo al descargarlo)
+ROBOTS_TTL = 3600
+ROBOTS_ERROR_TTL = 300
+
+# Tamaño máximo de robots.txt que se procesa (RFC 9309 pide al menos 500 KiB)
+ROBOTS_MAX_BYTES = 512 * 1024
+
+
+class TokenBucket:
+    """Token bucket: `rate` tokens por segundo, hasta `capacity` acumulados"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Segundos hasta que haya un token (0 si ya hay)"""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        """Consume un token (llamar solo si delay() devolvió 0)"""
+        self._refill(now)
+        self.tokens -= 1
+
+
+class DomainRateLimiter:
+    """Token buckets por dominio, compartidos por todos los crawls del proceso"""
+
+    def __init__(self, rate: float = 1.0, burst: float = 2):
+        """
+        Args:
+            rate: Peticiones por segundo sostenidas a cada dominio
+            burst: Peticiones que se permiten de una vez tras un rato sin pedir
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate debe ser positivo y burst al menos 1")
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def bucket(self, domain: str) -> TokenBucket:
+        if domain not in self._buckets:
+            self._buckets[domain] = TokenBucket(self.rate, self.burst)
+        return self._buckets[domain]
+
+    def slow_down(self, domain: str, crawl_delay: float):
+        """Aplica un Crawl-delay (solo si es más lento que el ritmo actual)"""
+        bucket = self.bucket(domain)
+        if crawl_delay > 0 and 1 / crawl_delay < bucket.rate:
+            bucket.rate = 1 / crawl_delay
+            bucket.capacity = 1
+            bucket.tokens = min(bucket.tokens, 1)
+
+    def stats(self) -> Dict[str, Any]:
+        """Dominios con bucket y ritmo configurado"""
+        return {'domains': len(self._buckets), 'rate': self.rate, 'burst': self.burst}
+
+
+class RobotsCache:
+    """robots.txt por origen, descargado una vez y cacheado"""
+
+    def __init__(self, http_client: AsyncHTTPClient, user_agent: str = ROBOTS_USER_AGENT,
+                 ttl: float = ROBOTS_TTL):
+        """
+        Args:
+            http_client: Cliente cuya sesión (y connector) se usa para descargar
+            user_agent: Agente con el que se evalúan las reglas
+            ttl: Segundos de validez de un robots.txt descargado
+        """
+        self.http_client = http_client
+        self.user_agent = user_agent
+        self.ttl = ttl
+        self._rules: Dict[str, tuple] = {}
+        self._inflight = AsyncSingleFlight()
+        self.fetched = 0
+
+    @staticmethod
+    def origin(url: str) -> str:
+        parts = urlsplit(url)
+        return f'{parts.scheme}://{parts.netloc}'
+
+    async def rules(self, url: str) -> RobotFileParser:
+        """
+        Reglas de robots.txt del origen de una URL
+
+        Args:
+            url: Cualquier URL del origen
+
+        Returns:
+            RobotFileParser con las reglas (o permitir/prohibir todo)
+        """
+        origin = self.origin(url)
+        cached = self._rules.get(origin)
+        if cached and cached[1] > time.monotonic():
+            return cached[0]
+        return await self._inflight.do(origin, lambda: self._fetch(origin))
+
+    async def allowed(self, url: str) -> bool:
+        """Indica si robots.txt permite descargar la URL"""
+        return (await self.rules(url)).can_fetch(self.user_agent, url)
+
+    async def crawl_delay(self, url: str) -> Optional[float]:
+        """Crawl-delay declarado para este agente, si hay"""
+        delay = (await self.rules(url)).crawl_delay(self.user_agent)
+        return float(delay) if delay is not None else None
+
+    async def _fetch(self, origin: str) -> RobotFileParser:
+        parser = RobotFileParser(f'{origin}/robots.txt')
+        ttl = self.ttl
+        try:
+            await self.http_client.create_session()
+            async with self.http_client.session.get(f'{origin}/robots.txt', timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status == 200:
+                    body = await response.content.read(ROBOTS_MAX_BYTES)
+                    parser.parse(body.decode('utf-8', errors='replace').splitlines())
+                elif 400 <= response.status < 500:
+                    # Sin robots.txt (o inaccesible): todo permitido
+                    parser.allow_all = True
+                else:
+                    parser.disallow_all = True
+                    ttl = ROBOTS_ERROR_TTL
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            # Origen inalcanzable: no se descarga nada hasta reintentar
+            parser.disallow_all = True
+            ttl = ROBOTS_ERROR_TTL
+
+        self.fetched += 1
+        self._rules[origin] = (parser, time.monotonic() + ttl)
+        return parser
+
+    def stats(self) -> Dict[str, int]:
+        """Orígenes cacheados y robots.txt descargados"""
+        return {'origins': len(self._rules), 'fetched': self.fetched}
+
+
+class Crawler:
+    """Crawl de uno o más sitios a partir de URLs semilla"""
+
+    def __init__(self, fetch_page: Callable[[str], Awaitable[Dict[str, Any]]],
+                 rate_limiter: DomainRateLimiter, robots: Optional[RobotsCache] = None,
+                 max_pages: int = 50, max_depth: int = 2, concurrency: int = 8,
+                 same_domain: bool = True, seen=None, frontier: Optional[DiskFrontier] = None):
+        """
+        Args:
+            fetch_page: Corrutina que descarga y parsea una URL y devuelve
+                        los datos extraídos (con 'links')
+            rate_limiter: Límite de peticiones por dominio
+            robots: Caché de robots.txt (None = no consultar robots.txt)
+            max_pages: Páginas máximas a descargar
+            max_depth: Saltos máximos desde las semillas (0 = solo las semillas)
+            concurrency: Descargas simultáneas
+            same_domain: Seguir solo enlaces a los hosts de las semillas
+            seen: Conjunto de URLs vistas, con add() -> bool (default: las
+                  huellas de la frontera; ver scraper/url_set.py)
+            frontier: Archivo donde esperan las URLs encoladas (default:
+                      DiskFrontier temporal, que close() libera)
+        """
+        self.fetch_page = fetch_page
+        self.rate_limiter = rate_limiter
+        self.robots = robots
+        self.max_pages = max_pages
+        self.max_depth = max_depth
+        self.concurrency = concurrency
+        self.same_domain = same_domain
+        self._owns_frontier = frontier is None
+        self.frontier = frontier if frontier is not None else DiskFrontier()
+        self.seen = seen if seen is not None else self.frontier.seen
+
+        self._queues: Dict[str, deque] = {}
+        self._ready = []
+        self._sequence = 0
+        self._hosts = set()
+        self._active = 0
+        self._changed = asyncio.Condition()
+        self.started = 0
+        self.counters = {'fetched': 0, 'failed': 0, 'robots_blocked': 0, 'queued': 0, 'duplicates': 0,
+                         'off_domain': 0, 'rate_waits': 0}
+
+    def enqueue(self, url: str, depth: int) -> bool:
+        """
+        Agrega una URL a la frontera si no se vio antes
+
+        Args:
+            url: URL (se normaliza)
+            depth: Saltos desde la semilla
+
+        Returns:
+            bool: True si se encoló
+        """
+        url = normalize_url(url)
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            return False
+        if self.same_domain and self._hosts and parts.hostname not in self._hosts:
+            self.counters['off_domain'] += 1
+            return False
+        if not self.seen.add(url):
+            self.counters['duplicates'] += 1
+            return False
+
+        domain = parts.netloc
+        queue = self._queues.get(domain)
+        if queue is None:
+            queue = self._queues[domain] = deque()
+            self._schedule(domain, time.monotonic())
+        queue.append(self.frontier.append(url, depth))
+        self.counters['queued'] += 1
+        return True
+
+    def _schedule(self, domain: str, at: float):
+        self._sequence += 1
+        heapq.heappush(self._ready, (at, self._sequence, domain))
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _next(self):
+        """Siguiente (url, profundidad) respetando el límite por dominio, o None al terminar"""
+        async with self._changed:
+            while True:
+                if self.started >= self.max_pages:
+                    # Una página en curso todavía puede devolver su lugar (robots.txt)
+                    if self._active == 0:
+                        return None
+                    await self._changed.wait()
+                    continue
+                if not self._ready:
+                    if self._active == 0:
+                        return None
+                    await self._changed.wait()
+                    continue
+
+                at, _, domain = self._ready[0]
+                now = time.monotonic()
+                if at > now:
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), at - now)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+
+                heapq.heappop(self._ready)
+                bucket = self.rate_limiter.bucket(domain)
+                wait = bucket.delay(now)
+                if wait > 0:
+                    self.counters['rate_waits'] += 1
+                    self._schedule(domain, now + wait)
+                    continue
+
+                bucket.take(now)
+                queue = self._queues[domain]
+                url, depth = self.frontier.read(queue.popleft())
+                if queue:
+                    wait = bucket.delay(now)
+                    if wait > 0:
+                        self.counters['rate_waits'] += 1
+                    self._schedule(domain, now + wait)
+                else:
+                    del self._queues[domain]
+                self._active += 1
+                self.started += 1
+                return url, depth
+
+    async def _visit(self, url: str, depth: int) -> Dict[str, Any]:
+        """Descarga una URL, encola sus enlaces y arma su resultado"""
+        start = time.perf_counter()
+        if self.robots:
+            if not await self.robots.allowed(url):
+                self.counters['robots_blocked'] += 1
+                # Una URL bloqueada no cuenta como página descargada
+                self.started -= 1
+                return {'url': url, 'depth': depth, 'status': 'skipped', 'reason': 'robots.txt'}
+            delay = await self.robots.crawl_delay(url)
+            if delay:
+                self.rate_limiter.slow_down(urlsplit(url).netloc, delay)
+
+        try:
+            data = await self.fetch_page(url)
+        except Exception as e:
+            self.counters['failed'] += 1
+            return {'url': url, 'depth': depth, 'status': 'failed', 'error': str(e),
+                    'elapsed_ms': round((time.perf_counter() - start) * 1000, 2)}
+
+        self.counters['fetched'] += 1
+        links = data.get('links', [])
+        queued = 0
+        if depth < self.max_depth:
+            queued = sum(self.enqueue(link, depth + 1) for link in links)
+        return {
+            'url': url,
+            'depth': depth,
+            'status': 'success',
+            'links_found': len(links),
+            'links_queued': queued,
+            'elapsed_ms': round((time.perf_counter() - start) * 1000, 2),
+            'scraping_data': data
+        }
+
+    async def crawl(self, seeds: Iterable[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Ejecuta el crawl y entrega el resultado de cada página al terminarla
+
+        Args:
+            seeds: URLs iniciales (profundidad 0)
+
+        Yields:
+            Dict por página: url, depth, status ('success', 'failed' o
+            'skipped') y, si se descargó, links_found, links_queued y
+            scraping_data
+        """
+        seeds = [normalize_url(seed) for seed in seeds]
+        if self.same_domain:
+            self._hosts = {urlsplit(seed).hostname for seed in seeds}
+        for seed in seeds:
+            self.enqueue(seed, 0)
+
+        results = asyncio.Queue(maxsize=self.concurrency)
+
+        async def worker():
+            while True:
+                item = await self._next()
+                if item is None:
+                    await self._notify()
+                    return
+                url, depth = item
+                try:
+                    result = await self._visit(url, depth)
+                except Exception as e:
+                    # Un fallo de robots.txt o de la frontera es un fallo de
+                    # esta URL: el worker sigue con las demás
+                    self.counters['failed'] += 1
+                    result = {'url': url, 'depth': depth, 'status': 'failed', 'error': str(e)}
+                finally:
+                    self._active -= 1
+                    await self._notify()
+                await results.put(result)
+
+        async def finish(workers):
+            try:
+                await asyncio.gather(*workers)
+            finally:
+                # El stream termina aunque un worker haya fallado
+                await results.put(None)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.concurrency)]
+        finisher = asyncio.ensure_future(finish(workers))
+        try:
+            while True:
+                result = await results.get()
+                if result is None:
+                    break
+                yield result
+        finally:
+            for task in [finisher] + workers:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores del crawl y estado de la frontera"""
+        return dict(
+            self.counters,
+            pending=sum(len(queue) for queue in self._queues.values()),
+            domains=len(self._queues),
+            seen=len(self.seen)
+        )
+
+    def close(self):
+        """Libera la frontera si la creó el crawler"""
+        if self._owns_frontier:
+            self.frontier.close()
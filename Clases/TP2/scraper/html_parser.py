@@ -9,6 +9,13 @@ from urllib.parse import urljoin, urlparse
 from typing import Dict, List, Any
 import re
 
+from .metadata_extractor import extract_metadata_from_soup, extract_json_ld
+
+
+# Imágenes referenciadas desde CSS (url(...)) y extensiones de imagen aceptadas
+CSS_IMAGE_PATTERN = re.compile(r'url\(["\']?[^")\']+\.(jpg|jpeg|png|gif|webp|svg)', re.I)
+IMAGE_URL_PATTERN = re.compile(r'\.(jpg|jpeg|png|gif|webp)($|\?)', re.I)
+
 
 def parse_html(html_content: str, base_url: str) -> Dict[str, Any]:
     """
@@ -31,6 +38,36 @@ def parse_html(html_content: str, base_url: str) -> Dict[str, Any]:
     }
 
 
+def parse_page(html_content: str, base_url: str, image_limit: int = 5) -> Dict[str, Any]:
+    """
+    Parsea el HTML una sola vez y extrae todo lo que necesita un scraping
+    
+    Un único árbol alimenta título, enlaces, estructura, meta tags
+    (básicos, Open Graph y Twitter), JSON-LD, URLs de imágenes y la lista de
+    recursos externos que usa el análisis de rendimiento.
+    
+    Args:
+        html_content: String con el HTML de la página
+        base_url: URL base para resolver enlaces relativos
+        image_limit: Número máximo de URLs de imágenes a extraer
+        
+    Returns:
+        Dict con toda la información extraída
+    """
+    soup = BeautifulSoup(html_content, 'lxml')
+    
+    return {
+        'title': extract_title(soup),
+        'links': extract_links(soup, base_url),
+        'images_count': count_images(soup),
+        'structure': extract_structure(soup),
+        'meta_tags': extract_metadata_from_soup(soup),
+        'structured_data': extract_json_ld(soup),
+        'image_urls': extract_image_urls(soup, base_url, image_limit),
+        'resources': extract_resource_urls(soup, base_url)
+    }
+
+
 def extract_title(soup: BeautifulSoup) -> str:
     """
     Extrae el título de la página
@@ -103,7 +140,7 @@ def count_images(soup: BeautifulSoup) -> int:
     css_images = 0
     for style in style_tags:
         css_content = style.string or ''
-        css_images += len(re.findall(r'url\(["\']?[^")\']+\.(jpg|jpeg|png|gif|webp|svg)', css_content, re.I))
+        css_images += len(CSS_IMAGE_PATTERN.findall(css_content))
     
     return img_tags + css_images
 
@@ -152,7 +189,7 @@ def extract_image_urls(soup: BeautifulSoup, base_url: str, limit: int = 10) -> L
         # Filtrar imágenes válidas
         if absolute_url.startswith(('http://', 'https://')) and absolute_url not in seen:
             # Filtrar por extensión de imagen común
-            if re.search(r'\.(jpg|jpeg|png|gif|webp)($|\?)', absolute_url, re.I):
+            if IMAGE_URL_PATTERN.search(absolute_url):
                 images.append(absolute_url)
                 seen.add(absolute_url)
                 
@@ -162,6 +199,29 @@ def extract_image_urls(soup: BeautifulSoup, base_url: str, limit: int = 10) -> L
     return images
 
 
+def extract_resource_urls(soup: BeautifulSoup, base_url: str) -> Dict[str, List[str]]:
+    """
+    Extrae las URLs de los recursos externos de la página, por tipo
+    
+    Usa los mismos criterios que processor.performance.count_resources, así
+    el servidor de procesamiento puede contar recursos sin volver a
+    descargar la página.
+    
+    Args:
+        soup: Objeto BeautifulSoup
+        base_url: URL base para resolver URLs relativas
+        
+    Returns:
+        Dict: Listas de URLs de images, scripts, stylesheets y other
+    """
+    return {
+        'images': [urljoin(base_url, tag['src']) for tag in soup.find_all('img', src=True)],
+        'scripts': [urljoin(base_url, tag['src']) for tag in soup.find_all('script', src=True)],
+        'stylesheets': [urljoin(base_url, tag.get('href', '')) for tag in soup.find_all('link', rel='stylesheet')],
+        'other': [urljoin(base_url, tag.get('src', '')) for tag in soup.find_all(['video', 'iframe'])]
+    }
+
+
 def get_text_content(soup: BeautifulSoup, max_length: int = 1000) -> str:
     """
     Extrae el texto visible de la página
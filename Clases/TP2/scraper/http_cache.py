@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Módulo de Caché HTTP
+Guarda las páginas descargadas por AsyncHTTPClient en un archivo SQLite
+junto con sus validadores (ETag, Last-Modified) y su frescura
+(Cache-Control max-age, Expires).
+
+Mientras una página está fresca se responde desde la caché sin tocar la
+red. Cuando vence se revalida con If-None-Match / If-Modified-Since: si el
+servidor responde 304 el cuerpo guardado se reutiliza y solo viajan los
+headers.
+
+Es una caché compartida entre todos los clientes del servidor: las
+respuestas private o no-store no se guardan. Los métodos que consultan la
+base son bloqueantes; AsyncHTTPClient los llama desde un hilo.
+"""
+
+import json
+import time
+import sqlite3
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+
+# Frescura máxima estimada para respuestas sin max-age ni Expires (solo Last-Modified)
+HEURISTIC_MAX_AGE = 24 * 3600
+
+# Headers que actualiza una respuesta 304
+REVALIDATION_HEADERS = ('etag', 'last-modified', 'cache-control', 'expires', 'date', 'age')
+
+
+def parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    """
+    Separa las directivas de un header Cache-Control
+
+    Args:
+        value: Valor del header (ej: 'public, max-age=60')
+
+    Returns:
+        Dict: Directiva en minúsculas -> valor (None si no tiene)
+    """
+    directives = {}
+    for part in (value or '').split(','):
+        name, sep, argument = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') if sep else None
+    return directives
+
+
+def _parse_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Dict[str, str], now: float = None) -> Optional[float]:
+    """
+    Segundos que una respuesta puede servirse sin revalidar
+
+    Sigue el orden de RFC 9111: max-age, Expires y, si solo hay
+    Last-Modified, el 10% del tiempo desde la última modificación (hasta
+    HEURISTIC_MAX_AGE). Se descuenta el header Age.
+
+    Args:
+        headers: Headers de la respuesta (claves en minúsculas)
+        now: Instante de referencia (default: ahora)
+
+    Returns:
+        float: Segundos de frescura (0 = revalidar siempre), o None si la
+        respuesta no debe guardarse (no-store o private: es de un solo usuario)
+    """
+    now = time.time() if now is None else now
+    directives = parse_cache_control(headers.get('cache-control'))
+    if 'no-store' in directives or 'private' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0.0
+
+    try:
+        age = max(0.0, float(headers.get('age', 0)))
+    except ValueError:
+        age = 0.0
+
+    if directives.get('max-age') is not None:
+        try:
+            return max(0.0, int(directives['max-age']) - age)
+        except ValueError:
+            return 0.0
+
+    date = _parse_date(headers.get('date')) or now
+    if 'expires' in headers:
+        expires = _parse_date(headers['expires'])
+        # Un Expires inválido (ej: "0") significa ya vencido
+        return max(0.0, expires - date - age) if expires is not None else 0.0
+
+    last_modified = _parse_date(headers.get('last-modified'))
+    if last_modified is not None:
+        return max(0.0, min((date - last_modified) / 10, HEURISTIC_MAX_AGE) - age)
+    return 0.0
+
+
+class HTTPCache:
+    """Caché HTTP persistente con revalidación condicional y desalojo LRU"""
+
+    def __init__(self, path: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Args:
+            path: Archivo SQLite (':memory:' para una caché solo en memoria)
+            max_bytes: Tamaño máximo total de los cuerpos almacenados
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.fresh_hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' url TEXT PRIMARY KEY,'
+            ' status INTEGER NOT NULL,'
+            ' headers TEXT NOT NULL,'
+            ' body BLOB NOT NULL,'
+            ' encoding TEXT,'
+            ' size INTEGER NOT NULL,'
+            ' fresh_until REAL NOT NULL,'
+            ' last_access REAL NOT NULL)'
+        )
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)')
+
+        # Entradas y tamaño total se llevan en memoria: guardar no recorre la tabla
+        self._entries, self._size = self._db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses'
+        ).fetchone()
+
+    def lookup(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Busca la respuesta guardada de una URL (fresca o no)
+
+        Args:
+            url: URL pedida
+
+        Returns:
+            Dict con status, headers, body, encoding y fresh (si puede
+            servirse sin revalidar), o None si no está
+        """
+        with self._lock:
+            row = self._db.execute(
+                'SELECT status, headers, body, encoding, fresh_until FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'status': row[0],
+            'headers': json.loads(row[1]),
+            'body': row[2],
+            'encoding': row[3],
+            'fresh': row[4] > time.time()
+        }
+
+    @staticmethod
+    def conditional_headers(entry: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Headers para revalidar una respuesta guardada
+
+        Args:
+            entry: Resultado de lookup
+
+        Returns:
+            Dict con If-None-Match y/o If-Modified-Since
+        """
+        headers = {}
+        if entry['headers'].get('etag'):
+            headers['If-None-Match'] = entry['headers']['etag']
+        if entry['headers'].get('last-modified'):
+            headers['If-Modified-Since'] = entry['headers']['last-modified']
+        return headers
+
+    def hit(self, url: str, entry: Dict[str, Any]):
+        """
+        Registra que una respuesta fresca se sirvió desde la caché
+
+        Args:
+            url: URL pedida
+            entry: Resultado de lookup
+        """
+        with self._lock:
+            self.fresh_hits += 1
+            self.bytes_saved += len(entry['body'])
+            self._db.execute('UPDATE responses SET last_access = ? WHERE url = ?', (time.time(), url))
+
+    def miss(self):
+        """Registra una petición que tuvo que descargar el cuerpo completo"""
+        with self._lock:
+            self.misses += 1
+
+    def refresh(self, url: str, entry: Dict[str, Any], headers: Dict[str, str]):
+        """
+        Actualiza una respuesta guardada tras un 304 Not Modified
+
+        Args:
+            url: URL pedida
+            entry: Resultado de lookup (se actualizan sus headers)
+            headers: Headers de la respuesta 304
+        """
+        headers = {name.lower(): value for name, value in headers.items()}
+        for name in REVALIDATION_HEADERS:
+            if name in headers:
+                entry['headers'][name] = headers[name]
+
+        now = time.time()
+        lifetime = freshness_lifetime(entry['headers'], now) or 0.0
+        with self._lock:
+            self.revalidated += 1
+            self.bytes_saved += len(entry['body'])
+            self._db.execute(
+                'UPDATE responses SET headers = ?, fresh_until = ?, last_access = ? WHERE url = ?',
+                (json.dumps(entry['headers']), now + lifetime, now, url)
+            )
+
+    def store(self, url: str, status: int, headers: Dict[str, str], body: bytes,
+              encoding: str = None) -> bool:
+        """
+        Guarda una respuesta si es cacheable
+
+        Solo se guardan respuestas 200 que permitan almacenarse y que tengan
+        frescura o algún validador (si no, no habría forma de reutilizarlas).
+
+        Args:
+            url: URL pedida
+            status: Status code
+            headers: Headers de la respuesta
+            body: Cuerpo crudo
+            encoding: Encoding con el que se decodificó el cuerpo
+
+        Returns:
+            bool: True si se guardó
+        """
+        headers = {name.lower(): value for name, value in headers.items()}
+        now = time.time()
+        lifetime = freshness_lifetime(headers, now)
+        if status != 200 or lifetime is None or headers.get('vary', '').strip() == '*':
+            return False
+        if not lifetime and not headers.get('etag') and not headers.get('last-modified'):
+            return False
+        if len(body) > self.max_bytes:
+            return False
+
+        with self._lock:
+            previous = self._db.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses'
+                ' (url, status, headers, body, encoding, size, fresh_until, last_access)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, status, json.dumps(headers), body, encoding, len(body), now + lifetime, now)
+            )
+            if previous is None:
+                self._entries += 1
+            self._size += len(body) - (previous[0] if previous else 0)
+            self.stores += 1
+            self._evict()
+        return True
+
+    def _evict(self):
+        """Borra las respuestas menos usadas si se supera el tamaño máximo"""
+        if self._size <= self.max_bytes:
+            return
+
+        excess = self._size - self.max_bytes
+        victims = []
+        for url, size in self._db.execute('SELECT url, size FROM responses ORDER BY last_access'):
+            victims.append((url,))
+            excess -= size
+            self._size -= size
+            if excess <= 0:
+                break
+        self._db.executemany('DELETE FROM responses WHERE url = ?', victims)
+        self._entries -= len(victims)
+        self.evictions += len(victims)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Contadores de la caché
+
+        Returns:
+            Dict: respuestas frescas, revalidadas (304) y descargadas, hit
+            ratio, bytes que no hubo que descargar, entradas y tamaño
+        """
+        with self._lock:
+            entries, size = self._entries, self._size
+        requests = self.fresh_hits + self.revalidated + self.misses
+        return {
+            'fresh_hits': self.fresh_hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'hit_ratio': round((self.fresh_hits + self.revalidated) / requests, 3) if requests else 0.0,
+            'bytes_saved': self.bytes_saved,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'entries': entries,
+            'size_bytes': size
+        }
+
+    def close(self):
+        """Cierra la conexión con la base"""
+        with self._lock:
+            self._db.close()
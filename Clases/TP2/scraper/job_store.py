@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Módulo de Trabajos (jobs)
+Guarda el estado y los resultados de los scrapes que corren en segundo
+plano (POST /jobs). Cada trabajo se consulta por su ID mientras avanza:
+los datos del scraping quedan disponibles apenas se parsea la página y
+cada resultado del servidor B a medida que llega.
+
+Los trabajos terminados vencen después de un tiempo (ttl); los que siguen
+en curso no vencen.
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+# Estados de un trabajo, en orden
+JOB_PENDING = 'pending'
+JOB_SCRAPING = 'scraping'
+JOB_PROCESSING = 'processing'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+
+FINISHED_STATES = (JOB_DONE, JOB_FAILED)
+
+
+class JobStore:
+    """Estado de trabajos en memoria, con vencimiento de los terminados"""
+
+    def __init__(self, ttl: float = 600, max_jobs: int = 1000):
+        """
+        Args:
+            ttl: Segundos que se conserva un trabajo terminado
+            max_jobs: Trabajos máximos guardados (en curso + terminados)
+        """
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self._jobs: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.created = 0
+        self.expired = 0
+
+    def create(self, url: str, options: Dict[str, Any] = None) -> Dict[str, Any]:
+        """
+        Registra un trabajo nuevo en estado pending
+
+        Si se llegó a max_jobs se descartan los terminados más antiguos.
+
+        Args:
+            url: URL a scrapear
+            options: Opciones del scraping (ej: thumbnails)
+
+        Returns:
+            Dict: El trabajo creado
+
+        Raises:
+            RuntimeError: Si todos los trabajos guardados siguen en curso
+        """
+        self.purge()
+        if len(self._jobs) >= self.max_jobs:
+            for job_id in [job_id for job_id, job in self._jobs.items() if job['status'] in FINISHED_STATES]:
+                del self._jobs[job_id]
+                if len(self._jobs) < self.max_jobs:
+                    break
+        if len(self._jobs) >= self.max_jobs:
+            raise RuntimeError(f'Hay {self.max_jobs} trabajos en curso')
+
+        now = time.time()
+        job = {
+            'id': uuid.uuid4().hex,
+            'url': url,
+            'options': options or {},
+            'status': JOB_PENDING,
+            'created_at': now,
+            'updated_at': now,
+            'finished_at': None,
+            'scraping_data': None,
+            'processing_data': {},
+            'pending': [],
+            'errors': {},
+            'error': None
+        }
+        self._jobs[job['id']] = job
+        self.created += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Devuelve un trabajo (o None si no existe o ya venció)
+
+        Args:
+            job_id: ID del trabajo
+
+        Returns:
+            Dict: Copia del estado del trabajo
+        """
+        self.purge()
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+        return dict(job, processing_data=dict(job['processing_data']), pending=list(job['pending']),
+                    errors=dict(job['errors']))
+
+    def update(self, job_id: str, **fields):
+        """
+        Actualiza campos de un trabajo (los vencidos se ignoran)
+
+        Pasar a done o failed marca el momento desde el que corre el ttl.
+
+        Args:
+            job_id: ID del trabajo
+            **fields: Campos a reemplazar
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job.update(fields)
+        job['updated_at'] = time.time()
+        if fields.get('status') in FINISHED_STATES:
+            job['finished_at'] = job['updated_at']
+
+    def set_component(self, job_id: str, name: str, value: Any, error: str = None):
+        """
+        Guarda un resultado del servidor B y lo quita de los pendientes
+
+        Args:
+            job_id: ID del trabajo
+            name: Componente (screenshot, performance, thumbnails...)
+            value: Resultado
+            error: Por qué el componente no llegó (ej: plazo excedido)
+        """
+        job = self._jobs.get(job_id)
+        if job is None:
+            return
+        job['processing_data'][name] = value
+        if error:
+            job['errors'][name] = error
+        if name in job['pending']:
+            job['pending'].remove(name)
+        job['updated_at'] = time.time()
+
+    def purge(self) -> int:
+        """
+        Elimina los trabajos terminados hace más de ttl segundos
+
+        Returns:
+            int: Trabajos eliminados
+        """
+        limit = time.time() - self.ttl
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished_at'] is not None and job['finished_at'] < limit]
+        for job_id in expired:
+            del self._jobs[job_id]
+        self.expired += len(expired)
+        return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        """Trabajos guardados por estado y contadores"""
+        counts = {state: 0 for state in (JOB_PENDING, JOB_SCRAPING, JOB_PROCESSING, JOB_DONE, JOB_FAILED)}
+        for job in self._jobs.values():
+            counts[job['status']] += 1
+        return dict(counts, stored=len(self._jobs), created=self.created, expired=self.expired)
@@ -8,6 +8,10 @@ from bs4 import BeautifulSoup
 from typing import Dict, Any
 
 
+# Meta tags básicos que se extraen (en este orden)
+BASIC_META_NAMES = ['description', 'keywords', 'author', 'viewport', 'robots', 'generator']
+
+
 def extract_metadata(html_content: str) -> Dict[str, Any]:
     """
     Extrae todos los metadatos relevantes de la página
@@ -19,7 +23,19 @@ def extract_metadata(html_content: str) -> Dict[str, Any]:
         Dict con todos los metadatos extraídos
     """
     soup = BeautifulSoup(html_content, 'lxml')
+    return extract_metadata_from_soup(soup)
+
+
+def extract_metadata_from_soup(soup: BeautifulSoup) -> Dict[str, Any]:
+    """
+    Extrae los metadatos de un documento ya parseado
     
+    Args:
+        soup: Objeto BeautifulSoup
+        
+    Returns:
+        Dict con todos los metadatos extraídos
+    """
     metadata = {}
     
     # Meta tags básicos
@@ -47,9 +63,7 @@ def extract_basic_meta_tags(soup: BeautifulSoup) -> Dict[str, str]:
     basic_meta = {}
     
     # Meta tags comunes
-    meta_names = ['description', 'keywords', 'author', 'viewport', 'robots', 'generator']
-    
-    for name in meta_names:
+    for name in BASIC_META_NAMES:
         meta_tag = soup.find('meta', attrs={'name': name})
         if meta_tag and meta_tag.get('content'):
             basic_meta[name] = meta_tag.get('content')
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Módulo de Ejecución del Parseo
+Elige dónde corre el parseo HTML (CPU-bound) del servidor de scraping.
+
+- thread: pool de hilos (no bloquea el event loop, pero el parseo es Python
+  puro y comparte el GIL, así que con carga concurrente se serializa)
+- process: pool de procesos (paralelismo real; el HTML y el resultado viajan
+  serializados entre procesos)
+- inline: en el propio event loop (sin overhead, útil para depurar o con
+  páginas chicas)
+"""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+EXECUTOR_KINDS = ('thread', 'process', 'inline')
+
+WARMUP_HTML = (
+    '<html><head><title>warm</title><meta name="description" content="x"></head>'
+    '<body><h1>x</h1><a href="/a">a</a><img src="/a.png"></body></html>'
+)
+
+
+def warm_parser():
+    """
+    Importa bs4/lxml y parsea un documento chico
+
+    Se usa como initializer de los workers para que la primera petición real
+    no pague las importaciones ni la inicialización del parser.
+    """
+    from .html_parser import parse_page
+    parse_page(WARMUP_HTML, 'http://localhost/')
+
+
+class ParseExecutor:
+    """Ejecuta funciones de parseo en hilos, procesos o en línea"""
+
+    def __init__(self, kind: str = 'thread', workers: int = 4):
+        """
+        Args:
+            kind: 'thread', 'process' o 'inline'
+            workers: Cantidad de hilos o procesos
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Ejecutor desconocido: {kind} (opciones: {', '.join(EXECUTOR_KINDS)})")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.executor: Optional[Executor] = None
+
+    async def start(self):
+        """Crea el pool y precalienta todos sus workers"""
+        if self.kind == 'thread':
+            self.executor = ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix='parser',
+                initializer=warm_parser
+            )
+        elif self.kind == 'process':
+            # forkserver/spawn: no se hace fork de un proceso con el event loop y sus hilos
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=warm_parser
+            )
+        else:
+            warm_parser()
+            return
+
+        # Los pools crean sus workers a demanda: forzar que arranquen todos ahora
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(
+            loop.run_in_executor(self.executor, _noop) for _ in range(self.workers)
+        ))
+
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        Ejecuta func(*args) con el backend configurado
+
+        Args:
+            func: Función a ejecutar (para 'process' debe poder serializarse)
+            *args: Argumentos de la función
+
+        Returns:
+            Any: Resultado de la función
+        """
+        if self.executor is None:
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    async def run_local(self, func: Callable, *args) -> Any:
+        """
+        Ejecuta func(*args) sobre estado de este proceso sin bloquear el event loop
+
+        Sirve para objetos que no pueden viajar a otro proceso, como un
+        parser incremental: con 'thread' corre en el pool de hilos, con
+        'process' en el pool de hilos por defecto del loop y con 'inline' en
+        el propio loop.
+
+        Args:
+            func: Función a ejecutar
+            *args: Argumentos de la función
+
+        Returns:
+            Any: Resultado de la función
+        """
+        if self.executor is None:
+            return func(*args)
+        loop = asyncio.get_running_loop()
+        executor = self.executor if self.kind == 'thread' else None
+        return await loop.run_in_executor(executor, func, *args)
+
+    def info(self) -> Dict[str, Any]:
+        """Configuración del ejecutor (para /health)"""
+        return {'kind': self.kind, 'workers': self.workers if self.kind != 'inline' else 0}
+
+    async def close(self):
+        """Detiene el pool esperando las tareas en curso"""
+        if self.executor is not None:
+            executor, self.executor = self.executor, None
+            await asyncio.to_thread(executor.shutdown, True)
+
+
+def _noop():
+    return None
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Módulo de Single-Flight
+Agrupa operaciones asíncronas idénticas que están en curso al mismo tiempo.
+
+Si llegan 50 peticiones por la misma URL mientras la primera todavía se está
+procesando, solo la primera ejecuta el trabajo; las demás esperan el mismo
+resultado (o la misma excepción).
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class AsyncSingleFlight:
+    """Deduplicación de operaciones asíncronas en curso por clave"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Ejecuta func una sola vez por clave mientras haya una ejecución en curso
+        
+        La operación corre en su propia tarea: si uno de los que esperan se
+        cancela (ej: el cliente HTTP cortó), el resto sigue esperando.
+        
+        Args:
+            key: Clave que identifica la operación (ej: URL normalizada)
+            func: Función sin argumentos que devuelve la corrutina a ejecutar
+            
+        Returns:
+            Any: Resultado de la operación compartida
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            self.executed += 1
+        else:
+            self.coalesced += 1
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        """Cantidad de operaciones en curso"""
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de ejecuciones reales y peticiones agrupadas"""
+        return {
+            'in_flight': len(self._calls),
+            'executed': self.executed,
+            'coalesced': self.coalesced
+        }
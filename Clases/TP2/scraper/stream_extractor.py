@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Módulo de Extracción HTML en Streaming
+Extrae los datos de una página en una sola pasada, a medida que llegan los
+chunks de la respuesta, usando los eventos del parser incremental de lxml.
+
+A diferencia de parse_page (BeautifulSoup), no se construye el árbol
+completo: cada elemento se procesa al cerrarse y después se descarta, así
+la memoria queda acotada aunque la página pese varios megabytes. El
+resultado tiene el mismo formato que parse_page.
+"""
+
+import json
+from urllib.parse import urljoin
+from typing import Any, Dict, List, Optional
+
+from lxml import etree
+
+from .html_parser import CSS_IMAGE_PATTERN, IMAGE_URL_PATTERN
+from .metadata_extractor import BASIC_META_NAMES
+
+
+HEADERS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+
+# Elementos cuyo texto se necesita: sus hijos no se descartan hasta cerrarlos
+TEXT_TAGS = ('title', 'style', 'script') + HEADERS
+
+# Bytes sin ningún '>' a partir de los cuales se alimenta el parser igual
+MAX_PENDING = 256 * 1024
+
+
+class StreamingHTMLExtractor:
+    """Extractor de datos HTML de una sola pasada con memoria acotada"""
+
+    def __init__(self, base_url: str, link_limit: int = 100, image_limit: int = 5,
+                 stop_early: bool = False, encoding: Optional[str] = None):
+        """
+        Args:
+            base_url: URL base para resolver enlaces relativos
+            link_limit: Número máximo de enlaces a extraer
+            image_limit: Número máximo de URLs de imágenes a extraer
+            stop_early: Dar la extracción por terminada cuando se cerró el
+                        <head> y se alcanzaron los límites de enlaces e
+                        imágenes (los conteos quedan parciales)
+            encoding: Codificación de la respuesta si se conoce (header
+                      Content-Type); si no, lxml la detecta
+        """
+        self.base_url = base_url
+        self.link_limit = link_limit
+        self.image_limit = image_limit
+        self.stop_early = stop_early
+        self.encoding = encoding
+        self.bytes_fed = 0
+        self.truncated = False
+
+        self._parser = None
+        self._pending = b''
+        self._capture = 0
+        self._head_closed = False
+
+        self._title = None
+        self._first_h1 = None
+        self._links: List[str] = []
+        self._seen_links = set()
+        self._image_urls: List[str] = []
+        self._seen_images = set()
+        self._img_tags = 0
+        self._css_images = 0
+        self._structure = {tag: 0 for tag in HEADERS}
+        self._basic_meta: Dict[str, Optional[str]] = {}
+        self._charset = None
+        self._og: Dict[str, str] = {}
+        self._twitter: Dict[str, str] = {}
+        self._json_ld: List[Any] = []
+        self._resources: Dict[str, List[str]] = {
+            'images': [], 'scripts': [], 'stylesheets': [], 'other': []
+        }
+
+    @property
+    def done(self) -> bool:
+        """Indica si ya no hace falta seguir leyendo la respuesta"""
+        if self.truncated:
+            return True
+        return (
+            self.stop_early
+            and self._head_closed
+            and len(self._links) >= self.link_limit
+            and len(self._image_urls) >= self.image_limit
+        )
+
+    def feed(self, chunk: bytes) -> bool:
+        """
+        Procesa un chunk de la respuesta
+
+        Args:
+            chunk: Bytes recibidos
+
+        Returns:
+            bool: True si la extracción ya terminó y se puede dejar de leer
+        """
+        if self.truncated:
+            return True
+        if self._parser is None:
+            self._parser = etree.HTMLPullParser(
+                events=('start', 'end'), encoding=self.encoding, recover=True
+            )
+
+        self.bytes_fed += len(chunk)
+
+        # El parser incremental de libxml2 (2.10) deja de emitir eventos si un
+        # atributo entre comillas queda cortado entre dos feed(): se le pasa
+        # solo hasta el último '>' y el resto se guarda para el próximo chunk
+        data = self._pending + chunk
+        cut = data.rfind(b'>') + 1
+        if not cut and len(data) < MAX_PENDING:
+            self._pending = data
+            return False
+        if not cut:
+            cut = len(data)
+        self._pending = data[cut:]
+
+        self._parser.feed(data[:cut])
+        self._process_events()
+
+        if self.done:
+            self.truncated = True
+        return self.truncated
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Termina el parseo y devuelve los datos extraídos
+
+        Returns:
+            Dict con el mismo formato que parse_page
+        """
+        if self._parser is not None and not self.truncated:
+            try:
+                if self._pending:
+                    self._parser.feed(self._pending)
+                    self._pending = b''
+                self._parser.close()
+            except etree.XMLSyntaxError:
+                # Documento vacío o sin elementos
+                pass
+            self._process_events()
+        self._parser = None
+        return self.result()
+
+    def result(self) -> Dict[str, Any]:
+        """Datos extraídos hasta el momento"""
+        meta_tags = {}
+        for name in BASIC_META_NAMES:
+            if self._basic_meta.get(name):
+                meta_tags[name] = self._basic_meta[name]
+        if self._charset is not None:
+            meta_tags['charset'] = self._charset
+        meta_tags.update(self._og)
+        meta_tags.update(self._twitter)
+
+        return {
+            'title': self._title if self._title is not None else (self._first_h1 or ''),
+            'links': list(self._links),
+            'images_count': self._img_tags + self._css_images,
+            'structure': dict(self._structure),
+            'meta_tags': meta_tags,
+            'structured_data': list(self._json_ld),
+            'image_urls': list(self._image_urls),
+            'resources': {kind: list(urls) for kind, urls in self._resources.items()}
+        }
+
+    def _process_events(self):
+        for event, elem in self._parser.read_events():
+            tag = elem.tag
+            if not isinstance(tag, str):
+                # Comentarios e instrucciones de procesamiento
+                continue
+
+            if event == 'start':
+                if tag in TEXT_TAGS:
+                    self._capture += 1
+                self._on_start(tag, elem)
+                continue
+
+            if tag in TEXT_TAGS:
+                self._capture -= 1
+                self._on_text_end(tag, elem)
+            elif tag == 'head':
+                self._head_closed = True
+
+            # Descartar lo ya procesado (salvo dentro de elementos cuyo texto se necesita)
+            if self._capture == 0:
+                elem.clear(keep_tail=True)
+                parent = elem.getparent()
+                if parent is not None:
+                    while elem.getprevious() is not None:
+                        del parent[0]
+
+    def _on_start(self, tag: str, elem):
+        """Procesa los atributos de un elemento (disponibles al abrirse)"""
+        if tag == 'a':
+            href = elem.get('href')
+            if href is not None and len(self._links) < self.link_limit:
+                url = urljoin(self.base_url, href)
+                if url.startswith(('http://', 'https://')) and url not in self._seen_links:
+                    self._links.append(url)
+                    self._seen_links.add(url)
+
+        elif tag == 'img':
+            self._img_tags += 1
+            src = elem.get('src')
+            if src is not None:
+                url = urljoin(self.base_url, src)
+                self._resources['images'].append(url)
+                if (len(self._image_urls) < self.image_limit
+                        and url.startswith(('http://', 'https://'))
+                        and url not in self._seen_images
+                        and IMAGE_URL_PATTERN.search(url)):
+                    self._image_urls.append(url)
+                    self._seen_images.add(url)
+
+        elif tag == 'script':
+            src = elem.get('src')
+            if src is not None:
+                self._resources['scripts'].append(urljoin(self.base_url, src))
+
+        elif tag == 'link':
+            if 'stylesheet' in (elem.get('rel') or '').split():
+                self._resources['stylesheets'].append(urljoin(self.base_url, elem.get('href', '')))
+
+        elif tag in ('video', 'iframe'):
+            self._resources['other'].append(urljoin(self.base_url, elem.get('src', '')))
+
+        elif tag == 'meta':
+            self._on_meta(elem)
+
+        elif tag in self._structure:
+            self._structure[tag] += 1
+
+    def _on_meta(self, elem):
+        name = elem.get('name')
+        content = elem.get('content')
+
+        if name in BASIC_META_NAMES and name not in self._basic_meta:
+            self._basic_meta[name] = content
+        if self._charset is None and elem.get('charset') is not None:
+            self._charset = elem.get('charset')
+
+        prop = elem.get('property')
+        if prop and prop.startswith('og:') and content:
+            self._og[prop] = content
+        if name and name.startswith('twitter:') and content:
+            self._twitter[name] = content
+
+    def _on_text_end(self, tag: str, elem):
+        """Procesa el texto de un elemento al cerrarse"""
+        if tag == 'title':
+            if self._title is None:
+                self._title = ''.join(text.strip() for text in elem.itertext())
+
+        elif tag == 'h1':
+            if self._first_h1 is None:
+                self._first_h1 = ''.join(text.strip() for text in elem.itertext())
+
+        elif tag == 'style':
+            self._css_images += len(CSS_IMAGE_PATTERN.findall(elem.text or ''))
+
+        elif tag == 'script' and elem.get('type') == 'application/ld+json':
+            try:
+                if elem.text:
+                    self._json_ld.append(json.loads(elem.text))
+            except json.JSONDecodeError:
+                pass
+
+
+def extract_stream(chunks, base_url: str, image_limit: int = 5, **kwargs) -> Dict[str, Any]:
+    """
+    Extrae los datos de una página a partir de un iterable de chunks
+
+    Args:
+        chunks: Iterable de bytes (ej: archivo leído por partes)
+        base_url: URL base para resolver enlaces relativos
+        image_limit: Número máximo de URLs de imágenes a extraer
+        **kwargs: Opciones adicionales de StreamingHTMLExtractor
+
+    Returns:
+        Dict con el mismo formato que parse_page
+    """
+    extractor = StreamingHTMLExtractor(base_url, image_limit=image_limit, **kwargs)
+    for chunk in chunks:
+        if extractor.feed(chunk):
+            break
+    return extractor.close()
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+Módulo de Conjuntos de URLs
+Estructuras compactas para recordar qué URLs ya se vieron en un crawl
+grande, sin guardar millones de strings en memoria (un str de URL en un
+set de Python ocupa más de 100 bytes):
+
+- BloomFilter: bits en memoria, ~1.8 bytes por URL con 0.1% de falsos
+  positivos; la capacidad se fija al crearlo.
+- ScalableBloomFilter: cadena de BloomFilter que crece a medida que se
+  agregan URLs manteniendo acotada la tasa total de falsos positivos.
+- FingerprintSet: huellas de 64 bits (blake2b de la URL) en una tabla hash
+  sobre un archivo mapeado en memoria (mmap). Sin falsos positivos en la
+  práctica (colisión ~ n² / 2^65) y las páginas que no se usan las puede
+  desalojar el sistema operativo.
+- DiskFrontier: cola de URLs en un archivo mapeado en memoria (mmap) con
+  un FingerprintSet para descartar las repetidas. Es la frontera de
+  Crawler: sus colas por dominio guardan solo offsets al archivo.
+
+Todas las estructuras de pertenencia exponen add(url) -> bool (True si era
+nueva), `url in conjunto` y len().
+"""
+
+import os
+import math
+import mmap
+import hashlib
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+
+# Encabezado de un archivo de FingerprintSet: magic y cantidad de huellas
+FINGERPRINT_MAGIC = int.from_bytes(b'URLFP001', 'little')
+FINGERPRINT_HEADER_SLOTS = 2
+
+# Ocupación máxima de la tabla antes de duplicarla
+FINGERPRINT_MAX_LOAD = 0.7
+
+# Tamaño inicial del archivo de la cola de DiskFrontier (se duplica al llenarse)
+FRONTIER_INITIAL_BYTES = 64 * 1024
+
+
+def url_fingerprint(url: str) -> int:
+    """
+    Huella de 64 bits de una URL (0 se reserva para "vacío")
+
+    Args:
+        url: URL (normalizarla antes si variantes equivalentes deben coincidir)
+
+    Returns:
+        int: Entero de 64 bits distinto de 0
+    """
+    digest = hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little') or 1
+
+
+def bloom_hash(item: str) -> Tuple[int, int]:
+    """
+    Los dos hashes de 64 bits de los que salen las posiciones de un Bloom
+
+    Doble hashing (Kirsch-Mitzenmacher): la posición i es h1 + i * h2, así
+    un único digest sirve para todos los hashes y para todos los filtros de
+    un ScalableBloomFilter.
+
+    Args:
+        item: Elemento
+
+    Returns:
+        Tuple: (h1, h2) con h2 impar
+    """
+    digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class BloomFilter:
+    """Filtro de Bloom sobre strings: pertenencia aproximada con memoria fija"""
+
+    def __init__(self, capacity: int = 100_000, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: Elementos previstos
+            error_rate: Probabilidad de falso positivo con `capacity` elementos
+        """
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def add_hashed(self, hashed: Tuple[int, int]) -> bool:
+        """add() con el hash ya calculado (ver bloom_hash)"""
+        first, second = hashed
+        size, bits = self.size, self.bits
+        added = False
+        for i in range(self.hashes):
+            position = (first + i * second) % size
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def contains_hashed(self, hashed: Tuple[int, int]) -> bool:
+        """Pertenencia con el hash ya calculado (ver bloom_hash)"""
+        first, second = hashed
+        size, bits = self.size, self.bits
+        for i in range(self.hashes):
+            position = (first + i * second) % size
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def add(self, item: str) -> bool:
+        """
+        Agrega un elemento
+
+        Returns:
+            bool: True si no estaba (o False si era un falso positivo)
+        """
+        return self.add_hashed(bloom_hash(item))
+
+    def __contains__(self, item: str) -> bool:
+        return self.contains_hashed(bloom_hash(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def memory_bytes(self) -> int:
+        """Bytes ocupados por los bits"""
+        return len(self.bits)
+
+
+class ScalableBloomFilter:
+    """Filtro de Bloom que crece sin fijar la capacidad de antemano"""
+
+    def __init__(self, initial_capacity: int = 100_000, error_rate: float = 0.001,
+                 growth: int = 2, tightening: float = 0.5):
+        """
+        Cuando el filtro actual llega a su capacidad se agrega otro `growth`
+        veces más grande y con una tasa de error `tightening` veces menor,
+        así la tasa total queda acotada por error_rate / (1 - tightening).
+
+        Args:
+            initial_capacity: Capacidad del primer filtro
+            error_rate: Tasa de falsos positivos del primer filtro
+            growth: Factor de crecimiento de la capacidad
+            tightening: Factor de reducción de la tasa de error
+        """
+        if growth < 1 or not 0 < tightening < 1:
+            raise ValueError("growth debe ser al menos 1 y tightening estar entre 0 y 1")
+        self.error_rate = error_rate
+        self.growth = growth
+        self.tightening = tightening
+        self.filters = [BloomFilter(initial_capacity, error_rate)]
+
+    def add(self, item: str) -> bool:
+        """
+        Agrega un elemento
+
+        Returns:
+            bool: True si no estaba (o False si era un falso positivo)
+        """
+        hashed = bloom_hash(item)
+        if self._contains(hashed):
+            return False
+        current = self.filters[-1]
+        if current.count >= current.capacity:
+            current = BloomFilter(current.capacity * self.growth, current.error_rate * self.tightening)
+            self.filters.append(current)
+        current.add_hashed(hashed)
+        return True
+
+    def _contains(self, hashed: Tuple[int, int]) -> bool:
+        # El filtro más nuevo (el más grande) primero
+        return any(bloom.contains_hashed(hashed) for bloom in reversed(self.filters))
+
+    def __contains__(self, item: str) -> bool:
+        return self._contains(bloom_hash(item))
+
+    def __len__(self) -> int:
+        return sum(bloom.count for bloom in self.filters)
+
+    def memory_bytes(self) -> int:
+        """Bytes ocupados por los bits de todos los filtros"""
+        return sum(bloom.memory_bytes() for bloom in self.filters)
+
+
+class FingerprintSet:
+    """Conjunto de huellas de 64 bits en una tabla hash mapeada en memoria"""
+
+    def __init__(self, path: Optional[str] = None, capacity: int = 1 << 16):
+        """
+        Args:
+            path: Archivo de la tabla (None = memoria anónima). Si el archivo
+                  ya existe se reutiliza su contenido
+            capacity: Huecos iniciales de la tabla (se redondea a potencia de 2)
+        """
+        self.path = path
+        self._file = None
+        self._map = None
+        self._slots = None
+        self.resizes = 0
+
+        if path and os.path.exists(path) and os.path.getsize(path) > FINGERPRINT_HEADER_SLOTS * 8:
+            self._open(path, os.path.getsize(path) // 8 - FINGERPRINT_HEADER_SLOTS, create=False)
+            if self._slots[0] != FINGERPRINT_MAGIC:
+                self.close()
+                raise ValueError(f"{path} no es un archivo de huellas de URLs")
+        else:
+            self._open(path, 1 << max(3, (capacity - 1).bit_length()), create=True)
+
+    def _open(self, path: Optional[str], capacity: int, create: bool):
+        size = (capacity + FINGERPRINT_HEADER_SLOTS) * 8
+        if path:
+            self._file = open(path, 'w+b' if create else 'r+b')
+            if create:
+                self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+        else:
+            self._map = mmap.mmap(-1, size)
+        # Acceso a los huecos como enteros de 64 bits (orden de bytes nativo)
+        self._slots = memoryview(self._map).cast('Q')
+        self.capacity = capacity
+        self._mask = capacity - 1
+        if create:
+            self._slots[0] = FINGERPRINT_MAGIC
+            self._slots[1] = 0
+
+    def _grow(self):
+        """Duplica la tabla y reinserta las huellas (sin copiarlas a memoria)"""
+        old_slots, old_map, old_file = self._slots, self._map, self._file
+        grow_path = f'{self.path}.grow' if self.path else None
+        self._open(grow_path, self.capacity * 2, create=True)
+
+        slots, mask = self._slots, self._mask
+        for fp in old_slots[FINGERPRINT_HEADER_SLOTS:]:
+            if fp:
+                slot = fp & mask
+                while slots[FINGERPRINT_HEADER_SLOTS + slot]:
+                    slot = (slot + 1) & mask
+                slots[FINGERPRINT_HEADER_SLOTS + slot] = fp
+        slots[1] = old_slots[1]
+
+        old_slots.release()
+        old_map.close()
+        if old_file:
+            old_file.close()
+            # El archivo nuevo sigue abierto y mapeado con su nombre definitivo
+            os.replace(grow_path, self.path)
+        self.resizes += 1
+
+    def add_fingerprint(self, fp: int) -> bool:
+        """
+        Agrega una huella (ver url_fingerprint)
+
+        Returns:
+            bool: True si no estaba
+        """
+        if (self._slots[1] + 1) > self.capacity * FINGERPRINT_MAX_LOAD:
+            self._grow()
+        slots, mask = self._slots, self._mask
+        slot = fp & mask
+        while True:
+            current = slots[FINGERPRINT_HEADER_SLOTS + slot]
+            if current == fp:
+                return False
+            if not current:
+                slots[FINGERPRINT_HEADER_SLOTS + slot] = fp
+                slots[1] += 1
+                return True
+            slot = (slot + 1) & mask
+
+    def contains_fingerprint(self, fp: int) -> bool:
+        """Indica si la huella está en el conjunto"""
+        slots, mask = self._slots, self._mask
+        slot = fp & mask
+        while True:
+            current = slots[FINGERPRINT_HEADER_SLOTS + slot]
+            if current == fp:
+                return True
+            if not current:
+                return False
+            slot = (slot + 1) & mask
+
+    def add(self, url: str) -> bool:
+        """
+        Agrega una URL
+
+        Returns:
+            bool: True si no estaba
+        """
+        return self.add_fingerprint(url_fingerprint(url))
+
+    def __contains__(self, url: str) -> bool:
+        return self.contains_fingerprint(url_fingerprint(url))
+
+    def __len__(self) -> int:
+        return self._slots[1]
+
+    def memory_bytes(self) -> int:
+        """Bytes de la tabla (mapeada; no necesariamente residentes)"""
+        return (self.capacity + FINGERPRINT_HEADER_SLOTS) * 8
+
+    def flush(self):
+        """Escribe los cambios al archivo"""
+        self._map.flush()
+
+    def close(self):
+        """Libera la tabla (y escribe el archivo si lo hay)"""
+        if self._map is not None:
+            self._slots.release()
+            if self._file:
+                self._map.flush()
+                self._file.close()
+            self._map.close()
+            self._slots = self._map = self._file = None
+
+
+class DiskFrontier:
+    """Cola de URLs en un archivo mapeado en memoria, sin repetidas"""
+
+    def __init__(self, directory: Optional[str] = None, capacity: int = 1 << 16):
+        """
+        La cola y las huellas se crean vacías (no se retoma un crawl anterior).
+
+        Args:
+            directory: Directorio de los archivos (None = archivo temporal y
+                       huellas en memoria anónima)
+            capacity: Capacidad inicial de la tabla de huellas
+        """
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            seen_path = os.path.join(directory, 'seen.fp')
+            if os.path.exists(seen_path):
+                os.remove(seen_path)
+            self._file = open(os.path.join(directory, 'frontier.queue'), 'w+b')
+        else:
+            seen_path = None
+            self._file = tempfile.TemporaryFile()
+        self.seen = FingerprintSet(seen_path, capacity)
+        self._map = None
+        self._map_file(FRONTIER_INITIAL_BYTES)
+        self._read_offset = 0
+        self._write_offset = 0
+        self.pushed = 0
+        self.popped = 0
+
+    def _map_file(self, size: int):
+        if self._map is not None:
+            self._map.close()
+        self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size)
+
+    def append(self, url: str, depth: int = 0) -> int:
+        """
+        Escribe una URL en la cola sin consultar las huellas
+
+        Para colas propias sobre el mismo archivo (ej: una por dominio en
+        Crawler): se guarda el offset y se lee con read().
+
+        Args:
+            url: URL (normalizada)
+            depth: Profundidad que se devuelve junto con la URL
+
+        Returns:
+            int: Offset del registro
+        """
+        record = f'{depth}\t{url}\n'.encode('utf-8')
+        offset = self._write_offset
+        end = offset + len(record)
+        if end > len(self._map):
+            size = len(self._map)
+            while size < end:
+                size *= 2
+            self._map_file(size)
+        self._map[offset:end] = record
+        self._write_offset = end
+        self.pushed += 1
+        return offset
+
+    def read(self, offset: int) -> Tuple[str, int]:
+        """
+        Lee (y consume) el registro escrito por append() en un offset
+
+        Cuando no quedan registros sin leer el archivo vuelve a su tamaño
+        inicial: los offsets anteriores dejan de valer.
+
+        Args:
+            offset: Offset devuelto por append()
+
+        Returns:
+            Tuple (url, profundidad)
+        """
+        end = self._map.find(b'\n', offset, self._write_offset)
+        if end < 0:
+            raise ValueError(f"Offset inválido en la frontera: {offset}")
+        depth, _, url = self._map[offset:end].decode('utf-8').partition('\t')
+        self.popped += 1
+        if self.popped == self.pushed:
+            # Cola vacía: se recupera el espacio en disco (las huellas quedan)
+            self._read_offset = self._write_offset = 0
+            if len(self._map) > FRONTIER_INITIAL_BYTES:
+                self._map_file(FRONTIER_INITIAL_BYTES)
+        return url, int(depth)
+
+    def push(self, url: str, depth: int = 0) -> bool:
+        """
+        Encola una URL si nunca se encoló antes
+
+        Args:
+            url: URL (normalizada)
+            depth: Profundidad que se devuelve junto con la URL
+
+        Returns:
+            bool: True si se encoló
+        """
+        if not self.seen.add(url):
+            return False
+        self.append(url, depth)
+        return True
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """
+        Desencola la URL más antigua (no mezclar con read())
+
+        Returns:
+            Tuple (url, profundidad), o None si la cola está vacía
+        """
+        if self.popped == self.pushed:
+            return None
+        offset = self._read_offset
+        self._read_offset = self._map.find(b'\n', offset, self._write_offset) + 1
+        return self.read(offset)
+
+    def __len__(self) -> int:
+        return self.pushed - self.popped
+
+    def stats(self) -> Dict[str, Any]:
+        """URLs pendientes, vistas y tamaño en disco"""
+        return {
+            'pending': len(self),
+            'seen': len(self.seen),
+            'queue_bytes': self._write_offset - self._read_offset,
+            'fingerprint_bytes': self.seen.memory_bytes()
+        }
+
+    def close(self):
+        """Cierra los archivos"""
+        self.seen.close()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._file.close()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Módulo de Utilidades de URL
+Normaliza URLs para que variantes equivalentes compartan la misma clave
+"""
+
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Normaliza una URL
+    
+    Pasa esquema y host a minúsculas, quita el puerto por defecto y el
+    fragmento (#...), usa '/' como path vacío y ordena los parámetros del
+    query string.
+    
+    Args:
+        url: URL a normalizar
+        
+    Returns:
+        str: URL normalizada (o la original si no se puede interpretar)
+    """
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if ':' in host:
+        host = f'[{host}]'
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{port}'
+    if parts.username:
+        userinfo = parts.username + (f':{parts.password}' if parts.password else '')
+        host = f'{userinfo}@{host}'
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or '/', query, ''))
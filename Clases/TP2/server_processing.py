@@ -4,34 +4,85 @@ Servidor de Procesamiento con Multiprocessing (Parte B)
 Servidor que procesa tareas CPU-bound usando multiprocessing
 """
 
+import os
 import socket
-import struct
 import argparse
 import sys
 import signal
+import selectors
+import threading
+import queue
+import itertools
+import uuid
+from collections import deque
 from multiprocessing import Pool, cpu_count, Manager
-from typing import Dict, Any
+from typing import Any, Callable, Dict, List, Tuple
 import json
 
 # Importar módulos de procesamiento
-from processor.screenshot import capture_screenshot, is_screenshot_available
+from processor.screenshot import capture_screenshot_png, is_screenshot_available
+from processor.browser_pool import get_browser_pool, init_browser_pool
+from processor.result_cache import ResultCache
+from processor.http_session import get_session, install_dns_cache
 from processor.performance import analyze_performance
-from processor.image_processor import process_images_parallel
+from processor.image_processor import (
+    process_images_parallel,
+    init_image_pools,
+    set_download_limits,
+    validate_thumbnail_set_options,
+    THUMBNAIL_PRESETS,
+    DEFAULT_THUMBNAIL_PRESET,
+    DEFAULT_MAX_IMAGE_BYTES,
+    DEFAULT_MAX_IMAGE_PIXELS
+)
 from common.protocol import (
     ProtocolMessage,
     create_response,
     create_error_response,
+    create_hello,
+    SUPPORTED_FEATURES,
+    FEATURE_BINARY,
     MSG_TYPE_SCREENSHOT,
     MSG_TYPE_PERFORMANCE,
-    MSG_TYPE_IMAGE_PROCESSING
+    MSG_TYPE_IMAGE_PROCESSING,
+    MSG_TYPE_STATS,
+    MSG_TYPE_HELLO
 )
 from common.serialization import serialize_json, deserialize_json
+from common.framing import FrameReader, FrameTooLargeError, DEFAULT_MAX_FRAME_SIZE
+
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'processing_cache.sqlite')
+
+# Imágenes procesadas por tarea de thumbnails
+MAX_IMAGES_PER_TASK = 5
+
+
+class ClientConnection:
+    """Estado de una conexión de cliente dentro del bucle de selectors"""
+    
+    def __init__(self, sock: socket.socket, address: tuple, max_frame_size: int = DEFAULT_MAX_FRAME_SIZE):
+        self.sock = sock
+        self.address = address
+        self.reader = FrameReader(max_frame_size)
+        self.outbuf = deque()     # Buffers pendientes de envío (scatter-gather)
+        self.binary = False       # Formato binario negociado con MSG_TYPE_HELLO
+        self.pending = 0          # Tareas enviadas al pool sin respuesta aún
+        self.eof = False          # El cliente ya no enviará más datos
+        self.closed = False
+        self.registered = False
 
 
 class ProcessingServer:
     """Servidor de procesamiento con multiprocessing"""
     
-    def __init__(self, host: str, port: int, num_processes: int = None):
+    def __init__(self, host: str, port: int, num_processes: int = None,
+                 max_frame_size: int = DEFAULT_MAX_FRAME_SIZE, warm_browsers: bool = False,
+                 cache_path: str = None, cache_ttl: float = 300,
+                 cache_max_bytes: int = 256 * 1024 * 1024,
+                 thumbnail_preset: str = DEFAULT_THUMBNAIL_PRESET,
+                 max_image_bytes: int = DEFAULT_MAX_IMAGE_BYTES,
+                 max_image_pixels: int = DEFAULT_MAX_IMAGE_PIXELS):
         """
         Inicializa el servidor de procesamiento
         
@@ -39,18 +90,58 @@ class ProcessingServer:
             host: Dirección de escucha
             port: Puerto de escucha
             num_processes: Número de procesos en el pool
+            max_frame_size: Tamaño máximo aceptado por mensaje en bytes
+            warm_browsers: Iniciar un navegador en cada worker al arrancar
+            cache_path: Archivo SQLite de la caché de resultados (None = sin caché)
+            cache_ttl: Segundos de validez de cada resultado cacheado
+            cache_max_bytes: Tamaño máximo de la caché
+            thumbnail_preset: Preset de thumbnails por defecto ('fast', 'balanced', 'quality')
+            max_image_bytes: Tamaño máximo de una imagen descargada
+            max_image_pixels: Píxeles máximos de una imagen (protege de bombas de descompresión)
         """
         self.host = host
         self.port = port
         self.num_processes = num_processes or cpu_count()
+        self.max_frame_size = max_frame_size
+        self.warm_browsers = warm_browsers
+        self.cache_path = cache_path
+        self.cache_ttl = cache_ttl
+        self.cache_max_bytes = cache_max_bytes
+        self.thumbnail_preset = thumbnail_preset
+        self.max_image_bytes = max_image_bytes
+        self.max_image_pixels = max_image_pixels
+        self.cache = None
         self.pool = None
+        
+        # Tareas en curso por clave: varios clientes pueden esperar el mismo resultado
+        self._inflight: Dict[str, List[Tuple[ClientConnection, Any]]] = {}
+        self._inflight_lock = threading.Lock()
+        self.coalesced = 0
         self.socket = None
+        self.selector = None
         self.running = False
+        self.ready = threading.Event()
+        
+        # Resultados que llegan desde el pool (hilo de callbacks) hacia el bucle principal
+        self._completed = queue.SimpleQueue()
+        self._wakeup_r = None
+        self._wakeup_w = None
     
     def start(self):
         """Inicia el servidor"""
         print(f"Inicializando pool de {self.num_processes} procesos...")
-        self.pool = Pool(processes=self.num_processes)
+        self.pool = Pool(
+            processes=self.num_processes,
+            initializer=init_worker,
+            initargs=(self.warm_browsers, self.max_image_bytes, self.max_image_pixels)
+        )
+        
+        # La caché se abre después de crear el pool para no heredar la conexión en los workers
+        if self.cache_path:
+            if self.cache_path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+            self.cache = ResultCache(self.cache_path, ttl=self.cache_ttl, max_bytes=self.cache_max_bytes)
+            print(f"Caché de resultados: {self.cache_path} (TTL {self.cache_ttl}s)")
         
         print(f"Creando socket en {self.host}:{self.port}...")
 
@@ -72,13 +163,26 @@ class ProcessingServer:
                 pass
 
             self.socket.bind(sa)
-            self.socket.listen(5)
+            self.socket.listen(128)
+            self.socket.setblocking(False)
+            # Si se pidió el puerto 0, reflejar el puerto real asignado por el SO
+            self.port = self.socket.getsockname()[1]
+            
+            # Selector + socketpair para que el pool pueda despertar al bucle principal
+            self.selector = selectors.DefaultSelector()
+            self.selector.register(self.socket, selectors.EVENT_READ, None)
+            self._wakeup_r, self._wakeup_w = socket.socketpair()
+            self._wakeup_r.setblocking(False)
+            self._wakeup_w.setblocking(False)
+            self.selector.register(self._wakeup_r, selectors.EVENT_READ, None)
+            
             self.running = True
             
             print(f"Servidor de procesamiento escuchando en {self.host}:{self.port}")
             print(f"Procesos en pool: {self.num_processes}")
             print("Esperando conexiones...\n")
             
+            self.ready.set()
             self.accept_connections()
             
         except OSError as e:
@@ -87,140 +191,362 @@ class ProcessingServer:
             sys.exit(1)
     
     def accept_connections(self):
-        """Acepta conexiones entrantes"""
+        """
+        Bucle principal basado en selectors
+        
+        Acepta conexiones, lee mensajes de todos los clientes a la vez y
+        escribe las respuestas a medida que el pool las va completando.
+        Ninguna operación del bucle bloquea esperando al pool.
+        """
         while self.running:
             try:
-                client_socket, address = self.socket.accept()
-                print(f"Conexión recibida desde {address}")
-                
-                # Manejar cliente
-                self.handle_client(client_socket, address)
-                
+                events = self.selector.select(timeout=1.0)
             except KeyboardInterrupt:
                 print("\nDeteniendo servidor...")
                 break
-            except Exception as e:
-                print(f"Error aceptando conexión: {e}")
+            
+            for key, mask in events:
+                try:
+                    if key.fileobj is self.socket:
+                        self.accept_client()
+                    elif key.fileobj is self._wakeup_r:
+                        self.drain_wakeup()
+                    else:
+                        conn = key.data
+                        if mask & selectors.EVENT_READ:
+                            self.handle_readable(conn)
+                        if mask & selectors.EVENT_WRITE and not conn.closed:
+                            self.flush_output(conn)
+                except Exception as e:
+                    print(f"Error en el bucle de eventos: {e}")
+            
+            # Entregar respuestas que haya completado el pool
+            self.deliver_completed()
     
-    def handle_client(self, client_socket: socket.socket, address: tuple):
+    def accept_client(self):
+        """Acepta todas las conexiones pendientes en el socket de escucha"""
+        while True:
+            try:
+                client_socket, address = self.socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            
+            print(f"Conexión recibida desde {address}")
+            client_socket.setblocking(False)
+            conn = ClientConnection(client_socket, address, self.max_frame_size)
+            self.update_interest(conn)
+    
+    def handle_readable(self, conn: ClientConnection):
         """
-        Maneja una conexión de cliente
+        Lee datos disponibles de un cliente y procesa los mensajes completos
         
         Args:
-            client_socket: Socket del cliente
-            address: Dirección del cliente
+            conn: Conexión con datos para leer
         """
         try:
-            # Leer header (5 bytes: 4 de longitud + 1 de tipo)
-            header = self.recv_exact(client_socket, 5)
-            
-            if not header:
-                return
-            
-            length, msg_type = struct.unpack('!IB', header)
-            
-            # Leer datos (length ya incluye el byte del tipo)
-            data_bytes = self.recv_exact(client_socket, length - 1)
-            
-            if not data_bytes:
-                return
-            
-            # Deserializar mensaje
-            message_data = deserialize_json(data_bytes)
-            message = ProtocolMessage(msg_type, message_data)
-            
-            # Procesar mensaje
-            response = self.process_message(message)
-            
-            # Enviar respuesta
-            response_bytes = response.encode()
-            client_socket.sendall(response_bytes)
-            
-            # Asegurar que los datos se envíen antes de cerrar
-            client_socket.shutdown(socket.SHUT_WR)
-            
+            frames = conn.reader.read_frames(conn.sock)
+        except EOFError:
+            # El cliente cerró su lado de escritura: responder lo pendiente y cerrar
+            conn.eof = True
+            self.update_interest(conn)
+            return
+        except FrameTooLargeError as e:
+            print(f"Mensaje rechazado de {conn.address}: {e}")
+            conn.eof = True
+            self.send_response(conn, create_error_response(str(e)))
+            return
         except socket.error as e:
             # Ignorar errores de socket cerrado, es esperado
             if e.errno not in (32, 104):  # EPIPE, ECONNRESET
-                print(f"Error de socket con cliente {address}: {e}")
+                print(f"Error de socket con cliente {conn.address}: {e}")
+            self.close_client(conn)
+            return
         
-        except Exception as e:
-            print(f"Error manejando cliente {address}: {e}")
-        
-        finally:
+        # Una lectura puede traer varios mensajes completos
+        for msg_type, data_bytes in frames:
             try:
-                client_socket.close()
-            except:
-                pass
-            print(f"Conexión cerrada con {address}")
+                message = ProtocolMessage.from_payload(msg_type, data_bytes, conn.binary)
+            except Exception as e:
+                self.send_response(conn, create_error_response(f"Mensaje inválido: {e}"))
+                continue
+            
+            if message.msg_type == MSG_TYPE_HELLO:
+                self.negotiate(conn, message)
+            else:
+                self.process_message(conn, message)
     
-    def recv_exact(self, sock: socket.socket, num_bytes: int) -> bytes:
+    def negotiate(self, conn: ClientConnection, message: ProtocolMessage):
         """
-        Recibe exactamente num_bytes del socket
+        Responde a MSG_TYPE_HELLO con las capacidades comunes
         
-        Args:
-            sock: Socket
-            num_bytes: Número de bytes a recibir
-            
-        Returns:
-            bytes: Datos recibidos
+        La respuesta viaja en el formato JSON; a partir de la siguiente trama
+        ambos extremos usan el formato acordado.
         """
-        data = b''
-        while len(data) < num_bytes:
-            chunk = sock.recv(num_bytes - len(data))
-            if not chunk:
-                return b''
-            data += chunk
-        return data
-    
-    def process_message(self, message: ProtocolMessage) -> ProtocolMessage:
+        requested = message.data.get('features', [])
+        accepted = [f for f in SUPPORTED_FEATURES if f in requested]
+        self.send_response(conn, create_hello(accepted))
+        conn.binary = FEATURE_BINARY in accepted
+    
+    def process_message(self, conn: ClientConnection, message: ProtocolMessage):
         """
-        Procesa un mensaje y retorna la respuesta
+        Despacha un mensaje al pool sin bloquear el bucle de eventos
+        
+        La respuesta se envía cuando el pool completa la tarea (ver
+        on_task_done), por lo que varias tareas pueden ejecutarse en paralelo.
         
         Args:
+            conn: Conexión que originó el mensaje
             message: Mensaje a procesar
-            
-        Returns:
-            ProtocolMessage con la respuesta
         """
-        try:
-            if message.msg_type == MSG_TYPE_SCREENSHOT:
-                # Procesar screenshot en el pool
-                url = message.data.get('url')
-                print(f"Procesando screenshot para {url}")
-                
-                # Ejecutar en proceso separado
-                result = self.pool.apply(process_screenshot_task, (url,))
-                
-                return create_response({'screenshot': result})
-            
-            elif message.msg_type == MSG_TYPE_PERFORMANCE:
-                # Procesar análisis de rendimiento
-                url = message.data.get('url')
-                print(f"Analizando rendimiento de {url}")
-                
-                # Ejecutar en proceso separado
-                result = self.pool.apply(process_performance_task, (url,))
-                
-                return create_response({'performance': result})
-            
-            elif message.msg_type == MSG_TYPE_IMAGE_PROCESSING:
-                # Procesar imágenes
-                url = message.data.get('url')
-                images = message.data.get('images', [])
-                print(f"Procesando {len(images)} imágenes para {url}")
-                
-                # Ejecutar en proceso separado
-                result = self.pool.apply(process_images_task, (images,))
-                
-                return create_response({'thumbnails': result})
+        task_id = message.data.get('task_id')
+        url = message.data.get('url')
+        options = message.data.get('options')
+        expected = None
+        shareable = True
+        
+        if message.msg_type == MSG_TYPE_SCREENSHOT:
+            print(f"Procesando screenshot para {url}")
+            task, args, key, target = process_screenshot_task, (url,), 'screenshot', url
+        
+        elif message.msg_type == MSG_TYPE_PERFORMANCE:
+            print(f"Analizando rendimiento de {url}")
+            page = message.data.get('page')
+            measure_weight = bool((options or {}).get('page_weight'))
+            try:
+                waterfall = int((options or {}).get('waterfall_samples') or 0)
+            except (TypeError, ValueError):
+                self.send_response(conn, create_error_response("waterfall_samples debe ser un entero", task_id))
+                return
+            # Las métricas de A (page) cambian el resultado: forman parte de la
+            # clave, así dos páginas distintas no comparten caché ni tarea en curso
+            task, key = process_performance_task, 'performance'
+            target = [url, page] if page else url
+            args = (url, page, measure_weight, waterfall)
+            # Las muestras del waterfall miden la red en este momento: no se
+            # reutilizan ni se comparten entre peticiones
+            shareable = waterfall <= 0
+        
+        elif message.msg_type == MSG_TYPE_IMAGE_PROCESSING:
+            images = message.data.get('images', [])
+            expected = min(len(images), MAX_IMAGES_PER_TASK)
+            preset = (options or {}).get('preset') or self.thumbnail_preset
+            if preset not in THUMBNAIL_PRESETS:
+                self.send_response(conn, create_error_response(f"Preset de thumbnails desconocido: {preset}", task_id))
+                return
+            # El preset cambia el resultado: forma parte de la clave de caché
+            options = dict(options or {}, preset=preset)
             
+            if options.get('sizes'):
+                try:
+                    sizes, formats = validate_thumbnail_set_options(options['sizes'], options.get('formats'))
+                except ValueError as e:
+                    self.send_response(conn, create_error_response(str(e), task_id))
+                    return
+                options.update(sizes=[list(size) for size in sizes], formats=formats)
+                print(f"Procesando sets de {len(sizes)} tamaños x {', '.join(formats)} "
+                      f"de {len(images)} imágenes para {url}")
+                task, key = process_image_sets_task, 'thumbnail_sets'
+                args, target = (images, sizes, formats, preset), images
             else:
-                return create_error_response(f"Tipo de mensaje desconocido: {message.msg_type}")
+                print(f"Procesando {len(images)} imágenes para {url} (preset {preset})")
+                task, args, key, target = process_images_task, (images, preset), 'thumbnails', images
+        
+        elif message.msg_type == MSG_TYPE_STATS:
+            self.send_response(conn, create_response({'stats': self.get_stats()}, task_id))
+            return
+        
+        else:
+            self.send_response(
+                conn,
+                create_error_response(f"Tipo de mensaje desconocido: {message.msg_type}", task_id)
+            )
+            return
+        
+        if shareable:
+            task_key = ResultCache.make_key(message.msg_type, target, options)
+        else:
+            task_key = uuid.uuid4().hex
+        
+        # Un resultado cacheado se responde sin pasar por el pool
+        if self.cache and shareable:
+            cached = self.cache.get(task_key)
+            if cached is not None:
+                print(f"Resultado en caché ({key}) para {url}")
+                self.send_response(conn, create_response({key: cached}, task_id))
+                return
+        
+        # Si la misma tarea ya está en el pool, esperar su resultado en lugar de repetirla
+        conn.pending += 1
+        with self._inflight_lock:
+            waiters = self._inflight.get(task_key)
+            if waiters is not None:
+                waiters.append((conn, task_id))
+                self.coalesced += 1
+                print(f"Tarea idéntica en curso ({key}) para {url}: se comparte el resultado")
+                return
+            self._inflight[task_key] = [(conn, task_id)]
+        
+        def on_result(result):
+            if self.cache and shareable and is_cacheable(key, result, expected):
+                self.cache.put(task_key, result)
+            self.finish_task(task_key, lambda tid: create_response({key: result}, tid))
         
+        def on_error(e):
+            self.finish_task(task_key, lambda tid: create_error_response(str(e), tid))
+        
+        try:
+            # Ejecutar en proceso separado sin esperar el resultado
+            self.pool.apply_async(task, args, callback=on_result, error_callback=on_error)
         except Exception as e:
             print(f"Error procesando mensaje: {e}")
-            return create_error_response(str(e))
+            on_error(e)
+    
+    def finish_task(self, task_key: str, make_response: Callable[[Any], ProtocolMessage]):
+        """
+        Entrega el resultado de una tarea a todos los clientes que la esperaban
+        
+        Args:
+            task_key: Clave de la tarea
+            make_response: Función que arma la respuesta para un task_id
+        """
+        with self._inflight_lock:
+            waiters = self._inflight.pop(task_key, [])
+        for conn, task_id in waiters:
+            self.on_task_done(conn, make_response(task_id))
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas del servidor (pool y caché)"""
+        return {
+            'processes': self.num_processes,
+            'in_flight': len(self._inflight),
+            'coalesced': self.coalesced,
+            'cache': self.cache.stats() if self.cache else None
+        }
+    
+    def on_task_done(self, conn: ClientConnection, response: ProtocolMessage):
+        """
+        Callback del pool (se ejecuta en el hilo de resultados del Pool)
+        
+        Solo encola la respuesta y despierta al bucle principal, que es el
+        único que toca los sockets.
+        """
+        self._completed.put((conn, response))
+        self.wakeup()
+    
+    def wakeup(self):
+        """Despierta al bucle de selectors escribiendo en el socketpair"""
+        try:
+            self._wakeup_w.send(b'\0')
+        except (BlockingIOError, OSError):
+            # Buffer lleno: ya hay un despertar pendiente
+            pass
+    
+    def drain_wakeup(self):
+        """Vacía el socketpair de despertar"""
+        try:
+            while self._wakeup_r.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+    
+    def deliver_completed(self):
+        """Envía las respuestas completadas por el pool a sus clientes"""
+        while True:
+            try:
+                conn, response = self._completed.get_nowait()
+            except queue.Empty:
+                return
+            
+            conn.pending -= 1
+            if conn.closed:
+                continue
+            self.send_response(conn, response)
+    
+    def send_response(self, conn: ClientConnection, response: ProtocolMessage):
+        """
+        Encola una respuesta en el buffer de salida e intenta enviarla
+        
+        Args:
+            conn: Conexión destino
+            response: Mensaje de respuesta
+        """
+        # Los adjuntos binarios se encolan tal cual, sin concatenarlos
+        parts = (memoryview(part) for part in response.encode_parts(conn.binary))
+        conn.outbuf.extend(part for part in parts if part.nbytes)
+        self.flush_output(conn)
+    
+    def flush_output(self, conn: ClientConnection):
+        """Escribe todo lo posible del buffer de salida sin bloquear (sendmsg)"""
+        try:
+            while conn.outbuf:
+                sent = conn.sock.sendmsg(list(itertools.islice(conn.outbuf, 64)))
+                while sent:
+                    first = conn.outbuf[0]
+                    if len(first) <= sent:
+                        sent -= len(first)
+                        conn.outbuf.popleft()
+                    else:
+                        conn.outbuf[0] = first[sent:]
+                        sent = 0
+        except (BlockingIOError, InterruptedError):
+            pass
+        except socket.error as e:
+            if e.errno not in (32, 104):  # EPIPE, ECONNRESET
+                print(f"Error de socket con cliente {conn.address}: {e}")
+            self.close_client(conn)
+            return
+        
+        self.update_interest(conn)
+    
+    def update_interest(self, conn: ClientConnection):
+        """
+        Ajusta los eventos que el selector vigila para una conexión
+        
+        Se lee mientras el cliente no haya cerrado y se espera escritura solo
+        si hay datos pendientes. Una conexión sin nada que hacer se cierra.
+        """
+        if conn.closed:
+            return
+        
+        events = 0
+        if not conn.eof:
+            events |= selectors.EVENT_READ
+        if conn.outbuf:
+            events |= selectors.EVENT_WRITE
+        
+        if not events:
+            if conn.pending == 0:
+                self.close_client(conn)
+            elif conn.registered:
+                # Quedan tareas en el pool: dejar de vigilar hasta que haya respuesta
+                self.selector.unregister(conn.sock)
+                conn.registered = False
+            return
+        
+        if conn.registered:
+            self.selector.modify(conn.sock, events, conn)
+        else:
+            self.selector.register(conn.sock, events, conn)
+            conn.registered = True
+    
+    def close_client(self, conn: ClientConnection):
+        """Cierra una conexión de cliente"""
+        if conn.closed:
+            return
+        conn.closed = True
+        
+        if conn.registered:
+            try:
+                self.selector.unregister(conn.sock)
+            except Exception:
+                pass
+            conn.registered = False
+        
+        try:
+            conn.sock.close()
+        except:
+            pass
+        print(f"Conexión cerrada con {conn.address}")
     
     def cleanup(self):
         """Limpia recursos"""
@@ -229,19 +555,76 @@ class ProcessingServer:
         if self.pool:
             self.pool.close()
             self.pool.join()
+            self.pool = None
+        
+        if self.cache:
+            self.cache.close()
+            self.cache = None
+        
+        if self.selector:
+            self.selector.close()
+            self.selector = None
+        
+        for sock in (self._wakeup_r, self._wakeup_w):
+            if sock:
+                sock.close()
+        self._wakeup_r = self._wakeup_w = None
         
         if self.socket:
             self.socket.close()
+            self.socket = None
     
     def stop(self):
-        """Detiene el servidor"""
+        """Detiene el bucle del servidor (puede llamarse desde otro hilo)"""
         self.running = False
-        self.cleanup()
+        if self._wakeup_w:
+            self.wakeup()
 
 
 # Funciones de procesamiento que se ejecutarán en procesos separados
 
-def process_screenshot_task(url: str) -> str:
+def is_cacheable(key: str, result: Any, expected: int = None) -> bool:
+    """
+    Indica si el resultado de una tarea puede guardarse en caché (no se cachean fallos)
+    
+    Args:
+        key: Tipo de resultado ('screenshot', 'performance', 'thumbnails' o 'thumbnail_sets')
+        result: Resultado de la tarea
+        expected: Imágenes pedidas en una tarea de thumbnails
+        
+    Returns:
+        bool: True si el resultado está completo
+    """
+    if key == 'screenshot':
+        return result is not None
+    if key == 'performance':
+        return isinstance(result, dict) and 'error' not in result
+    # Thumbnails: las imágenes que fallan no aparecen en la lista, así que un
+    # lote se cachea solo si no está vacío y trae una por cada imagen pedida
+    return (isinstance(result, list) and len(result) > 0 and all(result)
+            and (expected is None or len(result) == expected))
+
+
+def init_worker(warm_browsers: bool = False, max_image_bytes: int = None, max_image_pixels: int = None):
+    """
+    Inicializa cada proceso del pool
+    
+    Args:
+        warm_browsers: Iniciar el navegador del worker antes de la primera captura
+        max_image_bytes: Tamaño máximo de una imagen descargada
+        max_image_pixels: Píxeles máximos de una imagen descargada
+    """
+    set_download_limits(max_image_bytes, max_image_pixels)
+    # Sesión HTTP, caché DNS y pools de hilos de imágenes del worker: se
+    # reutilizan en todas sus tareas
+    install_dns_cache()
+    get_session()
+    init_image_pools()
+    if is_screenshot_available():
+        init_browser_pool(warm=warm_browsers)
+
+
+def process_screenshot_task(url: str) -> bytes:
     """
     Tarea para procesar screenshot en un proceso separado
     
@@ -249,11 +632,13 @@ def process_screenshot_task(url: str) -> str:
         url: URL a capturar
         
     Returns:
-        str: Screenshot en base64 o None
+        bytes: Screenshot PNG o None (se envía como adjunto binario o base64
+        según lo negociado con el cliente)
     """
     try:
         if is_screenshot_available():
-            screenshot = capture_screenshot(url, timeout=30000)
+            # Reutilizar el navegador ya iniciado de este worker
+            screenshot = capture_screenshot_png(url, timeout=30, pool=get_browser_pool())
             return screenshot
         else:
             print("Selenium no disponible, screenshot omitido")
@@ -263,36 +648,66 @@ def process_screenshot_task(url: str) -> str:
         return None
 
 
-def process_performance_task(url: str) -> Dict[str, Any]:
+def process_performance_task(url: str, page: Dict[str, Any] = None,
+                             measure_weight: bool = False, waterfall: int = 0) -> Dict[str, Any]:
     """
     Tarea para analizar rendimiento en un proceso separado
     
     Args:
         url: URL a analizar
+        page: Datos de la página ya descargada por el servidor A (opcional)
+        measure_weight: Medir el peso real descargando los subrecursos
+        waterfall: Muestras del desglose DNS/conexión/TLS/TTFB/descarga (0 = no medir)
         
     Returns:
         Dict con métricas de rendimiento
     """
     try:
-        performance = analyze_performance(url, timeout=30)
+        performance = analyze_performance(url, timeout=30, page=page, measure_weight=measure_weight,
+                                          waterfall=waterfall)
         return performance
     except Exception as e:
         print(f"Error en process_performance_task: {e}")
         return {'error': str(e)}
 
 
-def process_images_task(image_urls: list) -> list:
+def process_image_sets_task(image_urls: list, sizes: list, formats: list,
+                            preset: str = DEFAULT_THUMBNAIL_PRESET) -> list:
+    """
+    Tarea para generar sets de thumbnails (varios tamaños y formatos por imagen)
+    
+    Args:
+        image_urls: Lista de URLs de imágenes
+        sizes: Tamaños (ancho, alto) ya validados
+        formats: Formatos ya validados ('JPEG', 'WEBP', 'AVIF')
+        preset: Preset de thumbnails
+        
+    Returns:
+        list: Por imagen, la lista de variantes (size, width, height, format, data en bytes)
+    """
+    try:
+        result = process_images_parallel(image_urls, max_images=MAX_IMAGES_PER_TASK, encode_base64=False,
+                                         preset=preset, sizes=sizes, formats=formats)
+        return result.get('thumbnail_sets', [])
+    except Exception as e:
+        print(f"Error en process_image_sets_task: {e}")
+        return []
+
+
+def process_images_task(image_urls: list, preset: str = DEFAULT_THUMBNAIL_PRESET) -> list:
     """
     Tarea para procesar imágenes en un proceso separado
     
     Args:
         image_urls: Lista de URLs de imágenes
+        preset: Preset de thumbnails ('fast', 'balanced' o 'quality')
         
     Returns:
-        list: Lista de thumbnails en base64
+        list: Lista de thumbnails JPEG (bytes)
     """
     try:
-        result = process_images_parallel(image_urls, max_images=5)
+        result = process_images_parallel(image_urls, max_images=MAX_IMAGES_PER_TASK, encode_base64=False,
+                                         preset=preset)
         return result.get('thumbnails', [])
     except Exception as e:
         print(f"Error en process_images_task: {e}")
@@ -327,6 +742,67 @@ def parse_arguments():
         help=f'Número de procesos en el pool (default: {cpu_count()})'
     )
     
+    parser.add_argument(
+        '--max-frame-mb',
+        type=int,
+        default=DEFAULT_MAX_FRAME_SIZE // (1024 * 1024),
+        help=f'Tamaño máximo por mensaje en MB (default: {DEFAULT_MAX_FRAME_SIZE // (1024 * 1024)})'
+    )
+    
+    parser.add_argument(
+        '--warm-browsers',
+        action='store_true',
+        help='Iniciar un navegador headless por worker al arrancar (screenshots sin arranque en frío)'
+    )
+    
+    parser.add_argument(
+        '--cache-path',
+        type=str,
+        default=DEFAULT_CACHE_PATH,
+        help='Archivo SQLite de la caché de resultados (default: cache/processing_cache.sqlite)'
+    )
+    
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=300,
+        help='Segundos de validez de un resultado cacheado (default: 300)'
+    )
+    
+    parser.add_argument(
+        '--cache-max-mb',
+        type=int,
+        default=256,
+        help='Tamaño máximo de la caché en MB (default: 256)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Desactivar la caché de resultados'
+    )
+    
+    parser.add_argument(
+        '--thumbnail-preset',
+        choices=sorted(THUMBNAIL_PRESETS),
+        default=DEFAULT_THUMBNAIL_PRESET,
+        help=f'Velocidad vs calidad de los thumbnails (default: {DEFAULT_THUMBNAIL_PRESET})'
+    )
+    
+    parser.add_argument(
+        '--max-image-mb',
+        type=float,
+        default=DEFAULT_MAX_IMAGE_BYTES / (1024 * 1024),
+        help=f'Tamaño máximo de una imagen a descargar en MB (default: {DEFAULT_MAX_IMAGE_BYTES // (1024 * 1024)})'
+    )
+    
+    parser.add_argument(
+        '--max-image-mp',
+        type=float,
+        default=DEFAULT_MAX_IMAGE_PIXELS / 1_000_000,
+        help=f'Megapíxeles máximos de una imagen (default: {DEFAULT_MAX_IMAGE_PIXELS // 1_000_000})'
+    )
+    
     return parser.parse_args()
 
 
@@ -356,7 +832,19 @@ def main():
     print("\nPresiona Ctrl+C para detener el servidor\n")
     
     # Crear y arrancar servidor
-    server = ProcessingServer(args.ip, args.port, args.processes)
+    server = ProcessingServer(
+        args.ip,
+        args.port,
+        args.processes,
+        max_frame_size=args.max_frame_mb * 1024 * 1024,
+        warm_browsers=args.warm_browsers,
+        cache_path=None if args.no_cache else args.cache_path,
+        cache_ttl=args.cache_ttl,
+        cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+        thumbnail_preset=args.thumbnail_preset,
+        max_image_bytes=int(args.max_image_mb * 1024 * 1024),
+        max_image_pixels=int(args.max_image_mp * 1_000_000)
+    )
     
     try:
         server.start()
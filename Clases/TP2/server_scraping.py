@@ -7,50 +7,166 @@ Servidor HTTP que maneja solicitudes de scraping usando asyncio
 import asyncio
 import argparse
 import json
+import os
 import sys
+import time
 from datetime import datetime
 from typing import Dict, Any
 from aiohttp import web
 import aiohttp
 
 # Importar módulos locales
-from scraper.async_http import AsyncHTTPClient
-from scraper.html_parser import parse_html, extract_image_urls
-from scraper.metadata_extractor import extract_metadata
+from scraper.async_http import AsyncHTTPClient, MAX_BODY_BYTES
+from scraper.http_cache import HTTPCache
+from scraper.connector import CONNECTOR_PROFILES, resolve_profile
+from scraper.html_parser import parse_page
+from scraper.stream_extractor import StreamingHTMLExtractor
+from scraper.parse_executor import ParseExecutor, EXECUTOR_KINDS
+from scraper.single_flight import AsyncSingleFlight
+from scraper.url_utils import normalize_url
+from scraper.crawler import Crawler, DomainRateLimiter, RobotsCache
+from scraper.job_store import JobStore, JOB_SCRAPING, JOB_PROCESSING, JOB_DONE, JOB_FAILED
 from common.protocol import (
     create_screenshot_request,
     create_performance_request,
     create_image_processing_request,
-    ProtocolMessage,
+    create_stats_request,
+    ProcessingConnectionPool,
     MSG_TYPE_RESPONSE,
     MSG_TYPE_ERROR
 )
+from common.serialization import encode_binary_base64
+
+
+DEFAULT_HTTP_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache', 'http_cache.sqlite')
+
+# URLs máximas por lote de /scrape/batch
+MAX_BATCH_URLS = 10000
+
+# Límites de un crawl de /crawl
+MAX_CRAWL_PAGES = 1000
+MAX_CRAWL_DEPTH = 5
+
+# Segundos máximos de espera de cada resultado del servidor B; pasado el
+# plazo el componente se responde con su valor vacío y un error
+COMPONENT_DEADLINES = {
+    'screenshot': 20,
+    'performance': 30,
+    'thumbnails': 30,
+    'thumbnail_sets': 60
+}
+
+# Valor de un componente que no llegó
+COMPONENT_DEFAULTS = {
+    'screenshot': None,
+    'performance': {},
+    'thumbnails': [],
+    'thumbnail_sets': []
+}
+
+# Formatos de /scrape?stream=
+STREAM_MODES = ('ndjson', 'sse')
+
+# Bytes que se juntan antes de pasarlos al extractor en streaming (cada
+# entrega es un salto al ejecutor de parseo)
+STREAM_FEED_BYTES = 256 * 1024
 
 
 class ScrapingServer:
     """Servidor de scraping asíncrono"""
     
-    def __init__(self, processing_host: str = 'localhost', processing_port: int = 9000):
+    def __init__(self, processing_host: str = 'localhost', processing_port: int = 9000,
+                 processing_connections: int = 2, parser: str = 'soup',
+                 executor: str = 'thread', workers: int = 4, page_weight: bool = False,
+                 waterfall_samples: int = 0, batch_concurrency: int = 8, job_ttl: float = 600,
+                 component_deadlines: Dict[str, float] = None, http_cache_path: str = None,
+                 http_cache_max_bytes: int = 256 * 1024 * 1024, connector_profile=None,
+                 crawl_rate: float = 1.0, crawl_burst: float = 2, respect_robots: bool = True,
+                 max_page_bytes: int = MAX_BODY_BYTES):
         """
         Inicializa el servidor de scraping
         
         Args:
             processing_host: Host del servidor de procesamiento
             processing_port: Puerto del servidor de procesamiento
+            processing_connections: Conexiones persistentes hacia el servidor de procesamiento
+            parser: 'soup' (BeautifulSoup sobre la página completa) o 'stream'
+                    (extracción incremental con lxml a medida que llegan los chunks)
+            executor: Dónde corre el parseo: 'thread', 'process' o 'inline'
+            workers: Hilos o procesos del ejecutor de parseo
+            page_weight: Pedir al servidor B el peso real de la página (descarga los subrecursos)
+            waterfall_samples: Muestras del desglose DNS/conexión/TLS/TTFB/descarga (0 = no medir)
+            batch_concurrency: Scrapes simultáneos máximos de cada lote de /scrape/batch
+            job_ttl: Segundos que se conserva el resultado de un trabajo terminado (/jobs)
+            component_deadlines: Plazos por componente del servidor B (reemplazan a COMPONENT_DEADLINES)
+            http_cache_path: Archivo SQLite de la caché HTTP de páginas (None = sin caché)
+            http_cache_max_bytes: Tamaño máximo de la caché HTTP
+            connector_profile: Perfil de conexiones de las descargas (nombre de
+                               CONNECTOR_PROFILES o dict, ver scraper/connector.py)
+            crawl_rate: Peticiones por segundo máximas a cada dominio durante un crawl
+            crawl_burst: Peticiones seguidas permitidas a un dominio antes de aplicar crawl_rate
+            respect_robots: Consultar robots.txt antes de cada página de un crawl
+            max_page_bytes: Tamaño máximo de una página descargada (se corta la descarga)
         """
         self.processing_host = processing_host
         self.processing_port = processing_port
+        self.processing_connections = processing_connections
+        self.parser = parser
+        self.parse_executor = ParseExecutor(executor, workers)
+        self.page_weight = page_weight
+        self.waterfall_samples = waterfall_samples
+        self.batch_concurrency = batch_concurrency
+        self.component_deadlines = dict(COMPONENT_DEADLINES, **(component_deadlines or {}))
+        self.http_cache_path = http_cache_path
+        self.http_cache_max_bytes = http_cache_max_bytes
+        self.http_cache = None
+        self.connector_profile = connector_profile
+        self.max_page_bytes = max_page_bytes
         self.http_client = None
+        self.processing_pool = None
+        # Scrapes en curso por URL normalizada (peticiones simultáneas comparten el resultado)
+        self.inflight = AsyncSingleFlight()
+        # Trabajos en segundo plano de /jobs y sus tareas (referencias para que no se recolecten)
+        self.jobs = JobStore(ttl=job_ttl)
+        self.job_tasks = set()
+        # Límite por dominio y robots.txt compartidos por todos los crawls
+        self.rate_limiter = DomainRateLimiter(crawl_rate, crawl_burst)
+        self.respect_robots = respect_robots
+        self.robots = None
+        self.crawls = {'active': 0, 'completed': 0}
     
     async def initialize(self):
         """Inicializa recursos asíncronos"""
-        self.http_client = AsyncHTTPClient(timeout=30)
+        if self.http_cache_path:
+            if self.http_cache_path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.http_cache_path)), exist_ok=True)
+            self.http_cache = HTTPCache(self.http_cache_path, max_bytes=self.http_cache_max_bytes)
+            print(f"Caché HTTP: {self.http_cache_path}")
+        self.http_client = AsyncHTTPClient(timeout=30, cache=self.http_cache,
+                                           connector_profile=self.connector_profile,
+                                           max_body_bytes=self.max_page_bytes)
         await self.http_client.create_session()
+        self.robots = RobotsCache(self.http_client)
+        await self.parse_executor.start()
+        self.processing_pool = ProcessingConnectionPool(
+            self.processing_host,
+            self.processing_port,
+            size=self.processing_connections
+        )
     
     async def cleanup(self):
         """Limpia recursos asíncronos"""
+        for task in list(self.job_tasks):
+            task.cancel()
+        await asyncio.gather(*self.job_tasks, return_exceptions=True)
         if self.http_client:
             await self.http_client.close_session()
+        if self.processing_pool:
+            await self.processing_pool.close()
+        await self.parse_executor.close()
+        if self.http_cache:
+            self.http_cache.close()
+            self.http_cache = None
     
     async def handle_scrape(self, request: web.Request) -> web.Response:
         """
@@ -71,59 +187,431 @@ class ScrapingServer:
                 status=400
             )
         
+        try:
+            image_options = parse_thumbnail_query(request.query)
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        stop_early = parse_stop_early_query(request.query)
+        
+        mode = request.query.get('stream')
+        if mode:
+            if mode not in STREAM_MODES:
+                return web.json_response({'error': f'stream debe ser uno de: {", ".join(STREAM_MODES)}'}, status=400)
+            return await self.stream_scrape(request, url, image_options, mode, stop_early)
+        
         try:
             # Realizar scraping completo
-            result = await self.scrape_url(url)
+            result = await self.scrape_url(url, image_options, stop_early)
             
             return web.json_response(result, status=200)
             
-        except asyncio.TimeoutError:
-            return web.json_response(
-                {'error': f'Timeout al acceder a {url}', 'status': 'failed'},
-                status=504
-            )
+        except Exception as e:
+            status, message = describe_scrape_error(url, e)
+            return web.json_response({'error': message, 'status': 'failed'}, status=status)
+    
+    async def stream_scrape(self, request: web.Request, url: str, image_options: Dict[str, Any],
+                            mode: str, stop_early: bool = False) -> web.StreamResponse:
+        """
+        Scraping con respuesta progresiva (/scrape?stream=ndjson o sse)
         
-        except aiohttp.ClientError as e:
-            return web.json_response(
-                {'error': f'Error de cliente: {str(e)}', 'status': 'failed'},
-                status=502
-            )
+        Envía scraping_data apenas se parsea la página y después cada
+        resultado del servidor B en el orden en que terminan, cada uno con su
+        plazo: un screenshot colgado no demora al resto. Si la descarga de la
+        página falla se responde un error JSON como en /scrape.
+        
+        Eventos (una línea NDJSON o un evento SSE con el mismo JSON en data):
+        - scraping: url, timestamp y scraping_data
+        - component: name, data y, si no llegó a tiempo o falló, error
+        - done: status y elapsed_ms
         
+        Args:
+            request: Request de aiohttp
+            url: URL a scrapear
+            image_options: Opciones de thumbnails para el servidor B
+            mode: 'ndjson' o 'sse'
+            stop_early: Cortar la descarga al tener los datos (con --parser stream)
+            
+        Returns:
+            StreamResponse con los eventos
+        """
+        start = time.perf_counter()
+        try:
+            scraping_data, image_urls, page = await self.fetch_and_parse(url, stop_early)
         except Exception as e:
-            return web.json_response(
-                {'error': f'Error interno: {str(e)}', 'status': 'failed'},
-                status=500
-            )
+            status, message = describe_scrape_error(url, e)
+            return web.json_response({'error': message, 'status': 'failed'}, status=status)
+        
+        content_type = 'text/event-stream' if mode == 'sse' else 'application/x-ndjson'
+        response = web.StreamResponse(headers={'Content-Type': content_type, 'Cache-Control': 'no-cache'})
+        await response.prepare(request)
+        
+        async def emit(event):
+            event['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            payload = json.dumps(event)
+            if mode == 'sse':
+                payload = f"event: {event['event']}\ndata: {payload}\n\n"
+            else:
+                payload += '\n'
+            await response.write(payload.encode('utf-8'))
+        
+        components = self.processing_components(url, image_urls, page, image_options)
+        tasks = [asyncio.ensure_future(self.collect_component(name, pending))
+                 for name, pending in components.items()]
+        try:
+            await emit({
+                'event': 'scraping',
+                'url': url,
+                'timestamp': datetime.now().isoformat(),
+                'scraping_data': scraping_data
+            })
+            for next_result in asyncio.as_completed(tasks):
+                name, value, error = await next_result
+                event = {'event': 'component', 'name': name, 'data': encode_binary_base64(value)}
+                if error:
+                    event['error'] = error
+                await emit(event)
+            await emit({'event': 'done', 'status': 'success'})
+            await response.write_eof()
+        finally:
+            # Cliente desconectado: no se esperan los componentes que faltan
+            for task in tasks:
+                task.cancel()
+        return response
+    
+    async def handle_batch(self, request: web.Request) -> web.StreamResponse:
+        """
+        Maneja peticiones de scraping por lotes (POST /scrape/batch)
+        
+        El cuerpo puede ser JSON (una lista de URLs o {"urls": [...]}) o
+        NDJSON / texto con una URL por línea; en ese caso las URLs se leen a
+        medida que llegan y el scraping empieza antes de recibir el lote
+        completo. Se scrapean hasta `concurrency` URLs a la vez y cada
+        resultado se envía como una línea NDJSON apenas termina, con su
+        índice en el lote. Si el cliente lee más lento de lo que se
+        scrapea, los workers esperan antes de tomar URLs nuevas. La última
+        línea es un resumen ({"summary": {...}}).
+        
+        Args:
+            request: Request de aiohttp (query: concurrency, stop_early y opciones de thumbnails)
+            
+        Returns:
+            StreamResponse NDJSON
+        """
+        try:
+            image_options = parse_thumbnail_query(request.query)
+            concurrency = int(request.query.get('concurrency') or self.batch_concurrency)
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        stop_early = parse_stop_early_query(request.query)
+        concurrency = max(1, min(concurrency, self.batch_concurrency))
+        
+        # Colas acotadas: si los workers no dan abasto se deja de leer el cuerpo
+        urls = asyncio.Queue(maxsize=concurrency)
+        results = asyncio.Queue(maxsize=concurrency)
+        reader = asyncio.ensure_future(self.read_batch(request, urls, concurrency))
+        
+        async def worker():
+            while True:
+                item = await urls.get()
+                if item is None:
+                    # Fin del lote (el lector encola un None por worker)
+                    return
+                index, url = item
+                try:
+                    result = await self.scrape_url(url, image_options, stop_early)
+                    line = dict(result, index=index)
+                except Exception as e:
+                    _, message = describe_scrape_error(url, e)
+                    line = {'index': index, 'url': url, 'status': 'failed', 'error': message}
+                await results.put(line)
+        
+        async def finish(workers):
+            await asyncio.gather(*workers)
+            await results.put(None)
+        
+        workers = [asyncio.ensure_future(worker()) for _ in range(concurrency)]
+        finisher = asyncio.ensure_future(finish(workers))
+        
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        start = time.perf_counter()
+        summary = {'total': 0, 'succeeded': 0, 'failed': 0}
+        try:
+            while True:
+                line = await results.get()
+                if line is None:
+                    break
+                summary['total'] += 1
+                summary['succeeded' if line.get('status') == 'success' else 'failed'] += 1
+                await response.write(json.dumps(line).encode('utf-8') + b'\n')
+            
+            batch_error = reader.result()
+            if batch_error:
+                summary['error'] = batch_error
+            summary['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            await response.write(json.dumps({'summary': summary}).encode('utf-8') + b'\n')
+            await response.write_eof()
+        finally:
+            # Cliente desconectado: se abandona el resto del lote
+            for task in [reader, finisher] + workers:
+                task.cancel()
+        return response
+    
+    async def read_batch(self, request: web.Request, urls: asyncio.Queue, consumers: int = 1):
+        """
+        Lee las URLs del cuerpo de /scrape/batch y las encola con su índice
+        
+        Si la cola está llena espera a que los workers tomen URLs, así el
+        cuerpo se lee al ritmo del scraping. Termina encolando un None por
+        worker. Las URLs inválidas se encolan igual (su scraping falla y el
+        error sale en su línea de resultado).
+        
+        Args:
+            request: Request de aiohttp
+            urls: Cola acotada de (índice, URL)
+            consumers: Workers que leen la cola
+            
+        Returns:
+            str: Error que cortó la lectura del lote, o None
+        """
+        count = 0
+        error = None
+        try:
+            if request.content_type == 'application/json':
+                body = await request.json()
+                if isinstance(body, dict):
+                    body = body.get('urls')
+                if not isinstance(body, list):
+                    raise ValueError('Se espera una lista de URLs o {"urls": [...]}')
+                lines = body
+            else:
+                lines = None
+            
+            async def next_lines():
+                if lines is not None:
+                    for item in lines:
+                        yield item
+                    return
+                async for raw in request.content:
+                    yield raw.decode('utf-8', errors='replace')
+            
+            async for item in next_lines():
+                url = parse_batch_item(item)
+                if url is None:
+                    continue
+                if count >= MAX_BATCH_URLS:
+                    raise ValueError(f'El lote supera el máximo de {MAX_BATCH_URLS} URLs')
+                await urls.put((count, url))
+                count += 1
+        except Exception as e:
+            error = str(e)
+        for _ in range(consumers):
+            await urls.put(None)
+        return error
+    
+    async def handle_crawl(self, request: web.Request) -> web.StreamResponse:
+        """
+        Recorre un sitio siguiendo enlaces (GET /crawl)
+        
+        Parte de `url` y sigue los enlaces de cada página hasta max_depth
+        saltos o max_pages páginas, respetando robots.txt y el límite de
+        peticiones por dominio (compartido con los demás crawls en curso).
+        Solo se hace la parte de scraping, sin pedir nada al servidor B.
+        Cada página se envía como una línea NDJSON al terminar; la última
+        línea es un resumen ({"summary": {...}}).
+        
+        Args:
+            request: Request de aiohttp (query: url, max_pages, max_depth,
+                     same_domain y concurrency)
+            
+        Returns:
+            StreamResponse NDJSON
+        """
+        url = request.query.get('url')
+        if not url:
+            return web.json_response({'error': 'URL parameter is required'}, status=400)
+        try:
+            options = parse_crawl_query(request.query)
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        
+        async def fetch_page(page_url):
+            scraping_data, _, _ = await self.fetch_and_parse(page_url)
+            return scraping_data
+        
+        crawler = Crawler(
+            fetch_page,
+            self.rate_limiter,
+            robots=self.robots if self.respect_robots else None,
+            max_pages=options['max_pages'],
+            max_depth=options['max_depth'],
+            concurrency=max(1, min(options['concurrency'] or self.batch_concurrency, self.batch_concurrency)),
+            same_domain=options['same_domain']
+        )
+        
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        start = time.perf_counter()
+        self.crawls['active'] += 1
+        pages = crawler.crawl([url])
+        try:
+            async for page in pages:
+                await response.write(json.dumps(page).encode('utf-8') + b'\n')
+            summary = dict(crawler.stats(), elapsed_ms=round((time.perf_counter() - start) * 1000, 2))
+            await response.write(json.dumps({'summary': summary}).encode('utf-8') + b'\n')
+            await response.write_eof()
+        finally:
+            # Cliente desconectado: se cancelan las descargas en curso
+            await pages.aclose()
+            crawler.close()
+            self.crawls['active'] -= 1
+            self.crawls['completed'] += 1
+        return response
     
-    async def scrape_url(self, url: str) -> Dict[str, Any]:
+    async def handle_create_job(self, request: web.Request) -> web.Response:
+        """
+        Crea un trabajo de scraping en segundo plano (POST /jobs)
+        
+        La URL llega como query parameter o en el cuerpo JSON ({"url": ...});
+        acepta las mismas opciones thumb_* que /scrape. Responde enseguida
+        con el ID del trabajo, que se consulta con GET /jobs/{id}.
+        
+        Args:
+            request: Request de aiohttp
+            
+        Returns:
+            Response JSON 202 con id, status y la URL para consultarlo
+        """
+        url = request.query.get('url')
+        if not url and request.content_type == 'application/json':
+            try:
+                body = await request.json()
+            except ValueError:
+                body = None
+            if isinstance(body, dict):
+                url = body.get('url')
+        
+        if not url:
+            return web.json_response({'error': 'URL parameter is required'}, status=400)
+        
+        try:
+            image_options = parse_thumbnail_query(request.query)
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        
+        try:
+            job = self.jobs.create(url, image_options)
+        except RuntimeError as e:
+            return web.json_response({'error': str(e)}, status=503)
+        
+        task = asyncio.ensure_future(self.run_job(job['id'], url, image_options))
+        self.job_tasks.add(task)
+        task.add_done_callback(self.job_tasks.discard)
+        
+        location = f"/jobs/{job['id']}"
+        return web.json_response(
+            {'id': job['id'], 'status': job['status'], 'url': url, 'location': location},
+            status=202,
+            headers={'Location': location}
+        )
+    
+    async def handle_get_job(self, request: web.Request) -> web.Response:
+        """
+        Devuelve el estado de un trabajo (GET /jobs/{id})
+        
+        Mientras el trabajo avanza la respuesta trae lo que ya está listo:
+        scraping_data apenas se parsea la página y, en processing_data, cada
+        resultado del servidor B a medida que llega (pending lista los que
+        faltan).
+        
+        Args:
+            request: Request de aiohttp
+            
+        Returns:
+            Response JSON con el trabajo, o 404 si no existe o ya venció
+        """
+        job = self.jobs.get(request.match_info['job_id'])
+        if job is None:
+            return web.json_response({'error': 'Job not found or expired'}, status=404)
+        
+        for field in ('created_at', 'updated_at', 'finished_at'):
+            if job[field] is not None:
+                job[field] = datetime.fromtimestamp(job[field]).isoformat()
+        return web.json_response(job)
+    
+    async def run_job(self, job_id: str, url: str, image_options: Dict[str, Any] = None):
+        """
+        Ejecuta un trabajo de /jobs guardando cada resultado apenas está listo
+        
+        Args:
+            job_id: ID del trabajo
+            url: URL a scrapear
+            image_options: Opciones de thumbnails para el servidor B
+        """
+        try:
+            self.jobs.update(job_id, status=JOB_SCRAPING)
+            scraping_data, image_urls, page = await self.fetch_and_parse(url)
+            
+            components = self.processing_components(url, image_urls, page, image_options, job_id)
+            self.jobs.update(job_id, status=JOB_PROCESSING, scraping_data=scraping_data, pending=list(components))
+            
+            async def complete(name, request):
+                name, value, error = await self.collect_component(name, request)
+                self.jobs.set_component(job_id, name, encode_binary_base64(value), error)
+            
+            await asyncio.gather(*(complete(name, request) for name, request in components.items()))
+            self.jobs.update(job_id, status=JOB_DONE)
+        
+        except Exception as e:
+            _, message = describe_scrape_error(url, e)
+            self.jobs.update(job_id, status=JOB_FAILED, error=message)
+    
+    async def scrape_url(self, url: str, image_options: Dict[str, Any] = None,
+                         stop_early: bool = False) -> Dict[str, Any]:
         """
         Realiza el scraping completo de una URL
         
+        Si ya hay un scraping en curso para la misma URL (normalizada) y las
+        mismas opciones, espera ese resultado en lugar de descargar y procesar
+        la página de nuevo.
+        
         Args:
             url: URL a scrapear
+            image_options: Opciones de thumbnails para el servidor B (ver parse_thumbnail_query)
+            stop_early: Cortar la descarga al tener los datos (con --parser stream)
             
         Returns:
             Dict con todos los datos extraídos y procesados
         """
-        # 1. Obtener HTML de forma asíncrona
-        html_content, status_code, headers = await self.http_client.fetch_url(url)
-        
-        # 2. Parsear HTML y extraer información (I/O no bloqueante)
-        scraping_data = await asyncio.to_thread(parse_html, html_content, url)
-        
-        # 3. Extraer metadatos
-        metadata = await asyncio.to_thread(extract_metadata, html_content)
-        scraping_data['meta_tags'] = metadata
+        key = normalize_url(url)
+        if image_options:
+            key += '|' + json.dumps(image_options, sort_keys=True)
+        if stop_early:
+            key += '|stop_early'
+        return await self.inflight.do(key, lambda: self.fetch_and_scrape(url, image_options, stop_early))
+    
+    async def fetch_and_scrape(self, url: str, image_options: Dict[str, Any] = None,
+                               stop_early: bool = False) -> Dict[str, Any]:
+        """
+        Descarga, parsea y procesa una URL (sin deduplicación)
         
-        # 4. Extraer URLs de imágenes
-        from bs4 import BeautifulSoup
-        soup = await asyncio.to_thread(BeautifulSoup, html_content, 'lxml')
-        image_urls = await asyncio.to_thread(extract_image_urls, soup, url, 5)
+        Args:
+            url: URL a scrapear
+            image_options: Opciones de thumbnails para el servidor B
+            stop_early: Cortar la descarga al tener los datos (con --parser stream)
+            
+        Returns:
+            Dict con todos los datos extraídos y procesados
+        """
+        scraping_data, image_urls, page = await self.fetch_and_parse(url, stop_early)
         
-        # 5. Comunicarse con servidor de procesamiento para tareas CPU-bound
-        processing_data = await self.request_processing(url, image_urls)
+        # 4. Comunicarse con servidor de procesamiento para tareas CPU-bound
+        if image_options:
+            processing_data = await self.request_processing(url, image_urls, page, image_options)
+        else:
+            processing_data = await self.request_processing(url, image_urls, page)
         
-        # 6. Construir respuesta consolidada
+        # 5. Construir respuesta consolidada
         result = {
             'url': url,
             'timestamp': datetime.now().isoformat(),
@@ -134,37 +622,134 @@ class ScrapingServer:
         
         return result
     
-    async def request_processing(self, url: str, image_urls: list) -> Dict[str, Any]:
+    async def fetch_and_parse(self, url: str, stop_early: bool = False):
+        """
+        Descarga y parsea una URL (la parte barata del scraping)
+        
+        Args:
+            url: URL a scrapear
+            stop_early: Con --parser stream, dejar de descargar cuando se cerró
+                        el <head> y se alcanzaron los límites de enlaces e
+                        imágenes (los conteos de la página quedan parciales)
+            
+        Returns:
+            Tuple: (datos extraídos, URLs de imágenes, datos de la descarga
+            para el análisis de rendimiento; None si la página salió de la
+            caché HTTP, así el servidor B mide la página él mismo)
+        """
+        # 1-2. Obtener el HTML y parsearlo una sola vez: datos, metadatos, imágenes y recursos
+        cached = False
+        if self.parser == 'stream':
+            parsed, status_code, size_bytes, load_time_ms = await self.fetch_streaming(url, stop_early)
+        else:
+            start = time.perf_counter()
+            html_content, status_code, headers = await self.http_client.fetch_url(url)
+            load_time_ms = (time.perf_counter() - start) * 1000
+            cached = headers.get('X-Cache') in ('HIT', 'REVALIDATED')
+            size_bytes = len(html_content.encode('utf-8'))
+            # Parseo en el ejecutor configurado (hilos, procesos o en línea)
+            parsed = await self.parse_executor.run(parse_page, html_content, url, 5)
+        
+        image_urls = parsed.pop('image_urls')
+        resources = parsed.pop('resources')
+        
+        # 3. El análisis de rendimiento reutiliza esta descarga en lugar de
+        # repetirla; una página servida desde la caché no tiene un tiempo de
+        # carga real que informar
+        if cached:
+            return parsed, image_urls, None
+        page = {
+            'load_time_ms': load_time_ms,
+            'size_bytes': size_bytes,
+            'status_code': status_code,
+            'resources': resources
+        }
+        return parsed, image_urls, page
+    
+    async def fetch_streaming(self, url: str, stop_early: bool = False):
+        """
+        Descarga la página y la parsea a medida que llegan los chunks
+        
+        La página nunca se guarda completa en memoria. Los chunks se juntan
+        hasta STREAM_FEED_BYTES y cada lote se parsea en el ejecutor de
+        parseo (run_local: el extractor vive en este proceso), así lxml no
+        bloquea el event loop. El tiempo de carga informado descuenta el
+        tiempo dedicado a parsear.
+        
+        Args:
+            url: URL a scrapear
+            stop_early: Dejar de descargar cuando el extractor ya tiene los datos
+            
+        Returns:
+            Tuple: (datos extraídos, status code, bytes leídos, tiempo de carga en ms)
+        """
+        extractor = StreamingHTMLExtractor(url, image_limit=5, stop_early=stop_early)
+        parse_time = 0.0
+        batch = []
+        batch_bytes = 0
+        
+        def on_headers(status, headers, charset):
+            extractor.encoding = charset
+        
+        async def feed():
+            nonlocal parse_time, batch_bytes
+            data = batch[0] if len(batch) == 1 else b''.join(batch)
+            batch.clear()
+            batch_bytes = 0
+            start = time.perf_counter()
+            done = await self.parse_executor.run_local(extractor.feed, data)
+            parse_time += time.perf_counter() - start
+            return done
+        
+        async def on_chunk(chunk):
+            nonlocal batch_bytes
+            batch.append(chunk)
+            batch_bytes += len(chunk)
+            return batch_bytes >= STREAM_FEED_BYTES and await feed()
+        
+        start = time.perf_counter()
+        status_code, headers, size_bytes = await self.http_client.fetch_stream(url, on_chunk, on_headers)
+        load_time_ms = (time.perf_counter() - start - parse_time) * 1000
+        
+        if batch:
+            await feed()
+        parsed = await self.parse_executor.run_local(extractor.close)
+        return parsed, status_code, size_bytes, load_time_ms
+    
+    async def request_processing(self, url: str, image_urls: list, page: Dict[str, Any] = None,
+                                 image_options: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Solicita procesamiento al servidor B de forma asíncrona
         
         Args:
             url: URL de la página
             image_urls: Lista de URLs de imágenes
+            page: Datos de la descarga ya hecha, para el análisis de rendimiento
+            image_options: Opciones de thumbnails (con 'sizes' se piden sets de thumbnails)
             
         Returns:
             Dict con datos procesados
         """
         try:
-            # Crear tareas para solicitar procesamiento en paralelo
-            # Cada tarea abre su propia conexión para evitar conflictos
-            tasks = [
-                self.request_screenshot(url),
-                self.request_performance(url),
-                self.request_image_processing(url, image_urls)
-            ]
-            
-            # Ejecutar todas las tareas en paralelo
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Las tres peticiones corren en paralelo y comparten las conexiones
+            # persistentes del pool (multiplexadas por task_id)
+            components = self.processing_components(url, image_urls, page, image_options)
+            results = await asyncio.gather(*(self.collect_component(name, request)
+                                             for name, request in components.items()))
             
             # Construir resultado
-            processing_data = {
-                'screenshot': results[0] if not isinstance(results[0], Exception) else None,
-                'performance': results[1] if not isinstance(results[1], Exception) else {},
-                'thumbnails': results[2] if not isinstance(results[2], Exception) else []
-            }
+            processing_data = {'screenshot': None, 'performance': {}, 'thumbnails': []}
+            errors = {}
+            for name, value, error in results:
+                processing_data[name] = value
+                if error:
+                    errors[name] = error
+            if errors:
+                processing_data['errors'] = errors
             
-            return processing_data
+            # Screenshot y thumbnails llegan como bytes crudos desde el servidor B;
+            # solo se codifican en base64 aquí, para la respuesta JSON al cliente
+            return encode_binary_base64(processing_data)
             
         except ConnectionRefusedError:
             print(f"Error: No se pudo conectar al servidor de procesamiento en {self.processing_host}:{self.processing_port}")
@@ -182,22 +767,58 @@ class ScrapingServer:
                 'thumbnails': []
             }
     
-    async def request_screenshot(self, url: str) -> str:
-        """Solicita screenshot al servidor de procesamiento"""
-        reader, writer = None, None
-        try:
-            # Abrir conexión dedicada
-            reader, writer = await asyncio.open_connection(
-                self.processing_host,
-                self.processing_port
-            )
+    def processing_components(self, url: str, image_urls: list, page: Dict[str, Any] = None,
+                              image_options: Dict[str, Any] = None, job_id: str = None) -> Dict[str, Any]:
+        """
+        Arma las peticiones al servidor B de un scraping, sin ejecutarlas
+        
+        Args:
+            url: URL de la página
+            image_urls: Lista de URLs de imágenes
+            page: Datos de la descarga ya hecha, para el análisis de rendimiento
+            image_options: Opciones de thumbnails (con 'sizes' se piden sets de thumbnails)
+            job_id: Trabajo al que pertenecen (se usa en los task_id para seguirlas en el servidor B)
             
-            # Crear y enviar petición
-            request = create_screenshot_request(url)
-            await request.send_message(writer)
+        Returns:
+            Dict: Corrutina de cada componente (screenshot, performance y
+            thumbnails o thumbnail_sets), acotada por su plazo
+        """
+        def task_id(name):
+            return f'{job_id}:{name}' if job_id else None
+        
+        images = 'thumbnail_sets' if image_options and image_options.get('sizes') else 'thumbnails'
+        requests = {
+            'screenshot': self.request_screenshot(url, task_id('screenshot')),
+            'performance': self.request_performance(url, page, task_id('performance')),
+            images: self.request_image_processing(url, image_urls, image_options, task_id(images))
+        }
+        return {name: asyncio.wait_for(request, self.component_deadlines[name])
+                for name, request in requests.items()}
+    
+    async def collect_component(self, name: str, request) -> tuple:
+        """
+        Espera un componente de processing_components sin propagar errores
+        
+        Args:
+            name: Nombre del componente
+            request: Corrutina de processing_components
             
-            # Recibir respuesta
-            response = await ProtocolMessage.receive_message(reader)
+        Returns:
+            Tuple: (nombre, valor, error); si vence el plazo o falla, el
+            valor es el de COMPONENT_DEFAULTS y error explica por qué
+        """
+        try:
+            return name, await request, None
+        except asyncio.TimeoutError:
+            print(f"Plazo excedido esperando {name}")
+            return name, COMPONENT_DEFAULTS[name], f'Plazo de {self.component_deadlines[name]:g} s excedido'
+        except Exception as e:
+            return name, COMPONENT_DEFAULTS[name], str(e)
+    
+    async def request_screenshot(self, url: str, task_id: str = None) -> str:
+        """Solicita screenshot al servidor de procesamiento"""
+        try:
+            response = await self.processing_pool.request(create_screenshot_request(url, task_id))
             
             if response.msg_type == MSG_TYPE_RESPONSE:
                 return response.data.get('screenshot')
@@ -207,25 +828,16 @@ class ScrapingServer:
         except Exception as e:
             print(f"Error en request_screenshot: {str(e)}")
             return None
-        finally:
-            if writer:
-                writer.close()
-                await writer.wait_closed()
     
-    async def request_performance(self, url: str) -> Dict:
+    async def request_performance(self, url: str, page: Dict[str, Any] = None, task_id: str = None) -> Dict:
         """Solicita análisis de rendimiento al servidor de procesamiento"""
-        reader, writer = None, None
         try:
-            # Abrir conexión dedicada
-            reader, writer = await asyncio.open_connection(
-                self.processing_host,
-                self.processing_port
-            )
-            
-            request = create_performance_request(url)
-            await request.send_message(writer)
-            
-            response = await ProtocolMessage.receive_message(reader)
+            options = {}
+            if self.page_weight:
+                options['page_weight'] = True
+            if self.waterfall_samples:
+                options['waterfall_samples'] = self.waterfall_samples
+            response = await self.processing_pool.request(create_performance_request(url, task_id, page=page, options=options))
             
             if response.msg_type == MSG_TYPE_RESPONSE:
                 return response.data.get('performance', {})
@@ -235,42 +847,200 @@ class ScrapingServer:
         except Exception as e:
             print(f"Error en request_performance: {str(e)}")
             return {}
-        finally:
-            if writer:
-                writer.close()
-                await writer.wait_closed()
     
-    async def request_image_processing(self, url: str, image_urls: list) -> list:
-        """Solicita procesamiento de imágenes al servidor de procesamiento"""
-        reader, writer = None, None
+    async def request_image_processing(self, url: str, image_urls: list,
+                                       options: Dict[str, Any] = None, task_id: str = None) -> list:
+        """Solicita procesamiento de imágenes al servidor de procesamiento (thumbnails o sets)"""
+        key = 'thumbnail_sets' if options and options.get('sizes') else 'thumbnails'
         try:
-            # Abrir conexión dedicada
-            reader, writer = await asyncio.open_connection(
-                self.processing_host,
-                self.processing_port
+            response = await self.processing_pool.request(
+                create_image_processing_request(url, image_urls, task_id, options=options)
             )
             
-            request = create_image_processing_request(url, image_urls)
-            await request.send_message(writer)
-            
-            response = await ProtocolMessage.receive_message(reader)
-            
             if response.msg_type == MSG_TYPE_RESPONSE:
-                return response.data.get('thumbnails', [])
+                return response.data.get(key, [])
             else:
                 return []
                 
         except Exception as e:
             print(f"Error en request_image_processing: {str(e)}")
             return []
-        finally:
-            if writer:
-                writer.close()
-                await writer.wait_closed()
     
     async def handle_health(self, request: web.Request) -> web.Response:
-        """Endpoint de health check"""
-        return web.json_response({'status': 'healthy', 'service': 'scraping-server'})
+        """Endpoint de health check (incluye estadísticas del servidor B si responde)"""
+        health = {
+            'status': 'healthy',
+            'service': 'scraping-server',
+            'scrapes': self.inflight.stats(),
+            'jobs': self.jobs.stats(),
+            'http_cache': self.http_cache.stats() if self.http_cache else None,
+            'http_connections': self.http_client.connection_stats.stats() if self.http_client else None,
+            'crawls': dict(
+                self.crawls,
+                rate_limiter=self.rate_limiter.stats(),
+                robots=self.robots.stats() if self.robots else None
+            ),
+            'parse_executor': self.parse_executor.info()
+        }
+        try:
+            response = await self.processing_pool.request(create_stats_request(), timeout=2)
+            if response.msg_type == MSG_TYPE_RESPONSE:
+                health['processing'] = response.data.get('stats')
+        except Exception as e:
+            health['processing'] = {'error': str(e)}
+        return web.json_response(health)
+
+
+def describe_scrape_error(url: str, error: Exception):
+    """
+    Traduce un error de scraping a status HTTP y mensaje
+    
+    Args:
+        url: URL scrapeada
+        error: Excepción de scrape_url
+        
+    Returns:
+        Tuple: (status HTTP, mensaje)
+    """
+    if isinstance(error, asyncio.TimeoutError):
+        return 504, f'Timeout al acceder a {url}'
+    if isinstance(error, aiohttp.ClientError):
+        return 502, f'Error de cliente: {str(error)}'
+    return 500, f'Error interno: {str(error)}'
+
+
+def parse_batch_item(item):
+    """
+    Extrae la URL de un elemento de lote
+    
+    Acepta una URL, un string JSON o un objeto {"url": ...}. Las líneas
+    vacías y los comentarios (#) se ignoran.
+    
+    Args:
+        item: Elemento de la lista JSON o línea NDJSON/texto
+        
+    Returns:
+        str: URL o None si el elemento no tiene URL
+    """
+    if isinstance(item, dict):
+        return item.get('url') or None
+    if not isinstance(item, str):
+        raise ValueError(f'Elemento de lote inválido: {item!r}')
+    
+    item = item.strip()
+    if not item or item.startswith('#'):
+        return None
+    if item[0] in '{"':
+        return parse_batch_item(json.loads(item))
+    return item
+
+
+def parse_deadlines(values: list) -> Dict[str, float]:
+    """
+    Lee los plazos de --deadline (COMPONENTE=SEGUNDOS)
+    
+    Args:
+        values: Valores de --deadline
+        
+    Returns:
+        Dict con el plazo de cada componente indicado
+        
+    Raises:
+        ValueError: Si el componente no existe o el plazo no es un número positivo
+    """
+    deadlines = {}
+    for value in values:
+        name, sep, seconds = value.partition('=')
+        if not sep or name not in COMPONENT_DEADLINES:
+            raise ValueError(f"Plazo inválido: {value} (componentes: {', '.join(COMPONENT_DEADLINES)})")
+        try:
+            deadlines[name] = float(seconds)
+        except ValueError:
+            raise ValueError(f"Plazo inválido: {value} (se esperan segundos)")
+        if deadlines[name] <= 0:
+            raise ValueError(f"Plazo inválido: {value} (debe ser positivo)")
+    return deadlines
+
+
+def parse_crawl_query(query) -> Dict[str, Any]:
+    """
+    Lee las opciones de /crawl
+    
+    Args:
+        query: Query string (max_pages, max_depth, same_domain, concurrency)
+        
+    Returns:
+        Dict con max_pages, max_depth, same_domain y concurrency (0 = la del servidor)
+        
+    Raises:
+        ValueError: Si algún valor no es un número o está fuera de rango
+    """
+    try:
+        options = {
+            'max_pages': int(query.get('max_pages', 50)),
+            'max_depth': int(query.get('max_depth', 2)),
+            'concurrency': int(query.get('concurrency', 0))
+        }
+    except ValueError:
+        raise ValueError("max_pages, max_depth y concurrency deben ser enteros")
+    if not 1 <= options['max_pages'] <= MAX_CRAWL_PAGES:
+        raise ValueError(f"max_pages debe estar entre 1 y {MAX_CRAWL_PAGES}")
+    if not 0 <= options['max_depth'] <= MAX_CRAWL_DEPTH:
+        raise ValueError(f"max_depth debe estar entre 0 y {MAX_CRAWL_DEPTH}")
+    options['same_domain'] = query.get('same_domain', '1').lower() not in ('0', 'false', 'no')
+    return options
+
+
+def parse_stop_early_query(query) -> bool:
+    """
+    Lee la opción stop_early de los query parameters de /scrape y /scrape/batch
+    
+    Args:
+        query: Query parameters de la petición
+        
+    Returns:
+        bool: True si se pidió cortar la descarga al tener los datos
+    """
+    return query.get('stop_early', '0').lower() in ('1', 'true', 'yes')
+
+
+def parse_thumbnail_query(query) -> Dict[str, Any]:
+    """
+    Lee las opciones de thumbnails de los query parameters de /scrape
+    
+    - thumb_sizes: tamaños separados por coma (ej: 640x480,320x240,160x120)
+    - thumb_formats: formatos de cada tamaño (ej: jpeg,webp)
+    - thumb_preset: 'fast', 'balanced' o 'quality'
+    
+    La validación de tamaños y formatos disponibles la hace el servidor B.
+    
+    Args:
+        query: Query parameters de la petición
+        
+    Returns:
+        Dict con las opciones (vacío si no se pidió nada)
+        
+    Raises:
+        ValueError: Si algún tamaño no tiene la forma ANCHOxALTO
+    """
+    options = {}
+    
+    if query.get('thumb_sizes'):
+        sizes = []
+        for size in query['thumb_sizes'].split(','):
+            width, sep, height = size.strip().lower().partition('x')
+            if not sep or not width.isdigit() or not height.isdigit():
+                raise ValueError(f"Tamaño de thumbnail inválido: {size} (se espera ANCHOxALTO)")
+            sizes.append([int(width), int(height)])
+        options['sizes'] = sizes
+        
+        if query.get('thumb_formats'):
+            options['formats'] = [name.strip() for name in query['thumb_formats'].split(',') if name.strip()]
+    
+    if query.get('thumb_preset'):
+        options['preset'] = query['thumb_preset']
+    
+    return options
 
 
 async def create_app(server: ScrapingServer) -> web.Application:
@@ -287,6 +1057,10 @@ async def create_app(server: ScrapingServer) -> web.Application:
     
     # Registrar rutas
     app.router.add_get('/scrape', server.handle_scrape)
+    app.router.add_post('/scrape/batch', server.handle_batch)
+    app.router.add_get('/crawl', server.handle_crawl)
+    app.router.add_post('/jobs', server.handle_create_job)
+    app.router.add_get('/jobs/{job_id}', server.handle_get_job)
     app.router.add_get('/health', server.handle_health)
     
     # Inicializar y cleanup
@@ -321,7 +1095,14 @@ def parse_arguments():
         '-w', '--workers',
         type=int,
         default=4,
-        help='Número de workers (default: 4)'
+        help='Hilos o procesos del ejecutor de parseo (default: 4)'
+    )
+    
+    parser.add_argument(
+        '--executor',
+        choices=EXECUTOR_KINDS,
+        default='thread',
+        help='Dónde corre el parseo HTML: thread, process o inline (default: thread)'
     )
     
     parser.add_argument(
@@ -338,7 +1119,152 @@ def parse_arguments():
         help='Puerto del servidor de procesamiento (default: 9000)'
     )
     
-    return parser.parse_args()
+    parser.add_argument(
+        '--processing-connections',
+        type=int,
+        default=2,
+        help='Conexiones persistentes hacia el servidor de procesamiento (default: 2)'
+    )
+    
+    parser.add_argument(
+        '--parser',
+        choices=['soup', 'stream'],
+        default='soup',
+        help='Extractor HTML: soup (BeautifulSoup) o stream (lxml incremental, memoria acotada) (default: soup)'
+    )
+    
+    parser.add_argument(
+        '--page-weight',
+        action='store_true',
+        help='Medir el peso real de cada página descargando sus subrecursos (más lento)'
+    )
+    
+    parser.add_argument(
+        '--waterfall-samples',
+        type=int,
+        default=0,
+        help='Muestras del desglose DNS/conexión/TLS/TTFB/descarga por página (default: 0, no medir; máximo 10)'
+    )
+    
+    parser.add_argument(
+        '--batch-concurrency',
+        type=int,
+        default=8,
+        help='Scrapes simultáneos máximos por lote de /scrape/batch (default: 8)'
+    )
+    
+    parser.add_argument(
+        '--max-page-mb',
+        type=float,
+        default=MAX_BODY_BYTES / 1024 / 1024,
+        help='Tamaño máximo de una página en MB; una más grande falla sin leerse entera (default: 10)'
+    )
+    
+    parser.add_argument(
+        '--http-cache-path',
+        type=str,
+        default=DEFAULT_HTTP_CACHE_PATH,
+        help='Archivo SQLite de la caché HTTP de páginas (default: cache/http_cache.sqlite)'
+    )
+    
+    parser.add_argument(
+        '--http-cache-max-mb',
+        type=int,
+        default=256,
+        help='Tamaño máximo de la caché HTTP en MB (default: 256)'
+    )
+    
+    parser.add_argument(
+        '--no-http-cache',
+        action='store_true',
+        help='Desactivar la caché HTTP de páginas'
+    )
+    
+    parser.add_argument(
+        '--connector-profile',
+        choices=list(CONNECTOR_PROFILES),
+        default='default',
+        help='Perfil de conexiones de las descargas: default (10 en total, 6 por host), '
+             'crawl (100, 4 por host) o gentle (4, 1 por host) (default: default)'
+    )
+    
+    parser.add_argument(
+        '--max-connections',
+        type=int,
+        help='Conexiones simultáneas totales (reemplaza al valor del perfil)'
+    )
+    
+    parser.add_argument(
+        '--max-per-host',
+        type=int,
+        help='Conexiones simultáneas por host, 0 = sin límite (reemplaza al valor del perfil)'
+    )
+    
+    parser.add_argument(
+        '--dns-ttl',
+        type=int,
+        help='Segundos de la caché DNS, 0 = sin caché (reemplaza al valor del perfil)'
+    )
+    
+    parser.add_argument(
+        '--keepalive-timeout',
+        type=float,
+        help='Segundos que una conexión ociosa queda abierta para reutilizarse (reemplaza al valor del perfil)'
+    )
+    
+    parser.add_argument(
+        '--deadline',
+        action='append',
+        default=[],
+        metavar='COMPONENTE=SEG',
+        help='Plazo de un componente del servidor B, repetible (ej: --deadline screenshot=10); '
+             f'componentes y defaults: {", ".join(f"{k}={v}" for k, v in COMPONENT_DEADLINES.items())}'
+    )
+    
+    parser.add_argument(
+        '--crawl-rate',
+        type=float,
+        default=1.0,
+        help='Peticiones por segundo máximas a cada dominio durante un crawl (default: 1.0)'
+    )
+    
+    parser.add_argument(
+        '--crawl-burst',
+        type=int,
+        default=2,
+        help='Peticiones seguidas permitidas a un dominio antes de aplicar --crawl-rate (default: 2)'
+    )
+    
+    parser.add_argument(
+        '--ignore-robots',
+        action='store_true',
+        help='No consultar robots.txt durante un crawl'
+    )
+    
+    parser.add_argument(
+        '--job-ttl',
+        type=float,
+        default=600,
+        help='Segundos que se conserva el resultado de un trabajo terminado de /jobs (default: 600)'
+    )
+    
+    args = parser.parse_args()
+    if args.crawl_rate <= 0 or args.crawl_burst < 1:
+        parser.error("--crawl-rate debe ser positivo y --crawl-burst al menos 1")
+    if args.max_page_mb <= 0:
+        parser.error("--max-page-mb debe ser positivo")
+    try:
+        args.deadline = parse_deadlines(args.deadline)
+        args.connector = resolve_profile(
+            args.connector_profile,
+            limit=args.max_connections,
+            limit_per_host=args.max_per_host,
+            dns_ttl=args.dns_ttl,
+            keepalive=args.keepalive_timeout
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    return args
 
 
 def main():
@@ -349,16 +1275,40 @@ def main():
     print("Servidor de Scraping Web Asíncrono (Parte A)")
     print("=" * 60)
     print(f"Escuchando en: {args.ip}:{args.port}")
-    print(f"Workers: {args.workers}")
+    print(f"Parseo: {args.executor} ({args.workers} workers)")
+    print(f"Conexiones: {args.connector['limit']} en total, {args.connector['limit_per_host'] or 'sin límite'} por host")
     print(f"Servidor de procesamiento: {args.processing_host}:{args.processing_port}")
     print("=" * 60)
     print("\nEndpoints disponibles:")
-    print("  GET /scrape?url=<URL>  - Realizar scraping de una URL")
+    print("  GET /scrape?url=<URL>  - Realizar scraping de una URL (&stream=ndjson|sse: respuesta progresiva)")
+    print("  POST /scrape/batch     - Scraping de un lote de URLs (resultados en NDJSON)")
+    print("  GET /crawl?url=<URL>   - Recorrer un sitio siguiendo enlaces (resultados en NDJSON)")
+    print("  POST /jobs?url=<URL>   - Scraping en segundo plano (devuelve un ID)")
+    print("  GET /jobs/<ID>         - Estado y resultados parciales de un trabajo")
     print("  GET /health            - Health check")
     print("\nPresiona Ctrl+C para detener el servidor\n")
     
     # Crear servidor
-    server = ScrapingServer(args.processing_host, args.processing_port)
+    server = ScrapingServer(
+        args.processing_host,
+        args.processing_port,
+        args.processing_connections,
+        parser=args.parser,
+        executor=args.executor,
+        workers=args.workers,
+        page_weight=args.page_weight,
+        waterfall_samples=args.waterfall_samples,
+        batch_concurrency=args.batch_concurrency,
+        job_ttl=args.job_ttl,
+        component_deadlines=args.deadline,
+        http_cache_path=None if args.no_http_cache else args.http_cache_path,
+        http_cache_max_bytes=args.http_cache_max_mb * 1024 * 1024,
+        connector_profile=args.connector,
+        crawl_rate=args.crawl_rate,
+        crawl_burst=args.crawl_burst,
+        respect_robots=not args.ignore_robots,
+        max_page_bytes=int(args.max_page_mb * 1024 * 1024)
+    )
     
     # Ejecutar aplicación
     try:
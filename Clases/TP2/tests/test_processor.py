@@ -1,9 +1,19 @@
 import io
+import socket
+import time
 import base64
+import struct
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from PIL import Image
 import pytest
 
-from processor import image_processor
+from processor import image_processor, performance, http_session
+from processor.browser_pool import BrowserPool
+from processor.result_cache import ResultCache
+from processor.http_session import DNSCache, system_getaddrinfo
+from processor.page_weight import measure_page_weight
+from processor import timing
 
 
 def make_image_bytes(format='PNG', size=(300, 200), color=(255, 0, 0)):
@@ -23,6 +33,85 @@ def test_create_thumbnail_returns_base64_and_decodable():
 	assert img.format in ('JPEG', 'JPG')
 
 
+@pytest.mark.parametrize('preset', list(image_processor.THUMBNAIL_PRESETS))
+def test_thumbnail_presets_respect_size(preset):
+	img_bytes = make_image_bytes(format='JPEG', size=(1600, 1200))
+	thumb = image_processor.create_thumbnail_bytes(img_bytes, size=(150, 150), preset=preset)
+	img = Image.open(io.BytesIO(thumb))
+	assert img.format == 'JPEG'
+	assert img.width == 150 and img.height in (112, 113)
+
+
+def test_thumbnail_composites_alpha_on_white():
+	# Mitad izquierda roja opaca, mitad derecha transparente
+	img = Image.new('RGBA', (600, 300), (0, 0, 0, 0))
+	img.paste((255, 0, 0, 255), (0, 0, 300, 300))
+	buf = io.BytesIO()
+	img.save(buf, format='PNG')
+	thumb = Image.open(io.BytesIO(image_processor.create_thumbnail_bytes(buf.getvalue())))
+	assert thumb.mode == 'RGB'
+	r, g, b = thumb.getpixel((10, 37))
+	assert r > 230 and g < 30 and b < 30
+	assert min(thumb.getpixel((140, 37))) > 230
+
+
+def test_thumbnail_handles_palette_with_transparency():
+	img = Image.new('P', (400, 400), 0)
+	img.putpalette([0, 0, 255] + [0, 0, 0] * 255)
+	img.paste(1, (200, 0, 400, 400))
+	buf = io.BytesIO()
+	img.save(buf, format='PNG', transparency=1)
+	thumb = Image.open(io.BytesIO(image_processor.create_thumbnail_bytes(buf.getvalue())))
+	assert thumb.size == (150, 150)
+	r, g, b = thumb.getpixel((10, 75))
+	assert b > 200 and r < 40
+	assert min(thumb.getpixel((140, 75))) > 230
+
+
+def test_thumbnail_unknown_preset_returns_none():
+	assert image_processor.create_thumbnail_bytes(make_image_bytes(), preset='turbo') is None
+
+
+def test_create_thumbnail_set_decodes_once(monkeypatch):
+	img_bytes = make_image_bytes(format='JPEG', size=(1600, 1200))
+	opened = []
+	real_open = image_processor.Image.open
+	monkeypatch.setattr(image_processor.Image, 'open', lambda fp: opened.append(fp) or real_open(fp))
+
+	sizes = [(160, 160), (640, 640), (320, 320)]
+	variants = image_processor.create_thumbnail_set(img_bytes, sizes, ['JPEG', 'WEBP'])
+	assert len(opened) == 1
+	assert [(v['size'], v['format']) for v in variants] == [
+		([160, 160], 'jpeg'), ([160, 160], 'webp'),
+		([640, 640], 'jpeg'), ([640, 640], 'webp'),
+		([320, 320], 'jpeg'), ([320, 320], 'webp')
+	]
+	for variant in variants:
+		img = Image.open(io.BytesIO(variant['data']))
+		assert img.format == variant['format'].upper()
+		assert img.size == (variant['width'], variant['height'])
+		assert img.width == variant['size'][0]
+
+
+def test_thumbnail_set_webp_keeps_transparency():
+	img = Image.new('RGBA', (400, 400), (0, 0, 0, 0))
+	buf = io.BytesIO()
+	img.save(buf, format='PNG')
+	jpeg, webp = image_processor.create_thumbnail_set(buf.getvalue(), [(100, 100)], ['JPEG', 'WEBP'])
+	assert Image.open(io.BytesIO(jpeg['data'])).getpixel((50, 50)) == (255, 255, 255)
+	assert Image.open(io.BytesIO(webp['data'])).convert('RGBA').getpixel((50, 50))[3] == 0
+
+
+def test_validate_thumbnail_set_options():
+	sizes, formats = image_processor.validate_thumbnail_set_options([[320, 240]], ['webp', 'jpeg', 'WEBP'])
+	assert sizes == [(320, 240)]
+	assert formats == ['WEBP', 'JPEG']
+	for bad_sizes, bad_formats in [([], None), ([[0, 10]], None), ([[10, 10]] * 7, None),
+	                               ([[10, 10]], ['gif'])]:
+		with pytest.raises(ValueError):
+			image_processor.validate_thumbnail_set_options(bad_sizes, bad_formats)
+
+
 def test_optimize_image_reduces_large_images():
 	# Large image to trigger resizing
 	img_bytes = make_image_bytes(size=(2000, 2000))
@@ -49,6 +138,70 @@ def test_create_multiple_thumbnails_creates_all_sizes():
 		assert isinstance(t, str)
 
 
+@pytest.fixture
+def image_site():
+	"""Servidor local: path -> (cuerpo, content-type, enviar Content-Length)"""
+	routes = {}
+
+	class Handler(BaseHTTPRequestHandler):
+		def do_GET(self):
+			body, content_type, with_length = routes[self.path]
+			self.send_response(200)
+			self.send_header('Content-Type', content_type)
+			if with_length:
+				self.send_header('Content-Length', str(len(body)))
+			self.end_headers()
+			try:
+				self.wfile.write(body)
+			except (BrokenPipeError, ConnectionResetError):
+				pass
+
+		def log_message(self, *args):
+			pass
+
+	httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+	threading.Thread(target=httpd.serve_forever, daemon=True).start()
+	base = f'http://127.0.0.1:{httpd.server_address[1]}'
+
+	def add(path, body, content_type='image/png', with_length=True):
+		routes[path] = (body, content_type, with_length)
+		return base + path
+
+	yield add
+	httpd.shutdown()
+
+
+def test_download_image_returns_valid_image(image_site):
+	img_bytes = make_image_bytes(format='JPEG', size=(640, 480))
+	url = image_site('/ok.jpg', img_bytes, 'application/octet-stream', with_length=False)
+	assert image_processor.download_image(url) == img_bytes
+
+
+def test_download_image_enforces_size_limit(image_site):
+	body = make_image_bytes(size=(50, 50)) + b'\0' * 200_000
+	announced = image_site('/big.png', body)
+	streamed = image_site('/big-chunked.png', body, with_length=False)
+	assert image_processor.download_image(announced, max_bytes=100_000) is None
+	assert image_processor.download_image(streamed, max_bytes=100_000) is None
+	assert image_processor.download_image(streamed, max_bytes=1_000_000) == body
+
+
+def test_download_image_rejects_non_images_and_bombs(image_site):
+	html = image_site('/fake.png', b'<html><body>not an image</body></html>', 'image/png')
+	# Encabezado PNG de 100000 x 100000 píxeles: se rechaza sin decodificar
+	ihdr = struct.pack('>II5B', 100_000, 100_000, 8, 2, 0, 0, 0)
+	bomb = image_site('/bomb.png', b'\x89PNG\r\n\x1a\n' + struct.pack('>I', 13) + b'IHDR' + ihdr + b'\0' * 100)
+	assert image_processor.download_image(html) is None
+	assert image_processor.download_image(bomb) is None
+
+
+def test_download_image_accepts_formats_without_own_sniffer(image_site):
+	img_bytes = make_image_bytes(format='TIFF', size=(320, 240))
+	url = image_site('/scan.tif', img_bytes, 'image/tiff', with_length=False)
+	assert image_processor.download_image(url) == img_bytes
+	assert image_processor.create_thumbnail_bytes(img_bytes) is not None
+
+
 def test_process_images_uses_download_and_creates_thumbnails(monkeypatch):
 	# Prepare two urls, one that returns image bytes and one that fails
 	good_url = 'https://good/image1.jpg'
@@ -79,3 +232,427 @@ def test_process_images_parallel_counts(monkeypatch):
 	assert result['failed_count'] == 0
 	assert len(result['thumbnails']) == 2
 
+
+def test_process_images_parallel_sets_only_report_thumbnail_sets(monkeypatch):
+	img_bytes = make_image_bytes()
+	monkeypatch.setattr(image_processor, 'download_image', lambda url, timeout=10: img_bytes)
+
+	result = image_processor.process_images_parallel(['https://site/img.jpg'], max_images=1,
+													 encode_base64=False, sizes=[(64, 64), (32, 32)])
+	assert 'thumbnails' not in result
+	assert result['processed_count'] == 1
+	assert [variant['size'] for variant in result['thumbnail_sets'][0]] == [[64, 64], [32, 32]]
+
+
+def test_process_images_parallel_overlaps_downloads(monkeypatch):
+	img_bytes = make_image_bytes()
+
+	def slow_download(url, timeout=10):
+		time.sleep(0.2)
+		return img_bytes
+
+	monkeypatch.setattr(image_processor, 'download_image', slow_download)
+	urls = [f'https://site{i}/img.jpg' for i in range(5)]
+	start = time.monotonic()
+	result = image_processor.process_images_parallel(urls, max_images=5)
+	elapsed = time.monotonic() - start
+
+	# 5 descargas de 0.2 s en paralelo: cerca de max(imagen), no de la suma (1 s)
+	assert result['processed_count'] == 5
+	assert elapsed < 0.6
+
+
+def test_process_images_parallel_limits_per_host_and_applies_deadline(monkeypatch):
+	img_bytes = make_image_bytes()
+	active = {'now': 0, 'max': 0}
+	lock = threading.Lock()
+
+	def download(url, timeout=10):
+		with lock:
+			active['now'] += 1
+			active['max'] = max(active['max'], active['now'])
+		time.sleep(2 if 'slow' in url else 0.05)
+		with lock:
+			active['now'] -= 1
+		return img_bytes
+
+	monkeypatch.setattr(image_processor, 'download_image', download)
+	urls = ['https://a/slow.jpg'] + [f'https://a/{i}.jpg' for i in range(4)]
+	start = time.monotonic()
+	result = image_processor.process_images_parallel(urls, max_images=5, per_host=2, deadline=0.5)
+
+	assert time.monotonic() - start < 1
+	assert active['max'] == 2
+	assert result['processed_count'] == 4
+	assert result['timed_out_count'] == 1
+	assert result['failed_count'] == 1
+
+
+def test_process_images_parallel_deadline_starts_when_each_download_starts(monkeypatch):
+	img_bytes = make_image_bytes()
+
+	def download(url, timeout=10):
+		time.sleep(0.25 if 'slow' in url else 0.02)
+		return img_bytes
+
+	monkeypatch.setattr(image_processor, 'download_image', download)
+	# Con un solo hilo por host la rápida espera ~0.5 s en cola, más que su deadline
+	urls = ['https://a/slow1.jpg', 'https://a/slow2.jpg', 'https://a/fast.jpg']
+	start = time.monotonic()
+	result = image_processor.process_images_parallel(urls, max_images=3, per_host=1, deadline=0.4)
+
+	assert result['processed_count'] == 3 and result['timed_out_count'] == 0
+	assert 0.5 <= time.monotonic() - start < 1
+
+	# El tope del lote sí cuenta la cola
+	result = image_processor.process_images_parallel(urls, max_images=3, per_host=1, deadline=0.4,
+													 batch_deadline=0.35)
+	assert result['processed_count'] == 1 and result['timed_out_count'] == 2
+
+
+class FakeDriver:
+	def __init__(self):
+		self.alive = True
+		self.quit_called = False
+		self.visited = []
+
+	def execute_script(self, script):
+		if not self.alive:
+			raise RuntimeError('browser crashed')
+		return 1
+
+	def get(self, url):
+		if not self.alive:
+			raise RuntimeError('browser crashed')
+		self.visited.append(url)
+
+	def delete_all_cookies(self):
+		pass
+
+	def quit(self):
+		self.quit_called = True
+
+
+def test_browser_pool_reuses_and_recycles_after_max_pages():
+	drivers = []
+
+	def factory():
+		drivers.append(FakeDriver())
+		return drivers[-1]
+
+	pool = BrowserPool(factory, size=1, max_pages=3)
+	for i in range(5):
+		with pool.browser() as driver:
+			driver.get(f'https://site/{i}')
+
+	# 3 páginas con el primer navegador, 2 con el segundo
+	assert len(drivers) == 2
+	assert drivers[0].quit_called
+	assert [u for u in drivers[0].visited if u != 'about:blank'] == ['https://site/0', 'https://site/1', 'https://site/2']
+	assert pool.health_check()['idle'] == 1
+
+
+def test_browser_pool_replaces_crashed_browsers():
+	drivers = []
+
+	def factory():
+		drivers.append(FakeDriver())
+		return drivers[-1]
+
+	pool = BrowserPool(factory, size=1, max_pages=10)
+	pool.warm()
+	drivers[0].alive = False
+
+	# El navegador caído se detecta al pedirlo y se reemplaza
+	with pool.browser() as driver:
+		assert driver is drivers[1]
+
+	# Una excepción durante el uso descarta el navegador
+	with pytest.raises(RuntimeError):
+		with pool.browser() as driver:
+			raise RuntimeError('timeout')
+	assert drivers[1].quit_called
+	assert pool.health_check() == {'idle': 0, 'size': 1, 'created': 2, 'recycled': 2}
+
+
+def test_result_cache_hits_misses_and_ttl(tmp_path):
+	cache = ResultCache(str(tmp_path / 'cache.sqlite'), ttl=60)
+	key = ResultCache.make_key(2, 'https://site', {'a': 1})
+	assert key == ResultCache.make_key(2, 'https://site', {'a': 1})
+	assert key != ResultCache.make_key(2, 'https://site', {'a': 2})
+
+	assert cache.get(key) is None
+	cache.put(key, {'load_time_ms': 10, 'png': b'\x89PNG'})
+	assert cache.get(key) == {'load_time_ms': 10, 'png': b'\x89PNG'}
+
+	# Entrada vencida: cuenta como miss y se borra
+	cache.put('old', 'x', ttl=-1)
+	assert cache.get('old') is None
+	stats = cache.stats()
+	assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 1)
+	cache.close()
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+	blob = b'x' * 1000
+	cache = ResultCache(str(tmp_path / 'cache.sqlite'), max_bytes=2500)
+	cache.put('a', blob)
+	cache.put('b', blob)
+	cache.get('a')
+	cache.put('c', blob)
+
+	# 'b' fue la menos usada recientemente
+	assert cache.get('b') is None
+	assert cache.get('a') == blob
+	assert cache.get('c') == blob
+	assert cache.stats()['evictions'] == 1
+	cache.close()
+
+
+def test_analyze_performance_uses_page_without_refetching(monkeypatch):
+	def no_fetch(*args, **kwargs):
+		raise AssertionError('no debería descargar la página')
+
+	monkeypatch.setattr(performance.requests, 'get', no_fetch)
+	monkeypatch.setattr(performance, 'fetch_timed', no_fetch)
+	page = {
+		'load_time_ms': 120.456,
+		'size_bytes': 2048,
+		'status_code': 200,
+		'resources': {'images': ['a', 'b'], 'scripts': ['c'], 'stylesheets': [], 'other': []}
+	}
+	result = performance.analyze_performance('https://site', page=page)
+	assert result == {
+		'load_time_ms': 120.46,
+		'total_size_kb': 2.0,
+		'num_requests': 4,
+		'resources': {'images': 2, 'scripts': 1, 'stylesheets': 0, 'other': 0}
+	}
+
+
+def test_detailed_performance_uses_one_request_for_ttfb_and_load():
+	requests_seen = []
+
+	class SlowBodyHandler(BaseHTTPRequestHandler):
+		protocol_version = 'HTTP/1.1'
+
+		def do_GET(self):
+			requests_seen.append(self.path)
+			body = b'<html><body><img src="a.png"></body></html>'
+			self.send_response(200)
+			self.send_header('Content-Type', 'text/html')
+			self.send_header('Content-Length', str(len(body)))
+			self.end_headers()
+			self.wfile.flush()
+			# El cuerpo llega 200 ms después de los headers
+			time.sleep(0.2)
+			self.wfile.write(body)
+
+		def log_message(self, *args):
+			pass
+
+	httpd = ThreadingHTTPServer(('127.0.0.1', 0), SlowBodyHandler)
+	threading.Thread(target=httpd.serve_forever, daemon=True).start()
+	try:
+		result = performance.analyze_performance_detailed(f'http://127.0.0.1:{httpd.server_address[1]}/')
+	finally:
+		httpd.shutdown()
+
+	assert len(requests_seen) == 1
+	assert result['resources']['images'] == 1
+	assert result['ttfb_ms'] < 150
+	assert result['load_time_ms'] >= 200
+	assert result['network_ms'] >= 150
+
+
+def test_dns_cache_reuses_resolutions_until_ttl():
+	calls = []
+
+	def resolver(host, port, *args):
+		calls.append(host)
+		return [('addr', host)]
+
+	cache = DNSCache(ttl=0.1, resolver=resolver)
+	assert cache.getaddrinfo('site.test', 80) == [('addr', 'site.test')]
+	cache.getaddrinfo('site.test', 80)
+	cache.getaddrinfo('other.test', 80)
+	assert calls == ['site.test', 'other.test']
+	time.sleep(0.15)
+	cache.getaddrinfo('site.test', 80)
+	assert calls == ['site.test', 'other.test', 'site.test']
+	assert cache.stats() == {'hits': 1, 'misses': 3, 'entries': 2}
+
+
+def test_dns_cache_evicts_least_recently_used_hosts():
+	cache = DNSCache(resolver=lambda host, port, *args: [('addr', host)], max_entries=2)
+	cache.getaddrinfo('a.test', 80)
+	cache.getaddrinfo('b.test', 80)
+	cache.getaddrinfo('a.test', 80)
+	cache.getaddrinfo('c.test', 80)
+	assert cache.stats() == {'hits': 1, 'misses': 3, 'entries': 2}
+	cache.getaddrinfo('a.test', 80)
+	assert cache.stats()['hits'] == 2
+
+
+def test_dns_cache_is_scoped_to_the_session(monkeypatch, image_site):
+	resolved = []
+
+	def resolver(host, port, *args):
+		resolved.append(host)
+		return system_getaddrinfo('127.0.0.1', port, *args)
+
+	monkeypatch.setattr(http_session, '_dns_cache', DNSCache(resolver=resolver))
+	monkeypatch.setattr(http_session, '_session', None)
+	url = image_site('/a.png', make_image_bytes()).replace('127.0.0.1', 'images.test')
+	assert http_session.get_session().get(url, timeout=5).status_code == 200
+	assert resolved == ['images.test']
+	# El resto del proceso sigue usando la resolución del sistema
+	assert socket.getaddrinfo is system_getaddrinfo
+
+
+def test_measure_page_weight_reports_real_bytes_and_caches(monkeypatch):
+	hits = []
+
+	class AssetHandler(BaseHTTPRequestHandler):
+		def send_asset(self, with_body):
+			hits.append((self.command, self.path))
+			if self.path == '/slow.js':
+				time.sleep(1)
+			if self.path == '/missing.css':
+				self.send_error(404)
+				return
+			body = {'/app.css': b'c' * 3000, '/app.js': b'j' * 5000, '/slow.js': b's'}.get(self.path, b'i' * 7000)
+			self.send_response(200)
+			# Las imágenes no informan Content-Length: hay que descargarlas
+			if not self.path.endswith('.png'):
+				self.send_header('Content-Length', str(len(body)))
+			self.end_headers()
+			if with_body:
+				self.wfile.write(body)
+
+		def do_HEAD(self):
+			self.send_asset(False)
+
+		def do_GET(self):
+			self.send_asset(True)
+
+		def log_message(self, *args):
+			pass
+
+	httpd = ThreadingHTTPServer(('127.0.0.1', 0), AssetHandler)
+	threading.Thread(target=httpd.serve_forever, daemon=True).start()
+	base = f'http://127.0.0.1:{httpd.server_address[1]}'
+	resources = {
+		'images': [base + '/a.png', base + '/a.png'],
+		'scripts': [base + '/app.js', base + '/slow.js'],
+		'stylesheets': [base + '/app.css', base + '/missing.css'],
+		'other': []
+	}
+	try:
+		result = measure_page_weight(resources, html_bytes=1000, html_ms=50, deadline=0.5)
+		hits.clear()
+		again = measure_page_weight({'images': [base + '/a.png'], 'scripts': [base + '/app.js']})
+	finally:
+		httpd.shutdown()
+
+	assert result['by_type']['images'] == {'count': 1, 'bytes': 7000}
+	assert result['by_type']['scripts'] == {'count': 1, 'bytes': 5000}
+	assert result['by_type']['stylesheets'] == {'count': 1, 'bytes': 3000}
+	assert result['total_bytes'] == 1000 + 7000 + 5000 + 3000
+	assert result['timed_out'] == 1
+	assert result['failed'] == 1
+	assert result['critical_path_ms'] >= 50
+	assert result['critical_resource'] in (base + '/app.js', base + '/app.css')
+	assert len(result['slowest']) == 3
+	# Segunda página con recursos compartidos: salen de la caché
+	assert hits == []
+	assert again['cached'] == 2
+
+
+def test_percentile_interpolates():
+	assert timing.percentile([5.0], 90) == 5.0
+	assert timing.percentile([1, 2, 3, 4], 50) == 2.5
+	assert timing.percentile([4, 1, 3, 2], 100) == 4
+
+
+def test_waterfall_separates_ttfb_and_download_and_follows_redirects():
+	class SlowHandler(BaseHTTPRequestHandler):
+		def do_GET(self):
+			if self.path == '/old':
+				self.send_response(301)
+				self.send_header('Location', '/page')
+				self.end_headers()
+				return
+			time.sleep(0.1)
+			self.send_response(200)
+			self.end_headers()
+			self.wfile.flush()
+			time.sleep(0.1)
+			self.wfile.write(b'x' * 5000)
+
+		def log_message(self, *args):
+			pass
+
+	httpd = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+	threading.Thread(target=httpd.serve_forever, daemon=True).start()
+	try:
+		result = timing.waterfall_samples(f'http://127.0.0.1:{httpd.server_address[1]}/old', samples=2)
+	finally:
+		httpd.shutdown()
+
+	assert result['ok'] == 2
+	assert result['status'] == 200 and result['bytes'] == 5000
+	assert result['redirects'] == 1 and result['url'].endswith('/page')
+	assert result['tls_ms']['max'] == 0
+	assert 90 <= result['ttfb_ms']['p50'] < 190
+	assert 90 <= result['download_ms']['p50'] < 190
+	assert result['total_ms']['min'] >= result['ttfb_ms']['min'] + result['download_ms']['min']
+
+
+def test_fetch_phases_decodes_chunked_bodies_and_stops_at_the_last_byte():
+	class ChunkedHandler(BaseHTTPRequestHandler):
+		protocol_version = 'HTTP/1.1'
+
+		def do_GET(self):
+			self.send_response(200)
+			self.send_header('Transfer-Encoding', 'chunked')
+			self.end_headers()
+			for _ in range(3):
+				self.wfile.write(b'3e8\r\n' + b'x' * 1000 + b'\r\n')
+			self.wfile.write(b'0\r\n\r\n')
+			self.wfile.flush()
+			# La conexión queda abierta: la descarga no debe esperar al cierre
+			time.sleep(1)
+
+		def log_message(self, *args):
+			pass
+
+	httpd = ThreadingHTTPServer(('127.0.0.1', 0), ChunkedHandler)
+	threading.Thread(target=httpd.serve_forever, daemon=True).start()
+	try:
+		sample = timing.fetch_phases(f'http://127.0.0.1:{httpd.server_address[1]}/')
+	finally:
+		httpd.shutdown()
+
+	assert sample['status'] == 200
+	assert sample['bytes'] == 3000
+	assert sample['total_ms'] < 500
+
+
+def test_process_images_parallel_reuses_process_pools(monkeypatch):
+	img_bytes = make_image_bytes()
+	threads = set()
+
+	def download(url, timeout=10):
+		threads.add(threading.current_thread().name)
+		return img_bytes
+
+	monkeypatch.setattr(image_processor, 'download_image', download)
+	pools = image_processor.init_image_pools()
+	for _ in range(3):
+		result = image_processor.process_images_parallel(['https://a/1.jpg', 'https://b/2.jpg'], max_images=2)
+		assert result['processed_count'] == 2
+
+	assert image_processor.init_image_pools() == pools
+	assert len(threads) <= image_processor.DOWNLOAD_THREADS
+	assert all(name.startswith('img-download') for name in threads)
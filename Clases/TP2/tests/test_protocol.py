@@ -0,0 +1,210 @@
+import asyncio
+import socket
+import threading
+
+import pytest
+
+from common.framing import FrameReader, FrameTooLargeError
+from common.protocol import (
+    ProtocolMessage,
+    ProcessingConnectionPool,
+    create_performance_request,
+    create_response,
+    create_error_response,
+    MSG_TYPE_RESPONSE,
+    MSG_TYPE_ERROR,
+    MSG_TYPE_HELLO
+)
+
+
+def test_encode_decode_roundtrip():
+    message = create_performance_request('https://example.com', task_id='abc')
+    decoded = ProtocolMessage.decode(message.encode())
+    assert decoded.msg_type == message.msg_type
+    assert decoded.data == {'url': 'https://example.com', 'task_id': 'abc'}
+
+
+def test_binary_frame_carries_raw_attachments():
+    png = bytes(range(256)) * 10
+    message = create_response({'screenshot': png, 'thumbnails': [b'a', b'bc'], 'n': 1}, 't1')
+    parts = message.encode_parts(binary=True)
+    # Los adjuntos se pasan tal cual, sin copias ni base64
+    assert any(part is png for part in parts)
+
+    decoded = ProtocolMessage.decode(b''.join(parts), binary=True)
+    assert bytes(decoded.data['screenshot']) == png
+    assert [bytes(t) for t in decoded.data['thumbnails']] == [b'a', b'bc']
+    assert decoded.data['n'] == 1
+    assert decoded.data['task_id'] == 't1'
+
+
+def test_json_frame_falls_back_to_base64():
+    message = create_response({'screenshot': b'\x89PNG'})
+    decoded = ProtocolMessage.decode(message.encode())
+    assert decoded.data['screenshot'] == 'iVBORw=='
+
+
+def test_receive_binary_message_from_stream():
+    async def run():
+        reader = asyncio.StreamReader()
+        payload = b'x' * 100000
+        reader.feed_data(create_response({'screenshot': payload}, 't').encode(binary=True))
+        reader.feed_eof()
+        return payload, await ProtocolMessage.receive_message(reader, binary=True)
+
+    payload, message = asyncio.run(run())
+    assert isinstance(message.data['screenshot'], bytearray)
+    assert message.data['screenshot'] == payload
+
+
+def test_frame_reader_small_and_large_frames():
+    left, right = socket.socketpair()
+    small = [create_performance_request(f'https://{i}.test', task_id=str(i)) for i in range(50)]
+    large = create_response({'blob': b'z' * (3 * 1024 * 1024)}, 'big')
+
+    def sender():
+        left.sendall(b''.join(m.encode() for m in small) + large.encode(binary=True))
+        left.close()
+
+    thread = threading.Thread(target=sender)
+    thread.start()
+    reader = FrameReader(chunk_size=4096)
+    frames = []
+    while True:
+        frame = reader.recv_frame(right)
+        if frame is None:
+            break
+        frames.append(frame)
+    thread.join()
+    right.close()
+
+    assert len(frames) == 51
+    decoded = [ProtocolMessage.from_payload(t, p) for t, p in frames[:50]]
+    assert [m.data['task_id'] for m in decoded] == [str(i) for i in range(50)]
+    blob = ProtocolMessage.from_payload(*frames[50], binary=True).data['blob']
+    assert len(blob) == 3 * 1024 * 1024
+
+
+def test_frame_reader_nonblocking_and_size_limit():
+    left, right = socket.socketpair()
+    right.setblocking(False)
+    reader = FrameReader(max_frame_size=1024)
+    try:
+        assert reader.read_frames(right) == []
+
+        frame = create_performance_request('https://a.test').encode()
+        left.sendall(frame[:3])
+        assert reader.read_frames(right) == []
+        left.sendall(frame[3:])
+        assert len(reader.read_frames(right)) == 1
+
+        left.sendall(create_response({'blob': 'x' * 2048}).encode())
+        with pytest.raises(FrameTooLargeError):
+            reader.read_frames(right)
+
+        left.close()
+        with pytest.raises(EOFError):
+            FrameReader().read_frames(right)
+    finally:
+        right.close()
+
+
+async def _reverse_order_server(batch: int, connections: list):
+    """Servidor falso sin soporte de HELLO: lee `batch` peticiones y responde en orden inverso"""
+    async def handler(reader, writer):
+        connections.append(writer)
+        try:
+            hello = await ProtocolMessage.receive_message(reader)
+            assert hello.msg_type == MSG_TYPE_HELLO
+            await create_error_response('Tipo de mensaje desconocido').send_message(writer)
+            while True:
+                requests = [await ProtocolMessage.receive_message(reader) for _ in range(batch)]
+                for request in reversed(requests):
+                    reply = create_response({'echo': request.data['url']}, request.data['task_id'])
+                    await reply.send_message(writer)
+        except asyncio.IncompleteReadError:
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handler, '127.0.0.1', 0)
+
+
+def test_pool_multiplexes_out_of_order_responses():
+    async def run():
+        connections = []
+        server = await _reverse_order_server(3, connections)
+        port = server.sockets[0].getsockname()[1]
+        pool = ProcessingConnectionPool('127.0.0.1', port, size=1)
+        try:
+            urls = ['https://a.test', 'https://b.test', 'https://c.test']
+            responses = await asyncio.wait_for(
+                asyncio.gather(*(pool.request(create_performance_request(u)) for u in urls)), 10
+            )
+            assert not pool.connections[0].binary
+            return urls, responses, len(connections)
+        finally:
+            await pool.close()
+            server.close()
+            await server.wait_closed()
+
+    urls, responses, opened = asyncio.run(run())
+    assert opened == 1
+    assert [r.data['echo'] for r in responses] == urls
+    assert all(r.msg_type == MSG_TYPE_RESPONSE for r in responses)
+
+
+def test_pool_fails_pending_and_reconnects_after_connection_loss():
+    async def run():
+        connections = []
+
+        async def handler(reader, writer):
+            connections.append(writer)
+            request = await ProtocolMessage.receive_message(reader)
+            if len(connections) == 1:
+                writer.close()  # Simula una caída del servidor
+                return
+            await create_response({'ok': True}, request.data['task_id']).send_message(writer)
+
+        server = await asyncio.start_server(handler, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        pool = ProcessingConnectionPool('127.0.0.1', port, size=1, binary=False)
+        try:
+            with pytest.raises(ConnectionError):
+                await asyncio.wait_for(pool.request(create_performance_request('https://x.test')), 10)
+            response = await asyncio.wait_for(pool.request(create_performance_request('https://x.test')), 10)
+            return response, len(connections)
+        finally:
+            await pool.close()
+            server.close()
+            await server.wait_closed()
+
+    response, opened = asyncio.run(run())
+    assert response.data['ok'] is True
+    assert opened == 2
+
+
+def test_untagged_error_fails_all_pending_requests():
+    async def run():
+        async def handler(reader, writer):
+            for _ in range(2):
+                await ProtocolMessage.receive_message(reader)
+            # Error sin task_id, como el que envía B ante un frame inválido
+            await create_error_response('Mensaje inválido').send_message(writer)
+            await reader.read()
+            writer.close()
+
+        server = await asyncio.start_server(handler, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        pool = ProcessingConnectionPool('127.0.0.1', port, size=1, binary=False)
+        try:
+            requests = [pool.request(create_performance_request(u)) for u in ('https://a.test', 'https://b.test')]
+            return await asyncio.wait_for(asyncio.gather(*requests), 10)
+        finally:
+            await pool.close()
+            server.close()
+            await server.wait_closed()
+
+    responses = asyncio.run(run())
+    assert [r.msg_type for r in responses] == [MSG_TYPE_ERROR, MSG_TYPE_ERROR]
+    assert all(r.data['error'] == 'Mensaje inválido' for r in responses)
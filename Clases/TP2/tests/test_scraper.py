@@ -1,5 +1,21 @@
+import asyncio
+
 import pytest
 from scraper import html_parser
+from scraper.url_utils import normalize_url
+from scraper.single_flight import AsyncSingleFlight
+from scraper.stream_extractor import StreamingHTMLExtractor, extract_stream
+from scraper.parse_executor import ParseExecutor
+from scraper.job_store import JobStore
+from scraper.async_http import AsyncHTTPClient, IncrementalHTMLDecoder, ResponseTooLargeError, sniff_encoding
+from scraper.http_cache import HTTPCache, freshness_lifetime
+from scraper.connector import resolve_profile, interleave_families
+from scraper.crawler import TokenBucket, DomainRateLimiter, RobotsCache, Crawler
+from scraper.url_set import BloomFilter, ScalableBloomFilter, FingerprintSet, DiskFrontier, FRONTIER_INITIAL_BYTES
+import json
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+from server_scraping import ScrapingServer, parse_thumbnail_query, parse_batch_item, parse_deadlines, parse_crawl_query
 
 
 def test_extract_title_and_fallback():
@@ -96,3 +112,924 @@ def test_get_text_content_strips_scripts_and_truncates():
 	text = html_parser.get_text_content(soup, max_length=100)
 	assert 'var a=1' not in text
 	assert len(text) <= 104  # 100 + ellipsis
+
+
+def test_normalize_url_equivalent_variants():
+		expected = 'https://example.com/?a=1&b=2'
+		assert normalize_url('HTTPS://Example.COM:443?b=2&a=1#top') == expected
+		assert normalize_url('https://example.com/?a=1&b=2') == expected
+		assert normalize_url('http://example.com:8080/x') == 'http://example.com:8080/x'
+
+
+def test_single_flight_runs_once_for_concurrent_calls():
+		calls = []
+
+		async def fetch():
+			calls.append(1)
+			await asyncio.sleep(0.05)
+			return {'title': 'ok'}
+
+		async def run():
+			flight = AsyncSingleFlight()
+			results = await asyncio.gather(*(flight.do('k', fetch) for _ in range(50)))
+			# Terminada la primera ejecución, una llamada nueva vuelve a ejecutar
+			await flight.do('k', fetch)
+			return results, flight.stats()
+
+		results, stats = asyncio.run(run())
+		assert len(calls) == 2
+		assert all(r is results[0] for r in results)
+		assert stats == {'in_flight': 0, 'executed': 2, 'coalesced': 49}
+
+
+def test_single_flight_shares_errors_and_survives_cancellation():
+		async def failing():
+			await asyncio.sleep(0.05)
+			raise ValueError('boom')
+
+		async def run():
+			flight = AsyncSingleFlight()
+			first = asyncio.ensure_future(flight.do('k', failing))
+			second = asyncio.ensure_future(flight.do('k', failing))
+			await asyncio.sleep(0)
+			# Cancelar a uno de los que esperan no cancela la operación compartida
+			first.cancel()
+			with pytest.raises(ValueError):
+				await second
+
+		asyncio.run(run())
+
+
+def test_parse_page_extracts_everything_from_one_parse():
+		html = """
+		<html><head>
+			<title>Tienda</title>
+			<meta name="description" content="Desc">
+			<meta property="og:title" content="OG">
+			<meta name="twitter:card" content="summary">
+			<link rel="stylesheet" href="/s.css">
+			<script src="app.js"></script>
+			<script type="application/ld+json">{"@type": "Product", "name": "X"}</script>
+		</head><body>
+			<h1>A</h1><h2>B</h2>
+			<a href="/p/1">P1</a>
+			<img src="/a.png"><img src="b.jpg"><img src="/c.svg">
+			<iframe src="https://video.test/e"></iframe>
+		</body></html>
+		"""
+		base = 'https://shop.test/cat/'
+		page = html_parser.parse_page(html, base, image_limit=5)
+
+		assert page['title'] == 'Tienda'
+		assert page['links'] == ['https://shop.test/p/1']
+		assert page['structure']['h1'] == 1 and page['structure']['h2'] == 1
+		assert page['meta_tags'] == {'description': 'Desc', 'og:title': 'OG', 'twitter:card': 'summary'}
+		assert page['structured_data'] == [{'@type': 'Product', 'name': 'X'}]
+		assert page['image_urls'] == ['https://shop.test/a.png', 'https://shop.test/cat/b.jpg']
+		assert page['resources'] == {
+			'images': ['https://shop.test/a.png', 'https://shop.test/cat/b.jpg', 'https://shop.test/c.svg'],
+			'scripts': ['https://shop.test/cat/app.js'],
+			'stylesheets': ['https://shop.test/s.css'],
+			'other': ['https://video.test/e']
+		}
+
+
+def test_stream_extractor_matches_parse_page_with_tiny_chunks():
+		html = """
+		<html><head><meta charset="utf-8"><title>Tienda</title>
+			<meta name="description" content="Desc"><meta property="og:title" content="OG">
+			<link rel="stylesheet" href="/s.css">
+			<style>.a { background: url('/bg.png') }</style>
+			<script type="application/ld+json">{"@type": "Product"}</script>
+		</head><body>
+		""" + ''.join(
+			f'<div class="item"><h2>Item {i}</h2><a href="/p/{i}">ver</a><img src="/img/{i}.jpg"></div>'
+			for i in range(150)
+		) + '</body></html>'
+		data = html.encode('utf-8')
+		base = 'https://shop.test/'
+
+		# Chunks de 5 bytes: cortan atributos entre comillas en cualquier punto
+		result = extract_stream((data[i:i + 5] for i in range(0, len(data), 5)), base, image_limit=5)
+		assert result == html_parser.parse_page(html, base, image_limit=5)
+		assert len(result['links']) == 100
+		assert result['images_count'] == 151
+
+
+def test_stream_extractor_stops_early_when_limits_are_reached():
+		extractor = StreamingHTMLExtractor('https://site.test/', link_limit=2, image_limit=1, stop_early=True)
+		assert not extractor.feed(b'<html><head><title>T</title></head><body><a href="/1">1</a>')
+		assert extractor.feed(b'<a href="/2">2</a><img src="/a.png"><p>')
+		# Lo que llegue después ya no se procesa
+		assert extractor.feed(b'<a href="/3">3</a></p></body></html>')
+
+		result = extractor.close()
+		assert extractor.truncated
+		assert result['links'] == ['https://site.test/1', 'https://site.test/2']
+		assert result['image_urls'] == ['https://site.test/a.png']
+
+
+@pytest.mark.parametrize('kind', ['inline', 'thread', 'process'])
+def test_parse_executor_backends_give_same_result(kind):
+		html = '<html><head><title>T</title></head><body><a href="/a">a</a><img src="/i.png"></body></html>'
+
+		async def run():
+			executor = ParseExecutor(kind, workers=2)
+			await executor.start()
+			try:
+				return await executor.run(html_parser.parse_page, html, 'https://site.test/', 5)
+			finally:
+				await executor.close()
+
+		assert asyncio.run(run()) == html_parser.parse_page(html, 'https://site.test/', 5)
+
+
+def test_parse_executor_rejects_unknown_backend():
+		with pytest.raises(ValueError):
+			ParseExecutor('gpu')
+
+
+def test_parse_thumbnail_query():
+		query = {'thumb_sizes': '640x480, 160X120', 'thumb_formats': 'jpeg,webp', 'thumb_preset': 'fast'}
+		assert parse_thumbnail_query(query) == {
+			'sizes': [[640, 480], [160, 120]],
+			'formats': ['jpeg', 'webp'],
+			'preset': 'fast'
+		}
+		assert parse_thumbnail_query({}) == {}
+		with pytest.raises(ValueError):
+			parse_thumbnail_query({'thumb_sizes': '640by480'})
+
+
+def test_parse_batch_item_accepts_urls_json_and_objects():
+		assert parse_batch_item('  https://a.com/x \n') == 'https://a.com/x'
+		assert parse_batch_item('"https://b.com"') == 'https://b.com'
+		assert parse_batch_item('{"url": "https://c.com"}') == 'https://c.com'
+		assert parse_batch_item({'url': 'https://d.com'}) == 'https://d.com'
+		assert parse_batch_item('# comentario') is None
+		assert parse_batch_item('   ') is None
+		with pytest.raises(ValueError):
+			parse_batch_item(42)
+
+
+def batch_server(fake_scrape, concurrency):
+		server = ScrapingServer(batch_concurrency=concurrency)
+		server.scrape_url = fake_scrape
+		app = web.Application()
+		app.router.add_post('/scrape/batch', server.handle_batch)
+		return TestClient(TestServer(app))
+
+
+def test_batch_streams_results_with_bounded_concurrency():
+		state = {'running': 0, 'peak': 0, 'done': 0}
+
+		async def fake_scrape(url, image_options=None, stop_early=False):
+			state['running'] += 1
+			state['peak'] = max(state['peak'], state['running'])
+			try:
+				await asyncio.sleep(0.01 if url.endswith('/0') else 0.1)
+				if 'bad' in url:
+					raise ValueError('boom')
+				return {'url': url, 'status': 'success'}
+			finally:
+				state['running'] -= 1
+				state['done'] += 1
+
+		urls = [f'https://site.com/{i}' for i in range(9)] + ['https://bad.com/']
+		body = ''.join(json.dumps({'url': url}) + '\n' for url in urls)
+
+		async def run():
+			async with batch_server(fake_scrape, 3) as client:
+				response = await client.post('/scrape/batch?concurrency=5', data=body,
+											 headers={'Content-Type': 'application/x-ndjson'})
+				assert response.headers['Content-Type'] == 'application/x-ndjson'
+				first = json.loads(await response.content.readline())
+				# El primer resultado llega antes de que termine el lote
+				done_at_first = state['done']
+				lines = [first] + [json.loads(line) async for line in response.content]
+				return done_at_first, lines
+
+		done_at_first, lines = asyncio.run(run())
+		assert lines[0]['index'] == 0 and done_at_first < len(urls)
+		assert state['peak'] == 3
+		summary = lines[-1]['summary']
+		assert summary['total'] == 10 and summary['succeeded'] == 9 and summary['failed'] == 1
+		results = {line['index']: line for line in lines[:-1]}
+		assert sorted(results) == list(range(10))
+		assert results[9]['status'] == 'failed' and 'boom' in results[9]['error']
+		assert results[4]['url'] == urls[4]
+
+
+def test_read_batch_waits_for_workers_and_ends_each_one():
+		class FakeRequest:
+			content_type = 'application/json'
+
+			async def json(self):
+				return [f'https://site.com/{i}' for i in range(10)]
+
+		async def run():
+			urls = asyncio.Queue(maxsize=2)
+			reader = asyncio.ensure_future(ScrapingServer().read_batch(FakeRequest(), urls, consumers=3))
+			await asyncio.sleep(0.05)
+			# Cola llena: el lector espera en lugar de encolar todo el lote
+			blocked = not reader.done() and urls.qsize() == 2
+			items = [await urls.get() for _ in range(13)]
+			return blocked, items, await reader
+
+		blocked, items, error = asyncio.run(run())
+		assert blocked and error is None
+		assert [item[0] for item in items[:10]] == list(range(10))
+		assert items[10:] == [None, None, None]
+
+
+def test_batch_accepts_json_body_and_reports_bad_input():
+		async def fake_scrape(url, image_options=None, stop_early=False):
+			return {'url': url, 'status': 'success', 'options': image_options}
+
+		async def run():
+			async with batch_server(fake_scrape, 4) as client:
+				response = await client.post('/scrape/batch?thumb_preset=fast',
+											 json={'urls': ['https://a.com', 'https://b.com']})
+				ok = [json.loads(line) async for line in response.content]
+				response = await client.post('/scrape/batch', json={'url': 'https://a.com'})
+				bad = [json.loads(line) async for line in response.content]
+				return ok, bad
+
+		ok, bad = asyncio.run(run())
+		assert [line['url'] for line in sorted(ok[:-1], key=lambda line: line['index'])] == ['https://a.com', 'https://b.com']
+		assert ok[0]['options'] == {'preset': 'fast'}
+		assert ok[-1]['summary']['total'] == 2
+		assert len(bad) == 1 and bad[0]['summary']['total'] == 0
+		assert 'urls' in bad[0]['summary']['error']
+
+
+def test_job_store_expires_finished_jobs_and_evicts_when_full():
+		store = JobStore(ttl=60, max_jobs=2)
+		running = store.create('https://a.com')
+		finished = store.create('https://b.com')
+		store.update(finished['id'], status='done')
+		store.set_component(finished['id'], 'screenshot', None)
+
+		# Lleno: se descarta el terminado, nunca el que sigue en curso
+		third = store.create('https://c.com')
+		assert store.get(finished['id']) is None
+		assert store.get(running['id'])['status'] == 'pending'
+		with pytest.raises(RuntimeError):
+			store.create('https://d.com')
+
+		store.update(third['id'], status='failed', error='boom')
+		store._jobs[third['id']]['finished_at'] -= 61
+		assert store.get(third['id']) is None
+		stats = store.stats()
+		assert stats['stored'] == 1 and stats['pending'] == 1 and stats['expired'] == 1
+
+
+def test_jobs_expose_scraping_data_before_slow_processing():
+		release = asyncio.Event()
+		server = ScrapingServer()
+
+		async def fetch_and_parse(url):
+			if 'bad' in url:
+				raise ValueError('no html')
+			return {'title': 'Hola'}, [], {}
+
+		async def screenshot(url, task_id=None):
+			assert task_id.endswith(':screenshot')
+			await release.wait()
+			return b'png'
+
+		async def performance(url, page=None, task_id=None):
+			return {'load_time_ms': 1}
+
+		async def images(url, image_urls, options=None, task_id=None):
+			return []
+
+		server.fetch_and_parse = fetch_and_parse
+		server.request_screenshot = screenshot
+		server.request_performance = performance
+		server.request_image_processing = images
+		app = web.Application()
+		app.router.add_post('/jobs', server.handle_create_job)
+		app.router.add_get('/jobs/{job_id}', server.handle_get_job)
+
+		async def run():
+			async with TestClient(TestServer(app)) as client:
+				response = await client.post('/jobs', json={'url': 'https://a.com'})
+				assert response.status == 202
+				location = response.headers['Location']
+				for _ in range(50):
+					partial = await (await client.get(location)).json()
+					if 'performance' in partial['processing_data']:
+						break
+					await asyncio.sleep(0.01)
+				release.set()
+				for _ in range(50):
+					done = await (await client.get(location)).json()
+					if done['status'] == 'done':
+						break
+					await asyncio.sleep(0.01)
+				failed = await (await client.post('/jobs?url=https://bad.com')).json()
+				await asyncio.sleep(0.05)
+				failed = await (await client.get(failed['location'])).json()
+				missing = await client.get('/jobs/nope')
+				return partial, done, failed, missing.status
+
+		partial, done, failed, missing = asyncio.run(run())
+		assert partial['status'] == 'processing' and partial['scraping_data'] == {'title': 'Hola'}
+		assert partial['pending'] == ['screenshot']
+		assert done['processing_data']['screenshot'] == 'cG5n' and done['pending'] == []
+		assert done['finished_at'] is not None
+		assert failed['status'] == 'failed' and 'no html' in failed['error']
+		assert missing == 404
+
+
+def fake_scrape_client(**kwargs):
+		server = ScrapingServer(**kwargs)
+
+		async def fetch_and_parse(url, stop_early=False):
+			return {'title': 'Hola'}, [], {}
+
+		async def screenshot(url, task_id=None):
+			await asyncio.sleep(10)
+
+		async def performance(url, page=None, task_id=None):
+			await asyncio.sleep(0.05)
+			return {'load_time_ms': 1}
+
+		async def images(url, image_urls, options=None, task_id=None):
+			return [b'jpg']
+
+		server.fetch_and_parse = fetch_and_parse
+		server.request_screenshot = screenshot
+		server.request_performance = performance
+		server.request_image_processing = images
+		app = web.Application()
+		app.router.add_get('/scrape', server.handle_scrape)
+		return TestClient(TestServer(app))
+
+
+def test_stream_scrape_sends_each_component_as_it_finishes():
+		async def run():
+			async with fake_scrape_client(component_deadlines={'screenshot': 0.3}) as client:
+				response = await client.get('/scrape?url=https://a.com&stream=ndjson')
+				events = [json.loads(line) async for line in response.content]
+				sse = await (await client.get('/scrape?url=https://a.com&stream=sse')).text()
+				full = await (await client.get('/scrape?url=https://a.com')).json()
+				bad = await client.get('/scrape?url=https://a.com&stream=xml')
+				return response.headers['Content-Type'], events, sse, full, bad.status
+
+		content_type, events, sse, full, bad = asyncio.run(run())
+		assert content_type == 'application/x-ndjson'
+		assert [(e['event'], e.get('name')) for e in events] == [
+			('scraping', None), ('component', 'thumbnails'), ('component', 'performance'),
+			('component', 'screenshot'), ('done', None)
+		]
+		assert events[0]['scraping_data'] == {'title': 'Hola'} and events[0]['elapsed_ms'] < 100
+		assert events[1]['data'] == ['anBn']
+		assert events[3]['data'] is None and 'Plazo de 0.3 s' in events[3]['error']
+		assert events[3]['elapsed_ms'] < 1000
+		assert sse.startswith('event: scraping\ndata: {') and 'event: done\n' in sse
+		# Sin stream, el componente vencido se informa en errors
+		assert full['processing_data']['performance'] == {'load_time_ms': 1}
+		assert list(full['processing_data']['errors']) == ['screenshot']
+		assert bad == 400
+
+
+def test_parse_deadlines():
+		assert parse_deadlines(['screenshot=5', 'performance=1.5']) == {'screenshot': 5.0, 'performance': 1.5}
+		for value in ('screenshot', 'video=3', 'screenshot=abc', 'screenshot=0'):
+			with pytest.raises(ValueError):
+				parse_deadlines([value])
+
+
+def test_freshness_lifetime_follows_cache_headers():
+		now = 1_700_000_000
+		date = 'Tue, 14 Nov 2023 22:13:20 GMT'
+		assert freshness_lifetime({'cache-control': 'public, max-age=60', 'age': '10'}, now) == 50
+		assert freshness_lifetime({'cache-control': 'no-cache, max-age=60'}, now) == 0
+		assert freshness_lifetime({'cache-control': 'no-store'}, now) is None
+		assert freshness_lifetime({'cache-control': 'private, max-age=60'}, now) is None
+		assert freshness_lifetime({'date': date, 'expires': 'Tue, 14 Nov 2023 22:15:20 GMT'}, now) == 120
+		assert freshness_lifetime({'expires': '0'}, now) == 0
+		# Solo Last-Modified: 10% del tiempo desde la modificación
+		assert freshness_lifetime({'date': date, 'last-modified': 'Tue, 14 Nov 2023 22:03:20 GMT'}, now) == 60
+		assert freshness_lifetime({}, now) == 0
+
+
+def test_http_cache_decodes_invalid_bytes_like_the_live_fetch(tmp_path):
+		# Declarada UTF-8, con bytes inválidos lejos del principio
+		body = '<html><title>ñ</title>'.encode('utf-8') + b'x' * 5000 + b'<p>\xff\xfe</p></html>'
+
+		async def page(request):
+			headers = {'Cache-Control': 'max-age=60'} if request.path == '/fresh' else {'ETag': '"v1"'}
+			if request.headers.get('If-None-Match') == '"v1"':
+				return web.Response(status=304, headers=headers)
+			return web.Response(body=body, headers=headers, content_type='text/html', charset='utf-8')
+
+		app = web.Application()
+		app.router.add_get('/{name}', page)
+
+		async def run():
+			server = TestServer(app)
+			await server.start_server()
+			results = []
+			async with AsyncHTTPClient(timeout=5, cache=HTTPCache(str(tmp_path / 'http.sqlite'))) as client:
+				for name in ('fresh', 'etag'):
+					url = str(server.make_url(f'/{name}'))
+					results.append((await client.fetch_url(url), await client.fetch_url(url)))
+			await server.close()
+			return results
+
+		for first, second in asyncio.run(run()):
+			assert first[0] == second[0] and '\ufffd' in first[0]
+			assert first[2]['X-Cache'] == 'MISS' and second[2]['X-Cache'] in ('HIT', 'REVALIDATED')
+
+
+def test_http_cache_serves_fresh_pages_and_revalidates_with_304(tmp_path):
+		hits = {}
+		version = {'changed': 'v1'}
+
+		async def page(request):
+			name = request.match_info['name']
+			hits.setdefault(name, []).append(request.headers.get('If-None-Match') or request.headers.get('If-Modified-Since'))
+			body = f'<html><title>{name} ñ</title></html>'
+			headers = {}
+			if name == 'fresh':
+				headers['Cache-Control'] = 'max-age=60'
+			elif name == 'etag':
+				headers.update({'Cache-Control': 'no-cache', 'ETag': '"v1"'})
+				if request.headers.get('If-None-Match') == '"v1"':
+					return web.Response(status=304, headers=headers)
+			elif name == 'lastmod':
+				headers.update({'Cache-Control': 'max-age=0', 'Last-Modified': 'Tue, 14 Nov 2023 22:03:20 GMT'})
+				if request.headers.get('If-Modified-Since') == headers['Last-Modified']:
+					return web.Response(status=304, headers=headers)
+			elif name == 'changed':
+				headers['ETag'] = f'"{version["changed"]}"'
+				body += version['changed']
+				if request.headers.get('If-None-Match') == headers['ETag']:
+					return web.Response(status=304, headers=headers)
+			elif name == 'nostore':
+				headers.update({'Cache-Control': 'no-store', 'ETag': '"x"'})
+			return web.Response(body=body.encode('latin-1'), headers=headers,
+								content_type='text/html', charset='latin-1')
+
+		app = web.Application()
+		app.router.add_get('/{name}', page)
+		cache = HTTPCache(str(tmp_path / 'http.sqlite'))
+
+		async def run():
+			server = TestServer(app)
+			await server.start_server()
+			results = {}
+			async with AsyncHTTPClient(timeout=5, cache=cache) as client:
+				for name in ('fresh', 'etag', 'lastmod', 'changed', 'nostore'):
+					url = str(server.make_url(f'/{name}'))
+					first = await client.fetch_url(url)
+					if name == 'changed':
+						version['changed'] = 'v2'
+					second = await client.fetch_url(url)
+					results[name] = (first, second)
+			await server.close()
+			return results
+
+		results = asyncio.run(run())
+		status = {name: (a[2]['X-Cache'], b[2]['X-Cache']) for name, (a, b) in results.items()}
+		assert status == {
+			'fresh': ('MISS', 'HIT'),
+			'etag': ('MISS', 'REVALIDATED'),
+			'lastmod': ('MISS', 'REVALIDATED'),
+			'changed': ('MISS', 'MISS'),
+			'nostore': ('MISS', 'MISS')
+		}
+		# El cuerpo cacheado se decodifica con el mismo charset
+		for name, (first, second) in results.items():
+			if name != 'changed':
+				assert second[0] == first[0] and 'ñ' in second[0] and second[1] == 200
+		# Cambió: el 200 con el cuerpo nuevo reemplaza al guardado
+		assert results['changed'][0][0].endswith('v1') and results['changed'][1][0].endswith('v2')
+		# Fresca: sin segunda petición; vencidas: petición condicional
+		assert hits['fresh'] == [None]
+		assert hits['etag'] == [None, '"v1"']
+		assert hits['lastmod'] == [None, 'Tue, 14 Nov 2023 22:03:20 GMT']
+		assert hits['changed'] == [None, '"v1"']
+		assert hits['nostore'] == [None, None]
+
+		stats = cache.stats()
+		assert (stats['fresh_hits'], stats['revalidated'], stats['misses']) == (1, 2, 7)
+		assert stats['hit_ratio'] == 0.3
+		assert stats['bytes_saved'] == sum(len(results[name][0][0]) for name in ('fresh', 'etag', 'lastmod'))
+		assert stats['entries'] == 4
+
+
+def test_http_cache_evicts_least_recently_used(tmp_path):
+		cache = HTTPCache(str(tmp_path / 'http.sqlite'), max_bytes=250)
+		for name in ('a', 'b', 'c'):
+			assert cache.store(f'https://site/{name}', 200, {'ETag': name}, b'x' * 100)
+		assert cache.lookup('https://site/a') is None
+		assert cache.lookup('https://site/c')['body'] == b'x' * 100
+		assert not cache.store('https://site/big', 200, {'ETag': 'big'}, b'x' * 300)
+		assert not cache.store('https://site/none', 200, {}, b'x')
+		assert not cache.store('https://site/404', 404, {'ETag': 'e'}, b'x')
+		assert cache.stats()['evictions'] == 1
+		# Reemplazar una entrada actualiza el total llevado en memoria
+		assert cache.store('https://site/c', 200, {'ETag': 'c2'}, b'x' * 50)
+		assert (cache.stats()['entries'], cache.stats()['size_bytes']) == (2, 150)
+		cache.close()
+		assert HTTPCache(str(tmp_path / 'http.sqlite')).stats()['size_bytes'] == 150
+
+
+def test_cached_pages_are_measured_by_the_processing_server():
+		server = ScrapingServer()
+
+		class FakeClient:
+			def __init__(self, cache_status):
+				self.cache_status = cache_status
+
+			async def fetch_url(self, url):
+				return '<html><title>T</title></html>', 200, {'X-Cache': self.cache_status}
+
+		async def run():
+			await server.parse_executor.start()
+			pages = {}
+			for cache_status in ('MISS', 'HIT', 'REVALIDATED'):
+				server.http_client = FakeClient(cache_status)
+				pages[cache_status] = (await server.fetch_and_parse('https://site.test/'))[2]
+			await server.parse_executor.close()
+			return pages
+
+		pages = asyncio.run(run())
+		assert pages['MISS']['status_code'] == 200 and 'load_time_ms' in pages['MISS']
+		assert pages['HIT'] is None and pages['REVALIDATED'] is None
+
+
+def test_resolve_profile_and_family_interleaving():
+		profile = resolve_profile('crawl', limit_per_host=2, dns_ttl=None)
+		assert profile['limit'] == 100 and profile['limit_per_host'] == 2 and profile['dns_ttl'] == 600
+		assert resolve_profile({'limit': 3})['limit_per_host'] == 6
+		for bad in ('turbo', {'limit': 0}, {'pipelining': True}):
+			with pytest.raises(ValueError):
+				resolve_profile(bad)
+
+		hosts = [{'host': h, 'family': f} for h, f in (('a', 10), ('b', 10), ('c', 10), ('x', 2), ('y', 2))]
+		assert [h['host'] for h in interleave_families(hosts)] == ['a', 'x', 'b', 'y', 'c']
+
+
+def test_connector_profile_limits_per_host_and_reports_pool_usage():
+		state = {'active': 0, 'peak': 0}
+
+		async def page(request):
+			state['active'] += 1
+			state['peak'] = max(state['peak'], state['active'])
+			await asyncio.sleep(0.05)
+			state['active'] -= 1
+			return web.Response(text='<html></html>', content_type='text/html')
+
+		app = web.Application()
+		app.router.add_get('/{name}', page)
+
+		async def run():
+			server = TestServer(app, host='127.0.0.1')
+			await server.start_server()
+			profile = {'limit': 8, 'limit_per_host': 2, 'dns_ttl': 60}
+			async with AsyncHTTPClient(timeout=5, connector_profile=profile) as client:
+				# 'localhost' pasa por el resolver (y su caché); puede incluir ::1 sin servidor
+				urls = [f'http://localhost:{server.port}/{i}' for i in range(8)]
+				results = await client.fetch_multiple_urls(urls)
+				stats = client.connection_stats.stats()
+			await server.close()
+			return results, stats
+
+		results, stats = asyncio.run(run())
+		assert all(result[1] == 200 for result in results.values())
+		assert state['peak'] == 2
+		assert stats['requests'] == 8 and stats['in_flight'] == 0 and stats['peak_in_flight'] == 8
+		assert stats['connections_created'] == 2 and stats['connections_reused'] == 6
+		assert stats['queued'] == 6 and stats['avg_queue_ms'] > 0
+		assert stats['dns_cache_misses'] == 1 and stats['dns_cache_hits'] >= 1
+		assert stats['profile']['limit_per_host'] == 2
+
+
+def test_token_bucket_and_bloom_filter():
+		bucket = TokenBucket(rate=10, capacity=2)
+		now = bucket.updated
+		for _ in range(2):
+			assert bucket.delay(now) == 0
+			bucket.take(now)
+		assert bucket.delay(now) == pytest.approx(0.1)
+		assert bucket.delay(now + 0.1) == pytest.approx(0)
+
+		limiter = DomainRateLimiter(rate=10, burst=2)
+		limiter.slow_down('site', 0.5)
+		assert limiter.bucket('site').rate == 2 and limiter.bucket('other').rate == 10
+		with pytest.raises(ValueError):
+			DomainRateLimiter(rate=0)
+
+		seen = BloomFilter(capacity=1000, error_rate=0.01)
+		added = sum(seen.add(f'https://site/{i}') for i in range(1000))
+		assert added > 980 and len(seen) == added
+		assert all(f'https://site/{i}' in seen for i in range(1000))
+		assert not seen.add('https://site/5')
+		false_positives = sum(f'https://other/{i}' in seen for i in range(10000))
+		assert false_positives < 300
+
+
+def test_parse_crawl_query():
+		assert parse_crawl_query({}) == {'max_pages': 50, 'max_depth': 2, 'concurrency': 0, 'same_domain': True}
+		assert parse_crawl_query({'max_depth': '0', 'same_domain': 'false'})['same_domain'] is False
+		for bad in ({'max_pages': '0'}, {'max_depth': '9'}, {'max_pages': 'x'}):
+			with pytest.raises(ValueError):
+				parse_crawl_query(bad)
+
+
+def test_crawler_follows_links_politely():
+		import time
+		pages = {
+			'/': ['/a', '/b', '/a#top', '/private/x', 'http://other.example/'],
+			'/a': ['/c', '/'],
+			'/b': ['/a?'],
+			'/c': ['/d'],
+			'/d': []
+		}
+		requests = []
+
+		async def robots(request):
+			requests.append(('/robots.txt', time.monotonic()))
+			return web.Response(text='User-agent: *\nDisallow: /private\n')
+
+		async def page(request):
+			requests.append((request.path, time.monotonic()))
+			if request.path not in pages:
+				raise web.HTTPNotFound()
+			links = ''.join(f'<a href="{link}">x</a>' for link in pages[request.path])
+			return web.Response(text=f'<html><title>{request.path}</title>{links}</html>', content_type='text/html')
+
+		app = web.Application()
+		app.router.add_get('/robots.txt', robots)
+		app.router.add_get('/{tail:.*}', page)
+
+		async def run():
+			server = TestServer(app, host='127.0.0.1')
+			await server.start_server()
+			async with AsyncHTTPClient(timeout=5) as client:
+				async def fetch_page(url):
+					html, _, _ = await client.fetch_url(url)
+					return html_parser.parse_page(html, url)
+
+				crawler = Crawler(fetch_page, DomainRateLimiter(rate=20, burst=1), robots=RobotsCache(client),
+								  max_pages=10, max_depth=2, concurrency=4)
+				results = [result async for result in crawler.crawl([str(server.make_url('/'))])]
+			await server.close()
+			return results, crawler.stats()
+
+		results, stats = asyncio.run(run())
+		visited = {result['url'].split(':', 2)[2].split('/', 1)[1]: result for result in results}
+		assert set(visited) == {'', 'a', 'b', 'c', 'private/x'}
+		assert visited['private/x']['status'] == 'skipped' and visited['private/x']['reason'] == 'robots.txt'
+		assert visited['']['links_found'] == 5 and visited['']['links_queued'] == 3
+		assert visited['c']['depth'] == 2 and visited['c']['links_queued'] == 0
+		assert visited['a']['scraping_data']['title'] == '/a'
+		assert stats['fetched'] == 4 and stats['robots_blocked'] == 1 and stats['pending'] == 0
+		assert stats['duplicates'] >= 2 and stats['off_domain'] == 1
+
+		# robots.txt una sola vez, /private nunca y a lo sumo 20 páginas por segundo
+		paths = [path for path, _ in requests]
+		assert paths.count('/robots.txt') == 1 and '/private/x' not in paths
+		times = [at for path, at in requests if path != '/robots.txt']
+		assert all(later - earlier >= 0.045 for earlier, later in zip(times, times[1:]))
+
+
+def test_crawler_stops_at_max_pages():
+		async def fetch_page(url):
+			await asyncio.sleep(0.01)
+			number = int(url.rsplit('/', 1)[1] or 0)
+			return {'links': [f'https://site/{number * 2 + 1}', f'https://site/{number * 2 + 2}']}
+
+		async def run():
+			crawler = Crawler(fetch_page, DomainRateLimiter(rate=1000, burst=10), max_pages=7,
+							  max_depth=5, concurrency=3, seen=FingerprintSet())
+			return [result async for result in crawler.crawl(['https://site/'])], crawler.stats()
+
+		results, stats = asyncio.run(run())
+		assert len(results) == 7 and all(result['status'] == 'success' for result in results)
+		assert stats['fetched'] == 7 and stats['pending'] > 0
+
+
+def test_crawler_queues_urls_in_its_disk_frontier(tmp_path):
+		async def fetch_page(url):
+			number = int(url.rsplit('/', 1)[1] or 0)
+			return {'links': [f'https://site/{number * 2 + 1}', f'https://site/{number * 2 + 2}', 'https://site/']}
+
+		frontier = DiskFrontier(str(tmp_path / 'frontier'))
+
+		async def run():
+			crawler = Crawler(fetch_page, DomainRateLimiter(rate=1000, burst=10), max_pages=15,
+							  max_depth=3, concurrency=2, frontier=frontier)
+			return [result async for result in crawler.crawl(['https://site/'])], crawler.stats()
+
+		results, stats = asyncio.run(run())
+		assert sorted(result['url'] for result in results) == sorted(f'https://site/{i or ""}' for i in range(15))
+		assert stats['duplicates'] == 7 and stats['seen'] == len(frontier.seen) == 15
+		assert len(frontier) == 0 and frontier.pushed == 15
+		frontier.close()
+
+
+def test_crawler_reports_robots_errors_as_failed_pages():
+		class BrokenRobots:
+			async def allowed(self, url):
+				if url.endswith('/2'):
+					raise RuntimeError('robots roto')
+				return True
+
+			async def crawl_delay(self, url):
+				return None
+
+		async def fetch_page(url):
+			return {'links': ['https://site/1', 'https://site/2', 'https://site/3']}
+
+		async def run():
+			crawler = Crawler(fetch_page, DomainRateLimiter(rate=1000, burst=10), robots=BrokenRobots(),
+							  max_pages=10, max_depth=1, concurrency=1)
+			results = [result async for result in crawler.crawl(['https://site/'])]
+			return results, crawler.stats()
+
+		results, stats = asyncio.run(asyncio.wait_for(run(), 5))
+		by_url = {result['url']: result for result in results}
+		assert by_url['https://site/2'] == {'url': 'https://site/2', 'depth': 1, 'status': 'failed', 'error': 'robots roto'}
+		assert by_url['https://site/3']['status'] == 'success'
+		assert len(results) == 4 and stats['failed'] == 1 and stats['fetched'] == 3
+
+
+def test_scalable_bloom_filter_grows_and_keeps_error_bounded():
+		seen = ScalableBloomFilter(initial_capacity=100, error_rate=0.01)
+		added = sum(seen.add(f'https://site/{i}') for i in range(3000))
+		assert len(seen.filters) > 1 and len(seen) == added > 2900
+		assert all(f'https://site/{i}' in seen for i in range(3000))
+		# Cota: error_rate / (1 - tightening) = 2%
+		assert sum(f'https://other/{i}' in seen for i in range(10000)) < 300
+		assert seen.memory_bytes() < 3000 * 4
+
+
+def test_fingerprint_set_grows_and_persists(tmp_path):
+		path = str(tmp_path / 'seen.fp')
+		seen = FingerprintSet(path, capacity=8)
+		assert all(seen.add(f'https://site/{i}') for i in range(1000))
+		assert not seen.add('https://site/7') and 'https://site/1000' not in seen
+		assert len(seen) == 1000 and seen.resizes > 0 and seen.capacity >= 1000 / 0.7
+		seen.close()
+
+		reopened = FingerprintSet(path)
+		assert len(reopened) == 1000 and 'https://site/999' in reopened
+		reopened.close()
+
+		(tmp_path / 'other.fp').write_bytes(b'x' * 64)
+		with pytest.raises(ValueError):
+			FingerprintSet(str(tmp_path / 'other.fp'))
+
+
+def test_disk_frontier_is_fifo_without_repeats(tmp_path):
+		frontier = DiskFrontier(str(tmp_path / 'frontier'), capacity=8)
+		assert frontier.push('https://site/a') and frontier.push('https://site/ñ', 1)
+		assert not frontier.push('https://site/a', 2)
+		assert frontier.pop() == ('https://site/a', 0)
+		assert frontier.push('https://site/b', 2)
+		assert [frontier.pop(), frontier.pop(), frontier.pop()] == [('https://site/ñ', 1), ('https://site/b', 2), None]
+		# Vacía: el archivo de la cola se trunca pero las huellas siguen
+		assert frontier.stats() == {'pending': 0, 'seen': 3, 'queue_bytes': 0, 'fingerprint_bytes': 80}
+		assert (tmp_path / 'frontier' / 'frontier.queue').stat().st_size == FRONTIER_INITIAL_BYTES
+		assert not frontier.push('https://site/b')
+		frontier.close()
+
+
+def test_disk_frontier_grows_its_mapping_and_reads_by_offset(tmp_path):
+		frontier = DiskFrontier(str(tmp_path / 'frontier'))
+		long_path = 'x' * 1000
+		offsets = [frontier.append(f'https://site/{i}/{long_path}', i % 3) for i in range(200)]
+		assert (tmp_path / 'frontier' / 'frontier.queue').stat().st_size > FRONTIER_INITIAL_BYTES
+		# Lectura en cualquier orden, como las colas por dominio de Crawler
+		assert frontier.read(offsets[150]) == (f'https://site/150/{long_path}', 0)
+		for i, offset in enumerate(offsets):
+			if i != 150:
+				assert frontier.read(offset) == (f'https://site/{i}/{long_path}', i % 3)
+		assert len(frontier) == 0
+		assert (tmp_path / 'frontier' / 'frontier.queue').stat().st_size == FRONTIER_INITIAL_BYTES
+		frontier.close()
+
+
+def test_incremental_decoder_handles_split_characters_and_sniffs_encoding():
+		data = '<html><title>Año ñandú €</title></html>'.encode('utf-8')
+		decoder = IncrementalHTMLDecoder('utf-8')
+		text = ''.join(decoder.decode(data[i:i + 1]) for i in range(len(data))) + decoder.flush()
+		assert text == data.decode('utf-8')
+
+		latin = '<meta charset="iso-8859-1"><p>Año</p>'.encode('latin-1')
+		assert sniff_encoding(latin) == 'iso8859-1'
+		assert sniff_encoding('<p>Año</p>'.encode('utf-8')) == 'utf-8'
+		assert sniff_encoding('<p>Año</p>'.encode('cp1252')) == 'windows-1252'
+		assert sniff_encoding(b'\xef\xbb\xbf<p>') == 'utf-8-sig'
+
+		decoder = IncrementalHTMLDecoder()
+		assert decoder.decode(latin) == '' and decoder.flush() == latin.decode('latin-1')
+
+
+def test_fetch_url_streams_with_size_limit():
+		async def page(request):
+			return web.Response(body='<html><title>ñ</title></html>'.encode('latin-1'),
+								content_type='text/html', charset='latin-1')
+
+		async def declared(request):
+			return web.Response(body=b'<html>' + b'x' * 5000, content_type='text/html')
+
+		async def endless(request):
+			response = web.StreamResponse(headers={'Content-Type': 'text/html'})
+			await response.prepare(request)
+			try:
+				while True:
+					await response.write(b'<p>' + b'x' * 1000 + b'</p>')
+			except (ConnectionError, RuntimeError):
+				pass
+			return response
+
+		async def image(request):
+			return web.Response(body=b'\x89PNG' + b'\x00' * 3000, content_type='image/png')
+
+		app = web.Application()
+		app.router.add_get('/page', page)
+		app.router.add_get('/declared', declared)
+		app.router.add_get('/endless', endless)
+		app.router.add_get('/image', image)
+
+		async def run():
+			server = TestServer(app, host='127.0.0.1')
+			await server.start_server()
+			results = {}
+			async with AsyncHTTPClient(timeout=5, max_body_bytes=4096, max_binary_bytes=2048) as client:
+				chunks = []
+				results['page'] = await client.fetch_url(str(server.make_url('/page')), on_chunk=chunks.append)
+				results['chunks'] = chunks
+				stopped = []
+				results['stopped'] = await client.fetch_url(str(server.make_url('/endless')), chunk_size=1024,
+															 on_chunk=lambda chunk: stopped.append(chunk) or len(stopped) == 3)
+				for name in ('declared', 'endless'):
+					with pytest.raises(ResponseTooLargeError):
+						await client.fetch_url(str(server.make_url(f'/{name}')))
+				with pytest.raises(ResponseTooLargeError):
+					await client.fetch_stream(str(server.make_url('/endless')), lambda chunk: False)
+				with pytest.raises(ResponseTooLargeError):
+					await client.download_binary(str(server.make_url('/image')))
+				results['image'] = await client.download_binary(str(server.make_url('/image')), max_bytes=4000)
+				results['unlimited'] = await client.fetch_url(str(server.make_url('/declared')), max_bytes=10_000)
+			await server.close()
+			return results
+
+		results = asyncio.run(run())
+		html, status, _ = results['page']
+		assert html == '<html><title>ñ</title></html>' and status == 200
+		assert b''.join(results['chunks']) == html.encode('latin-1')
+		# Cortado por on_chunk: se devuelve lo leído (3 chunks de a lo sumo 1 KB)
+		assert results['stopped'][0].startswith('<p>') and len(results['stopped'][0]) <= 3 * 1024
+		assert len(results['image']) == 3004 and len(results['unlimited'][0]) == 5006
+
+
+def test_fetch_streaming_parses_off_the_event_loop_and_stops_early():
+		links = ''.join(f'<a href="/{i}">{i}</a><img src="/{i}.png">' for i in range(120)).encode()
+		body = (b'<html><head><title>T</title></head><body>' + links
+				+ (b'<p>' + b'x' * 1000 + b'</p>') * 2000 + b'</body></html>')
+
+		async def page(request):
+			return web.Response(body=body, content_type='text/html')
+
+		app = web.Application()
+		app.router.add_get('/page', page)
+
+		async def run():
+			import threading
+			test_server = TestServer(app, host='127.0.0.1')
+			await test_server.start_server()
+			server = ScrapingServer(parser='stream', executor='thread', workers=1)
+			await server.parse_executor.start()
+			server.http_client = AsyncHTTPClient(timeout=5)
+			threads = set()
+			feed = StreamingHTMLExtractor.feed
+
+			def tracking_feed(extractor, chunk):
+				threads.add(threading.current_thread().name)
+				return feed(extractor, chunk)
+
+			StreamingHTMLExtractor.feed = tracking_feed
+			try:
+				url = str(test_server.make_url('/page'))
+				full = await server.fetch_streaming(url)
+				early = await server.fetch_streaming(url, stop_early=True)
+			finally:
+				StreamingHTMLExtractor.feed = feed
+				await server.http_client.close_session()
+				await server.parse_executor.close()
+				await test_server.close()
+			return full, early, threads
+
+		full, early, threads = asyncio.run(run())
+		assert threads and all(name.startswith('parser') for name in threads)
+		assert full[0]['title'] == early[0]['title'] == 'T'
+		assert full[2] == len(body)
+		assert early[2] < len(body)
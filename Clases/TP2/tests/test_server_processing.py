@@ -0,0 +1,242 @@
+import asyncio
+import threading
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import pytest
+
+from server_processing import ProcessingServer
+from common.protocol import (
+    ProtocolMessage,
+    ProcessingConnectionPool,
+    create_performance_request,
+    create_image_processing_request,
+    create_stats_request,
+    MSG_TYPE_RESPONSE,
+    MSG_TYPE_ERROR
+)
+
+
+PAGE = (
+    '<html><head><title>Local</title><link rel="stylesheet" href="a.css"></head>'
+    '<body><img src="a.png"><script src="a.js"></script></body></html>'
+)
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def page_server(tmp_path):
+    (tmp_path / 'index.html').write_text(PAGE)
+    handler = functools.partial(QuietHandler, directory=str(tmp_path))
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{httpd.server_address[1]}/index.html'
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def processing_server(tmp_path):
+    server = ProcessingServer('127.0.0.1', 0, num_processes=2,
+                              cache_path=str(tmp_path / 'cache.sqlite'))
+    thread = threading.Thread(target=server.start, daemon=True)
+    thread.start()
+    assert server.ready.wait(10)
+    yield server
+    server.stop()
+    thread.join(10)
+    server.cleanup()
+
+
+def test_concurrent_connections_are_served(processing_server, page_server):
+    async def one_request(i):
+        reader, writer = await asyncio.open_connection('127.0.0.1', processing_server.port)
+        try:
+            await create_performance_request(page_server, task_id=f't{i}').send_message(writer)
+            return await ProtocolMessage.receive_message(reader)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    async def run():
+        return await asyncio.wait_for(asyncio.gather(*(one_request(i) for i in range(4))), 30)
+
+    responses = asyncio.run(run())
+    assert [r.data['task_id'] for r in responses] == ['t0', 't1', 't2', 't3']
+    for response in responses:
+        assert response.msg_type == MSG_TYPE_RESPONSE
+        assert response.data['performance']['resources']['images'] == 1
+
+
+def test_pipelined_requests_on_one_connection(processing_server, page_server):
+    async def run():
+        reader, writer = await asyncio.open_connection('127.0.0.1', processing_server.port)
+        try:
+            await create_performance_request(page_server, task_id='a').send_message(writer)
+            await ProtocolMessage(42, {'task_id': 'b'}).send_message(writer)
+            await create_performance_request(page_server, task_id='c').send_message(writer)
+            return [await ProtocolMessage.receive_message(reader) for _ in range(3)]
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    responses = asyncio.run(asyncio.wait_for(run(), 30))
+    by_id = {r.data['task_id']: r for r in responses}
+    assert set(by_id) == {'a', 'b', 'c'}
+    assert by_id['b'].msg_type == MSG_TYPE_ERROR
+    assert by_id['a'].msg_type == MSG_TYPE_RESPONSE
+    assert by_id['c'].msg_type == MSG_TYPE_RESPONSE
+
+
+def test_pool_negotiates_binary_frames(processing_server, page_server):
+    async def run():
+        pool = ProcessingConnectionPool('127.0.0.1', processing_server.port, size=1)
+        try:
+            response = await asyncio.wait_for(pool.request(create_performance_request(page_server)), 30)
+            return response, pool.connections[0].binary
+        finally:
+            await pool.close()
+
+    response, binary = asyncio.run(run())
+    assert binary is True
+    assert response.msg_type == MSG_TYPE_RESPONSE
+    assert response.data['performance']['resources']['stylesheets'] == 1
+
+
+def test_repeated_request_is_served_from_cache(processing_server, page_server):
+    async def run():
+        pool = ProcessingConnectionPool('127.0.0.1', processing_server.port, size=1)
+        try:
+            first = await asyncio.wait_for(pool.request(create_performance_request(page_server)), 30)
+            second = await asyncio.wait_for(pool.request(create_performance_request(page_server)), 30)
+            stats = await asyncio.wait_for(pool.request(create_stats_request()), 30)
+            return first, second, stats
+        finally:
+            await pool.close()
+
+    first, second, stats = asyncio.run(run())
+    assert second.data['performance'] == first.data['performance']
+    cache = stats.data['stats']['cache']
+    assert cache['hits'] == 1
+    assert cache['misses'] == 1
+    assert cache['entries'] == 1
+
+
+def test_identical_in_flight_tasks_are_coalesced(processing_server, page_server):
+    async def run():
+        reader, writer = await asyncio.open_connection('127.0.0.1', processing_server.port)
+        try:
+            # Las dos peticiones llegan juntas: la segunda espera el resultado de la primera
+            writer.writelines([
+                create_performance_request(page_server, task_id='a').encode(),
+                create_performance_request(page_server, task_id='b').encode()
+            ])
+            responses = [await ProtocolMessage.receive_message(reader) for _ in range(2)]
+            await create_stats_request(task_id='s').send_message(writer)
+            stats = await ProtocolMessage.receive_message(reader)
+            return responses, stats
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    responses, stats = asyncio.run(asyncio.wait_for(run(), 30))
+    assert {r.data['task_id'] for r in responses} == {'a', 'b'}
+    assert responses[0].data['performance'] == responses[1].data['performance']
+    assert stats.data['stats']['coalesced'] == 1
+    assert stats.data['stats']['cache']['entries'] == 1
+
+
+def test_unknown_thumbnail_preset_is_rejected(processing_server):
+    async def run():
+        pool = ProcessingConnectionPool('127.0.0.1', processing_server.port, size=1)
+        try:
+            request = create_image_processing_request('http://x/', [], options={'preset': 'turbo'})
+            return await asyncio.wait_for(pool.request(request), 30)
+        finally:
+            await pool.close()
+
+    response = asyncio.run(run())
+    assert response.msg_type == MSG_TYPE_ERROR
+    assert 'turbo' in response.data['error']
+
+
+def test_image_request_with_sizes_returns_thumbnail_sets(processing_server, page_server, tmp_path):
+    from PIL import Image
+    Image.new('RGB', (800, 600), (0, 128, 255)).save(tmp_path / 'a.png')
+    image_url = page_server.replace('index.html', 'a.png')
+
+    async def run():
+        pool = ProcessingConnectionPool('127.0.0.1', processing_server.port, size=1)
+        try:
+            request = create_image_processing_request(
+                page_server, [image_url], options={'sizes': [[400, 400], [100, 100]], 'formats': ['jpeg', 'webp']}
+            )
+            return await asyncio.wait_for(pool.request(request), 30)
+        finally:
+            await pool.close()
+
+    response = asyncio.run(run())
+    assert response.msg_type == MSG_TYPE_RESPONSE
+    (variants,) = response.data['thumbnail_sets']
+    assert [(v['width'], v['format']) for v in variants] == [(400, 'jpeg'), (400, 'webp'), (100, 'jpeg'), (100, 'webp')]
+    assert all(len(v['data']) > 0 for v in variants)
+
+
+def test_failed_thumbnail_batch_is_not_cached(processing_server, page_server):
+    missing = page_server.replace('index.html', 'missing.png')
+
+    async def run():
+        pool = ProcessingConnectionPool('127.0.0.1', processing_server.port, size=1)
+        try:
+            response = await asyncio.wait_for(pool.request(create_image_processing_request(page_server, [missing])), 30)
+            stats = await asyncio.wait_for(pool.request(create_stats_request()), 30)
+            return response, stats
+        finally:
+            await pool.close()
+
+    response, stats = asyncio.run(run())
+    assert response.data['thumbnails'] == []
+    assert stats.data['stats']['cache']['entries'] == 0
+
+
+def test_performance_cache_key_includes_page_metrics(processing_server, page_server):
+    pages = [{'load_time_ms': ms, 'size_bytes': 1000, 'status_code': 200, 'resources': {}} for ms in (10, 900)]
+
+    async def run():
+        pool = ProcessingConnectionPool('127.0.0.1', processing_server.port, size=1)
+        try:
+            responses = [await asyncio.wait_for(pool.request(create_performance_request(page_server, page=page)), 30)
+                         for page in pages]
+            stats = await asyncio.wait_for(pool.request(create_stats_request()), 30)
+            return responses, stats
+        finally:
+            await pool.close()
+
+    responses, stats = asyncio.run(run())
+    assert [r.data['performance']['load_time_ms'] for r in responses] == [10, 900]
+    assert stats.data['stats']['cache']['hits'] == 0
+    assert stats.data['stats']['cache']['entries'] == 2
+
+
+def test_waterfall_measurements_are_not_cached(processing_server, page_server):
+    async def run():
+        pool = ProcessingConnectionPool('127.0.0.1', processing_server.port, size=1)
+        try:
+            request = lambda: create_performance_request(page_server, options={'waterfall_samples': 1})
+            first = await asyncio.wait_for(pool.request(request()), 30)
+            second = await asyncio.wait_for(pool.request(request()), 30)
+            stats = await asyncio.wait_for(pool.request(create_stats_request()), 30)
+            return first, second, stats
+        finally:
+            await pool.close()
+
+    first, second, stats = asyncio.run(run())
+    assert first.data['performance']['waterfall']['ok'] == 1
+    assert second.data['performance']['waterfall']['ok'] == 1
+    assert stats.data['stats']['cache']['hits'] == 0
+    assert stats.data['stats']['cache']['entries'] == 0